@@ -7,6 +7,7 @@ Endpoints:
 - GET /api/matches?date=2024-12-16&sport=football
 - GET /api/sports - lista dostępnych sportów
 - GET /api/dates - lista dostępnych dat
+- GET /api/odds-movement/<event_id>?date=2024-12-16 - ruch kursów meczu (per bukmacher)
 
 Run:
     python api_server.py
@@ -68,6 +69,14 @@ except Exception as e:
     espn_client = None
     ESPN_AVAILABLE = False
 
+# Wspólny transport HTTP (limity per host, circuit breaker, dyskowy cache odpowiedzi
+# dzielony między workerami gunicorna) dla football-data / TheSportsDB / Open-Meteo
+from http_transport import get_transport
+
+# Odds line-movement history (partycje dzienne, tylko odczyt)
+from odds_history import OddsHistory
+odds_history = OddsHistory()
+
 # Live scores cache (30 second TTL)
 _live_scores_cache: dict = {'data': [], 'timestamp': 0}
 
@@ -687,6 +696,38 @@ def health_check():
     })
 
 
+@app.route('/api/odds-movement/<event_id>', methods=['GET'])
+def get_odds_movement(event_id):
+    """Odds snapshots of one event per bookmaker (scrape time -> kickoff).
+
+    ``date`` (YYYY-MM-DD, default today) picks the day partition; the event is
+    looked up in that day +/- 1, so the cost does not depend on history length.
+    """
+    date_str = request.args.get('date')
+    try:
+        day = odds_history.find_day(event_id, around=date_str)
+        movement = odds_history.movement(event_id, day) if day else None
+    except ValueError:
+        return jsonify({'error': 'Invalid date, expected YYYY-MM-DD'}), 400
+    finally:
+        # Partycje czytane per zapytanie - bez zwolnienia każda odpytana data zostaje w pamięci procesu
+        odds_history.forget()
+    if movement is None:
+        return jsonify({'error': 'No odds history for event'}), 404
+
+    event = movement['event'] or {}
+    return jsonify({
+        'eventId': event_id,
+        'date': day,
+        'kickoff': event.get('kickoff'),
+        'sport': event.get('sport'),
+        'homeTeam': event.get('home_team'),
+        'awayTeam': event.get('away_team'),
+        'series': movement['series'],
+        'change': movement['change'],
+    })
+
+
 # =============================================================================
 # USER BETS ENDPOINTS
 # =============================================================================
@@ -1029,8 +1070,6 @@ def get_weather():
     Returns: { temp, feelsLike, windSpeed, humidity, precipitation, weatherCode, description }
     """
     import time as _time
-    import urllib.request
-    import urllib.error
 
     city = request.args.get('city', '')
     lat = request.args.get('lat', type=float)
@@ -1075,9 +1114,12 @@ def get_weather():
     }
 
     try:
-        req = urllib.request.Request(url, headers={'User-Agent': 'BigOneSportsApp/1.0'})
-        with urllib.request.urlopen(req, timeout=5) as resp:
-            raw = json.loads(resp.read().decode())
+        # Shared transport: shared on-disk HTTP cache across workers (1h TTL for forecasts)
+        resp = get_transport().get(url, headers={'User-Agent': 'BigOneSportsApp/1.0'},
+                                   timeout=5, retries=0, max_wait=2)
+        if resp.status_code != 200:
+            return jsonify({'error': f'Weather fetch failed: HTTP {resp.status_code}'}), 502
+        raw = resp.json()
 
         daily = raw.get('daily', {})
         temp_max = daily.get('temperature_2m_max', [None])[0]
@@ -1109,7 +1151,7 @@ def get_weather():
 
         return jsonify(result)
 
-    except (urllib.error.URLError, Exception) as e:
+    except Exception as e:
         return jsonify({'error': f'Weather fetch failed: {str(e)}'}), 502
 
 
@@ -1136,7 +1178,6 @@ _FD_COMPETITIONS = {
 def _fd_fetch(path: str) -> dict | None:
     """Fetch from football-data.org with caching and rate-limit awareness."""
     import time as _time
-    import urllib.request, urllib.error
 
     api_key = os.environ.get('FOOTBALL_DATA_API_KEY', '')
     if not api_key:
@@ -1148,14 +1189,18 @@ def _fd_fetch(path: str) -> dict | None:
         return cached['data']
 
     url = f'https://api.football-data.org/v4{path}'
-    req = urllib.request.Request(url, headers={
+    headers = {
         'X-Auth-Token': api_key,
         'User-Agent': 'BigOneSportsApp/1.0',
-    })
+    }
 
     try:
-        with urllib.request.urlopen(req, timeout=8) as resp:
-            data = json.loads(resp.read().decode())
+        # Shared transport: 10 req/min free-tier limit + circuit breaker
+        resp = get_transport().get(url, headers=headers, timeout=8, retries=1, max_wait=2)
+        if resp.status_code != 200:
+            logger.warning('football-data.org %s: HTTP %s', path, resp.status_code)
+            return None
+        data = resp.json()
         _fd_cache[path] = {'data': data, 'ts': now}
         return data
     except Exception as e:
@@ -1221,7 +1266,6 @@ _TSDB_TTL = 3600  # 1-hour cache for metadata
 def _tsdb_fetch(path: str) -> dict | None:
     """Fetch from TheSportsDB free API with caching."""
     import time as _time
-    import urllib.request, urllib.error
 
     api_key = os.environ.get('THESPORTSDB_API_KEY', '1')  # free test key
     now = _time.time()
@@ -1230,11 +1274,14 @@ def _tsdb_fetch(path: str) -> dict | None:
         return cached['data']
 
     url = f'https://www.thesportsdb.com/api/v1/json/{api_key}{path}'
-    req = urllib.request.Request(url, headers={'User-Agent': 'BigOneSportsApp/1.0'})
 
     try:
-        with urllib.request.urlopen(req, timeout=8) as resp:
-            data = json.loads(resp.read().decode())
+        resp = get_transport().get(url, headers={'User-Agent': 'BigOneSportsApp/1.0'},
+                                   timeout=8, retries=1, max_wait=2)
+        if resp.status_code != 200:
+            logger.warning('TheSportsDB %s: HTTP %s', path, resp.status_code)
+            return None
+        data = resp.json()
         _tsdb_cache[path] = {'data': data, 'ts': now}
         return data
     except Exception as e:
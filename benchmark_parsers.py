@@ -0,0 +1,316 @@
+"""
+Benchmark Parsers - offline wydajność i poprawność parserów HTML
+================================================================
+
+Mierzy parsery na zapisanych stronach (bez sieci, bez Selenium):
+
+    h2h        - parse_h2h_from_soup          (debug_html/h2h_page_*.html)
+    links      - _extract_match_links_from_soup
+    team_form  - extract_team_form (home + away, bez drivera)
+    h2h_form   - _parse_form_from_h2h_soup + _parse_away_form_from_soup
+    forebet    - wiersze Forebet: make_soup(FOREBET_ROWS_STRAINER) + _forebet_row_team_spans
+
+Dla każdego parsera: ops/s (1 op = 1 fixture), średni czas, a w osobnym
+przebiegu pod tracemalloc szczytowa i pozostała pamięć (alokacje).
+
+Wyniki parserów są porównywane z ``debug_html/parser_golden.json`` -
+zmiana wyniku = błąd (exit 1). Opcjonalnie porównanie z zapisanym lokalnie
+baseline ops/s: spadek poniżej ``1 / --max-slowdown`` = błąd.
+
+Użycie:
+    python benchmark_parsers.py                          # golden + czasy
+    python benchmark_parsers.py --update-golden          # po zamierzonej zmianie parsera
+    python benchmark_parsers.py --save-baseline bench.json
+    python benchmark_parsers.py --baseline bench.json --max-slowdown 1.5
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+from html_parsing import make_soup, FOREBET_ROWS_STRAINER
+
+logger = logging.getLogger(__name__)
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+FIXTURE_DIR = os.path.join(ROOT, 'debug_html')
+H2H_PATTERNS = ('h2h_page_*.html', 'h2h_debug_*.html')
+FOREBET_FIXTURES = (os.path.join(ROOT, 'forebet_football_puppeteer.html'),)
+GOLDEN_PATH = os.path.join(FIXTURE_DIR, 'parser_golden.json')
+
+LISTING_URL = 'https://www.livesport.com/pl/'
+BENCH_NAMES = ('h2h', 'links', 'team_form', 'h2h_form', 'forebet')
+
+
+def _read(path: str) -> str:
+    with open(path, encoding='utf-8', errors='ignore') as f:
+        return f.read()
+
+
+def _normalise(value):
+    """Wynik parsera w postaci JSON (krotki -> listy), żeby porównać z golden."""
+    return json.loads(json.dumps(value, ensure_ascii=False, default=str))
+
+
+def load_h2h_fixtures(fixture_dir: str = FIXTURE_DIR) -> List[Dict]:
+    """Strony H2H z gotowym soup i nazwami drużyn z nagłówka (setup, poza pomiarem)."""
+    import livesport_h2h_scraper as ls
+
+    paths = sorted({p for pattern in H2H_PATTERNS for p in glob.glob(os.path.join(fixture_dir, pattern))})
+    fixtures = []
+    for path in paths:
+        html = _read(path)
+        soup = make_soup(html)
+        header = {}
+        ls._parse_match_header(soup, path, header)
+        fixtures.append({
+            'name': os.path.basename(path),
+            'html': html,
+            'soup': soup,
+            'home': header.get('home_team') or '',
+            'away': header.get('away_team') or '',
+        })
+    return fixtures
+
+
+def load_forebet_fixtures(paths=FOREBET_FIXTURES) -> List[Dict]:
+    return [{'name': os.path.basename(p), 'html': _read(p)} for p in paths if os.path.exists(p)]
+
+
+# ----------------------------------------------------------------------
+# Parsery (fixture -> wynik porównywany z golden)
+# ----------------------------------------------------------------------
+def _bench_h2h(fx: Dict):
+    import livesport_h2h_scraper as ls
+    return ls.parse_h2h_from_soup(fx['soup'], fx['home'])
+
+
+def _bench_links(fx: Dict):
+    import livesport_h2h_scraper as ls
+    links, _ = ls._extract_match_links_from_soup(fx['soup'], LISTING_URL, set())
+    return links
+
+
+def _bench_team_form(fx: Dict):
+    import livesport_h2h_scraper as ls
+    return {
+        'home': ls.extract_team_form(fx['soup'], None, 'home', fx['home']),
+        'away': ls.extract_team_form(fx['soup'], None, 'away', fx['away']),
+    }
+
+
+def _bench_h2h_form(fx: Dict):
+    import livesport_h2h_scraper as ls
+    home_form, away_form = ls._parse_form_from_h2h_soup(fx['soup'], 'overall')
+    return {
+        'overall': [home_form, away_form],
+        'away_from_overall': ls._parse_away_form_from_soup(fx['soup'], away_form),
+    }
+
+
+def _bench_forebet(fx: Dict):
+    import forebet_scraper as fs
+    soup = make_soup(fx['html'], parse_only=FOREBET_ROWS_STRAINER)
+    teams = []
+    for row in soup.find_all('div', class_='rcnt'):
+        home_span, away_span, _, _ = fs._forebet_row_team_spans(row)
+        if home_span and away_span:
+            teams.append([home_span.get_text(strip=True), away_span.get_text(strip=True)])
+    return teams
+
+
+BENCHES: Dict[str, Callable[[Dict], object]] = {
+    'h2h': _bench_h2h,
+    'links': _bench_links,
+    'team_form': _bench_team_form,
+    'h2h_form': _bench_h2h_form,
+    'forebet': _bench_forebet,
+}
+
+
+class ParserBenchmark:
+    """
+    Czasy, pamięć i golden check parserów na fixture'ach z dysku.
+
+    Args:
+        h2h_fixtures: Wynik load_h2h_fixtures() (None = wczytaj z debug_html/)
+        forebet_fixtures: Wynik load_forebet_fixtures() (None = domyślne pliki)
+        iterations: Ile razy każdy parser przechodzi przez wszystkie fixture'y
+        golden_path: Plik z oczekiwanymi wynikami
+    """
+
+    def __init__(
+        self,
+        h2h_fixtures: Optional[List[Dict]] = None,
+        forebet_fixtures: Optional[List[Dict]] = None,
+        iterations: int = 5,
+        golden_path: str = GOLDEN_PATH,
+    ):
+        self.h2h_fixtures = load_h2h_fixtures() if h2h_fixtures is None else h2h_fixtures
+        self.forebet_fixtures = load_forebet_fixtures() if forebet_fixtures is None else forebet_fixtures
+        self.iterations = max(1, int(iterations))
+        self.golden_path = golden_path
+        self.stats: Dict[str, Dict] = {}
+        self.mismatches: List[str] = []
+
+    def fixtures_for(self, bench: str) -> List[Dict]:
+        return self.forebet_fixtures if bench == 'forebet' else self.h2h_fixtures
+
+    # ------------------------------------------------------------------
+    # Poprawność
+    # ------------------------------------------------------------------
+    def outputs(self) -> Dict[str, Dict[str, object]]:
+        """{parser: {fixture: wynik}} - format pliku golden."""
+        with contextlib.redirect_stdout(io.StringIO()):
+            return {
+                bench: {fx['name']: _normalise(fn(fx)) for fx in self.fixtures_for(bench)}
+                for bench, fn in BENCHES.items()
+            }
+
+    def load_golden(self) -> Dict:
+        if not os.path.exists(self.golden_path):
+            return {}
+        with open(self.golden_path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def save_golden(self) -> Dict:
+        outputs = self.outputs()
+        with open(self.golden_path, 'w', encoding='utf-8') as f:
+            json.dump(outputs, f, ensure_ascii=False, indent=1, sort_keys=True)
+            f.write('\n')
+        return outputs
+
+    def check_golden(self, golden: Optional[Dict] = None) -> List[str]:
+        """Lista różnic względem golden (pusta = OK). Brak golden = różnica."""
+        golden = self.load_golden() if golden is None else golden
+        self.mismatches = []
+        if not golden:
+            self.mismatches.append(f"brak pliku golden: {self.golden_path}")
+            return self.mismatches
+        for bench, results in self.outputs().items():
+            expected = golden.get(bench, {})
+            for name, result in results.items():
+                if name not in expected:
+                    self.mismatches.append(f"{bench}/{name}: brak w golden")
+                elif result != expected[name]:
+                    self.mismatches.append(f"{bench}/{name}: wynik różni się od golden")
+            for name in sorted(set(expected) - set(results)):
+                self.mismatches.append(f"{bench}/{name}: brak fixture'a")
+        return self.mismatches
+
+    # ------------------------------------------------------------------
+    # Wydajność
+    # ------------------------------------------------------------------
+    def _measure(self, bench: str) -> Dict:
+        fn = BENCHES[bench]
+        fixtures = self.fixtures_for(bench)
+        if not fixtures:
+            return {'ops': 0, 'ops_per_s': 0.0, 'mean_ms': 0.0, 'peak_kb': 0.0, 'retained_kb': 0.0}
+
+        fn(fixtures[0])  # rozgrzanie (importy, cache regexów)
+        t0 = time.perf_counter()
+        for _ in range(self.iterations):
+            for fx in fixtures:
+                fn(fx)
+        elapsed = time.perf_counter() - t0
+        ops = self.iterations * len(fixtures)
+
+        # Alokacje - osobny przebieg, tracemalloc spowalnia pomiar czasu
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        results = [fn(fx) for fx in fixtures]
+        current, peak = tracemalloc.get_traced_memory()
+        if not tracing:
+            tracemalloc.stop()
+        del results
+
+        return {
+            'ops': ops,
+            'ops_per_s': ops / elapsed if elapsed > 0 else float('inf'),
+            'mean_ms': elapsed / ops * 1000,
+            'peak_kb': max(0, peak - before) / 1024 / len(fixtures),
+            'retained_kb': max(0, current - before) / 1024 / len(fixtures),
+        }
+
+    def run(self, benches=BENCH_NAMES) -> Dict[str, Dict]:
+        # parsery drukują diagnostykę (np. forma ze strony bez H2H) - poza raportem
+        with contextlib.redirect_stdout(io.StringIO()):
+            for bench in benches:
+                self.stats[bench] = self._measure(bench)
+        return self.stats
+
+    def compare_baseline(self, baseline: Dict[str, Dict], max_slowdown: float = 1.5) -> List[str]:
+        """Parsery wolniejsze niż ``max_slowdown`` x zapisany baseline ops/s."""
+        regressions = []
+        for bench, stats in self.stats.items():
+            base = (baseline.get(bench) or {}).get('ops_per_s')
+            if base and stats['ops_per_s'] * max_slowdown < base:
+                regressions.append(f"{bench}: {stats['ops_per_s']:.1f} ops/s < baseline "
+                                   f"{base:.1f} / {max_slowdown:g}")
+        return regressions
+
+    def format_report(self) -> str:
+        lines = [f"⏱️ Benchmark parserów ({len(self.h2h_fixtures)} stron H2H, "
+                 f"{len(self.forebet_fixtures)} Forebet, {self.iterations} iteracji):",
+                 f"   {'parser':<10} {'ops/s':>9} {'ms/op':>8} {'peak KB':>9} {'zostaje KB':>11}"]
+        for bench, s in self.stats.items():
+            lines.append(f"   {bench:<10} {s['ops_per_s']:>9.1f} {s['mean_ms']:>8.2f} "
+                         f"{s['peak_kb']:>9.1f} {s['retained_kb']:>11.1f}")
+        if self.mismatches:
+            lines.append(f"   ❌ Golden: {len(self.mismatches)} różnic")
+            lines.extend(f"      - {m}" for m in self.mismatches[:20])
+        else:
+            lines.append("   ✅ Golden: wyniki zgodne")
+        return '\n'.join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Offline benchmark parserów HTML (debug_html/)')
+    parser.add_argument('--iterations', type=int, default=5, help='Przebiegi przez wszystkie fixture\'y')
+    parser.add_argument('--update-golden', action='store_true', help='Zapisz bieżące wyniki jako golden')
+    parser.add_argument('--golden', default=GOLDEN_PATH, help='Plik golden')
+    parser.add_argument('--baseline', help='Plik JSON z poprzednimi ops/s (--save-baseline)')
+    parser.add_argument('--save-baseline', help='Zapisz bieżące ops/s do pliku JSON')
+    parser.add_argument('--max-slowdown', type=float, default=1.5,
+                        help='Dopuszczalne spowolnienie względem --baseline (domyślnie 1.5x)')
+    args = parser.parse_args(argv)
+
+    # process_match loguje ostrzeżenia dla stron bez nagłówka (strony blokady)
+    logging.getLogger('livesport_h2h_scraper').setLevel(logging.ERROR)
+
+    bench = ParserBenchmark(iterations=args.iterations, golden_path=args.golden)
+    if args.update_golden:
+        bench.save_golden()
+        print(f"💾 Zapisano golden: {args.golden}")
+
+    bench.check_golden()
+    bench.run()
+    print(bench.format_report())
+
+    failed = bool(bench.mismatches)
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = bench.compare_baseline(json.load(f), args.max_slowdown)
+        for r in regressions:
+            print(f"   🐢 Regresja: {r}")
+        failed = failed or bool(regressions)
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump(bench.stats, f, indent=1)
+        print(f"💾 Zapisano baseline: {args.save_baseline}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,250 @@
+"""
+Browser Recycler - restart Chrome na podstawie pamięci i opóźnień
+=================================================================
+
+Zamiast restartu "na ślepo" co RESTART_INTERVAL meczów recycler obserwuje
+przeglądarkę po każdym meczu i restartuje ją tylko gdy przekroczy progi:
+
+    rss      - RSS chromedriver + wszystkie procesy Chrome (psutil) > max_rss_mb
+    latency  - mediana ostatnich czasów meczu > latency_factor x mediana bazowa
+               (i co najmniej o min_latency_increase sekund więcej)
+    limit    - bezpiecznik: max_matches meczów na jednej instancji
+
+Gdy metryki zbliżają się do progu (prestart_ratio), nowy driver jest
+uruchamiany w tle - restart to wtedy tylko podmiana, bez martwego czasu
+na start Chrome. Każdy restart jest logowany razem z powodem.
+
+Bez psutil działają tylko progi opóźnień i bezpiecznik.
+
+Użycie:
+    recycler = BrowserRecycler(lambda: start_driver(headless=True))
+    t0 = time.time(); process_match(url, driver)
+    reason = recycler.observe(driver, time.time() - t0)
+    if reason:
+        driver = recycler.recycle(driver, reason)
+    ...
+    recycler.close()
+"""
+
+import logging
+import os
+import statistics
+import threading
+from collections import deque
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    psutil = None
+    PSUTIL_AVAILABLE = False
+
+RECYCLE_MAX_RSS_ENV = 'BROWSER_RECYCLE_MAX_RSS_MB'
+
+DEFAULT_MAX_RSS_MB = 1500.0
+DEFAULT_LATENCY_FACTOR = 2.0
+DEFAULT_MAX_MATCHES = 400
+
+
+def driver_rss_mb(driver) -> Optional[float]:
+    """
+    Suma RSS procesu chromedriver i jego potomków (Chrome, renderery) w MB.
+
+    Returns:
+        MB albo None (brak psutil / brak PID / proces już nie istnieje)
+    """
+    if not PSUTIL_AVAILABLE:
+        return None
+    try:
+        pid = driver.service.process.pid
+        root = psutil.Process(pid)
+        total = root.memory_info().rss
+        for child in root.children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        return total / (1024 * 1024)
+    except Exception:
+        return None
+
+
+def _safe_quit(driver) -> None:
+    if driver is None:
+        return
+    try:
+        driver.quit()
+    except Exception:
+        pass  # Ignoruj błędy przy zamykaniu
+
+
+class BrowserRecycler:
+    """
+    Decyduje kiedy zrestartować przeglądarkę i trzyma zapasowy driver.
+
+    Args:
+        driver_factory: Funkcja bez argumentów zwracająca nowy driver
+        max_rss_mb: Próg pamięci [MB] (domyślnie z BROWSER_RECYCLE_MAX_RSS_MB lub 1500)
+        latency_factor: Ile razy wolniej niż bazowo, zanim restart
+        min_latency_increase: Minimalny bezwzględny wzrost mediany [s]
+        window: Liczba meczów w oknie bazowym i w oknie bieżącym
+        max_matches: Bezpiecznik - restart po tylu meczach niezależnie od metryk
+        sample_every: Co ile meczów mierzyć RSS
+        prestart_ratio: Ułamek progu, od którego startuje driver zapasowy (None = wyłączone)
+        rss_probe: Funkcja driver -> MB (domyślnie driver_rss_mb; do testów)
+        name: Etykieta w logach (np. numer workera)
+    """
+
+    def __init__(
+        self,
+        driver_factory: Callable[[], object],
+        max_rss_mb: Optional[float] = None,
+        latency_factor: float = DEFAULT_LATENCY_FACTOR,
+        min_latency_increase: float = 2.0,
+        window: int = 10,
+        max_matches: int = DEFAULT_MAX_MATCHES,
+        sample_every: int = 5,
+        prestart_ratio: Optional[float] = 0.8,
+        rss_probe: Callable[[object], Optional[float]] = None,
+        name: str = 'chrome',
+    ):
+        if max_rss_mb is None:
+            max_rss_mb = float(os.getenv(RECYCLE_MAX_RSS_ENV, DEFAULT_MAX_RSS_MB))
+        self.driver_factory = driver_factory
+        self.max_rss_mb = max_rss_mb
+        self.latency_factor = latency_factor
+        self.min_latency_increase = min_latency_increase
+        self.window = max(1, int(window))
+        self.max_matches = max(1, int(max_matches))
+        self.sample_every = max(1, int(sample_every))
+        self.prestart_ratio = prestart_ratio
+        self.rss_probe = rss_probe or driver_rss_mb
+        self.name = name
+
+        self._spare = None
+        self._spare_thread: Optional[threading.Thread] = None
+        self._spare_lock = threading.Lock()
+        self.stats = {
+            'recycles': 0,
+            'spare_hits': 0,
+            'reasons': {},
+            'peak_rss_mb': 0.0,
+        }
+        self._reset_metrics()
+
+    def _reset_metrics(self) -> None:
+        self.matches = 0
+        self.last_rss_mb: Optional[float] = None
+        self._baseline = []
+        self._recent = deque(maxlen=self.window)
+
+    # ------------------------------------------------------------------
+    # Metryki
+    # ------------------------------------------------------------------
+    def _latency_medians(self):
+        if len(self._baseline) < self.window or len(self._recent) < self.window:
+            return None, None
+        return statistics.median(self._baseline), statistics.median(self._recent)
+
+    def _check(self, ratio: float) -> Optional[str]:
+        """Powód restartu, gdy metryki przekraczają ``ratio`` x próg (1.0 = właściwy próg)."""
+        if self.matches >= self.max_matches * ratio:
+            return f'limit {self.matches} meczów'
+        if self.last_rss_mb is not None and self.last_rss_mb >= self.max_rss_mb * ratio:
+            return f'RSS {self.last_rss_mb:.0f} MB (próg {self.max_rss_mb:.0f} MB)'
+        baseline, recent = self._latency_medians()
+        if baseline is not None:
+            factor = 1 + (self.latency_factor - 1) * ratio
+            if recent >= baseline * factor and recent - baseline >= self.min_latency_increase * ratio:
+                return f'opóźnienie {recent:.1f}s vs bazowe {baseline:.1f}s'
+        return None
+
+    def observe(self, driver, seconds: float) -> Optional[str]:
+        """
+        Rejestruje czas meczu na bieżącym driverze.
+
+        Returns:
+            Powód restartu (str) albo None
+        """
+        self.matches += 1
+        if len(self._baseline) < self.window:
+            self._baseline.append(seconds)
+        else:
+            self._recent.append(seconds)
+
+        if self.matches % self.sample_every == 0:
+            self.last_rss_mb = self.rss_probe(driver)
+            if self.last_rss_mb is not None:
+                self.stats['peak_rss_mb'] = max(self.stats['peak_rss_mb'], self.last_rss_mb)
+
+        reason = self._check(1.0)
+        if reason is None and self.prestart_ratio and self._check(self.prestart_ratio):
+            self.prestart()
+        return reason
+
+    # ------------------------------------------------------------------
+    # Driver zapasowy
+    # ------------------------------------------------------------------
+    def _start_spare(self) -> None:
+        try:
+            spare = self.driver_factory()
+        except Exception as e:
+            logger.warning(f"[{self.name}] Nie udało się uruchomić zapasowego drivera: {e}")
+            return
+        with self._spare_lock:
+            self._spare = spare
+
+    def prestart(self) -> None:
+        """Uruchamia zapasowy driver w tle (no-op gdy już jest / trwa start)."""
+        with self._spare_lock:
+            if self._spare is not None or (self._spare_thread and self._spare_thread.is_alive()):
+                return
+            self._spare_thread = threading.Thread(target=self._start_spare, name=f'{self.name}-spare', daemon=True)
+            self._spare_thread.start()
+        logger.info(f"[{self.name}] Start zapasowego drivera w tle")
+
+    def _take_spare(self):
+        thread = self._spare_thread
+        if thread is not None:
+            thread.join()
+        with self._spare_lock:
+            spare, self._spare = self._spare, None
+            self._spare_thread = None
+        return spare
+
+    def recycle(self, driver, reason: str):
+        """
+        Zamyka bieżący driver i zwraca następny (zapasowy, jeśli gotowy).
+
+        Returns:
+            Nowy driver (wyjątek z driver_factory jest propagowany)
+        """
+        logger.info(f"[{self.name}] Restart przeglądarki po {self.matches} meczach: {reason}")
+        self.stats['recycles'] += 1
+        kind = reason.split()[0]
+        self.stats['reasons'][kind] = self.stats['reasons'].get(kind, 0) + 1
+
+        _safe_quit(driver)
+        self._reset_metrics()
+        spare = self._take_spare()
+        if spare is not None:
+            self.stats['spare_hits'] += 1
+            return spare
+        return self.driver_factory()
+
+    def close(self) -> None:
+        """Zamyka niewykorzystany driver zapasowy."""
+        _safe_quit(self._take_spare())
+
+    def format_report(self) -> str:
+        s = self.stats
+        if not s['recycles']:
+            peak = f", szczyt RSS {s['peak_rss_mb']:.0f} MB" if s['peak_rss_mb'] else ''
+            return f"♻️  Recykling przeglądarki: brak restartów{peak}"
+        reasons = ', '.join(f'{k}:{v}' for k, v in sorted(s['reasons'].items()))
+        return (f"♻️  Recykling przeglądarki: {s['recycles']} restartów ({reasons}), "
+                f"gotowy zapasowy driver: {s['spare_hits']}/{s['recycles']}, "
+                f"szczyt RSS {s['peak_rss_mb']:.0f} MB")
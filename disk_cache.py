@@ -0,0 +1,335 @@
+"""
+Disk Cache - trwały cache między runami (SQLite)
+================================================
+
+``DiskCache`` - prosty magazyn klucz -> JSON w jednym pliku SQLite,
+dzielony na przestrzenie nazw (namespace). Bezpieczny dla wielu wątków
+(MatchWorkerPool), opcjonalny TTL.
+
+``H2HCache`` - sparsowane H2H pary drużyn. H2H zmienia się tylko gdy
+drużyny grają ze sobą, więc wpis jest kluczowany sportem i kanoniczną
+parą ID drużyn z URL-a (kolejność bez znaczenia), a przechowuje wiersze
+``h2h_last5``, datę ostatniego spotkania oraz dane nagłówka strony
+(nazwy, czas meczu, podstawowa forma).
+
+Ważność wpisu: jest zapisany dla konkretnego meczu (``mid``). Ten sam
+mecz w kolejnym runie (inny tryb, --resume, kolejny workflow) -> trafienie,
+bez otwierania strony H2H. Inny mecz tej samej pary oznacza, że poprzedni
+(zapisany) mecz jest już nowszym spotkaniem -> wpis unieważniony i
+pobierany od nowa. Przy zapisie wykrywane jest też nowsze ostatnie
+spotkanie niż w cache.
+
+``PlayerCache`` - dane zawodników tenisa: URL profilu (długi TTL, adres
+się nie zmienia) oraz forma / ranking / statystyki nawierzchni (TTL w
+godzinach - zmieniają się po każdym meczu zawodnika).
+
+Plik: CACHE_PATH_ENV (domyślnie outputs/cache/scraper_cache.sqlite).
+
+Użycie:
+    cache = H2HCache()
+    entry = cache.lookup(url, 'football')   # None = pobierz stronę
+    ...
+    cache.store(url, 'football', out)
+    print(cache.format_report())
+"""
+
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+CACHE_PATH_ENV = 'SCRAPER_CACHE_PATH'
+DEFAULT_CACHE_PATH = os.path.join('outputs', 'cache', 'scraper_cache.sqlite')
+
+# Pola wiersza process_match zapisywane w cache H2H
+H2H_ENTRY_FIELDS = ('home_team', 'away_team', 'match_time', 'h2h_last5', 'home_form', 'away_form')
+
+
+def default_cache_path() -> str:
+    return os.getenv(CACHE_PATH_ENV) or DEFAULT_CACHE_PATH
+
+
+class DiskCache:
+    """
+    Magazyn klucz -> wartość JSON w SQLite.
+
+    Args:
+        path: Plik bazy (domyślnie z SCRAPER_CACHE_PATH)
+        namespace: Przestrzeń nazw (np. 'h2h', 'tennis_player')
+        max_age_days: Wpisy starsze są traktowane jak brak (None = bez TTL)
+    """
+
+    def __init__(self, path: Optional[str] = None, namespace: str = 'default',
+                 max_age_days: Optional[float] = None):
+        self.path = path or default_cache_path()
+        self.namespace = namespace
+        self.max_age_days = max_age_days
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        with self._lock:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS cache ('
+                ' namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,'
+                ' updated_at REAL NOT NULL, PRIMARY KEY (namespace, key))'
+            )
+            self._conn.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT value, updated_at FROM cache WHERE namespace = ? AND key = ?',
+                (self.namespace, key)).fetchone()
+        if row is None:
+            return None
+        value, updated_at = row
+        if self.max_age_days is not None and time.time() - updated_at > self.max_age_days * 86400:
+            return None
+        try:
+            return json.loads(value)
+        except ValueError:
+            logger.warning(f"DiskCache: uszkodzony wpis {self.namespace}/{key} - pomijam")
+            return None
+
+    def set(self, key: str, value: Any) -> None:
+        payload = json.dumps(value, ensure_ascii=False, default=str)
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO cache (namespace, key, value, updated_at) VALUES (?, ?, ?, ?)',
+                (self.namespace, key, payload, time.time()))
+            self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute('DELETE FROM cache WHERE namespace = ? AND key = ?', (self.namespace, key))
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                'SELECT COUNT(*) FROM cache WHERE namespace = ?', (self.namespace,)).fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# ----------------------------------------------------------------------
+# H2H
+# ----------------------------------------------------------------------
+_MATCH_PATH_RE = re.compile(r'/(?:mecz|match)/([^/?#]+)/([^/?#]+)/([^/?#]+)')
+_TEAM_ID_RE = re.compile(r'-([A-Za-z0-9]{8})$')
+
+
+def _team_id(slug: str) -> str:
+    m = _TEAM_ID_RE.search(slug)
+    return m.group(1) if m else slug
+
+
+def h2h_pair_key(match_url: str, sport: str = 'football') -> Optional[str]:
+    """
+    Klucz pary: ``sport:idA|idB`` (ID posortowane - H2H A-B == B-A).
+
+    /pl/mecz/siatkowka/cuprum-stilon-gorzow-K4CJzoda/slepsk-malow-suwalki-2kggPBWE/?mid=...
+    -> 'volleyball:2kggPBWE|K4CJzoda'
+    """
+    m = _MATCH_PATH_RE.search(match_url or '')
+    if not m:
+        return None
+    ids = sorted((_team_id(m.group(2)), _team_id(m.group(3))))
+    return f"{sport}:{ids[0]}|{ids[1]}"
+
+
+def _match_id(match_url: str) -> str:
+    m = re.search(r'[?&]mid=([^&#]+)', match_url or '')
+    return m.group(1) if m else ''
+
+
+def _parse_date(value) -> Optional[datetime]:
+    m = re.search(r'(\d{1,2})\.(\d{1,2})\.(\d{2,4})', str(value or ''))
+    if not m:
+        return None
+    day, month, year = (int(g) for g in m.groups())
+    if year < 100:
+        year += 2000 if year <= 50 else 1900
+    try:
+        return datetime(year, month, day)
+    except ValueError:
+        return None
+
+
+class H2HCache:
+    """
+    Cache H2H par drużyn (patrz docstring modułu).
+
+    Args:
+        cache: DiskCache (domyślnie namespace 'h2h' w pliku z SCRAPER_CACHE_PATH)
+        max_age_days: Bezpiecznik dla przełożonych meczów (ten sam mid bardzo długo)
+    """
+
+    def __init__(self, cache: Optional[DiskCache] = None, max_age_days: float = 14):
+        self.cache = cache if cache is not None else DiskCache(namespace='h2h', max_age_days=max_age_days)
+        self._lock = threading.Lock()
+        self.stats = {
+            'lookups': 0,
+            'hits': 0,
+            'invalidated': 0,       # wpis dla innego (wcześniejszego) meczu pary
+            'newer_meetings': 0,    # przy zapisie: nowsze ostatnie spotkanie niż w cache
+            'stores': 0,
+        }
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    def lookup(self, match_url: str, sport: str = 'football') -> Optional[Dict]:
+        """
+        Wpis dla meczu, jeśli wciąż ważny.
+
+        Returns:
+            dict z polami H2H_ENTRY_FIELDS (+ mid, last_meeting_date) albo None
+        """
+        key = h2h_pair_key(match_url, sport)
+        mid = _match_id(match_url)
+        if key is None or not mid:
+            return None
+        self._count('lookups')
+
+        entry = self.cache.get(key)
+        if entry is None:
+            return None
+        if entry.get('mid') != mid:
+            # Zapisany mecz pary to teraz nowsze spotkanie - H2H mogło się zmienić
+            # (wpis zostaje do porównania dat przy store())
+            self._count('invalidated')
+            logger.debug(f"H2HCache: unieważniono {key} (mecz {entry.get('mid')} -> {mid})")
+            return None
+        self._count('hits')
+        return entry
+
+    def store(self, match_url: str, sport: str, info: Dict) -> bool:
+        """
+        Zapisuje H2H z wyniku process_match (tylko gdy strona dała nazwy drużyn
+        i wiersze H2H - puste H2H to zwykle niedoładowana strona, a wpis
+        trzymałby je przez cały TTL).
+
+        Returns:
+            True jeśli zapisano
+        """
+        key = h2h_pair_key(match_url, sport)
+        mid = _match_id(match_url)
+        if key is None or not mid or not info.get('home_team') or not info.get('away_team'):
+            return False
+        if not info.get('h2h_last5'):
+            return False
+
+        entry = {field: info.get(field) for field in H2H_ENTRY_FIELDS}
+        entry['mid'] = mid
+        entry['last_meeting_date'] = info.get('last_h2h_date')
+        entry['fetched_at'] = datetime.now().isoformat(timespec='seconds')
+
+        previous = self.cache.get(key)
+        if previous:
+            old_date = _parse_date(previous.get('last_meeting_date'))
+            new_date = _parse_date(entry['last_meeting_date'])
+            if new_date and (old_date is None or new_date > old_date):
+                self._count('newer_meetings')
+
+        self.cache.set(key, entry)
+        self._count('stores')
+        return True
+
+    def hit_rate(self) -> float:
+        lookups = self.stats['lookups']
+        return self.stats['hits'] / lookups if lookups else 0.0
+
+    def format_report(self) -> str:
+        s = self.stats
+        if not s['lookups']:
+            return "🗄️  Cache H2H: brak zapytań"
+        return (f"🗄️  Cache H2H: {s['hits']}/{s['lookups']} trafień ({100 * self.hit_rate():.0f}%), "
+                f"unieważnione: {s['invalidated']}, nowsze spotkania: {s['newer_meetings']}, "
+                f"zapisane: {s['stores']}")
+
+
+# ----------------------------------------------------------------------
+# Zawodnicy tenisa
+# ----------------------------------------------------------------------
+PLAYER_URL_TTL_DAYS = 90
+PLAYER_DATA_TTL_HOURS = 6
+PLAYER_DATA_KINDS = ('form', 'ranking', 'surface')
+
+
+def player_key(name: str) -> str:
+    """Klucz zawodnika niezależny od wielkości liter i spacji: 'Iga  Świątek' -> 'iga świątek'."""
+    return ' '.join((name or '').lower().split())
+
+
+class PlayerCache:
+    """
+    Cache danych zawodników tenisa z osobnymi TTL dla URL-i i danych.
+
+    Args:
+        path: Plik bazy (domyślnie z SCRAPER_CACHE_PATH)
+        url_ttl_days: Ważność URL-a profilu [dni]
+        data_ttl_hours: Ważność formy / rankingu / statystyk nawierzchni [h]
+    """
+
+    def __init__(self, path: Optional[str] = None, url_ttl_days: float = PLAYER_URL_TTL_DAYS,
+                 data_ttl_hours: float = PLAYER_DATA_TTL_HOURS):
+        self.urls = DiskCache(path, namespace='tennis_player_url', max_age_days=url_ttl_days)
+        self.data = DiskCache(self.urls.path, namespace='tennis_player_data',
+                              max_age_days=data_ttl_hours / 24.0)
+        self._lock = threading.Lock()
+        self.stats = {kind: {'hits': 0, 'misses': 0} for kind in ('url',) + PLAYER_DATA_KINDS}
+
+    def _count(self, kind: str, hit: bool) -> None:
+        with self._lock:
+            self.stats[kind]['hits' if hit else 'misses'] += 1
+
+    def get_url(self, name: str) -> Optional[str]:
+        url = self.urls.get(player_key(name)) if name else None
+        self._count('url', url is not None)
+        return url
+
+    def set_url(self, name: str, url: str) -> None:
+        if name and url:
+            self.urls.set(player_key(name), url)
+
+    def get_data(self, player: str, kind: str) -> Optional[Any]:
+        """Dane zawodnika (``player`` = URL profilu albo nazwa) - None gdy brak / przeterminowane."""
+        value = self.data.get(self._data_key(player, kind)) if player else None
+        self._count(kind, value is not None)
+        return value
+
+    def set_data(self, player: str, kind: str, value: Any) -> None:
+        if player and value not in (None, [], {}):
+            self.data.set(self._data_key(player, kind), value)
+
+    @staticmethod
+    def _data_key(player: str, kind: str) -> str:
+        # URL profilu bez zmian (ID w URL rozróżnia wielkość liter), nazwa znormalizowana
+        return f"{kind}:{player if player.startswith('http') else player_key(player)}"
+
+    def hit_rate(self) -> float:
+        hits = sum(s['hits'] for s in self.stats.values())
+        total = hits + sum(s['misses'] for s in self.stats.values())
+        return hits / total if total else 0.0
+
+    def format_report(self) -> str:
+        parts = [f"{kind} {s['hits']}/{s['hits'] + s['misses']}"
+                 for kind, s in self.stats.items() if s['hits'] + s['misses']]
+        if not parts:
+            return "🎾 Cache zawodników: brak zapytań"
+        return f"🎾 Cache zawodników: {100 * self.hit_rate():.0f}% trafień ({', '.join(parts)})"
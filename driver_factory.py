@@ -0,0 +1,289 @@
+"""
+Driver Factory - trwały profil Chrome i rozgrzany zapasowy driver
+=================================================================
+
+Każdy ``start_driver`` szukał ChromeDrivera (glob po ``~/.wdm`` albo
+ChromeDriverManager), startował Chrome na pustym, tymczasowym profilu
+i scraper musiał ponownie klikać banner cookies. ``DriverFactory``:
+
+    - trzyma profile w katalogu CHROME_PROFILE_ENV (domyślnie
+      outputs/chrome_profile), po jednym slocie ``slot-N`` na równocześnie
+      działający Chrome - cookies zgody i cache przeglądarki zostają między
+      restartami i runami
+    - ścieżkę ChromeDrivera ustala raz i zapisuje w katalogu profili
+      (kolejny run pomija wyszukiwanie)
+    - trzyma ``spares`` rozgrzanych driverów w tle: start i każdy restart
+      (BrowserRecycler, MatchWorkerPool) dostają gotową przeglądarkę;
+      świeży slot przechodzi ``warmup`` (np. akceptacja zgody) jeszcze w tle
+
+Slot jest wolny, gdy proces chromedrivera jego drivera zakończył się
+(``driver.quit()``). Dwa równoległe runy potrzebują osobnych katalogów
+profili (Chrome blokuje profil na czas działania).
+
+Użycie:
+    factory = DriverFactory(functools.partial(start_driver, headless=True),
+                            resolve_driver_path=resolve_chromedriver_path,
+                            warmup=warm_livesport_profile)
+    driver = factory()                      # zapasowy (jeśli gotowy) albo nowy
+    recycler = BrowserRecycler(factory)     # restarty też z zapasowego
+    ...
+    factory.close()
+    print(factory.format_report())
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+CHROME_PROFILE_ENV = 'LIVESPORT_CHROME_PROFILE'
+DEFAULT_PROFILE_ROOT = os.path.join('outputs', 'chrome_profile')
+
+DRIVER_PATH_FILE = 'chromedriver.path'
+WARM_MARKER = '.warmed'
+# Pliki blokady profilu pozostawione przez przerwany Chrome
+_STALE_LOCKS = ('SingletonLock', 'SingletonSocket', 'SingletonCookie', 'lockfile')
+
+
+def get_profile_root(profile_root: Optional[str] = None) -> Optional[str]:
+    """Katalog profili: argument > LIVESPORT_CHROME_PROFILE > domyślny; 'off' = profile tymczasowe."""
+    root = profile_root or os.getenv(CHROME_PROFILE_ENV) or DEFAULT_PROFILE_ROOT
+    if root.strip().lower() in ('off', 'none', '0'):
+        return None
+    return root
+
+
+def driver_alive(driver) -> bool:
+    """Czy proces chromedrivera jeszcze działa (driver bez procesu, np. ReplayDriver = nie)."""
+    try:
+        return driver.service.process.poll() is None
+    except Exception:
+        return False
+
+
+def _process_exited(driver) -> bool:
+    """Driver z procesem chromedrivera, który już się zakończył (padł albo quit)."""
+    process = getattr(getattr(driver, 'service', None), 'process', None)
+    return process is not None and process.poll() is not None
+
+
+def _safe_quit(driver) -> None:
+    if driver is None:
+        return
+    try:
+        driver.quit()
+    except Exception:
+        pass  # Ignoruj błędy przy zamykaniu
+
+
+class DriverFactory:
+    """
+    Fabryka driverów z trwałymi profilami i zapasowymi instancjami w tle.
+
+    Args:
+        start: Funkcja startująca driver; dostaje ``profile_dir=`` (gdy profile
+               włączone) i ``driver_path=`` (gdy ścieżka znana)
+        profile_root: Katalog slotów profili (domyślnie z LIVESPORT_CHROME_PROFILE)
+        spares: Ile driverów trzymać rozgrzanych w tle (0 = bez zapasu)
+        resolve_driver_path: Funkcja bez argumentów zwracająca ścieżkę ChromeDrivera
+        warmup: Funkcja (driver) wołana raz na świeży slot w tle (np. zgoda cookies)
+        name: Etykieta w logach
+    """
+
+    def __init__(
+        self,
+        start: Callable[..., object],
+        profile_root: Optional[str] = None,
+        spares: int = 1,
+        resolve_driver_path: Optional[Callable[[], str]] = None,
+        warmup: Optional[Callable[[object], None]] = None,
+        name: str = 'chrome',
+    ):
+        self.start = start
+        self.profile_root = get_profile_root(profile_root)
+        self.spares = max(0, int(spares))
+        self.resolve_driver_path = resolve_driver_path
+        self.warmup = warmup
+        self.name = name
+
+        self._driver_path: Optional[str] = None
+        self._slots: List[object] = []     # driver albo None (slot wolny / rezerwacja = True)
+        self._spare_pool: List[object] = []
+        self._spare_threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self.stats = {
+            'started': 0,
+            'spare_hits': 0,
+            'spare_misses': 0,
+            'warmups': 0,
+            'start_time_s': 0.0,
+            'wait_time_s': 0.0,
+        }
+
+    # ------------------------------------------------------------------
+    # Profile i ścieżka drivera
+    # ------------------------------------------------------------------
+    def _acquire_slot(self) -> Optional[int]:
+        if self.profile_root is None:
+            return None
+        with self._lock:
+            for i, holder in enumerate(self._slots):
+                if holder is None or (holder is not True and not driver_alive(holder)):
+                    self._slots[i] = True
+                    return i
+            self._slots.append(True)
+            return len(self._slots) - 1
+
+    def _release_slot(self, slot: Optional[int], driver=None) -> None:
+        if slot is None:
+            return
+        with self._lock:
+            self._slots[slot] = driver
+
+    def slot_dir(self, slot: int) -> str:
+        return os.path.abspath(os.path.join(self.profile_root, f'slot-{slot}'))
+
+    def _prepare_slot(self, slot: int) -> str:
+        path = self.slot_dir(slot)
+        os.makedirs(path, exist_ok=True)
+        for name in _STALE_LOCKS:
+            lock = os.path.join(path, name)
+            if os.path.lexists(lock):
+                try:
+                    os.remove(lock)
+                except OSError:
+                    pass
+        return path
+
+    def driver_path(self) -> Optional[str]:
+        """Ścieżka ChromeDrivera: z pamięci, z pliku w katalogu profili albo z resolve_driver_path."""
+        if self._driver_path:
+            return self._driver_path
+        path_file = os.path.join(self.profile_root, DRIVER_PATH_FILE) if self.profile_root else None
+        if path_file and os.path.exists(path_file):
+            with open(path_file, encoding='utf-8') as f:
+                saved = f.read().strip()
+            if saved and os.path.exists(saved):
+                self._driver_path = saved
+                return saved
+        if self.resolve_driver_path is None:
+            return None
+        path = self.resolve_driver_path()
+        if path and path_file:
+            os.makedirs(self.profile_root, exist_ok=True)
+            with open(path_file, 'w', encoding='utf-8') as f:
+                f.write(path)
+        self._driver_path = path
+        return path
+
+    # ------------------------------------------------------------------
+    # Start
+    # ------------------------------------------------------------------
+    def _launch(self, warm: bool = False):
+        slot = self._acquire_slot()
+        kwargs = {}
+        try:
+            driver_path = self.driver_path()
+            if driver_path:
+                kwargs['driver_path'] = driver_path
+            if slot is not None:
+                kwargs['profile_dir'] = self._prepare_slot(slot)
+            t0 = time.time()
+            driver = self.start(**kwargs)
+        except Exception:
+            self._release_slot(slot)
+            raise
+        self._release_slot(slot, driver)
+        with self._lock:
+            self.stats['started'] += 1
+            self.stats['start_time_s'] += time.time() - t0
+
+        if warm and self.warmup is not None:
+            marker = os.path.join(kwargs['profile_dir'], WARM_MARKER) if slot is not None else None
+            if marker is None or not os.path.exists(marker):
+                try:
+                    self.warmup(driver)
+                    with self._lock:
+                        self.stats['warmups'] += 1
+                    if marker:
+                        open(marker, 'w').close()
+                except Exception as e:
+                    logger.debug(f"[{self.name}] warmup: {type(e).__name__}: {e}")
+        return driver
+
+    def _start_spare(self) -> None:
+        try:
+            driver = self._launch(warm=True)
+        except Exception as e:
+            logger.warning(f"[{self.name}] Nie udało się uruchomić zapasowego drivera: {e}")
+            return
+        with self._lock:
+            if not self._closed:
+                self._spare_pool.append(driver)
+                return
+        _safe_quit(driver)
+
+    def prestart(self) -> None:
+        """Dopełnia zapas do ``spares`` driverów (starty w tle)."""
+        with self._lock:
+            if self._closed:
+                return
+            self._spare_threads = [t for t in self._spare_threads if t.is_alive()]
+            missing = self.spares - len(self._spare_pool) - len(self._spare_threads)
+            for _ in range(max(0, missing)):
+                thread = threading.Thread(target=self._start_spare, name=f'{self.name}-spare', daemon=True)
+                self._spare_threads.append(thread)
+                thread.start()
+
+    def _take_spare(self, wait: bool):
+        with self._lock:
+            if self._spare_pool:
+                return self._spare_pool.pop(0)
+            threads = list(self._spare_threads)
+        if not wait or not threads:
+            return None
+        # Start w tle już trwa - dokończenie go jest szybsze niż nowy Chrome
+        t0 = time.time()
+        threads[0].join()
+        with self._lock:
+            self.stats['wait_time_s'] += time.time() - t0
+            return self._spare_pool.pop(0) if self._spare_pool else None
+
+    def __call__(self):
+        """Zwraca rozgrzany driver (lub nowy) i uzupełnia zapas w tle."""
+        driver = self._take_spare(wait=True)
+        while driver is not None and _process_exited(driver):
+            _safe_quit(driver)  # zapas padł w międzyczasie
+            driver = self._take_spare(wait=False)
+        if driver is not None:
+            with self._lock:
+                self.stats['spare_hits'] += 1
+        else:
+            with self._lock:
+                self.stats['spare_misses'] += 1
+            driver = self._launch()
+        self.prestart()
+        return driver
+
+    def close(self) -> None:
+        """Zamyka niewykorzystane zapasowe drivery (bez czekania na kolejne)."""
+        with self._lock:
+            self._closed = True
+            spares, self._spare_pool = self._spare_pool, []
+            threads = list(self._spare_threads)
+        for driver in spares:
+            _safe_quit(driver)
+        for thread in threads:
+            thread.join()
+
+    def format_report(self) -> str:
+        s = self.stats
+        avg = s['start_time_s'] / s['started'] if s['started'] else 0.0
+        profile = self.profile_root or 'tymczasowe'
+        return (f"🧊 Driver factory: {s['started']} startów Chrome (śr. {avg:.1f}s), "
+                f"zapas {s['spare_hits']}/{s['spare_hits'] + s['spare_misses']} "
+                f"(czekanie {s['wait_time_s']:.1f}s), rozgrzane profile: {s['warmups']}, profile: {profile}")
@@ -0,0 +1,164 @@
+"""
+Enrichment Pipeline - wzbogacanie meczów równolegle z FAZĄ 1
+============================================================
+
+Wcześniej FAZA 2 (Forebet, SofaScore, Gemini - same zapytania sieciowe)
+startowała dopiero po całej FAZIE 1 (Selenium H2H), więc czas runu był
+sumą obu faz. Teraz każdy kwalifikujący się wiersz trafia do kolejki
+zaraz po ``process_match``, a workery wzbogacania pracują w tle - czas
+runu dąży do max(FAZA 1, FAZA 2).
+
+Funkcja ``enrich_fn(row)`` modyfikuje wiersz w miejscu i zwraca True gdy
+dodała jakieś dane. ``on_done(row, enriched)`` jest wołane po każdym
+wierszu (np. zapis do dziennika runu) - wywołania są serializowane.
+Opcjonalne ``setup_fn`` (importy, pre-fetch Forebet) działa w tle od
+startu - workery czekają na nie przed pierwszym wierszem.
+
+Użycie:
+    pipeline = EnrichmentPipeline(enrich_row, workers=2,
+                                  on_done=lambda row, ok: journal.append(row['match_url'], row, 'enriched'))
+    pipeline.start()
+    ...
+    if info['qualifies']:
+        pipeline.submit(info)      # zaraz po process_match
+    ...
+    pipeline.close()               # czeka na resztę kolejki
+    print(pipeline.format_report())
+"""
+
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class EnrichmentPipeline:
+    """
+    Kolejka wierszy + workery wzbogacania działające w tle.
+
+    Args:
+        enrich_fn: Funkcja row -> bool (modyfikuje wiersz w miejscu)
+        workers: Liczba wątków wzbogacania
+        on_done: Callback (row, enriched) po każdym wierszu
+        should_stop: Funkcja () -> bool; True = kolejne wiersze zostają bez wzbogacenia
+                     (np. koniec budżetu czasu MatchScheduler)
+        delay: Pauza workera między wierszami [s] (rate limiting źródeł)
+        setup_fn: Jednorazowe przygotowanie źródeł uruchamiane w tle przy start()
+    """
+
+    def __init__(
+        self,
+        enrich_fn: Callable[[Dict], bool],
+        workers: int = 2,
+        on_done: Callable[[Dict, bool], None] = None,
+        should_stop: Callable[[], bool] = None,
+        delay: float = 0.0,
+        setup_fn: Optional[Callable[[], None]] = None,
+    ):
+        self.enrich_fn = enrich_fn
+        self.workers = max(1, int(workers or 1))
+        self.on_done = on_done
+        self.should_stop = should_stop
+        self.delay = delay
+        self.setup_fn = setup_fn
+        self._ready = threading.Event()
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._threads = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self.stats = {
+            'submitted': 0,
+            'enriched': 0,
+            'failed': 0,
+            'dropped': 0,        # bez wzbogacenia po should_stop
+            'busy_s': 0.0,       # łączny czas pracy workerów
+            'drain_s': 0.0,      # czekanie na kolejkę po close()
+        }
+
+    def _setup(self) -> None:
+        try:
+            self.setup_fn()
+        except Exception as e:
+            logger.warning(f"Błąd przygotowania wzbogacania: {type(e).__name__}: {e}")
+        finally:
+            self._ready.set()
+
+    def start(self) -> None:
+        if self.setup_fn is None:
+            self._ready.set()
+        else:
+            t = threading.Thread(target=self._setup, name='enrich-setup', daemon=True)
+            self._threads.append(t)
+            t.start()
+        for worker_id in range(1, self.workers + 1):
+            t = threading.Thread(target=self._worker, name=f'enrich-worker-{worker_id}', daemon=True)
+            self._threads.append(t)
+            t.start()
+
+    def submit(self, row: Dict) -> None:
+        """Dodaje wiersz do kolejki (bezpieczne dla wielu wątków)."""
+        if self._closed:
+            raise RuntimeError("EnrichmentPipeline: submit() po close()")
+        with self._lock:
+            self.stats['submitted'] += 1
+        self._queue.put(row)
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def _worker(self) -> None:
+        self._ready.wait()
+        while True:
+            row = self._queue.get()
+            if row is _STOP:
+                return
+            if self.should_stop is not None and self.should_stop():
+                with self._lock:
+                    self.stats['dropped'] += 1
+                continue
+
+            t0 = time.time()
+            enriched = False
+            try:
+                enriched = bool(self.enrich_fn(row))
+            except Exception as e:
+                logger.warning(f"Błąd wzbogacania {str(row.get('match_url', ''))[:80]}: "
+                               f"{type(e).__name__}: {str(e)[:100]}")
+                with self._lock:
+                    self.stats['failed'] += 1
+            with self._lock:
+                self.stats['busy_s'] += time.time() - t0
+                if enriched:
+                    self.stats['enriched'] += 1
+                if self.on_done:
+                    try:
+                        self.on_done(row, enriched)
+                    except Exception as e:
+                        logger.warning(f"on_done callback error: {e}")
+            if self.delay:
+                time.sleep(self.delay)
+
+    def close(self) -> None:
+        """Kończy przyjmowanie wierszy i czeka aż workery opróżnią kolejkę."""
+        if self._closed:
+            return
+        self._closed = True
+        t0 = time.time()
+        for _ in range(self.workers):
+            self._queue.put(_STOP)
+        for t in self._threads:
+            t.join()
+        self.stats['drain_s'] = time.time() - t0
+
+    def format_report(self) -> str:
+        s = self.stats
+        dropped = f", bez wzbogacenia (budżet czasu): {s['dropped']}" if s['dropped'] else ''
+        return (f"🔀 Wzbogacanie w tle: {s['enriched']}/{s['submitted']} wzbogaconych, "
+                f"błędy: {s['failed']}{dropped}, praca workerów {s['busy_s']:.0f}s, "
+                f"czekanie po FAZIE 1: {s['drain_s']:.0f}s")
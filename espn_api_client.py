@@ -19,11 +19,7 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 from dataclasses import dataclass
 
-try:
-    import requests
-    REQUESTS_AVAILABLE = True
-except ImportError:
-    REQUESTS_AVAILABLE = False
+from http_transport import REQUESTS_AVAILABLE, HttpTransport, get_transport
 
 
 @dataclass
@@ -79,11 +75,14 @@ class ESPNAPIClient:
         'europa_league': 'soccer/uefa.europa'
     }
     
-    def __init__(self):
-        self.session = requests.Session() if REQUESTS_AVAILABLE else None
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }) if self.session else None
+    HEADERS = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+    }
+    
+    def __init__(self, transport: Optional[HttpTransport] = None):
+        # Wspólny transport HTTP: pula keep-alive, limit hosta, circuit breaker
+        self.transport = transport or get_transport()
+        self.session = self.transport.session if REQUESTS_AVAILABLE else None
     
     def _make_request(self, url: str) -> Optional[Dict]:
         """Wykonuje request do ESPN API"""
@@ -91,7 +90,7 @@ class ESPNAPIClient:
             return None
         
         try:
-            response = self.session.get(url, timeout=10)
+            response = self.transport.get(url, session=self.session, headers=self.HEADERS, timeout=10, retries=1)
             if response.status_code == 200:
                 return response.json()
             else:
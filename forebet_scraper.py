@@ -28,6 +28,8 @@ import subprocess
 import re
 from typing import Dict, Optional, Tuple
 
+from http_transport import get_transport
+
 # ========================================================================
 # CACHE DLA FOREBET - unika wielokrotnego sprawdzania tych samych meczów
 # ========================================================================
@@ -87,7 +89,8 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from bs4 import BeautifulSoup
+from html_parsing import make_soup, FOREBET_ROWS_STRAINER
+from page_archive import archived_driver
 from difflib import SequenceMatcher
 import undetected_chromedriver as uc
 
@@ -194,9 +197,9 @@ def prefetch_forebet_html(sport: str, match_date: str = None) -> bool:
     
     # 🔥 METODA 1: curl_cffi (najszybsza, bypass Cloudflare TLS fingerprint)
     try:
-        from curl_cffi import requests as curl_requests
+        import curl_cffi  # noqa: F401 - brak biblioteki -> ImportError -> następna metoda
         print(f"   🔥 Forebet {sport}: Próbuję curl_cffi...")
-        resp = curl_requests.get(url, impersonate='chrome', timeout=20)
+        resp = get_transport().get(url, impersonate='chrome', timeout=20, retries=0)
         if resp.status_code == 200:
             curl_html = resp.text
             is_forebet_curl = 'rcnt' in curl_html or 'fprc' in curl_html or 'forepr' in curl_html
@@ -205,7 +208,7 @@ def prefetch_forebet_html(sport: str, match_date: str = None) -> bool:
             sport_matches_curl = any(kw in html_lower_curl for kw in keywords)
             
             if is_forebet_curl and not is_cf_block and sport_matches_curl:
-                soup = BeautifulSoup(curl_html, 'html.parser')
+                soup = make_soup(curl_html)
                 _forebet_html_cache[sport_cache_key] = (curl_html, soup, time.time())
                 print(f"   ✅ Forebet {sport}: curl_cffi SUCCESS! ({len(curl_html)} znaków)")
                 return True
@@ -245,7 +248,7 @@ def prefetch_forebet_html(sport: str, match_date: str = None) -> bool:
                 sport_matches = any(kw in html_lower for kw in keywords)
                 
                 if is_forebet and sport_matches:
-                    soup = BeautifulSoup(html_content, 'html.parser')
+                    soup = make_soup(html_content)
                     _forebet_html_cache[sport_cache_key] = (html_content, soup, time.time())
                     print(f"   ✅ Forebet {sport}: Prefetch SUCCESS! ({len(html_content)} znaków)")
                     return True
@@ -946,6 +949,18 @@ _FOREBET_LEAGUE_MAP = {
 }
 
 
+def _forebet_row_team_spans(row) -> Tuple:
+    """
+    Spany drużyn z wiersza Forebet: (span.homeTeam, span.awayTeam, inner_home, inner_away).
+    inner_* to zagnieżdżone span[itemprop="name"] - szukane tylko gdy oba spany istnieją.
+    """
+    home_span = row.find('span', class_='homeTeam')
+    away_span = row.find('span', class_='awayTeam')
+    if not (home_span and away_span):
+        return home_span, away_span, None, None
+    return home_span, away_span, home_span.find('span', itemprop='name'), away_span.find('span', itemprop='name')
+
+
 def search_forebet_prediction(
     home_team: str,
     away_team: str,
@@ -1047,7 +1062,7 @@ def search_forebet_prediction(
     if html_content is None:
         # 🔥 METODA 0: curl_cffi - najszybsza, działa wszędzie (CI + local)
         try:
-            from curl_cffi import requests as curl_requests
+            import curl_cffi  # noqa: F401 - brak biblioteki -> ImportError -> następna metoda
             
             _sport_urls_curl = {
                 'football': 'https://www.forebet.com/en/football-tips-and-predictions-for-today/predictions-1x2',
@@ -1068,7 +1083,7 @@ def search_forebet_prediction(
             _curl_url = f"{_base_url_curl}?date={match_date}" if match_date and match_date != _today_curl else _base_url_curl
             
             print(f"      🔥 curl_cffi: Próbuję pobrać {sport} → {_curl_url}")
-            _curl_resp = curl_requests.get(_curl_url, impersonate='chrome', timeout=20)
+            _curl_resp = get_transport().get(_curl_url, impersonate='chrome', timeout=20, retries=0)
             
             if _curl_resp.status_code == 200:
                 _curl_html = _curl_resp.text
@@ -1077,7 +1092,7 @@ def search_forebet_prediction(
                 
                 if _is_fb and not _is_cf:
                     html_content = _curl_html
-                    soup = BeautifulSoup(html_content, 'html.parser')
+                    soup = make_soup(html_content)
                     _forebet_html_cache[sport_cache_key] = (html_content, soup, time.time())
                     print(f"      ✅ curl_cffi SUCCESS! ({len(html_content)} znaków)")
                 else:
@@ -1177,7 +1192,7 @@ def search_forebet_prediction(
                         elif is_forebet and sport_matches:
                             print(f"      🔥 Cloudflare Bypass SUCCESS! ({len(html_content)} znaków)")
                             print(f"      ✅ Potwierdzona strona Forebet dla {sport}!")
-                            soup = BeautifulSoup(html_content, 'html.parser')
+                            soup = make_soup(html_content)
                             # 🔥 Zapisz do cache!
                             _forebet_html_cache[sport_cache_key] = (html_content, soup, time.time())
                             print(f"      💾 HTML zapisany do cache dla {sport}")
@@ -1202,7 +1217,7 @@ def search_forebet_prediction(
         elif not IS_CI_CD:
             # 🔥 METODA 1: curl_cffi - fastest, bypasses Cloudflare with Chrome TLS
             try:
-                from curl_cffi import requests as curl_requests
+                import curl_cffi  # noqa: F401 - brak biblioteki -> ImportError -> następna metoda
                 
                 sport_urls_local = {
                     'football': 'https://www.forebet.com/en/football-tips-and-predictions-for-today/predictions-1x2',
@@ -1226,7 +1241,7 @@ def search_forebet_prediction(
                     curl_url = base_url_local
                 
                 print(f"      🔥 Lokalnie: curl_cffi → {curl_url}")
-                resp = curl_requests.get(curl_url, impersonate='chrome', timeout=20)
+                resp = get_transport().get(curl_url, impersonate='chrome', timeout=20, retries=0)
                 
                 if resp.status_code == 200:
                     curl_html = resp.text
@@ -1235,7 +1250,7 @@ def search_forebet_prediction(
                     
                     if is_forebet_curl and not is_cf_block:
                         html_content = curl_html
-                        soup = BeautifulSoup(html_content, 'html.parser')
+                        soup = make_soup(html_content)
                         _forebet_html_cache[sport_cache_key] = (html_content, soup, time.time())
                         print(f"      ✅ curl_cffi SUCCESS! ({len(html_content)} znaków)")
                     else:
@@ -1258,11 +1273,11 @@ def search_forebet_prediction(
                     
                     if is_forebet and not is_cloudflare:
                         print(f"      ✅ Puppeteer SUCCESS! ({len(html_content)} znaków)")
-                        soup = BeautifulSoup(html_content, 'html.parser')
+                        soup = make_soup(html_content)
                         _forebet_html_cache[sport_cache_key] = (html_content, soup, time.time())
                     elif is_forebet and is_cloudflare:
                         print(f"      ✅ Puppeteer SUCCESS (z Cloudflare residuals)! ({len(html_content)} znaków)")
-                        soup = BeautifulSoup(html_content, 'html.parser')
+                        soup = make_soup(html_content)
                         _forebet_html_cache[sport_cache_key] = (html_content, soup, time.time())
                     else:
                         html_content = None
@@ -1271,7 +1286,7 @@ def search_forebet_prediction(
         # Jeśli mamy już HTML, parsuj go i POMIŃ całą logikę Selenium!
         if html_content:
             if soup is None:
-                soup = BeautifulSoup(html_content, 'html.parser')
+                soup = make_soup(html_content)
             print(f"      ✅ Używam HTML ({len(html_content)} znaków)")
             # Zapisz debug HTML
             with open('forebet_debug.html', 'w', encoding='utf-8') as f:
@@ -1311,18 +1326,23 @@ def search_forebet_prediction(
             ]
             options.add_argument(f'user-agent={random.choice(user_agents)}')
             
-            try:
-                driver = uc.Chrome(options=options, version_main=None)
-                print(f"      ✅ Undetected ChromeDriver utworzony")
-            except Exception as e:
-                print(f"      ⚠️ Fallback do standardowego Chrome: {e}")
-                # Fallback do zwykłego Chrome z stealth
-                from selenium.webdriver.chrome.options import Options
-                options = Options()
-                options.add_argument('--headless=new')
-                options.add_argument('--disable-gpu')
-                options.add_argument('--no-sandbox')
-                driver = webdriver.Chrome(options=options)
+            def _create_chrome():
+                try:
+                    chrome = uc.Chrome(options=options, version_main=None)
+                    print(f"      ✅ Undetected ChromeDriver utworzony")
+                    return chrome
+                except Exception as e:
+                    print(f"      ⚠️ Fallback do standardowego Chrome: {e}")
+                    # Fallback do zwykłego Chrome z stealth
+                    from selenium.webdriver.chrome.options import Options
+                    fallback_options = Options()
+                    fallback_options.add_argument('--headless=new')
+                    fallback_options.add_argument('--disable-gpu')
+                    fallback_options.add_argument('--no-sandbox')
+                    return webdriver.Chrome(options=fallback_options)
+            
+            # 🎞️ Archiwum stron: nagrywanie page_source / replay bez Chrome
+            driver = archived_driver(_create_chrome)
             
             # METODA 2: Selenium Stealth (dodatkowa warstwa)
             if STEALTH_AVAILABLE:
@@ -1387,9 +1407,8 @@ def search_forebet_prediction(
             # 🔥 PEŁNE SCROLLOWANIE - ładuje WSZYSTKIE mecze (w tym wieczorne europejskie)
             print(f"      🖱️ Scrollowanie całej strony aby załadować wszystkie mecze...")
             
-            # Pobierz początkową liczbę meczów
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
-            initial_matches = len(soup.find_all('div', class_='rcnt'))
+            # Pobierz początkową liczbę meczów (do liczenia wystarczą same wiersze div.rcnt)
+            initial_matches = len(make_soup(driver.page_source, parse_only=FOREBET_ROWS_STRAINER).find_all('div', class_='rcnt'))
             print(f"      📊 Początkowa liczba meczów: {initial_matches}")
             
             # Scrolluj całą stronę od góry do dołu, czekając na lazy loading
@@ -1404,8 +1423,7 @@ def search_forebet_prediction(
                 
                 # Sprawdź czy strona się powiększyła
                 new_height = driver.execute_script("return document.body.scrollHeight")
-                soup = BeautifulSoup(driver.page_source, 'html.parser')
-                current_matches = len(soup.find_all('div', class_='rcnt'))
+                current_matches = len(make_soup(driver.page_source, parse_only=FOREBET_ROWS_STRAINER).find_all('div', class_='rcnt'))
                 
                 print(f"      📊 Scroll {scroll_attempts + 1}: {current_matches} meczów (height: {new_height})")
                 
@@ -1424,16 +1442,15 @@ def search_forebet_prediction(
             driver.execute_script("window.scrollTo(0, 0);")
             time.sleep(0.5)
             
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
+            # Finalny HTML - jeden pełny parse
+            page_source = driver.page_source
+            soup = make_soup(page_source)
             final_matches = len(soup.find_all('div', class_='rcnt'))
             print(f"      📊 Finalna liczba meczów: {final_matches} (dodano {final_matches - initial_matches})")
             
-            # Pobierz finalny HTML
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
-            
             # DEBUG: Zapisz HTML do pliku
             with open('forebet_debug.html', 'w', encoding='utf-8') as f:
-                f.write(driver.page_source)
+                f.write(page_source)
             print(f"      💾 Debug: Zapisano HTML do forebet_debug.html")
         
         # Sprawdź czy to nie jest strona błędu Cloudflare
@@ -1528,15 +1545,17 @@ def search_forebet_prediction(
         print(f"      🔎 Znormalizowane: '{normalize_team_name(home_team)}' vs '{normalize_team_name(away_team)}'")
         
         # v3.8: Pre-scan - zbierz WSZYSTKIE nazwy drużyn z page (dla debug i Gemini fallback)
+        # Spany drużyn są liczone raz na wiersz i używane ponownie w pętli dopasowania
+        row_spans = []
         for pre_row in match_rows:
+            row_spans.append(None)
             try:
                 pre_home = None
                 pre_away = None
-                h_span = pre_row.find('span', class_='homeTeam')
-                a_span = pre_row.find('span', class_='awayTeam')
+                spans = _forebet_row_team_spans(pre_row)
+                row_spans[-1] = spans
+                h_span, a_span, h_inner, a_inner = spans
                 if h_span and a_span:
-                    h_inner = h_span.find('span', itemprop='name')
-                    a_inner = a_span.find('span', itemprop='name')
                     pre_home = h_inner.get_text(strip=True) if h_inner else h_span.get_text(strip=True)
                     pre_away = a_inner.get_text(strip=True) if a_inner else a_span.get_text(strip=True)
                 if pre_home and pre_away:
@@ -1566,19 +1585,19 @@ def search_forebet_prediction(
         best_candidate = None  # (row, home_score, away_score, forebet_home, forebet_away)
         best_combined = 0.0
         
-        for row in match_rows:
+        for row_idx, row in enumerate(match_rows):
             try:
                 # Wyciągnij nazwy drużyn - WIELE WARIANTÓW
                 home_name = None
                 away_name = None
                 
                 # Wariant 1: span.homeTeam > span[itemprop="name"] (AKTUALNA STRUKTURA FOREBET 2025)
-                home_span = row.find('span', class_='homeTeam')
-                away_span = row.find('span', class_='awayTeam')
+                spans = row_spans[row_idx]
+                if spans is None:
+                    spans = _forebet_row_team_spans(row)
+                home_span, away_span, home_inner, away_inner = spans
                 if home_span and away_span:
-                    # Szukaj zagnieżdżonego span z itemprop="name"
-                    home_inner = home_span.find('span', itemprop='name')
-                    away_inner = away_span.find('span', itemprop='name')
+                    # Zagnieżdżony span z itemprop="name"
                     if home_inner and away_inner:
                         home_name = home_inner.get_text(strip=True)
                         away_name = away_inner.get_text(strip=True)
@@ -2090,7 +2109,7 @@ if __name__ == '__main__':
             driver.get('https://www.forebet.com/en/volleyball-tips-and-predictions-for-today')
             time.sleep(5)
             
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
+            soup = make_soup(driver.page_source)
             rows = soup.find_all('div', class_='rcnt')
             
             print(f'✅ Znaleziono {len(rows)} meczów volleyball na Forebet\n')
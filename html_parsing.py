@@ -0,0 +1,92 @@
+"""
+HTML Parsing - wspólny backend parsera dla BeautifulSoup
+=========================================================
+
+Wszystkie gorące ścieżki (H2H, forma, listing meczów, wiersze Forebet)
+budują soup przez ``make_soup`` zamiast ``BeautifulSoup(html, 'html.parser')``.
+
+Backend:
+    HTML_PARSER_BACKEND=auto        - lxml jeśli zainstalowany, inaczej html.parser (domyślnie)
+    HTML_PARSER_BACKEND=lxml        - wymuś lxml (fallback na html.parser gdy brak)
+    HTML_PARSER_BACKEND=html.parser - czysty Python (stare zachowanie)
+
+Częściowe parsowanie (SoupStrainer) - budowane są tylko kontenery,
+które czyta parser danego widoku:
+    H2H_STRAINER      - sekcje/wiersze H2H (klasy zawierające 'h2h')
+    LINKS_STRAINER    - tylko <a href> (listing meczów)
+    FOREBET_ROWS_STRAINER - wiersze meczów Forebet (div.rcnt)
+    LISTING_ROWS_STRAINER - wiersze meczów i nagłówki lig listingu Livesport
+
+Użycie:
+    soup = make_soup(driver.page_source)
+    sections = make_soup(driver.page_source, parse_only=H2H_STRAINER)
+"""
+
+import logging
+import os
+from typing import Optional
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+logger = logging.getLogger(__name__)
+
+PARSER_BACKEND_ENV = 'HTML_PARSER_BACKEND'
+
+try:
+    import lxml  # noqa: F401
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+
+# Podczas parsowania strainer dostaje surowy atrybut class ("rcnt tr_0"),
+# a nie listę - stąd funkcje zamiast zwykłego class_='rcnt'.
+def _has_h2h_class(css_class) -> bool:
+    return bool(css_class) and 'h2h' in css_class
+
+
+def _has_rcnt_class(css_class) -> bool:
+    return bool(css_class) and 'rcnt' in css_class.split()
+
+
+# Wiersz meczu (event__match) i nagłówki lig (stary event__header / nowy headerLeague)
+LISTING_ROW_CLASSES = ('event__match', 'event__header', 'headerLeague__wrapper')
+
+
+def _is_listing_row_class(css_class) -> bool:
+    return bool(css_class) and any(c in LISTING_ROW_CLASSES for c in css_class.split())
+
+
+H2H_STRAINER = SoupStrainer(class_=_has_h2h_class)
+LINKS_STRAINER = SoupStrainer('a', href=True)
+FOREBET_ROWS_STRAINER = SoupStrainer('div', class_=_has_rcnt_class)
+LISTING_ROWS_STRAINER = SoupStrainer('div', class_=_is_listing_row_class)
+
+
+def get_parser_backend(backend: Optional[str] = None) -> str:
+    """Nazwa parsera dla BeautifulSoup: argument > zmienna środowiskowa > auto."""
+    backend = (backend or os.getenv(PARSER_BACKEND_ENV, 'auto')).strip().lower()
+    if backend in ('auto', 'lxml'):
+        if LXML_AVAILABLE:
+            return 'lxml'
+        if backend == 'lxml':
+            logger.warning("lxml niedostępny - używam html.parser")
+        return 'html.parser'
+    if backend != 'html.parser':
+        logger.warning(f"Nieznany backend parsera '{backend}' - używam html.parser")
+    return 'html.parser'
+
+
+def make_soup(html: str, parse_only: SoupStrainer = None, backend: Optional[str] = None) -> BeautifulSoup:
+    """
+    Buduje BeautifulSoup wybranym backendem.
+
+    Args:
+        html: Źródło strony
+        parse_only: Opcjonalny SoupStrainer (częściowe parsowanie)
+        backend: Wymuszony backend ('lxml' / 'html.parser'); domyślnie z env
+
+    Returns:
+        BeautifulSoup
+    """
+    return BeautifulSoup(html or '', get_parser_backend(backend), parse_only=parse_only)
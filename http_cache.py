@@ -0,0 +1,308 @@
+"""
+HTTP Cache - dyskowy cache odpowiedzi HTTP (SQLite)
+===================================================
+
+Terminarze SofaScore, scoreboardy ESPN, tabele football-data, metadane
+TheSportsDB i pogoda Open-Meteo były pobierane od nowa przy każdym starcie
+procesu (cache tylko w słownikach procesu). ``HttpCache`` trzyma odpowiedzi
+na dysku:
+
+    - klucz: metoda + URL + parametry (posortowane - kolejność bez znaczenia)
+    - TTL per endpoint (ENDPOINT_TTLS: host + wzorzec ścieżki); endpointy
+      spoza listy nie są cache'owane
+    - po TTL wpis z ETag / Last-Modified jest rewalidowany zapytaniem
+      warunkowym (If-None-Match / If-Modified-Since) - 304 przedłuża wpis
+      bez pobierania treści
+    - limit rozmiaru (HTTP_CACHE_MAX_MB) - nadmiar usuwany od najdawniej
+      używanych wpisów (LRU)
+    - jeden plik SQLite w trybie WAL, połączenie per proces (także po
+      forku workerów gunicorna) - bezpieczny dla wielu procesów i wątków
+
+Podpięty do HttpTransport (``get_transport()``) - klienci nie zmieniają
+kodu; ``cache_ttl=0`` w zapytaniu omija cache. W runach --record / --replay
+(page_archive) cache jest pomijany, żeby archiwum widziało każde zapytanie.
+
+Plik: HTTP_CACHE_PATH (domyślnie outputs/cache/http_cache.sqlite, 'off' wyłącza).
+
+Użycie:
+    cache = HttpCache()
+    transport = HttpTransport(cache=cache)
+    response = transport.get(url, params=...)   # trafienie: bez sieci
+    print(cache.format_report())
+"""
+
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+logger = logging.getLogger(__name__)
+
+HTTP_CACHE_PATH_ENV = 'HTTP_CACHE_PATH'
+HTTP_CACHE_MAX_MB_ENV = 'HTTP_CACHE_MAX_MB'
+DEFAULT_HTTP_CACHE_PATH = os.path.join('outputs', 'cache', 'http_cache.sqlite')
+DEFAULT_MAX_MB = 200
+
+# (host, wzorzec ścieżki, TTL [s]) - pierwszy pasujący wpis wygrywa
+ENDPOINT_TTLS: List[Tuple[str, str, float]] = [
+    ('api.sofascore.com', r'/scheduled-events/', 15 * 60),
+    ('site.api.espn.com', r'/scoreboard$', 60),
+    ('api.football-data.org', r'/v4/competitions/[^/]+/standings$', 10 * 60),
+    ('www.thesportsdb.com', r'^/api/v1/json/', 24 * 3600),
+    ('api.open-meteo.com', r'^/v1/forecast$', 3600),
+]
+
+# Nagłówki odpowiedzi zapisywane razem z treścią
+STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+# Trafienie odświeża czas użycia (LRU) najwyżej raz na tyle sekund - mniej zapisów
+TOUCH_INTERVAL_S = 60.0
+
+
+def cache_key(method: str, url: str, params=None) -> str:
+    """Kanoniczny klucz: METODA URL z posortowanym query (parametry z URL-a i ``params``)."""
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    if params:
+        items = params.items() if isinstance(params, dict) else params
+        query += [(str(k), str(v)) for k, v in items if v is not None]
+    canonical = urlunsplit((parts.scheme, parts.netloc.lower(), parts.path, urlencode(sorted(query)), ''))
+    return f'{method.upper()} {canonical}'
+
+
+class CachedResponse:
+    """Odpowiedź z cache - interfejs jak requests.Response (status_code, headers, content, text, json())."""
+
+    def __init__(self, url: str, status_code: int, headers: Dict[str, str], content: bytes,
+                 stale: bool = False):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.from_cache = True
+        self.stale = stale
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    @property
+    def text(self) -> str:
+        return self.content.decode('utf-8', errors='replace')
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class HttpCache:
+    """
+    Cache odpowiedzi HTTP w SQLite.
+
+    Args:
+        path: Plik bazy (domyślnie z HTTP_CACHE_PATH)
+        max_mb: Limit łącznego rozmiaru treści (domyślnie z HTTP_CACHE_MAX_MB)
+        ttls: Reguły (host, wzorzec ścieżki, TTL [s]) (domyślnie ENDPOINT_TTLS)
+        clock: Zegar (testy)
+    """
+
+    def __init__(self, path: Optional[str] = None, max_mb: Optional[float] = None,
+                 ttls: Optional[List[Tuple[str, str, float]]] = None, clock=time.time):
+        self.path = path or os.getenv(HTTP_CACHE_PATH_ENV) or DEFAULT_HTTP_CACHE_PATH
+        if max_mb is None:
+            max_mb = float(os.getenv(HTTP_CACHE_MAX_MB_ENV) or DEFAULT_MAX_MB)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.rules = [(host.lower(), re.compile(pattern), ttl) for host, pattern, ttl in (ttls or ENDPOINT_TTLS)]
+        self.clock = clock
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'revalidated': 0, 'stored': 0, 'evicted': 0, 'stale': 0}
+
+    @classmethod
+    def from_env(cls) -> Optional['HttpCache']:
+        """Cache wg HTTP_CACHE_PATH; None gdy wyłączony ('off')."""
+        if (os.getenv(HTTP_CACHE_PATH_ENV) or '').lower() in ('off', '0', 'false', 'none'):
+            return None
+        return cls()
+
+    # ------------------------------------------------------------------
+    # Połączenie
+    # ------------------------------------------------------------------
+
+    def _db(self) -> sqlite3.Connection:
+        """Połączenie tego procesu (po forku - nowe; połączeń SQLite nie wolno dziedziczyć)."""
+        if self._conn is None or self._pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS responses ('
+                ' key TEXT PRIMARY KEY, status INTEGER NOT NULL, headers TEXT NOT NULL,'
+                ' body BLOB NOT NULL, size INTEGER NOT NULL, etag TEXT, last_modified TEXT,'
+                ' stored_at REAL NOT NULL, expires_at REAL NOT NULL, accessed_at REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)')
+            conn.commit()
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+    # ------------------------------------------------------------------
+    # Reguły
+    # ------------------------------------------------------------------
+
+    def ttl_for(self, url: str) -> float:
+        """TTL endpointu [s]; 0 = nie cache'ować."""
+        parts = urlsplit(url)
+        host = (parts.hostname or '').lower()
+        for rule_host, pattern, ttl in self.rules:
+            if rule_host == host and pattern.search(parts.path):
+                return ttl
+        return 0
+
+    # ------------------------------------------------------------------
+    # Odczyt / zapis
+    # ------------------------------------------------------------------
+
+    def lookup(self, key: str) -> Optional[Dict]:
+        """Wpis (także przeterminowany - do rewalidacji) albo None."""
+        try:
+            return self._lookup(key)
+        except sqlite3.Error as e:
+            logger.warning(f"HttpCache: odczyt {key} nieudany ({e}) - pobieram z sieci")
+            return None
+
+    def _lookup(self, key: str) -> Optional[Dict]:
+        now = self.clock()
+        with self._lock:
+            conn = self._db()
+            row = conn.execute(
+                'SELECT status, headers, body, etag, last_modified, expires_at, accessed_at'
+                ' FROM responses WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            status, headers, body, etag, last_modified, expires_at, accessed_at = row
+            if now - accessed_at >= TOUCH_INTERVAL_S:
+                conn.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (now, key))
+                conn.commit()
+        try:
+            headers = json.loads(headers)
+        except ValueError:
+            headers = {}
+        return {'status': status, 'headers': headers, 'body': bytes(body), 'etag': etag,
+                'last_modified': last_modified, 'fresh': now < expires_at}
+
+    def store(self, key: str, response, ttl: float) -> bool:
+        """Zapisuje odpowiedź 200 (bez Cache-Control: no-store); przycina cache do limitu."""
+        try:
+            return self._store(key, response, ttl)
+        except sqlite3.Error as e:
+            logger.warning(f"HttpCache: zapis {key} nieudany ({e})")
+            return False
+
+    def _store(self, key: str, response, ttl: float) -> bool:
+        headers = getattr(response, 'headers', None) or {}
+        if getattr(response, 'status_code', None) != 200 or 'no-store' in (headers.get('Cache-Control') or ''):
+            return False
+        body = response.content or b''
+        if len(body) > self.max_bytes:
+            return False
+        kept = {name: headers.get(name) for name in STORED_HEADERS if headers.get(name)}
+        now = self.clock()
+        with self._lock:
+            conn = self._db()
+            conn.execute(
+                'INSERT OR REPLACE INTO responses (key, status, headers, body, size, etag, last_modified,'
+                ' stored_at, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (key, 200, json.dumps(kept), sqlite3.Binary(body), len(body), kept.get('ETag'),
+                 kept.get('Last-Modified'), now, now + ttl, now))
+            self._evict(conn)
+            conn.commit()
+            self.stats['stored'] += 1
+        return True
+
+    def refresh(self, key: str, response, ttl: float) -> None:
+        """304 Not Modified: wpis ważny przez kolejny TTL (nowe walidatory, jeśli przyszły)."""
+        headers = getattr(response, 'headers', None) or {}
+        now = self.clock()
+        with self._lock:
+            conn = self._db()
+            try:
+                conn.execute(
+                    'UPDATE responses SET expires_at = ?, accessed_at = ?,'
+                    ' etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified) WHERE key = ?',
+                    (now + ttl, now, headers.get('ETag'), headers.get('Last-Modified'), key))
+                conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"HttpCache: przedłużenie {key} nieudane ({e})")
+            self.stats['revalidated'] += 1
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """LRU: usuwa najdawniej używane wpisy, aż łączny rozmiar zmieści się w limicie."""
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        freed = 0
+        victims = []
+        for key, size in conn.execute('SELECT key, size FROM responses ORDER BY accessed_at, stored_at'):
+            victims.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        conn.executemany('DELETE FROM responses WHERE key = ?', victims)
+        self.stats['evicted'] += len(victims)
+
+    def size(self) -> Tuple[int, int]:
+        """(liczba wpisów, łączny rozmiar treści w bajtach)."""
+        with self._lock:
+            count, total = self._db().execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses').fetchone()
+        return count, total
+
+    # ------------------------------------------------------------------
+    # Warstwa dla transportu
+    # ------------------------------------------------------------------
+
+    def count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    def conditional_headers(self, entry: Dict) -> Dict[str, str]:
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def response(self, url: str, entry: Dict, stale: bool = False) -> CachedResponse:
+        return CachedResponse(url, entry['status'], dict(entry['headers']), entry['body'], stale=stale)
+
+    def hit_rate(self) -> float:
+        asked = self.stats['hits'] + self.stats['revalidated'] + self.stats['misses']
+        return (self.stats['hits'] + self.stats['revalidated']) / asked if asked else 0.0
+
+    def format_report(self) -> str:
+        s = self.stats
+        count, total = self.size()
+        report = (f"💾 HTTP cache: {s['hits']} trafień, {s['revalidated']} rewalidacji (304), "
+                  f"{s['misses']} pobrań ({self.hit_rate():.0%} z cache); "
+                  f"{count} wpisów, {total / 1024 / 1024:.1f}/{self.max_bytes / 1024 / 1024:.0f} MB")
+        if s['evicted']:
+            report += f", {s['evicted']} usuniętych (LRU)"
+        if s['stale']:
+            report += f", {s['stale']} przeterminowanych przy awarii"
+        return report
@@ -0,0 +1,480 @@
+"""
+HTTP Transport - wspólna warstwa HTTP dla klientów API
+======================================================
+
+Każdy klient (SofaScore, Livesport odds, ESPN, loga drużyn, football-data,
+TheSportsDB, Forebet) miał własne sesje, własne retry i własne sleepy.
+Transport daje im jedną warstwę:
+
+    - pula keep-alive: jedna requests.Session na proces (HTTPAdapter z pulą
+      połączeń per host) i sesja curl_cffi per wątek dla impersonacji Chrome
+    - limit per host (token bucket: ``rate`` zapytań/s, ``burst`` naraz) -
+      wątki czekają na token zamiast dostawać 429 / bana (``max_wait``
+      ogranicza czekanie tam, gdzie blokować nie wolno, np. w serwerze API)
+    - retry z backoffem wykładniczym + jitter na timeout, błąd połączenia,
+      429 i 5xx (Retry-After z odpowiedzi respektowane)
+    - circuit breaker per host: ``failure_threshold`` kolejnych porażek
+      otwiera obwód na ``cooldown_s`` - zapytania kończą się od razu
+      CircuitOpenError; po cooldownie jedno zapytanie próbne (half-open)
+    - dyskowy cache odpowiedzi GET (http_cache.HttpCache) z TTL per endpoint
+      i rewalidacją ETag / Last-Modified - w transporcie procesu domyślnie
+
+Limity hostów: HOST_LIMITS, nadpisywane zmienną HTTP_HOST_RATE_LIMITS
+("api.sofascore.com=4:8,www.forebet.com=0.5:2").
+
+Użycie:
+    transport = get_transport()
+    response = transport.get(url, headers=..., timeout=10)                # requests, wspólna pula
+    response = transport.get(url, impersonate='chrome', timeout=20)      # curl_cffi
+    data = transport.call(url, lambda: urllib_fetch(url))                 # własny backend
+    print(transport.format_report())
+"""
+
+import logging
+import os
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from http_cache import HttpCache, cache_key
+from page_archive import get_archive
+
+logger = logging.getLogger(__name__)
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    REQUESTS_AVAILABLE = True
+except ImportError:
+    requests = None
+    REQUESTS_AVAILABLE = False
+
+# curl_cffi - impersonacja TLS Chrome (omija Cloudflare bez przeglądarki)
+try:
+    from curl_cffi import requests as curl_requests
+    CURL_CFFI_AVAILABLE = True
+except ImportError:
+    curl_requests = None
+    CURL_CFFI_AVAILABLE = False
+
+HOST_LIMITS_ENV = 'HTTP_HOST_RATE_LIMITS'
+
+# host -> (zapytań/s, burst)
+HOST_LIMITS: Dict[str, Tuple[float, int]] = {
+    'api.sofascore.com': (4.0, 8),
+    'www.sofascore.com': (2.0, 4),
+    'global.ds.lsapp.eu': (10.0, 20),
+    'site.api.espn.com': (5.0, 10),
+    'www.thesportsdb.com': (0.5, 30),       # darmowy klucz: 30 zapytań/min
+    'api.football-data.org': (10 / 60, 10),  # darmowy plan: 10 zapytań/min
+    'www.forebet.com': (0.5, 2),
+}
+DEFAULT_LIMIT: Tuple[float, int] = (5.0, 10)
+
+# Odpowiedzi, które warto ponowić (limit, chwilowa awaria upstreamu)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+MAX_RETRY_AFTER_S = 30.0
+
+
+class CircuitOpenError(Exception):
+    """Obwód hosta otwarty - upstream uznany za niedostępny, zapytanie nie zostało wysłane."""
+
+
+class RateLimitedError(Exception):
+    """Token hosta nie zwolni się w ``max_wait`` - zapytanie nie zostało wysłane."""
+
+
+def parse_host_limits(spec: Optional[str]) -> Dict[str, Tuple[float, int]]:
+    """'host=rate:burst,host2=rate' -> {host: (rate, burst)} (błędne wpisy pomijane)."""
+    limits = {}
+    for item in (spec or '').split(','):
+        host, _, value = item.strip().partition('=')
+        if not host or not value:
+            continue
+        rate, _, burst = value.partition(':')
+        try:
+            rate = float(rate)
+            limits[host.strip().lower()] = (rate, int(burst) if burst else max(1, int(rate)))
+        except ValueError:
+            logger.warning(f"{HOST_LIMITS_ENV}: pomijam wpis {item!r}")
+    return limits
+
+
+def host_of(url: str) -> str:
+    return (urlsplit(url).hostname or '').lower()
+
+
+class TokenBucket:
+    """
+    Token bucket: ``rate`` tokenów/s, maksymalnie ``burst`` zgromadzonych.
+
+    acquire() rezerwuje token pod blokadą, a czeka poza nią - kolejne wątki
+    ustawiają się w kolejce za zarezerwowanymi tokenami.
+    """
+
+    def __init__(self, rate: float, burst: int, clock: Callable[[], float] = time.monotonic):
+        self.rate = max(rate, 1e-6)
+        self.burst = max(1, int(burst))
+        self.clock = clock
+        self._tokens = float(self.burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self, max_wait: Optional[float] = None) -> Optional[float]:
+        """
+        Zabiera token; zwraca, ile sekund trzeba odczekać, zanim będzie ważny.
+        None (bez zabierania tokenu), gdy czekanie przekroczyłoby ``max_wait``.
+        """
+        with self._lock:
+            now = self.clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            wait = 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+            if max_wait is not None and wait > max_wait:
+                return None
+            self._tokens -= 1
+            return wait
+
+    def acquire(self, max_wait: Optional[float] = None) -> Optional[float]:
+        wait = self.reserve(max_wait)
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+class CircuitBreaker:
+    """
+    closed -> (failure_threshold kolejnych porażek) -> open -> (cooldown_s) ->
+    half-open: jedno zapytanie próbne; sukces zamyka, porażka otwiera ponownie.
+    """
+
+    def __init__(self, failure_threshold: int = 5, cooldown_s: float = 60.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown_s = cooldown_s
+        self.clock = clock
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probe = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return 'closed'
+        return 'half-open' if self.clock() - self.opened_at >= self.cooldown_s else 'open'
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half-open' and not self._probe:
+                self._probe = True
+                return True
+            return False
+
+    def release(self) -> None:
+        """Zwraca niewykorzystane zapytanie próbne (np. odrzucone przez limit)."""
+        with self._lock:
+            self._probe = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probe = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._probe or self.failures >= self.failure_threshold:
+                self.opened_at = self.clock()
+            self._probe = False
+
+
+class HttpTransport:
+    """
+    Wspólny transport HTTP: pula keep-alive, limity per host, retry, circuit breaker.
+
+    Args:
+        limits: {host: (zapytań/s, burst)} (domyślnie HOST_LIMITS + HTTP_HOST_RATE_LIMITS)
+        retries: Domyślna liczba ponowień zapytania
+        backoff: Bazowa pauza przed ponowieniem [s] (rośnie 2x + jitter)
+        failure_threshold: Kolejne porażki hosta, po których obwód się otwiera
+        cooldown_s: Jak długo obwód zostaje otwarty [s]
+        pool_size: Maks. połączeń keep-alive per host we wspólnej sesji requests
+        cache: Dyskowy cache odpowiedzi GET (HttpCache; None = bez cache)
+        clock: Zegar (testy)
+    """
+
+    def __init__(self, limits: Optional[Dict[str, Tuple[float, int]]] = None, retries: int = 2,
+                 backoff: float = 0.5, failure_threshold: int = 5, cooldown_s: float = 60.0,
+                 pool_size: int = 32, cache: Optional[HttpCache] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.limits = dict(HOST_LIMITS)
+        self.limits.update(parse_host_limits(os.getenv(HOST_LIMITS_ENV)))
+        if limits:
+            self.limits.update(limits)
+        self.retries = retries
+        self.backoff = backoff
+        self.failure_threshold = failure_threshold
+        self.cooldown_s = cooldown_s
+        self.pool_size = pool_size
+        self.cache = cache
+        self.clock = clock
+        self._session = None
+        self._local = threading.local()
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+        self.stats: Dict[str, Dict[str, float]] = {}
+
+    # ------------------------------------------------------------------
+    # Sesje
+    # ------------------------------------------------------------------
+
+    @property
+    def session(self):
+        """Wspólna requests.Session (pula połączeń per host)."""
+        if self._session is None:
+            with self._lock:
+                if self._session is None and REQUESTS_AVAILABLE:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=self.pool_size)
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    self._session = session
+        return self._session
+
+    def curl_session(self, impersonate: str = 'chrome'):
+        """Sesja curl_cffi z impersonacją (jedna na wątek i profil - sesje curl nie są thread-safe)."""
+        sessions = getattr(self._local, 'curl', None)
+        if sessions is None:
+            sessions = self._local.curl = {}
+        if impersonate not in sessions:
+            if not CURL_CFFI_AVAILABLE:
+                raise ImportError('curl_cffi niedostępne')
+            sessions[impersonate] = curl_requests.Session(impersonate=impersonate)
+        return sessions[impersonate]
+
+    # ------------------------------------------------------------------
+    # Limity / obwody
+    # ------------------------------------------------------------------
+
+    def bucket(self, host: str) -> TokenBucket:
+        with self._lock:
+            if host not in self._buckets:
+                rate, burst = self.limits.get(host, DEFAULT_LIMIT)
+                self._buckets[host] = TokenBucket(rate, burst, clock=self.clock)
+            return self._buckets[host]
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        with self._lock:
+            if host not in self._breakers:
+                self._breakers[host] = CircuitBreaker(self.failure_threshold, self.cooldown_s, clock=self.clock)
+            return self._breakers[host]
+
+    def _count(self, host: str, key: str, value: float = 1) -> None:
+        with self._lock:
+            stats = self.stats.setdefault(host, {'requests': 0, 'retries': 0, 'failures': 0,
+                                                 'rejected': 0, 'waited_s': 0.0})
+            stats[key] += value
+
+    def _pause(self, attempt: int, backoff: float, retry_after: Optional[float] = None) -> None:
+        wait = backoff * (2 ** attempt) + random.uniform(0, backoff)
+        if retry_after:
+            wait = max(wait, min(retry_after, MAX_RETRY_AFTER_S))
+        time.sleep(wait)
+
+    # ------------------------------------------------------------------
+    # Zapytania
+    # ------------------------------------------------------------------
+
+    def call(self, url: str, fn: Callable[[], object], retries: Optional[int] = None,
+             backoff: Optional[float] = None, retry_on: Callable[[object], bool] = None,
+             on_retry: Callable[[int, str], None] = None, max_wait: Optional[float] = None):
+        """
+        Wykonuje ``fn()`` (dowolny backend) pod limitem, obwodem i retry hosta ``url``.
+
+        Porażka = wyjątek z ``fn`` albo wynik z ``status_code`` w RETRY_STATUSES
+        (lub ``retry_on(wynik)``). Po wyczerpaniu ponowień (albo gdy obwód otworzy
+        się w ich trakcie) zwracany jest ostatni wynik albo rzucany ostatni wyjątek;
+        obwód otwarty już przed pierwszą próbą rzuca CircuitOpenError.
+        ``max_wait`` (np. w żądaniu API serwera) ogranicza czekanie na token -
+        dłuższe czekanie rzuca RateLimitedError zamiast blokować.
+        """
+        host = host_of(url)
+        retries = self.retries if retries is None else retries
+        backoff = self.backoff if backoff is None else backoff
+        breaker = self.breaker(host)
+
+        # Obwód sprawdzany tylko przed pierwszą próbą - jeśli otworzy się w trakcie
+        # ponowień, wywołujący dostaje ostatnią odpowiedź (np. 5xx) albo ostatni
+        # wyjątek z upstreamu, a nie CircuitOpenError
+        if not breaker.allow():
+            self._count(host, 'rejected')
+            raise CircuitOpenError(f'{host}: obwód otwarty po {breaker.failures} porażkach')
+
+        result = error = None
+        for attempt in range(retries + 1):
+            waited = self.bucket(host).acquire(max_wait)
+            if waited is None:
+                self._count(host, 'rejected')
+                if attempt:
+                    break
+                breaker.release()
+                raise RateLimitedError(f'{host}: limit zapytań (czekanie > {max_wait}s)')
+            self._count(host, 'requests')
+            if waited:
+                self._count(host, 'waited_s', waited)
+
+            retry_after = None
+            try:
+                result, error = fn(), None
+            except Exception as e:
+                breaker.record_failure()
+                self._count(host, 'failures')
+                result, error = None, e
+                reason = type(e).__name__
+            else:
+                status = getattr(result, 'status_code', None)
+                if status in RETRY_STATUSES:
+                    breaker.record_failure()
+                    self._count(host, 'failures')
+                    retry_after = _retry_after(result)
+                    reason = f'HTTP {status}'
+                else:
+                    breaker.record_success()
+                    if retry_on is None or not retry_on(result):
+                        return result
+                    reason = 'retry_on'
+            # Koniec ponowień także, gdy obwód się otworzył - nie dobijamy upstreamu
+            if attempt >= retries or breaker.state != 'closed':
+                break
+
+            self._count(host, 'retries')
+            logger.debug(f'{host}: {reason}, ponowienie {attempt + 1}/{retries}')
+            if on_retry is not None:
+                on_retry(attempt + 1, reason)
+            self._pause(attempt, backoff, retry_after)
+
+        if error is not None:
+            raise error
+        return result
+
+    def request(self, method: str, url: str, session=None, impersonate: Optional[str] = None,
+                retries: Optional[int] = None, backoff: Optional[float] = None,
+                retry_on: Callable[[object], bool] = None, on_retry: Callable[[int, str], None] = None,
+                max_wait: Optional[float] = None, cache_ttl: Optional[float] = None, **kwargs):
+        """
+        Zapytanie HTTP przez ``session`` (obiekt z metodą get/post...), sesję curl_cffi
+        (``impersonate``) albo wspólną sesję requests.
+
+        GET na endpoint z TTL w cache (``cache_ttl`` nadpisuje regułę, 0 = bez cache;
+        przy włączonym archiwum stron cache nie jest używany):
+        świeży wpis wraca bez sieci, przeterminowany jest rewalidowany (304 -> wpis),
+        a przy awarii upstreamu (wyjątek, otwarty obwód, 5xx) zwracany jest
+        przeterminowany wpis zamiast błędu.
+        """
+        if session is None:
+            session = self.curl_session(impersonate) if impersonate else self.session
+        send = getattr(session, method.lower())
+        # Przy --record / --replay cache pominięty: każde zapytanie musi przejść przez
+        # hook archiwum (Session.request), inaczej replay nie byłby deterministyczny
+        cache = self.cache if method.upper() == 'GET' and get_archive().mode == 'off' else None
+        ttl = 0 if cache is None else (cache.ttl_for(url) if cache_ttl is None else cache_ttl)
+        if not ttl:
+            return self.call(url, lambda: send(url, **kwargs), retries=retries, backoff=backoff,
+                             retry_on=retry_on, on_retry=on_retry, max_wait=max_wait)
+
+        key = cache_key(method, url, kwargs.get('params'))
+        entry = cache.lookup(key)
+        if entry and entry['fresh']:
+            cache.count('hits')
+            return cache.response(url, entry)
+        if entry:
+            conditional = cache.conditional_headers(entry)
+            if conditional:
+                kwargs['headers'] = {**(kwargs.get('headers') or {}), **conditional}
+
+        def fetch():
+            response = send(url, **kwargs)
+            status = getattr(response, 'status_code', None)
+            if status == 304 and entry:
+                cache.refresh(key, response, ttl)
+                return cache.response(url, entry)
+            if status == 200 and (retry_on is None or not retry_on(response)):
+                cache.store(key, response, ttl)
+            return response
+
+        try:
+            response = self.call(url, fetch, retries=retries, backoff=backoff,
+                                 retry_on=retry_on, on_retry=on_retry, max_wait=max_wait)
+        except Exception as e:
+            if not entry:
+                raise
+            response, reason = None, type(e).__name__
+        else:
+            if not entry or getattr(response, 'status_code', None) not in RETRY_STATUSES:
+                if not getattr(response, 'from_cache', False):
+                    cache.count('misses')
+                return response
+            reason = f'HTTP {response.status_code}'
+        cache.count('stale')
+        logger.warning(f'{host_of(url)}: {reason} - zwracam przeterminowany wpis z cache')
+        return cache.response(url, entry, stale=True)
+
+    def get(self, url: str, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def format_report(self) -> str:
+        if not self.stats:
+            return '🌐 HTTP: brak zapytań'
+        parts = []
+        for host, s in sorted(self.stats.items()):
+            part = f"{host} {s['requests']:.0f} zapytań"
+            if s['retries']:
+                part += f", {s['retries']:.0f} ponowień"
+            if s['waited_s']:
+                part += f", limit {s['waited_s']:.1f}s"
+            if s['rejected']:
+                part += f", {s['rejected']:.0f} odrzuconych"
+            state = self.breaker(host).state
+            if state != 'closed':
+                part += f" (obwód {state})"
+            parts.append(part)
+        report = '🌐 HTTP: ' + '; '.join(parts)
+        if self.cache is not None and any(self.cache.stats.values()):
+            report += '\n' + self.cache.format_report()
+        return report
+
+
+def _retry_after(response) -> Optional[float]:
+    headers = getattr(response, 'headers', None) or {}
+    try:
+        return float(headers.get('Retry-After'))
+    except (TypeError, ValueError):
+        return None
+
+
+_TRANSPORT: Optional[HttpTransport] = None
+_TRANSPORT_LOCK = threading.Lock()
+
+
+def get_transport() -> HttpTransport:
+    """Transport procesu (wspólne pule, limity i obwody wszystkich klientów)."""
+    global _TRANSPORT
+    with _TRANSPORT_LOCK:
+        if _TRANSPORT is None:
+            _TRANSPORT = HttpTransport(cache=HttpCache.from_env())
+        return _TRANSPORT
+
+
+def set_transport(transport: Optional[HttpTransport]) -> None:
+    """Podmienia transport procesu (testy, inna konfiguracja limitów)."""
+    global _TRANSPORT
+    with _TRANSPORT_LOCK:
+        _TRANSPORT = transport
@@ -43,6 +43,7 @@ import re
 import json
 import logging
 import random
+import functools
 from datetime import datetime
 from typing import List, Dict, Optional
 
@@ -52,13 +53,13 @@ if sys.platform == 'win32':
     sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
     sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')
 
-import pandas as pd
 from bs4 import BeautifulSoup
 
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
 from selenium.common.exceptions import (
     NoSuchElementException, 
     TimeoutException, 
@@ -67,6 +68,26 @@ from selenium.common.exceptions import (
 )
 from webdriver_manager.chrome import ChromeDriverManager
 
+from match_worker_pool import MatchWorkerPool
+from html_parsing import make_soup, H2H_STRAINER, LINKS_STRAINER, LISTING_ROWS_STRAINER
+from livesport_http import LivesportHttpClient
+from run_journal import RunJournal, journal_path_for
+from browser_recycler import BrowserRecycler
+from driver_factory import DriverFactory
+from disk_cache import H2HCache
+from match_scheduler import MatchScheduler
+from match_record import MatchRecord, records_to_frame
+from tennis_prefetch import DEFAULT_PREFETCH_WORKERS, TennisPrefetcher, apply_player_records
+from livesport_odds_api import DEFAULT_BATCH_CONCURRENCY, LivesportOddsBatch, get_shared_odds_api, remember_batch_odds
+from odds_history import OddsHistory
+from stage_tracer import enable_tracing, set_trace_match, trace_path_for, trace_record, trace_span
+from page_archive import ReplayDriver, enable_archive, get_archive
+from http_transport import get_transport
+from resource_blocking import (
+    BLOCK_PROFILE_ENV, BLOCKING_STATS, get_block_profile, configure_chrome_options,
+    apply_blocking_profile, collect_blocking_stats,
+)
+
 # ============================================================================
 # LOGGING SETUP
 # ============================================================================
@@ -218,6 +239,13 @@ def safe_get_text(element, default: str = '') -> str:
         return default
 
 
+def _journal_csv_row(record: Dict) -> Dict:
+    """Wiersz CSV z rekordu dziennika - h2h_last5 (lista słowników) jako string."""
+    if 'h2h_last5' in record:
+        record['h2h_last5'] = str(record['h2h_last5']) if record['h2h_last5'] else ''
+    return record
+
+
 def save_partial_results(rows: List[Dict], args, suffix: str = '_PARTIAL') -> str:
     """
     Zapisuje częściowe wyniki w razie błędu.
@@ -247,7 +275,7 @@ def save_partial_results(rows: List[Dict], args, suffix: str = '_PARTIAL') -> st
         date_str = args.date if hasattr(args, 'date') else datetime.now().strftime('%Y-%m-%d')
         outfn = os.path.join('outputs', f'livesport_h2h_{date_str}{output_suffix}{suffix}.csv')
         
-        df = pd.DataFrame(rows)
+        df = records_to_frame(rows)
         df.to_csv(outfn, index=False, encoding='utf-8-sig')
         
         logger.info(f"Zapisano częściowe wyniki ({len(rows)} wierszy) do: {outfn}")
@@ -365,10 +393,227 @@ POPULAR_LEAGUES = {
 H2H_TAB_TEXT_OPTIONS = ["H2H", "Head-to-Head", "Bezpośrednie", "Bezpośrednie spotkania", "H2H"]
 
 
-def start_driver(headless: bool = True) -> webdriver.Chrome:
+# ============================================================================
+# EXPLICIT WAITS - czekamy na konkretne elementy zamiast stałych sleepów
+# ============================================================================
+
+# Strategia ładowania strony: 'normal' (pełny load) lub 'eager' (DOMContentLoaded).
+# Przy 'eager' driver.get() wraca szybciej, a gotowość treści sprawdzają explicit waits.
+PAGE_LOAD_STRATEGY_ENV = 'LIVESPORT_PAGE_LOAD_STRATEGY'
+
+# Maksymalny czas oczekiwania na elementy strony (sekundy) per sport.
+# To GÓRNY limit - zwykle treść jest gotowa dużo wcześniej.
+SPORT_WAIT_TIMEOUTS = {
+    'football': 10.0,
+    'basketball': 10.0,
+    'volleyball': 12.0,
+    'handball': 12.0,
+    'rugby': 12.0,
+    'hockey': 10.0,
+    'tennis': 12.0,
+}
+DEFAULT_WAIT_TIMEOUT = 10.0
+CI_WAIT_FACTOR = 0.7  # CI: fail-fast, krótsze limity
+
+# Po pojawieniu się sekcji H2H wiersze renderują się praktycznie od razu;
+# brak wierszy po tym czasie = brak bezpośrednich spotkań.
+H2H_ROWS_GRACE = 1.0
+
+MATCH_PAGE_READY_SELECTORS = ['a.participant__participantName', 'div.duelParticipant', 'div.h2h__section']
+H2H_SECTION_SELECTORS = ['div.h2h__section']
+H2H_ROW_SELECTORS = ['a.h2h__row']
+LISTING_READY_SELECTORS = ['div.event__match', "a[href*='/mecz/']", "a[href*='/match/']"]
+
+
+def get_wait_timeout(sport: str = None) -> float:
+    """Zwraca limit explicit-wait dla sportu (krótszy w CI)."""
+    timeout = SPORT_WAIT_TIMEOUTS.get(sport, DEFAULT_WAIT_TIMEOUT)
+    if os.getenv('CI') == 'true' or os.getenv('GITHUB_ACTIONS') == 'true':
+        timeout *= CI_WAIT_FACTOR
+    return timeout
+
+
+def wait_for_any(driver: webdriver.Chrome, selectors: List[str], timeout: float = DEFAULT_WAIT_TIMEOUT,
+                 poll_frequency: float = 0.15) -> Optional[str]:
+    """
+    Czeka aż na stronie pojawi się element pasujący do KTÓREGOKOLWIEK selektora CSS.
+    
+    Wymaga implicitly_wait(0) - inaczej każdy pusty find_elements blokuje.
+    
+    Returns:
+        Pierwszy pasujący selektor lub None po upływie timeout
+    """
+    def _probe(d):
+        for selector in selectors:
+            try:
+                if d.find_elements(By.CSS_SELECTOR, selector):
+                    return selector
+            except StaleElementReferenceException:
+                continue
+        return False
+    
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=poll_frequency,
+                             ignored_exceptions=(StaleElementReferenceException,)).until(_probe)
+    except TimeoutException:
+        return None
+    except WebDriverException as e:
+        logger.debug(f"wait_for_any error: {type(e).__name__}")
+        return None
+
+
+# Listing "ucichł": brak nowych wierszy meczów przez LISTING_SETTLE_QUIET_MS
+LISTING_SETTLE_QUIET_MS = 700
+LISTING_SETTLE_TIMEOUT = 5.0
+
+# MutationObserver liczy tylko DODANE wiersze meczów (zegary meczów na żywo
+# zmieniają DOM cały czas - to nie jest doładowywanie listy)
+_DOM_SETTLE_SCRIPT = """
+var selector = arguments[0], quietMs = arguments[1], limitMs = arguments[2];
+var done = arguments[arguments.length - 1];
+var start = Date.now(), last = start, added = 0;
+var observer = new MutationObserver(function (records) {
+    for (var i = 0; i < records.length; i++) {
+        var nodes = records[i].addedNodes;
+        for (var j = 0; j < nodes.length; j++) {
+            var n = nodes[j];
+            if (n.nodeType === 1 && (n.matches(selector) || n.querySelector(selector))) {
+                added++;
+                last = Date.now();
+            }
+        }
+    }
+});
+observer.observe(document.body || document.documentElement, {childList: true, subtree: true});
+(function check() {
+    var now = Date.now();
+    if (now - last >= quietMs || now - start >= limitMs) {
+        observer.disconnect();
+        done({settled: now - last >= quietMs, added: added, waited_ms: now - start});
+    } else {
+        setTimeout(check, 50);
+    }
+})();
+"""
+
+
+def wait_for_dom_settled(driver: webdriver.Chrome, selectors: List[str] = None,
+                         quiet_ms: int = LISTING_SETTLE_QUIET_MS,
+                         timeout: float = LISTING_SETTLE_TIMEOUT) -> Optional[Dict]:
+    """
+    Czeka (MutationObserver w stronie) aż przestaną dochodzić wiersze pasujące do selektorów.
+    
+    Returns:
+        {'settled': bool, 'added': liczba nowych wierszy, 'waited_ms': int}
+        lub None gdy driver nie wykonuje skryptów asynchronicznych (stary tryb ze sleep)
+    """
+    selector = ', '.join(selectors or LISTING_READY_SELECTORS)
+    try:
+        result = driver.execute_async_script(_DOM_SETTLE_SCRIPT, selector, int(quiet_ms), int(timeout * 1000))
+    except (WebDriverException, AttributeError) as e:
+        logger.debug(f"wait_for_dom_settled: {type(e).__name__}")
+        return None
+    return result if isinstance(result, dict) else None
+
+
+def wait_for_match_page(driver: webdriver.Chrome, sport: str = None) -> bool:
+    """Czeka na nazwy uczestników / nagłówek meczu."""
+    return wait_for_any(driver, MATCH_PAGE_READY_SELECTORS, get_wait_timeout(sport)) is not None
+
+
+def wait_for_h2h_content(driver: webdriver.Chrome, sport: str = None) -> bool:
+    """
+    Czeka na sekcje H2H, a potem (krótko) na ich wiersze.
+    
+    Returns:
+        True jeśli sekcje H2H są na stronie
+    """
+    if wait_for_any(driver, H2H_SECTION_SELECTORS, get_wait_timeout(sport)) is None:
+        return False
+    wait_for_any(driver, H2H_ROW_SELECTORS, H2H_ROWS_GRACE)
+    return True
+
+
+def _configure_driver_timeouts(driver: webdriver.Chrome) -> None:
+    """Limity driver-a. Implicit wait = 0: gotowość strony sprawdzają explicit waits."""
+    driver.set_page_load_timeout(60)  # 60 seconds for page load
+    driver.set_script_timeout(30)  # 30 seconds for scripts
+    driver.implicitly_wait(0)
+
+
+_CHROMEDRIVER_PATH: Optional[str] = None
+
+
+def resolve_chromedriver_path() -> str:
+    """
+    Ścieżka ChromeDrivera - szukana raz na proces: cache ~/.wdm, systemowy
+    w CI, a lokalnie ChromeDriverManager.
+    """
+    global _CHROMEDRIVER_PATH
+    if _CHROMEDRIVER_PATH:
+        return _CHROMEDRIVER_PATH
+    
+    # Try to find cached ChromeDriver first (manual or auto-downloaded)
+    import glob
+    print("🔍 Sprawdzam ChromeDriver...")
+    
+    cache_pattern = os.path.join(os.path.expanduser("~"), ".wdm", "drivers", "chromedriver", "**", "chromedriver.exe")
+    cached_drivers = glob.glob(cache_pattern, recursive=True)
+    
+    if cached_drivers:
+        # Sort by path to get the newest version (highest number)
+        cached_drivers.sort(reverse=True)
+        driver_path = cached_drivers[0]
+        print(f"✅ Znaleziono ChromeDriver w cache: {driver_path}")
+    elif os.getenv('CI') or os.getenv('GITHUB_ACTIONS'):
+        # 🔥 CI/CD ENVIRONMENT: Use system chromedriver DIRECTLY
+        print("🔥 CI/CD detected - using system chromedriver (skipping ChromeDriverManager)")
+        driver_path = '/usr/bin/chromedriver'  # System chromedriver path
+    else:
+        # Fall back to ChromeDriverManager (local development)
+        print("⚠️ Pobieranie ChromeDriver przez ChromeDriverManager...")
+        try:
+            driver_path = ChromeDriverManager().install()
+        except Exception as e:
+            print(f"❌ Błąd podczas inicjalizacji ChromeDriver: {e}")
+            print("💡 Spróbuj: pip install --upgrade selenium webdriver-manager")
+            raise
+    
+    _CHROMEDRIVER_PATH = driver_path
+    return driver_path
+
+
+def start_driver(headless: bool = True, page_load_strategy: str = None,
+                 blocking_profile: str = None, sport: str = None,
+                 profile_dir: str = None, driver_path: str = None) -> webdriver.Chrome:
+    """
+    Uruchamia Chrome.
+    
+    Args:
+        headless: Tryb bez GUI
+        page_load_strategy: 'normal' / 'eager' (domyślnie z LIVESPORT_PAGE_LOAD_STRATEGY)
+        blocking_profile: 'off' / 'light' / 'aggressive' (domyślnie z LIVESPORT_BLOCK_PROFILE)
+        sport: Sport dla allowlisty blokowania (można zmienić później apply_blocking_profile)
+        profile_dir: Trwały katalog profilu Chrome (cookies zgody, cache) - None = tymczasowy
+        driver_path: Ścieżka ChromeDrivera (domyślnie resolve_chromedriver_path)
+    
+    Z archiwum stron (--record / --replay) zwraca driver nagrywający page_source
+    albo ReplayDriver bez uruchamiania Chrome.
+    """
+    archive = get_archive()
+    if archive.replaying:
+        return ReplayDriver(archive)
+    
     chrome_options = Options()
     if headless:
         chrome_options.add_argument("--headless=new")
+    if profile_dir:
+        chrome_options.add_argument(f"--user-data-dir={os.path.abspath(profile_dir)}")
+    
+    # 'eager' = nie czekaj na obrazki/iframe'y, treść sprawdzają explicit waits
+    page_load_strategy = page_load_strategy or os.getenv(PAGE_LOAD_STRATEGY_ENV, 'normal')
+    if page_load_strategy in ('normal', 'eager', 'none'):
+        chrome_options.page_load_strategy = page_load_strategy
     
     # 🔥 QUADRUPLE FORCE: Aggressive stability settings
     chrome_options.add_argument("--no-sandbox")
@@ -392,77 +637,63 @@ def start_driver(headless: bool = True) -> webdriver.Chrome:
         'profile.default_content_settings.popups': 0,
     })
     
+    # 🚫 Blokowanie zbędnych zasobów (obrazki, fonty, reklamy, analityka)
+    blocking_profile = get_block_profile(blocking_profile)
+    configure_chrome_options(chrome_options, blocking_profile)
+    
     # human-like user-agent (you may rotate)
     chrome_options.add_argument(
         "--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
     )
 
-    # Try to find cached ChromeDriver first (manual or auto-downloaded)
-    import glob
-    print("🔍 Sprawdzam ChromeDriver...")
+    service = Service(
+        driver_path or resolve_chromedriver_path(),
+        log_path='NUL' if sys.platform == 'win32' else '/dev/null',  # Suppress logs
+    )
+    driver = webdriver.Chrome(service=service, options=chrome_options)
     
-    cache_pattern = os.path.join(os.path.expanduser("~"), ".wdm", "drivers", "chromedriver", "**", "chromedriver.exe")
-    cached_drivers = glob.glob(cache_pattern, recursive=True)
+    # 🔥 QUADRUPLE FORCE: Set aggressive page load timeout
+    _configure_driver_timeouts(driver)
     
-    if cached_drivers:
-        # Sort by path to get the newest version (highest number)
-        cached_drivers.sort(reverse=True)
-        driver_path = cached_drivers[0]
-        print(f"✅ Znaleziono ChromeDriver w cache: {driver_path}")
-        
-        # 🔥 QUADRUPLE FORCE: Aggressive timeouts for Service
-        service = Service(
-            driver_path,
-            log_path='NUL' if sys.platform == 'win32' else '/dev/null',  # Suppress logs
-        )
-        
-        # Create driver with extended timeouts
-        driver = webdriver.Chrome(service=service, options=chrome_options)
-        
-        # 🔥 QUADRUPLE FORCE: Set aggressive page load timeout
-        driver.set_page_load_timeout(60)  # 60 seconds for page load
-        driver.set_script_timeout(30)  # 30 seconds for scripts
-        driver.implicitly_wait(10)  # 10 seconds implicit wait
-    else:
-        # 🔥 CI/CD ENVIRONMENT: Use system chromedriver DIRECTLY
-        if os.getenv('CI') or os.getenv('GITHUB_ACTIONS'):
-            print("🔥 CI/CD detected - using system chromedriver (skipping ChromeDriverManager)")
-            service = Service(
-                '/usr/bin/chromedriver',  # System chromedriver path
-                log_path='/dev/null',
-            )
-            driver = webdriver.Chrome(service=service, options=chrome_options)
-            driver.set_page_load_timeout(60)
-            driver.set_script_timeout(30)
-            driver.implicitly_wait(10)
-        else:
-            # Fall back to ChromeDriverManager (local development)
-            print("⚠️ Pobieranie ChromeDriver przez ChromeDriverManager...")
-            try:
-                service = Service(
-                    ChromeDriverManager().install(),
-                    log_path='NUL' if sys.platform == 'win32' else '/dev/null',
-                )
-                driver = webdriver.Chrome(service=service, options=chrome_options)
-                driver.set_page_load_timeout(60)
-                driver.set_script_timeout(30)
-                driver.implicitly_wait(10)
-            except Exception as e:
-                print(f"❌ Błąd podczas inicjalizacji ChromeDriver: {e}")
-                print("💡 Spróbuj: pip install --upgrade selenium webdriver-manager")
-                raise
+    if apply_blocking_profile(driver, blocking_profile, sport):
+        print(f"🚫 Profil blokowania zasobów: {blocking_profile}")
     
-    return driver
+    return archive.wrap_driver(driver)
+
+
+def warm_livesport_profile(driver: webdriver.Chrome) -> None:
+    """Rozgrzewa świeży profil: strona główna Livesport + zgoda cookies (zapisana w profilu)."""
+    driver.get('https://www.livesport.com/pl/')
+    wait_for_any(driver, ['#onetrust-accept-btn-handler'] + LISTING_READY_SELECTORS, DEFAULT_WAIT_TIMEOUT)
+    _accept_cookies_on_page(driver)
+
+
+def make_driver_factory(headless: bool = True, profile_root: str = None, spares: int = 1) -> DriverFactory:
+    """
+    DriverFactory dla start_driver: trwałe profile (LIVESPORT_CHROME_PROFILE),
+    ścieżka ChromeDrivera ustalana raz, ``spares`` rozgrzanych przeglądarek w tle.
+    W replay archiwum (bez Chrome) - bez profili i zapasu.
+    """
+    replaying = get_archive().replaying
+    return DriverFactory(
+        functools.partial(start_driver, headless=headless),
+        profile_root='off' if replaying else profile_root,
+        spares=0 if replaying else spares,
+        resolve_driver_path=None if replaying else resolve_chromedriver_path,
+        warmup=warm_livesport_profile,
+    )
 
 
 def click_h2h_tab(driver: webdriver.Chrome) -> None:
-    """Spróbuj kliknąć zakładkę H2H - sprawdzamy kilka wariantów tekstowych i atrybutów."""
+    """Spróbuj kliknąć zakładkę H2H - sprawdzamy kilka wariantów tekstowych i atrybutów.
+    
+    Nie czeka na treść - wywołujący używa wait_for_h2h_content().
+    """
     for text in H2H_TAB_TEXT_OPTIONS:
         try:
             # XPath contains text
             el = driver.find_element(By.XPATH, f"//a[contains(translate(normalize-space(.), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), '{text.lower()}')]")
             el.click()
-            time.sleep(0.8)
             return
         except (NoSuchElementException, StaleElementReferenceException):
             # Element nie istnieje lub stał się nieaktualny - próbuj następny wariant
@@ -475,7 +706,6 @@ def click_h2h_tab(driver: webdriver.Chrome) -> None:
     try:
         el = driver.find_element(By.XPATH, "//a[contains(@href, 'h2h') or contains(@data-tab, 'h2h')]")
         el.click()
-        time.sleep(0.8)
         return
     except (NoSuchElementException, StaleElementReferenceException):
         logger.debug("Nie znaleziono zakładki H2H - zawartość może być już widoczna")
@@ -634,100 +864,41 @@ def _teams_match(name_a, name_b):
     return overlap >= 0.8
 
 
-def process_match(url: str, driver: webdriver.Chrome, away_team_focus: bool = False, use_forebet: bool = False, use_gemini: bool = False, use_sofascore: bool = False, use_flashscore: bool = False, sport: str = 'football') -> Dict:
-    """Odwiedza stronę meczu, otwiera H2H i zwraca informację we właściwym formacie.
-    
-    Args:
-        url: URL meczu
-        driver: Selenium WebDriver
-        away_team_focus: Jeśli True, liczy zwycięstwa GOŚCI w H2H zamiast gospodarzy
-        use_forebet: Jeśli True, pobiera predykcje z Forebet
-        use_gemini: Jeśli True, używa Gemini AI do analizy
-        sport: Sport (football, volleyball, etc.)
+def _open_h2h_page(driver: webdriver.Chrome, url: str, target_url: str, sport: str = None,
+                   status: Optional[Dict] = None) -> bool:
     """
-    # ========================================================================
-    # PROFILOWANIE CZASU - rozpoczęcie pomiaru
-    # ========================================================================
-    import time as time_module
-    _t_start = time_module.time()
-    _timings = {
-        'h2h': 0.0,
-        'qualify': 0.0,
-        'forebet': 0.0,
-        'sofascore': 0.0,
-        'flashscore': 0.0,
-        'gemini': 0.0,
-    }
-    
-    out = {
-        'match_url': url,
-        'home_team': None,
-        'away_team': None,
-        'match_time': None,
-        'h2h_last5': [],
-        'last_h2h_date': None,  # Data ostatniego meczu H2H
-        'last_h2h_score': None,  # Wynik ostatniego meczu H2H
-        'last_h2h_home': None,  # Gospodarz ostatniego H2H
-        'last_h2h_away': None,  # Gość ostatniego H2H
-        'home_wins_in_h2h_last5': 0,
-        'away_wins_in_h2h_last5': 0,  # NOWE: dla trybu away_team_focus
-        'h2h_count': 0,
-        'win_rate': 0.0,  # % wygranych gospodarzy/gości w H2H (zależnie od trybu)
-        'qualifies': False,
-        'home_form': [],  # Forma gospodarzy: ['W', 'L', 'W', 'D', 'W']
-        'away_form': [],  # Forma gości: ['L', 'L', 'W', 'L', 'W']
-        'home_odds': None,  # Kursy bukmacherskie (info dodatkowa)
-        'away_odds': None,
-        'focus_team': 'away' if away_team_focus else 'home',  # NOWE: który tryb
-        # FOREBET PREDICTIONS
-        'forebet_prediction': None,  # '1', 'X', '2'
-        'forebet_probability': None,  # float (%)
-        'forebet_exact_score': None,  # '1-3'
-        'forebet_over_under': None,  # 'Over 2.5' / 'Under 2.5'
-        'forebet_btts': None,  # 'Yes' / 'No'
-        'forebet_avg_goals': None,  # float
-        # GEMINI AI PREDICTIONS
-        'gemini_prediction': None,  # Krótka predykcja AI (1-2 zdania)
-        'gemini_confidence': None,  # 0-100% pewności
-        'gemini_reasoning': None,  # Szczegółowe uzasadnienie
-        'gemini_recommendation': None,  # HIGH/MEDIUM/LOW/SKIP
-        # SPORT INFO
-        'sport': sport,  # Nazwa sportu (football, basketball, volleyball, etc.)
-        'league': None,  # League/competition name (extracted from Forebet or Livesport)
-    }
+    Otwiera stronę H2H ogółem w Selenium (z kilkoma strategiami retry).
 
+    Args:
+        status: Opcjonalny słownik - ``h2h_missed=True`` gdy strona się otworzyła,
+            ale sekcji H2H nie doczekano się nawet po kliknięciu zakładki
+
+    Returns:
+        True jeśli strona została otwarta, False gdy wszystkie próby zawiodły
+    """
     # 🔥🔥🔥🔥 QUADRUPLE FORCE: Ultra-aggressive retry logic with multiple strategies
     # W CI: tylko 2 próby (szybkie fail-fast), lokalnie: 5 prób
-    import os as _os_ci
-    _is_ci = _os_ci.getenv('CI') == 'true' or _os_ci.getenv('GITHUB_ACTIONS') == 'true'
+    _is_ci = os.getenv('CI') == 'true' or os.getenv('GITHUB_ACTIONS') == 'true'
     max_retries = 2 if _is_ci else 5
     last_error = None
     
-    # Sprawdź stan drivera przed rozpoczęciem
-    if not check_driver_health(driver):
-        logger.error(f"Driver nie działa przed przetworzeniem {url}")
-        return out
-    
     for attempt in range(max_retries):
         try:
-            # 🔥 Strategy 1: Normal navigation - szybsze w CI
+            # 🔥 Strategy 1: Normal navigation
             if attempt == 0:
-                driver.get(url)
-                time.sleep(1.0 if _is_ci else 3.0)  # CI: szybciej
+                driver.get(target_url)
             
             # 🔥 Strategy 2: Refresh if first failed
             elif attempt == 1:
                 print(f"   🔄 Próba #2: Refresh...")
                 driver.refresh()
-                time.sleep(1.0 if _is_ci else 3.0)
             
             # 🔥 Strategy 3: Navigate to main page first, then match
             elif attempt == 2:
                 print(f"   🔄 Próba #3: Via main page...")
                 driver.get("https://www.livesport.com/pl/")
-                time.sleep(1.0 if _is_ci else 2.0)
-                driver.get(url)
-                time.sleep(1.5 if _is_ci else 3.0)
+                wait_for_any(driver, LISTING_READY_SELECTORS, get_wait_timeout(sport))
+                driver.get(target_url)
             
             # 🔥 Strategy 4: Clear cache and try
             elif attempt == 3:
@@ -736,19 +907,22 @@ def process_match(url: str, driver: webdriver.Chrome, away_team_focus: bool = Fa
                     driver.delete_all_cookies()
                 except WebDriverException:
                     pass  # Ignoruj błędy przy czyszczeniu cookies
-                time.sleep(0.5 if _is_ci else 1.0)
-                driver.get(url)
-                time.sleep(1.5 if _is_ci else 3.0)
+                driver.get(target_url)
             
             # 🔥 Strategy 5: Last resort - direct URL
             else:
                 print(f"   🔄 Próba #5: Direct URL (last resort)...")
-                driver.get(url)
-                time.sleep(2.0 if _is_ci else 5.0)  # CI: szybciej
+                driver.get(target_url)
             
-            # Teraz spróbuj kliknąć zakładkę H2H
-            click_h2h_tab(driver)
-            time.sleep(1.5 if _is_ci else 2.5)  # CI: szybciej
+            # Strona H2H ogółem zawiera też nagłówek meczu - czekaj na wiersze H2H
+            if not wait_for_h2h_content(driver, sport):
+                # Fallback: H2H nie ma w DOM (nietypowy URL) - kliknij zakładkę
+                with trace_span('click_h2h') as span:
+                    click_h2h_tab(driver)
+                    if not wait_for_h2h_content(driver, sport):
+                        span['outcome'] = 'miss'
+                        if status is not None:
+                            status['h2h_missed'] = True
             break  # Success - wyjdź z pętli
             
         except (WebDriverException, ConnectionResetError, ConnectionError, TimeoutError, TimeoutException) as e:
@@ -765,13 +939,13 @@ def process_match(url: str, driver: webdriver.Chrome, away_team_focus: bool = Fa
                 # Sprawdź czy driver nadal działa
                 if not check_driver_health(driver):
                     logger.warning("Driver przestał działać po błędzie - przerywam próby")
-                    return out
+                    return False
                 continue
             else:
                 print(f"❌ Błąd otwierania {url} po {max_retries} próbach")
                 print(f"   Ostatni błąd: {type(last_error).__name__}: {str(last_error)[:100]}")
                 logger.error(f"Nie udało się otworzyć {url} po {max_retries} próbach: {last_error}")
-                return out
+                return False
         except StaleElementReferenceException as e:
             # Element stał się nieaktualny - spróbuj ponownie
             logger.debug(f"StaleElementReferenceException dla {url}, retry {attempt + 1}")
@@ -780,15 +954,72 @@ def process_match(url: str, driver: webdriver.Chrome, away_team_focus: bool = Fa
                 continue
             else:
                 logger.warning(f"StaleElementReferenceException po {max_retries} próbach dla {url}")
-                return out
+                return False
 
-    # pobierz tytuł strony jako fallback na nazwy druzyn
+    return True
+
+
+def _load_h2h_soup(url: str, driver: webdriver.Chrome, target_url: str, sport: str,
+                   http_client=None, status: Optional[Dict] = None):
+    """
+    Ładuje stronę H2H ogółem i zwraca (soup, from_http).
+
+    Tryb HTTP: dokument H2H przez curl_cffi, bez Chrome.
+    Selenium tylko gdy odpowiedź nie zawiera danych H2H.
+    (None, False) gdy strony nie udało się załadować.
+    ``status`` - jak w _open_h2h_page (``h2h_missed``).
+    """
+    if http_client is not None:
+        with trace_span('navigate', via='http') as span:
+            html = http_client.fetch_h2h(target_url)
+            if not html:
+                span['outcome'] = 'fallback'
+        if html:
+            with trace_span('parse', via='http'):
+                return make_soup(html), True
+
+    # Sprawdź stan drivera przed rozpoczęciem
+    if not check_driver_health(driver):
+        logger.error(f"Driver nie działa przed przetworzeniem {url}")
+        return None, False
+
+    # Profil blokowania zasobów (allowlista zależy od sportu - no-op gdy bez zmian)
+    apply_blocking_profile(driver, get_block_profile(), sport)
+
+    with trace_span('navigate', via='selenium') as span:
+        opened = _open_h2h_page(driver, url, target_url, sport, status=status)
+        if not opened:
+            span['outcome'] = 'failed'
+    if not opened:
+        return None, False
+
+    # Jeden soup na stronę - ten sam służy do nagłówka, H2H, formy i kursów
+    soup = None
     try:
         page_source = driver.page_source
         if not page_source:
             logger.warning(f"process_match: Pusta strona dla {url}")
-            return out
-        soup = BeautifulSoup(page_source, 'html.parser')
+            return None, False
+        with trace_span('parse', via='selenium'):
+            soup = make_soup(page_source)
+    except WebDriverException as e:
+        logger.debug(f"process_match: Błąd pobierania strony dla {url}: {e}")
+
+    # Ponownie pobierz soup tylko gdyby poprzednia próba się nie powiodła
+    if soup is None:
+        try:
+            soup = make_soup(driver.page_source)
+        except WebDriverException as e:
+            logger.error(f"process_match: Nie można pobrać page_source dla {url}: {e}")
+            return None, False
+    collect_blocking_stats(driver)
+    return soup, False
+
+
+def _parse_match_header(soup: BeautifulSoup, url: str, out: Dict) -> None:
+    """Nazwy drużyn i czas meczu z nagłówka strony H2H (uzupełnia ``out``)."""
+    # pobierz tytuł strony jako fallback na nazwy druzyn
+    try:
         # spróbuj wyciągnąć nazwy drużyn z nagłówka
         # FIX: soup.title.string może zwrócić None nawet gdy soup.title istnieje
         title = (soup.title.string or '') if soup.title else ''
@@ -798,20 +1029,13 @@ def process_match(url: str, driver: webdriver.Chrome, away_team_focus: bool = Fa
             if len(m) >= 2:
                 out['home_team'] = m[0].strip()
                 out['away_team'] = m[1].strip()
-    except (WebDriverException, AttributeError) as e:
+    except AttributeError as e:
         logger.debug(f"process_match: Błąd pobierania tytułu strony dla {url}: {e}")
     except Exception as e:
         logger.warning(f"process_match: Nieoczekiwany błąd przy parsowaniu tytułu: {type(e).__name__}: {e}")
 
     # NIE MUSIMY KLIKAĆ H2H - już jesteśmy na stronie /h2h/ogolem/
 
-    # Ponownie pobierz soup gdyby poprzednia próba się nie powiodła
-    try:
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
-    except WebDriverException as e:
-        logger.error(f"process_match: Nie można pobrać page_source dla {url}: {e}")
-        return out
-
     # try to extract team names from the page header - NOWE SELEKTORY
     try:
         # Nowa struktura Livesport (2025)
@@ -834,7 +1058,7 @@ def process_match(url: str, driver: webdriver.Chrome, away_team_focus: bool = Fa
             out['away_team'] = safe_get_text(away_el, out['away_team'])
     except (AttributeError, TypeError) as e:
         logger.debug(f"process_match: Błąd przy pobieraniu nazwy gości: {e}")
-    
+
     # Wydobądź datę i godzinę meczu
     try:
         # Szukaj różnych możliwych selektorów dla daty/czasu
@@ -842,7 +1066,7 @@ def process_match(url: str, driver: webdriver.Chrome, away_team_focus: bool = Fa
         time_el = soup.select_one("div.duelParticipant__startTime")
         if time_el:
             out['match_time'] = safe_get_text(time_el, '')
-        
+
         # Próba 2: Z tytułu strony (często zawiera datę)
         if not out['match_time'] and soup.title:
             title = soup.title.string if soup.title else ''
@@ -854,7 +1078,7 @@ def process_match(url: str, driver: webdriver.Chrome, away_team_focus: bool = Fa
                     date_str = date_match.group(1)
                     time_str = date_match.group(2) if date_match.group(2) else ''
                     out['match_time'] = f"{date_str} {time_str}".strip()
-        
+
         # Próba 3: Z URL (może zawierać datę)
         if not out['match_time']:
             # Czasem data jest w parametrach URL
@@ -867,8 +1091,101 @@ def process_match(url: str, driver: webdriver.Chrome, away_team_focus: bool = Fa
     except Exception as e:
         logger.warning(f"process_match: Nieoczekiwany błąd przy parsowaniu czasu: {type(e).__name__}")
 
-    # parse H2H
-    h2h = parse_h2h_from_soup(soup, out['home_team'] or '')
+
+def process_match(url: str, driver: webdriver.Chrome, away_team_focus: bool = False, use_forebet: bool = False, use_gemini: bool = False, use_sofascore: bool = False, use_flashscore: bool = False, sport: str = 'football',
+                  http_client=None, h2h_cache=None) -> Dict:
+    """Odwiedza stronę meczu, otwiera H2H i zwraca informację we właściwym formacie.
+    
+    Args:
+        url: URL meczu
+        driver: Selenium WebDriver
+        away_team_focus: Jeśli True, liczy zwycięstwa GOŚCI w H2H zamiast gospodarzy
+        use_forebet: Jeśli True, pobiera predykcje z Forebet
+        use_gemini: Jeśli True, używa Gemini AI do analizy
+        sport: Sport (football, volleyball, etc.)
+        http_client: Opcjonalny LivesportHttpClient - H2H bez Chrome, Selenium jako fallback
+        h2h_cache: Opcjonalny H2HCache - ten sam mecz z poprzedniego runu bez strony H2H
+    """
+    # ========================================================================
+    # PROFILOWANIE CZASU - rozpoczęcie pomiaru
+    # ========================================================================
+    import time as time_module
+    _t_start = time_module.time()
+    set_trace_match(url, sport)
+    _timings = {
+        'h2h': 0.0,
+        'qualify': 0.0,
+        'forebet': 0.0,
+        'sofascore': 0.0,
+        'flashscore': 0.0,
+        'gemini': 0.0,
+    }
+    
+    out = {
+        'match_url': url,
+        'home_team': None,
+        'away_team': None,
+        'match_time': None,
+        'h2h_last5': [],
+        'last_h2h_date': None,  # Data ostatniego meczu H2H
+        'last_h2h_score': None,  # Wynik ostatniego meczu H2H
+        'last_h2h_home': None,  # Gospodarz ostatniego H2H
+        'last_h2h_away': None,  # Gość ostatniego H2H
+        'home_wins_in_h2h_last5': 0,
+        'away_wins_in_h2h_last5': 0,  # NOWE: dla trybu away_team_focus
+        'h2h_count': 0,
+        'win_rate': 0.0,  # % wygranych gospodarzy/gości w H2H (zależnie od trybu)
+        'qualifies': False,
+        'home_form': [],  # Forma gospodarzy: ['W', 'L', 'W', 'D', 'W']
+        'away_form': [],  # Forma gości: ['L', 'L', 'W', 'L', 'W']
+        'home_odds': None,  # Kursy bukmacherskie (info dodatkowa)
+        'away_odds': None,
+        'focus_team': 'away' if away_team_focus else 'home',  # NOWE: który tryb
+        # FOREBET PREDICTIONS
+        'forebet_prediction': None,  # '1', 'X', '2'
+        'forebet_probability': None,  # float (%)
+        'forebet_exact_score': None,  # '1-3'
+        'forebet_over_under': None,  # 'Over 2.5' / 'Under 2.5'
+        'forebet_btts': None,  # 'Yes' / 'No'
+        'forebet_avg_goals': None,  # float
+        # GEMINI AI PREDICTIONS
+        'gemini_prediction': None,  # Krótka predykcja AI (1-2 zdania)
+        'gemini_confidence': None,  # 0-100% pewności
+        'gemini_reasoning': None,  # Szczegółowe uzasadnienie
+        'gemini_recommendation': None,  # HIGH/MEDIUM/LOW/SKIP
+        # SPORT INFO
+        'sport': sport,  # Nazwa sportu (football, basketball, volleyball, etc.)
+        'league': None,  # League/competition name (extracted from Forebet or Livesport)
+    }
+
+    # Plan nawigacji: od razu kanoniczny URL H2H ogółem (zamiast strony meczu + klik w zakładkę).
+    # Ten sam DOM służy potem do formy ogólnej i formy gości na wyjeździe.
+    h2h_urls = build_h2h_urls(url)
+    target_url = h2h_urls.get('overall', url)
+
+    # Cache H2H między runami: ten sam mecz -> bez otwierania strony H2H
+    cached_h2h = h2h_cache.lookup(url, sport) if h2h_cache is not None else None
+
+    soup = None
+    from_http = False
+    h2h_status = {}
+    if cached_h2h is None:
+        soup, from_http = _load_h2h_soup(url, driver, target_url, sport, http_client if h2h_urls else None,
+                                         status=h2h_status)
+        if soup is None:
+            trace_record('match', time_module.time() - _t_start, outcome='failed')
+            return out
+
+    if cached_h2h is not None:
+        for field in ('home_team', 'away_team', 'match_time'):
+            out[field] = cached_h2h.get(field)
+        h2h = list(cached_h2h.get('h2h_last5') or [])
+        print(f"   🗄️  H2H z cache ({out['home_team']} vs {out['away_team']})")
+    else:
+        with trace_span('extract'):
+            _parse_match_header(soup, url, out)
+            # parse H2H
+            h2h = parse_h2h_from_soup(soup, out['home_team'] or '')
 
     # ------------------------------------------------------------------
     # SORT H2H BY DATE (descending) so h2h[0] is always the most recent
@@ -979,9 +1296,14 @@ def process_match(url: str, driver: webdriver.Chrome, away_team_focus: bool = Fa
     if basic_qualifies:
         team_name = out['away_team'] if away_team_focus else out['home_team']
         print(f"   📊 Podstawowo kwalifikuje ({'GOŚCIE' if away_team_focus else 'GOSPODARZE'}: {team_name}, H2H: {win_rate*100:.0f}%) - sprawdzam formę...")
+        if soup is None:
+            # H2H z cache - forma wymaga strony (jedno załadowanie zamiast osobnych widoków)
+            soup, from_http = _load_h2h_soup(url, driver, target_url, sport, http_client if h2h_urls else None)
         try:
             # ZAAWANSOWANA ANALIZA FORMY (3 źródła)
-            advanced_form = extract_advanced_team_form(url, driver)
+            with trace_span('form', kind='advanced'):
+                advanced_form = extract_advanced_team_form(url, driver, overall_soup=soup, sport=sport,
+                                                           http_client=http_client if from_http else None)
             
             out['home_form_overall'] = advanced_form['home_form_overall']
             out['home_form_home'] = advanced_form['home_form_home']
@@ -1028,8 +1350,9 @@ def process_match(url: str, driver: webdriver.Chrome, away_team_focus: bool = Fa
             out['qualifies'] = basic_qualifies
             # Pobierz formę starą metodą
             try:
-                home_form = extract_team_form(soup, driver, 'home', out.get('home_team'))
-                away_form = extract_team_form(soup, driver, 'away', out.get('away_team'))
+                with trace_span('form', kind='fallback'):
+                    home_form = extract_team_form(soup, driver, 'home', out.get('home_team'))
+                    away_form = extract_team_form(soup, driver, 'away', out.get('away_team'))
                 out['home_form'] = home_form
                 out['away_form'] = away_form
                 # Mapuj na pola _overall dla kompatybilności z email_notifier
@@ -1043,15 +1366,25 @@ def process_match(url: str, driver: webdriver.Chrome, away_team_focus: bool = Fa
         # Nie kwalifikuje się podstawowo - ale nadal pobierz formę dla wyświetlenia
         out['qualifies'] = False
         # Pobierz podstawową formę (dla meczów niekwalifikujących się)
-        try:
-            home_form = extract_team_form(soup, driver, 'home', out.get('home_team'))
-            away_form = extract_team_form(soup, driver, 'away', out.get('away_team'))
-            out['home_form'] = home_form
-            out['away_form'] = away_form
-            out['home_form_overall'] = home_form
-            out['away_form_overall'] = away_form
-        except (AttributeError, TypeError, WebDriverException, NameError) as e:
-            logger.debug(f"Błąd przy pobieraniu formy dla niekwalifikujących: {e}")
+        if cached_h2h is not None:
+            out['home_form'] = out['home_form_overall'] = cached_h2h.get('home_form') or []
+            out['away_form'] = out['away_form_overall'] = cached_h2h.get('away_form') or []
+        else:
+            try:
+                with trace_span('form', kind='basic'):
+                    home_form = extract_team_form(soup, driver, 'home', out.get('home_team'))
+                    away_form = extract_team_form(soup, driver, 'away', out.get('away_team'))
+                out['home_form'] = home_form
+                out['away_form'] = away_form
+                out['home_form_overall'] = home_form
+                out['away_form_overall'] = away_form
+            except (AttributeError, TypeError, WebDriverException, NameError) as e:
+                logger.debug(f"Błąd przy pobieraniu formy dla niekwalifikujących: {e}")
+    
+    # Nie zapisuj H2H, którego nie doczekano się na stronie - pusty wpis
+    # blokowałby mecz na cały TTL cache
+    if h2h_cache is not None and cached_h2h is None and not h2h_status.get('h2h_missed'):
+        h2h_cache.store(url, sport, out)
     
     # ⏱️ TIMING: Koniec kwalifikacji (Etap 1)
     _timings['qualify'] = time_module.time() - _t_start - _timings['h2h']
@@ -1067,7 +1400,10 @@ def process_match(url: str, driver: webdriver.Chrome, away_team_focus: bool = Fa
     
     if out.get('match_url') and not _skip_odds:
         print(f"   💰 Livesport API: Pobieranie kursów...")
-        livesport_odds = fetch_odds_from_livesport(driver, out['match_url'], sport)
+        with trace_span('odds', source='livesport') as span:
+            livesport_odds = fetch_odds_from_livesport(driver, out['match_url'], sport)
+            if not livesport_odds.get('odds_found'):
+                span['outcome'] = 'miss'
         if livesport_odds.get('odds_found'):
             out['home_odds'] = livesport_odds.get('home_odds')
             out['draw_odds'] = livesport_odds.get('draw_odds')
@@ -1088,7 +1424,8 @@ def process_match(url: str, driver: webdriver.Chrome, away_team_focus: bool = Fa
     # FOREBET PREDICTIONS - TYLKO jeśli mecz KWALIFIKUJE SIĘ!
     # 🔥 OPTYMALIZACJA: Skip Forebet dla meczów które i tak nie przejdą
     _t_forebet_start = time_module.time()
-    if use_forebet and FOREBET_AVAILABLE and out.get('qualifies') and out.get('home_team') and out.get('away_team'):
+    _run_forebet = bool(use_forebet and FOREBET_AVAILABLE and out.get('qualifies') and out.get('home_team') and out.get('away_team'))
+    if _run_forebet:
         try:
             print(f"      🎯 Forebet: Pobieram predykcję...")
             
@@ -1148,12 +1485,15 @@ def process_match(url: str, driver: webdriver.Chrome, away_team_focus: bool = Fa
         except Exception as e:
             print(f"      ⚠️ Błąd Forebet: {e}")
     _timings['forebet'] = time_module.time() - _t_forebet_start
+    if _run_forebet:
+        trace_record('forebet', _timings['forebet'], outcome='ok' if out.get('forebet_prediction') else 'miss')
     
     # ============================================
     # GEMINI AI ANALYSIS (Faza 3)
     # ============================================
     _t_gemini_start = time_module.time()
-    if use_gemini and out.get('qualifies'):
+    _run_gemini = bool(use_gemini and out.get('qualifies'))
+    if _run_gemini:
         try:
             print("      🤖 Gemini AI analysis...")
             
@@ -1206,12 +1546,15 @@ def process_match(url: str, driver: webdriver.Chrome, away_team_focus: bool = Fa
         except Exception as e:
             print(f"      ⚠️ Błąd Gemini AI: {e}")
     _timings['gemini'] = time_module.time() - _t_gemini_start
+    if _run_gemini:
+        trace_record('gemini', _timings['gemini'], outcome='ok' if out.get('gemini_prediction') else 'miss')
     
     # ========================================================================
     # SOFASCORE INTEGRATION - "Who will win?" predictions
     # ========================================================================
     _t_sofascore_start = time_module.time()
-    if use_sofascore and out.get('home_team') and out.get('away_team'):
+    _run_sofascore = bool(use_sofascore and out.get('home_team') and out.get('away_team'))
+    if _run_sofascore:
         try:
             print(f"   🎯 SofaScore: Pobieranie predykcji...")
             from sofascore_scraper import scrape_sofascore_full
@@ -1244,11 +1587,15 @@ def process_match(url: str, driver: webdriver.Chrome, away_team_focus: bool = Fa
         except Exception as e:
             print(f"      ⚠️ Błąd SofaScore: {e}")
     _timings['sofascore'] = time_module.time() - _t_sofascore_start
+    if _run_sofascore:
+        trace_record('sofascore', _timings['sofascore'],
+                     outcome='ok' if out.get('sofascore_home_win_prob') else 'miss')
     
     # FLASHSCORE ODDS - tylko jeśli brak kursów z Livesport AND kwalifikuje się AND sport z kursami
     _t_flash_start = time_module.time()
     has_livesport_odds = out.get('home_odds') and out.get('away_odds')
-    if use_flashscore and FLASHSCORE_AVAILABLE and out.get('qualifies') and out.get('home_team') and out.get('away_team') and not has_livesport_odds and not _skip_odds:
+    _run_flashscore = bool(use_flashscore and FLASHSCORE_AVAILABLE and out.get('qualifies') and out.get('home_team') and out.get('away_team') and not has_livesport_odds and not _skip_odds)
+    if _run_flashscore:
         try:
             print(f"   💰 FlashScore: Pobieranie kursów...")
             
@@ -1286,11 +1633,16 @@ def process_match(url: str, driver: webdriver.Chrome, away_team_focus: bool = Fa
     elif use_flashscore and not FLASHSCORE_AVAILABLE:
         print(f"      ⚠️ FlashScore: Scraper niedostępny")
     _timings['flashscore'] = time_module.time() - _t_flash_start
+    if _run_flashscore:
+        trace_record('odds', _timings['flashscore'], outcome='ok' if out.get('flashscore_found') else 'miss',
+                     source='flashscore')
 
     # ========================================================================
     # PODSUMOWANIE INTEGRACJI DANYCH + TIMING
     # ========================================================================
     _t_total = time_module.time() - _t_start
+    trace_record('match', _t_total, outcome='qualifies' if out.get('qualifies') else 'no',
+                 h2h_cache=cached_h2h is not None)
     
     if out.get('home_team') and out.get('away_team'):
         sources = []
@@ -1385,25 +1737,124 @@ def format_form_as_score(form_list: List[str]) -> str:
     draws = form_list.count('D')
     total = len(form_list)
     
-    # Scoring: Win=3pts, Draw=1pt, Loss=0pt
-    points = wins * 3 + draws * 1
-    max_points = total * 3
+    # Scoring: Win=3pts, Draw=1pt, Loss=0pt
+    points = wins * 3 + draws * 1
+    max_points = total * 3
+    
+    # Scale to /10
+    if max_points > 0:
+        score = round((points / max_points) * 10, 1)
+        return f"{score}/10"
+    
+    return 'N/A'
+
+
+# Pod-zakładki H2H Livesport (slug w URL)
+H2H_SUBTABS = {
+    'overall': 'ogolem',
+    'home': 'u-siebie',
+    'away': 'na-wyjezdzie',
+}
+
+
+def build_h2h_urls(match_url: str) -> Dict[str, str]:
+    """
+    Plan nawigacji: kanoniczne URL-e widoków H2H dla meczu.
+    
+    Z:  /mecz/pilka-nozna/team1/team2/?mid=XXX  (lub .../szczegoly/, .../h2h/u-siebie/)
+    Na: /mecz/pilka-nozna/team1/team2/h2h/ogolem/?mid=XXX (+ u-siebie, na-wyjezdzie)
+    
+    Returns:
+        {'overall': url, 'home': url, 'away': url} lub {} dla nieobsługiwanych URL-i
+    """
+    if not match_url or ('/match/' not in match_url and '/mecz/' not in match_url):
+        return {}
+    
+    base_url = match_url.split('?')[0].split('#')[0].rstrip('/')
+    # Usuń końcówkę "/szczegoly", "/h2h/..." lub inną podstronę, jeśli istnieje
+    for marker in ('/h2h', '/szczegoly'):
+        if marker + '/' in base_url + '/':
+            base_url = base_url[:(base_url + '/').index(marker + '/')]
+    
+    mid = match_url.split('mid=')[1].split('&')[0] if 'mid=' in match_url else ''
+    return {view: f"{base_url}/h2h/{slug}/?mid={mid}" for view, slug in H2H_SUBTABS.items()}
+
+
+def _first_h2h_row_text(driver: webdriver.Chrome) -> Optional[str]:
+    """Tekst pierwszego wiersza H2H (do wykrycia przełączenia pod-zakładki)."""
+    try:
+        return driver.execute_script(
+            "var r = document.querySelector('div.h2h__section a.h2h__row');"
+            "return r ? r.textContent : null;"
+        )
+    except WebDriverException:
+        return None
+
+
+def switch_h2h_subtab(driver: webdriver.Chrome, view: str, sport: str = None) -> bool:
+    """
+    Przełącza pod-zakładkę H2H (ogółem / u siebie / na wyjeździe) kliknięciem
+    w już otwartej stronie - bez nowego driver.get().
+    
+    Returns:
+        True jeśli zakładka została przełączona i treść H2H jest na stronie
+    """
+    slug = H2H_SUBTABS.get(view)
+    if not slug:
+        return False
+    
+    links = safe_find_elements(driver, By.CSS_SELECTOR, f"a[href*='/h2h/{slug}/']")
+    if not links:
+        return False
+    
+    before = _first_h2h_row_text(driver)
+    try:
+        links[0].click()
+    except WebDriverException:
+        try:
+            driver.execute_script("arguments[0].click();", links[0])
+        except WebDriverException as e:
+            logger.debug(f"switch_h2h_subtab: kliknięcie '{slug}' nie powiodło się: {e}")
+            return False
+    
+    # SPA: najpierw zmiana URL, potem podmiana wierszy
+    try:
+        WebDriverWait(driver, get_wait_timeout(sport), poll_frequency=0.15).until(
+            lambda d: f'/h2h/{slug}/' in (d.current_url or '')
+        )
+    except TimeoutException:
+        logger.debug(f"switch_h2h_subtab: URL nie zmienił się na '{slug}'")
+        return False
     
-    # Scale to /10
-    if max_points > 0:
-        score = round((points / max_points) * 10, 1)
-        return f"{score}/10"
+    if not wait_for_h2h_content(driver, sport):
+        return False
     
-    return 'N/A'
+    # Wiersze mogą być identyczne (np. wszystkie ostatnie mecze u siebie) - wtedy tylko krótki grace
+    try:
+        WebDriverWait(driver, H2H_ROWS_GRACE, poll_frequency=0.1).until(
+            lambda d: _first_h2h_row_text(d) != before
+        )
+    except TimeoutException:
+        pass
+    return True
 
 
-def extract_advanced_team_form(match_url: str, driver: webdriver.Chrome) -> Dict:
+def extract_advanced_team_form(match_url: str, driver: webdriver.Chrome, overall_soup: BeautifulSoup = None,
+                               sport: str = None, http_client=None) -> Dict:
     """
     Ekstraktuje zaawansowaną formę drużyn z 3 źródeł:
     1. Forma ogólna (ostatnie 5 meczów)
     2. Forma u siebie (gospodarze)
     3. Forma na wyjeździe (goście)
     
+    Plan nawigacji: jeśli process_match przekazał już załadowaną stronę H2H ogółem
+    (overall_soup), forma ogólna i forma gości na wyjeździe pochodzą z tego DOM-u,
+    a "u siebie" to przełączenie pod-zakładki w stronie. Bez overall_soup (lub gdy
+    przełączenie się nie uda) - stara ścieżka z osobnymi driver.get().
+    
+    Z http_client (overall_soup pobrany przez HTTP) driver nie jest na stronie meczu,
+    więc "u siebie" też idzie przez HTTP, a Selenium tylko gdy odpowiedź jest pusta.
+    
     Returns:
         {
             'home_form_overall': ['W', 'L', 'D', 'W', 'W'],
@@ -1422,37 +1873,51 @@ def extract_advanced_team_form(match_url: str, driver: webdriver.Chrome) -> Dict
     }
     
     try:
-        # Konwertuj URL meczu na URL H2H
-        # Z: /mecz/pilka-nozna/team1/team2/?mid=XXX
-        # Na: /mecz/pilka-nozna/team1/team2/h2h/ogolem/?mid=XXX (lub /u-siebie/, /na-wyjezdzie/)
-        
-        if '/match/' in match_url or '/mecz/' in match_url:
-            base_url = match_url.split('?')[0]  # Usuń query params
-            
-            # Usuń końcówkę "/szczegoly" lub inną stronę, jeśli istnieje
-            base_url = base_url.rstrip('/')
-            if base_url.endswith('/szczegoly') or base_url.endswith('/szczegoly/'):
-                base_url = base_url.replace('/szczegoly', '')
-            
-            mid = match_url.split('mid=')[1] if 'mid=' in match_url else ''
+        h2h_urls = build_h2h_urls(match_url)
+        if h2h_urls:
+            # Strona H2H ogółem z process_match - potrzebne min. 2 sekcje (home, away)
+            if http_client is not None and overall_soup is not None and \
+                    len(overall_soup.find_all('div', class_='h2h__section')) < 2:
+                overall_soup = None
+            if overall_soup is not None and len(overall_soup.find_all('div', class_='h2h__section')) < 2:
+                try:
+                    overall_soup = _current_h2h_soup(driver)
+                except WebDriverException:
+                    overall_soup = None
+                if overall_soup is not None and len(overall_soup.find_all('div', class_='h2h__section')) < 2:
+                    overall_soup = None
             
             # 1. FORMA OGÓLNA
-            h2h_overall_url = f"{base_url}/h2h/ogolem/?mid={mid}"
-            result['home_form_overall'], result['away_form_overall'] = _extract_form_from_h2h_page(
-                h2h_overall_url, driver, 'overall'
-            )
-            
-            # 2. FORMA U SIEBIE (gospodarze)
-            h2h_home_url = f"{base_url}/h2h/u-siebie/?mid={mid}"
-            result['home_form_home'], _ = _extract_form_from_h2h_page(
-                h2h_home_url, driver, 'home'
-            )
+            if overall_soup is not None:
+                result['home_form_overall'], result['away_form_overall'] = _parse_form_from_h2h_soup(
+                    overall_soup, 'overall'
+                )
+            else:
+                result['home_form_overall'], result['away_form_overall'] = _extract_form_from_h2h_page(
+                    h2h_urls['overall'], driver, 'overall'
+                )
             
-            # 3. FORMA NA WYJEŹDZIE (goście)
+            # 2. FORMA NA WYJEŹDZIE (goście) - z DOM strony ogółem
             # NOWA METODA: Pobierz dane z strony ogólnej H2H i filtruj mecze gości na wyjeździe
-            result['away_form_away'] = _extract_away_form_from_overall(
-                h2h_overall_url, driver, result['away_form_overall']
-            )
+            if overall_soup is not None:
+                result['away_form_away'] = _parse_away_form_from_soup(overall_soup, result['away_form_overall'])
+            else:
+                result['away_form_away'] = _extract_away_form_from_overall(
+                    h2h_urls['overall'], driver, result['away_form_overall']
+                )
+            
+            # 3. FORMA U SIEBIE (gospodarze) - przełączenie pod-zakładki w stronie
+            home_html = http_client.fetch_h2h(h2h_urls['home']) if http_client is not None else None
+            if home_html:
+                result['home_form_home'], _ = _parse_form_from_h2h_soup(
+                    make_soup(home_html, parse_only=H2H_STRAINER), 'home'
+                )
+            elif http_client is None and overall_soup is not None and switch_h2h_subtab(driver, 'home', sport):
+                result['home_form_home'], _ = _parse_form_from_h2h_soup(_current_h2h_soup(driver), 'home')
+            else:
+                result['home_form_home'], _ = _extract_form_from_h2h_page(
+                    h2h_urls['home'], driver, 'home'
+                )
             
             # 4. ANALIZA PRZEWAGI FORMY
             result['form_advantage'] = _analyze_form_advantage(result)
@@ -1474,6 +1939,42 @@ def _extract_form_from_h2h_page(url: str, driver: webdriver.Chrome, context: str
         driver: Selenium WebDriver
         context: 'overall', 'home', lub 'away'
     
+    Returns:
+        (home_form, away_form) - każda to lista ['W', 'L', 'D', ...]
+    """
+    try:
+        driver.get(url)
+        wait_for_h2h_content(driver)  # Czekaj na sekcje H2H (zamiast stałego sleep)
+        soup = _current_h2h_soup(driver)
+    except Exception as e:
+        print(f"      ⚠️ _extract_form_from_h2h_page error ({context}): {e}")
+        return ([], [])
+    
+    return _parse_form_from_h2h_soup(soup, context)
+
+
+def _current_h2h_soup(driver: webdriver.Chrome) -> BeautifulSoup:
+    """Soup aktualnie otwartej strony H2H (po scrollu, który dociąga leniwe sekcje)."""
+    # Scroll down to trigger lazy-loading content
+    try:
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        # Sekcja gości bywa doładowywana dopiero po scrollu
+        wait_for_any(driver, ['div.h2h__section ~ div.h2h__section'], H2H_ROWS_GRACE)
+    except (WebDriverException, TimeoutException) as e:
+        logger.debug(f"Scroll dla lazy-loading nie powiódł się: {e}")
+    
+    # Parsery formy czytają tylko sekcje/wiersze H2H - reszty strony nie budujemy
+    return make_soup(driver.page_source, parse_only=H2H_STRAINER)
+
+
+def _parse_form_from_h2h_soup(soup: BeautifulSoup, context: str) -> tuple:
+    """
+    Ekstraktuje formę (home, away) z już załadowanej strony H2H - bez nawigacji.
+    
+    Args:
+        soup: BeautifulSoup strony H2H
+        context: 'overall', 'home', lub 'away' (do logów)
+    
     Returns:
         (home_form, away_form) - każda to lista ['W', 'L', 'D', ...]
     """
@@ -1481,18 +1982,6 @@ def _extract_form_from_h2h_page(url: str, driver: webdriver.Chrome, context: str
     away_form = []
     
     try:
-        driver.get(url)
-        time.sleep(3.0)  # Czas na załadowanie dynamicznych elementów
-        
-        # Scroll down to trigger lazy-loading content
-        try:
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(1.0)
-        except (WebDriverException, TimeoutException) as e:
-            logger.debug(f"Scroll dla lazy-loading nie powiódł się: {e}")
-        
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
-        
         # DEBUG: Sprawdź czy strona się załadowała
         page_text = soup.get_text()
         if 'error' in page_text.lower() or 'can\'t be displayed' in page_text.lower():
@@ -1615,15 +2104,27 @@ def _extract_away_form_from_overall(url: str, driver: webdriver.Chrome, away_for
     Returns:
         Lista formy na wyjeździe ['W', 'L', 'D', ...] lub away_form_overall jeśli nie można pobrać
     """
+    try:
+        driver.get(url)
+        wait_for_h2h_content(driver)
+        soup = make_soup(driver.page_source, parse_only=H2H_STRAINER)
+    except Exception as e:
+        print(f"      ⚠️ _extract_away_form_from_overall error: {e}")
+        return away_form_overall[:5] if away_form_overall else []
+    
+    return _parse_away_form_from_soup(soup, away_form_overall)
+
+
+def _parse_away_form_from_soup(soup: BeautifulSoup, away_form_overall: List[str]) -> List[str]:
+    """
+    Forma gości NA WYJEŹDZIE z już załadowanej strony H2H ogółem - bez nawigacji.
+    
+    Returns:
+        Lista formy na wyjeździe ['W', 'L', 'D', ...] lub away_form_overall jeśli brak danych
+    """
     away_form_away = []
     
     try:
-        # Strona jest już załadowana z wcześniejszego wywołania, ale dla pewności odśwież
-        driver.get(url)
-        time.sleep(2.0)
-        
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
-        
         # Szukaj drugiej sekcji H2H (sekcja gości)
         h2h_sections = soup.find_all('div', class_='h2h__section')
         
@@ -1901,7 +2402,7 @@ def fetch_odds_from_livesport(driver: webdriver.Chrome, match_url: str, sport: s
     
     try:
         # Import API client
-        from livesport_odds_api import LivesportOddsAPI, get_livesport_odds
+        from livesport_odds_api import get_livesport_odds
         
         # Użyj API do pobrania kursów
         api_result = get_livesport_odds(match_url, sport)
@@ -1943,7 +2444,7 @@ def fetch_odds_from_livesport(driver: webdriver.Chrome, match_url: str, sport: s
             
             if event_id:
                 print(f"   💰 Livesport API: Retry z Event ID: {event_id}")
-                api = LivesportOddsAPI()
+                api = get_shared_odds_api()
                 api_result = api.get_odds_from_multiple_bookmakers(event_id, sport)
                 
                 if api_result and api_result.get('success'):
@@ -2339,7 +2840,7 @@ def calculate_surface_stats_from_h2h(
         }
 
 
-def process_match_tennis(url: str, driver: webdriver.Chrome) -> Dict:
+def process_match_tennis(url: str, driver: webdriver.Chrome, players: Optional[Dict[str, Dict]] = None) -> Dict:
     """
     Przetwarzanie meczu tenisowego – silnik v4 (Player A / Player B).
 
@@ -2352,7 +2853,12 @@ def process_match_tennis(url: str, driver: webdriver.Chrome) -> Dict:
 
     Próg kwalifikacji: ≥45/100 advanced_score.
     NIE generuje syntetycznych danych – brak danych = neutralne 0.5.
+
+    players: rekordy zawodników dnia z TennisPrefetcher ({url profilu: rekord});
+    uzupełniają brakujący ranking / formę i dają statystyki nawierzchni.
     """
+    _t_start = time.time()
+    set_trace_match(url, 'tennis')
     out: Dict = {
         'match_url': url,
         'home_team': None,          # Player A
@@ -2412,6 +2918,7 @@ def process_match_tennis(url: str, driver: webdriver.Chrome) -> Dict:
         o['focus_team'] = 'home' if fav == 'player_a' else 'away'
         if o.get('ranking_a') and o.get('ranking_b'):
             o['ranking_info'] = f"ATP/WTA: #{o['ranking_a']} vs #{o['ranking_b']}"
+        trace_record('match', time.time() - _t_start, outcome='qualifies' if o.get('qualifies') else 'no')
         return o
 
     try:
@@ -2425,10 +2932,12 @@ def process_match_tennis(url: str, driver: webdriver.Chrome) -> Dict:
             return _finalise(out)
         
         # KROK 1: Przejdź do strony meczu
+        apply_blocking_profile(driver, get_block_profile(), 'tennis')
         driver.get(url)
-        time.sleep(2.5)
+        wait_for_match_page(driver, 'tennis')
         
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
+        # Tu potrzebny jest tylko link do H2H
+        soup = make_soup(driver.page_source, parse_only=LINKS_STRAINER)
         
         # KROK 2: Znajdź link do H2H na stronie
         h2h_link = None
@@ -2442,20 +2951,24 @@ def process_match_tennis(url: str, driver: webdriver.Chrome) -> Dict:
             # Zbuduj pełny URL do H2H
             h2h_url = 'https://www.livesport.com' + h2h_link if h2h_link.startswith('/') else h2h_link
             driver.get(h2h_url)
-            time.sleep(3.0)  # Tennis H2H wymaga więcej czasu na załadowanie
+            wait_for_h2h_content(driver, 'tennis')  # Tennis H2H wymaga więcej czasu na załadowanie
         else:
             # Fallback: użyj starej metody jeśli nie znaleziono linku
             h2h_url = url.replace('/szczegoly/', '/h2h/wszystkie-nawierzchnie/')
             if 'szczegoly' not in url and 'h2h' not in url:
                 h2h_url = url.rstrip('/') + '/h2h/wszystkie-nawierzchnie/'
             driver.get(h2h_url)
-            time.sleep(3.0)
+            wait_for_h2h_content(driver, 'tennis')
             
     except WebDriverException as e:
         print(f"   ⚠️ Błąd nawigacji dla tenisa: {e}")
+        trace_record('navigate', time.time() - _t_start, outcome='error', via='selenium')
         return _finalise(out)
+    trace_record('navigate', time.time() - _t_start, via='selenium')
 
-    soup = BeautifulSoup(driver.page_source, 'html.parser')
+    with trace_span('parse', via='selenium'):
+        soup = make_soup(driver.page_source)
+    collect_blocking_stats(driver)
 
     # Wydobądź nazwy zawodników
     try:
@@ -2565,6 +3078,9 @@ def process_match_tennis(url: str, driver: webdriver.Chrome) -> Dict:
     out['form_a'] = _extract_real_form_badges(soup, player_a)
     out['form_b'] = _extract_real_form_badges(soup, player_b)
     
+    # 3b. Rekordy zawodników z prefetchu dnia (ranking / forma / nawierzchnie)
+    apply_player_records(out, url, players)
+    
     # 4. ODDS
     odds = extract_betting_odds(soup)
     out['home_odds'] = odds['home_odds']
@@ -2747,20 +3263,289 @@ def _extract_match_links_from_soup(soup: BeautifulSoup, sport_url: str, existing
     return sport_links, debug_patterns_found
 
 
-def get_match_links_from_day(driver: webdriver.Chrome, date: str, sports: List[str] = None, leagues: List[str] = None) -> List[str]:
+# Statusy z listingu: mecze, których nie warto otwierać (brak typowania)
+LISTING_DROP_STATUSES = ('finished', 'postponed', 'cancelled', 'abandoned')
+# Wykluczone ligi (fragmenty nazwy "KRAJ: Liga", po przecinku), np. "kobiety,U19,towarzyskie"
+EXCLUDE_LEAGUES_ENV = 'LIVESPORT_EXCLUDE_LEAGUES'
+
+# Tekst pola event__stage -> status (kolejność ma znaczenie: "Przerwany" przed "Koniec")
+_LISTING_STAGE_STATUSES = (
+    ('postponed', re.compile(r'przełożon|postponed|opóźnion|delayed', re.I)),
+    ('cancelled', re.compile(r'odwołan|cancel', re.I)),
+    ('abandoned', re.compile(r'przerwan|abandon|interrupt|walkower|walkover|krecz|retired', re.I)),
+    ('finished', re.compile(r'zakończ|koniec|po dogr|po karnych|finished|after (?:extra|pen)|^ft$', re.I)),
+)
+
+
+def _listing_row_status(row, classes: List[str]) -> str:
+    """Status meczu z wiersza listingu: scheduled / live / finished / postponed / cancelled / abandoned."""
+    stage = row.select_one('.event__stage, .event__stage--block')
+    stage_text = stage.get_text(' ', strip=True) if stage is not None else ''
+    for status, pattern in _LISTING_STAGE_STATUSES:
+        if stage_text and pattern.search(stage_text):
+            return status
+    if any('event__match--live' in c for c in classes):
+        return 'live'
+    if any('event__match--scheduled' in c for c in classes):
+        return 'scheduled'
+    scores = [el.get_text(strip=True) for el in row.select('.event__score')]
+    if len(scores) >= 2 and all(s.isdigit() for s in scores[:2]):
+        return 'finished'
+    return 'scheduled'
+
+
+def _listing_event_id(row, href: str) -> Optional[str]:
+    """ID meczu: atrybut id wiersza (g_1_AByAQtGc), parametr mid albo None."""
+    row_id = row.get('id') or ''
+    m = re.match(r'g_\d+_(\w+)$', row_id)
+    if m:
+        return m.group(1)
+    m = re.search(r'[?&]mid=([^&#]+)', href)
+    return m.group(1) if m else None
+
+
+def _extract_listing_stubs_from_soup(soup: BeautifulSoup, sport: str) -> Dict[str, Dict]:
+    """
+    Metadane meczów z wierszy listingu (bez otwierania meczów).
+    
+    Returns:
+        {url: {'event_id', 'sport', 'league', 'home_team', 'away_team',
+               'kickoff' ('HH:MM' lub None), 'status', 'has_odds'}}
+    """
+    stubs = {}
+    league = None
+    for row in soup.find_all('div', class_=True):
+        classes = row.get('class', [])
+        if 'event__header' in classes or 'headerLeague__wrapper' in classes:
+            country = row.select_one('.event__title--type, .headerLeague__category-text')
+            name = row.select_one('.event__title--name, .headerLeague__title-text')
+            parts = [safe_get_text(el, '') for el in (country, name) if el is not None]
+            league = ': '.join(p for p in parts if p) or None
+            continue
+        if 'event__match' not in classes:
+            continue
+        link = row.find('a', href=True)
+        if link is None:
+            continue
+        href = link['href']
+        if href.startswith('/'):
+            href = 'https://www.livesport.com' + href
+        time_el = row.select_one('.event__time')
+        kickoff = None
+        if time_el is not None:
+            m = re.search(r'(\d{1,2}):(\d{2})', time_el.get_text(' ', strip=True))
+            if m:
+                kickoff = f"{int(m.group(1)):02d}:{m.group(2)}"
+        home = row.select_one('.event__participant--home, .event__homeParticipant')
+        away = row.select_one('.event__participant--away, .event__awayParticipant')
+        has_odds = any(re.search(r'\d+\.\d+', el.get_text(strip=True))
+                       for el in row.select('[class*="event__odd"]'))
+        stubs[href] = {
+            'event_id': _listing_event_id(row, href),
+            'sport': sport,
+            'league': league,
+            'home_team': safe_get_text(home, '') or None,
+            'away_team': safe_get_text(away, '') or None,
+            'kickoff': kickoff,
+            'status': _listing_row_status(row, classes),
+            'has_odds': has_odds,
+        }
+    return stubs
+
+
+def get_exclude_leagues(exclude_leagues: List[str] = None) -> List[str]:
+    """Wykluczone ligi z argumentu albo z LIVESPORT_EXCLUDE_LEAGUES (małe litery)."""
+    if exclude_leagues is None:
+        exclude_leagues = os.getenv(EXCLUDE_LEAGUES_ENV, '').split(',')
+    return [e.strip().lower() for e in exclude_leagues if e and e.strip()]
+
+
+def filter_listing_stubs(urls: List[str], stubs: Dict[str, Dict], drop_statuses=LISTING_DROP_STATUSES,
+                         exclude_leagues: List[str] = None) -> tuple:
+    """
+    Odrzuca mecze przed nawigacją: status z ``drop_statuses`` albo wykluczona liga.
+    Mecze bez stuba (link spoza wiersza listingu) zostają.
+    
+    Returns:
+        (zostawione URLe, {powód: liczba})
+    """
+    exclude = get_exclude_leagues(exclude_leagues)
+    kept, dropped = [], {}
+    for url in urls:
+        stub = stubs.get(url)
+        reason = None
+        if stub is not None:
+            if stub.get('status') in drop_statuses:
+                reason = stub['status']
+            elif exclude and any(e in (stub.get('league') or '').lower() for e in exclude):
+                reason = 'excluded_league'
+        if reason:
+            dropped[reason] = dropped.get(reason, 0) + 1
+        else:
+            kept.append(url)
+    return kept, dropped
+
+
+def apply_listing_stub(info: Optional[Dict], stub: Optional[Dict]) -> Optional[Dict]:
+    """Uzupełnia wynik meczu danymi z listingu (liga, drużyny), gdy strona ich nie dała."""
+    if not info or not stub:
+        return info
+    for field in ('league', 'home_team', 'away_team'):
+        if not info.get(field) and stub.get(field):
+            info[field] = stub[field]
+    return info
+
+
+def day_odds_events(urls: List[str], stubs: Optional[Dict[str, Dict]] = None) -> Dict[str, str]:
+    """{event_id: sport} meczów dnia - ID ze stubu listingu, inaczej z URL-a."""
+    api = get_shared_odds_api()
+    events = {}
+    for url in urls:
+        event_id = ((stubs or {}).get(url) or {}).get('event_id') or api.extract_event_id_from_url(url)
+        if event_id:
+            events.setdefault(event_id, detect_sport_from_url(url))
+    return events
+
+
+def prefetch_day_odds(urls: List[str], stubs: Optional[Dict[str, Dict]] = None,
+                      concurrency: int = DEFAULT_BATCH_CONCURRENCY, best_price: bool = False) -> LivesportOddsBatch:
+    """Kursy wszystkich meczów dnia jednym batchem; fetch_odds_from_livesport bierze je z pamięci."""
+    batch = LivesportOddsBatch(concurrency=concurrency, best_price=best_price)
+    remember_batch_odds(batch.fetch(day_odds_events(urls, stubs)))
+    return batch
+
+
+_LISTING_DROP_LABELS = {
+    'finished': 'zakończone', 'postponed': 'przełożone', 'cancelled': 'odwołane',
+    'abandoned': 'przerwane', 'excluded_league': 'wykluczone ligi',
+}
+
+
+# Listingi kolejnych sportów ładowane równolegle w osobnych kartach ('0' = po kolei)
+LISTING_TABS_ENV = 'LIVESPORT_LISTING_TABS'
+
+
+def _use_listing_tabs(driver: webdriver.Chrome, sports: List[str]) -> bool:
+    """Karty tylko dla >1 sportu, prawdziwego drivera i poza nagrywaniem/odtwarzaniem archiwum."""
+    if os.getenv(LISTING_TABS_ENV, '1').strip().lower() in ('0', 'false', 'no', 'off'):
+        return False
+    if len([s for s in sports if s in SPORT_URLS]) < 2 or not hasattr(driver, 'switch_to'):
+        return False
+    return get_archive().mode == 'off'  # archiwum kluczuje strony po driver.get()
+
+
+def _open_listing_tabs(driver: webdriver.Chrome, date: str, sports: List[str]) -> Dict[str, str]:
+    """
+    Otwiera karty z listingami sportów (bez czekania na załadowanie) - strony
+    ładują się równolegle, zanim scraper do nich dojdzie.
+    
+    Returns:
+        {sport: window handle}; pierwszy sport zostaje w bieżącej karcie (driver.get)
+    """
+    tabs = {}
+    original = driver.current_window_handle
+    for sport in [s for s in sports if s in SPORT_URLS][1:]:
+        try:
+            driver.switch_to.new_window('tab')
+            driver._blocking_key = None  # blokowanie CDP działa per karta
+            apply_blocking_profile(driver, get_block_profile(), sport)
+            driver.execute_script("window.location.href = arguments[0];", f"{SPORT_URLS[sport]}?date={date}")
+            tabs[sport] = driver.current_window_handle
+        except WebDriverException as e:
+            logger.warning(f"Karta listingu {sport}: {type(e).__name__} - dalej po kolei")
+            break
+    driver.switch_to.window(original)
+    driver._blocking_key = None
+    if tabs:
+        print(f"🗂️  Listingi ładowane równolegle w {len(tabs) + 1} kartach")
+    return tabs
+
+
+def _activate_listing_tab(driver: webdriver.Chrome, handle: str) -> None:
+    """Przełącza na kartę i wysuwa ją na wierzch (karty w tle nie doładowują wierszy)."""
+    driver.switch_to.window(handle)
+    try:
+        driver.execute_cdp_cmd('Page.bringToFront', {})
+    except Exception:
+        pass
+
+
+def _close_listing_tabs(driver: webdriver.Chrome, tabs: Dict[str, str], original: str) -> None:
+    for handle in tabs.values():
+        try:
+            driver.switch_to.window(handle)
+            driver.close()
+        except WebDriverException:
+            continue
+    driver.switch_to.window(original)
+    driver._blocking_key = None
+
+
+def _scroll_listing_until_settled(driver: webdriver.Chrome, sport: str, initial_count: int) -> int:
+    """
+    Scrolluje listing aż przestaną dochodzić wiersze meczów.
+    
+    Po każdym scrollu czeka na sygnał "wiersze ucichły" (MutationObserver) -
+    scroll bez nowych wierszy kończy listę. Bez obserwatora (replay, stary
+    driver): krótki sleep i stop po 3 scrollach bez nowych linków.
+    
+    Returns:
+        Liczba linków do meczów na stronie
+    """
+    # Maks scrolli: football=15, inne=8
+    max_scrolls = 15 if sport == 'football' else (10 if sport in ['basketball', 'tennis'] else 8)
+    prev_link_count = initial_count
+    no_new_links_count = 0
+    
+    for scroll_i in range(max_scrolls):
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        settled = wait_for_dom_settled(driver)
+        if settled is None:
+            time.sleep(0.6)  # Krótki wait — wystarczy do lazy-load
+        
+        # Policz aktualną liczbę linków (szybkie JS, bez BS4)
+        current_count = _count_match_links_in_page(driver)
+        
+        if current_count <= prev_link_count:
+            no_new_links_count += 1
+            if (settled is not None and settled.get('settled')) or no_new_links_count >= 3:
+                print(f"   ℹ️ Stop scrollowania po {scroll_i+1} scrollach (brak nowych linków, total={current_count})")
+                break
+        else:
+            no_new_links_count = 0
+            if (scroll_i + 1) % 5 == 0:
+                print(f"   📜 Scroll {scroll_i+1}/{max_scrolls}: {current_count} linków znalezionych")
+        prev_link_count = current_count
+    
+    # Scroll do góry (parsowanie po powrocie)
+    driver.execute_script("window.scrollTo(0, 0);")
+    return prev_link_count
+
+
+def get_match_links_from_day(driver: webdriver.Chrome, date: str, sports: List[str] = None, leagues: List[str] = None,
+                             stubs: Optional[Dict[str, Dict]] = None,
+                             exclude_leagues: List[str] = None) -> List[str]:
     """Zbiera linki do meczów z głównej strony dla danego dnia.
     
     OPTYMALIZACJA CI:
-    - Smart scroll: liczy linki podczas scrollowania, wychodzi gdy brak nowych
+    - Równoległe karty: listingi wszystkich sportów ładują się naraz (LIVESPORT_LISTING_TABS=0 wyłącza)
+    - Smart scroll: MutationObserver czeka aż wiersze ucichną zamiast stałych sleepów
     - Cookie consent: automatycznie zamyka bannery blokujące lazy-load
     - Rozszerzone wzorce URL: /match/, /mecz/, /event/, /detail/, /#id/
     - Debug logging: w CI loguje szczegóły dla diagnozy problemów
     
+    Wiersze listingu dają stuby meczów (drużyny, liga, godzina, status) - mecze
+    przełożone / odwołane / przerwane, zakończone (dziś i później) oraz z
+    wykluczonych lig są odrzucane bez otwierania strony meczu.
+    
     Args:
         driver: Selenium WebDriver
         date: Data w formacie 'YYYY-MM-DD'
         sports: Lista sportów do przetworzenia (np. ['football', 'basketball'])
         leagues: Lista slug-ów lig do filtrowania (np. ['ekstraklasa', 'premier-league'])
+        stubs: Opcjonalny dict uzupełniany stubami zwróconych meczów - {url: {...}}
+               (patrz _extract_listing_stubs_from_soup; wskazówki dla MatchScheduler)
+        exclude_leagues: Fragmenty nazw lig do pominięcia (domyślnie z LIVESPORT_EXCLUDE_LEAGUES)
     
     Returns:
         Lista URLi do meczów
@@ -2771,6 +3556,17 @@ def get_match_links_from_day(driver: webdriver.Chrome, date: str, sports: List[s
     IS_CI = os.environ.get('GITHUB_ACTIONS') == 'true' or os.environ.get('CI') == 'true'
     all_links = []
     all_links_set = set()
+    # Zakończone odrzucamy tylko dla dziś / przyszłości (przeszły dzień = analiza wyników)
+    drop_statuses = LISTING_DROP_STATUSES
+    if date < datetime.now().strftime('%Y-%m-%d'):
+        drop_statuses = tuple(s for s in LISTING_DROP_STATUSES if s != 'finished')
+    dropped_total = {}
+    
+    # 🗂️ Sporty 2..N ładują się w kartach w tle, gdy pierwszy jest scrapowany
+    tabs = {}
+    if _use_listing_tabs(driver, sports):
+        original_tab = driver.current_window_handle
+        tabs = _open_listing_tabs(driver, date, sports)
     
     for sport in sports:
         if sport not in SPORT_URLS:
@@ -2784,13 +3580,14 @@ def get_match_links_from_day(driver: webdriver.Chrome, date: str, sports: List[s
             # Dodaj datę do URL aby pobrać mecze z konkretnego dnia
             date_url = f"{sport_url}?date={date}"
             print(f"   URL: {date_url}")
-            driver.get(date_url)
-            
-            # Czas na pierwsze załadowanie strony
-            if sport in ['volleyball', 'handball', 'rugby']:
-                time.sleep(3.5)
+            if sport in tabs:
+                _activate_listing_tab(driver, tabs[sport])
             else:
-                time.sleep(2.5)
+                apply_blocking_profile(driver, get_block_profile(), sport)
+                driver.get(date_url)
+            
+            # Czekaj na pierwsze wiersze meczów (zamiast stałego sleep)
+            wait_for_any(driver, LISTING_READY_SELECTORS, get_wait_timeout(sport))
             
             # 🍪 Akceptuj consent banner (może blokować lazy-load!)
             _accept_cookies_on_page(driver)
@@ -2821,49 +3618,24 @@ def get_match_links_from_day(driver: webdriver.Chrome, date: str, sports: List[s
                 if has_content.get('sample'):
                     print(f"   ⚠️  CI DEBUG: body[0:300] = {has_content['sample'][:200]}")
                 
-                # Retry: poczekaj dodatkowe 3s i sprawdź ponownie
-                print(f"   🔄 Dodatkowe oczekiwanie 3s...")
-                time.sleep(3.0)
+                # Retry: poczekaj dodatkowo na wiersze i sprawdź ponownie
+                print(f"   🔄 Dodatkowe oczekiwanie na wiersze meczów...")
                 _accept_cookies_on_page(driver)
+                wait_for_any(driver, LISTING_READY_SELECTORS, get_wait_timeout(sport))
                 initial_link_count = _count_match_links_in_page(driver)
                 print(f"   📊 Po retry: linki={initial_link_count}")
             
             # ========================================
-            # SMART SCROLL: Dynamicznie wg znalezionych linków
+            # SMART SCROLL: do momentu, gdy wiersze przestaną dochodzić
             # ========================================
-            # Maks scrolli: football=15, inne=8. Auto-exit jeśli 3x z rzędu brak nowych.
-            max_scrolls = 15 if sport == 'football' else (10 if sport in ['basketball', 'tennis'] else 8)
-            
-            prev_link_count = initial_link_count
-            no_new_links_count = 0
-            
-            for scroll_i in range(max_scrolls):
-                driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(0.6)  # Krótki wait — wystarczy do lazy-load
-                
-                # Policz aktualną liczbę linków (szybkie JS, bez BS4)
-                current_count = _count_match_links_in_page(driver)
-                
-                if current_count <= prev_link_count:
-                    no_new_links_count += 1
-                    if no_new_links_count >= 3:
-                        print(f"   ℹ️ Stop scrollowania po {scroll_i+1} scrollach (brak nowych linków, total={current_count})")
-                        break
-                else:
-                    no_new_links_count = 0
-                    if (scroll_i + 1) % 5 == 0:
-                        print(f"   📜 Scroll {scroll_i+1}/{max_scrolls}: {current_count} linków znalezionych")
-                prev_link_count = current_count
+            _scroll_listing_until_settled(driver, sport, initial_link_count)
             
-            # Scroll do góry i parsuj
-            driver.execute_script("window.scrollTo(0, 0);")
-            time.sleep(0.3)
-            
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
+            page_source = driver.page_source
+            soup = make_soup(page_source, parse_only=LINKS_STRAINER)
+            collect_blocking_stats(driver)
             sport_links, debug_patterns_found = _extract_match_links_from_soup(
                 soup, sport_url, all_links_set, leagues
             )
-            
             # Debug info gdy za mało meczów
             if len(sport_links) < 20 or (sport == 'football' and len(sport_links) < 100):
                 print(f"   ⚠️  DEBUG - Wzorce znalezione: {debug_patterns_found}")
@@ -2873,12 +3645,25 @@ def get_match_links_from_day(driver: webdriver.Chrome, date: str, sports: List[s
                 print(f"   ⚠️  DEBUG - Przykładowe hrefs (5): {sample_hrefs[:5]}")
                 
                 # Dodatkowe: szukaj elementów które mogą być meczami ale nie są <a>
-                match_elements = soup.select('[class*="event"], [class*="match"], [class*="sportName"], [data-id]')
+                # (pełny parse tylko w tej gałęzi debug - zwykle wystarczają same <a>)
+                match_elements = make_soup(page_source).select('[class*="event"], [class*="match"], [class*="sportName"], [data-id]')
                 if match_elements:
                     print(f"   ⚠️  DEBUG - Elementy match/event (nie <a>): {len(match_elements)}")
                     for el in match_elements[:3]:
                         print(f"      tag={el.name}, classes={el.get('class', [])[:3]}, data-id={el.get('data-id', 'N/A')}")
             
+            # 🧾 Stuby z wierszy listingu: odrzuć mecze, których nie trzeba otwierać
+            listing_stubs = _extract_listing_stubs_from_soup(
+                make_soup(page_source, parse_only=LISTING_ROWS_STRAINER), sport)
+            sport_links, dropped = filter_listing_stubs(sport_links, listing_stubs, drop_statuses, exclude_leagues)
+            if dropped:
+                print(f"   🧹 Pominięte przed nawigacją: " + ', '.join(
+                    f"{_LISTING_DROP_LABELS.get(k, k)} {v}" for k, v in sorted(dropped.items())))
+                for reason, count in dropped.items():
+                    dropped_total[reason] = dropped_total.get(reason, 0) + count
+            if stubs is not None:
+                stubs.update({u: listing_stubs[u] for u in sport_links if u in listing_stubs})
+            
             print(f"   ✓ Znaleziono {len(sport_links)} meczów dla {sport}")
             all_links.extend(sport_links)
             
@@ -2888,7 +3673,12 @@ def get_match_links_from_day(driver: webdriver.Chrome, date: str, sports: List[s
             traceback.print_exc()
             continue
     
+    if tabs:
+        _close_listing_tabs(driver, tabs, original_tab)
+    
     print(f"\n📊 TOTAL: {len(all_links)} linków do meczów ze wszystkich sportów")
+    if dropped_total:
+        print(f"   🧹 Pominięto {sum(dropped_total.values())} meczów bez otwierania (status / wykluczona liga)")
     return all_links
 
 
@@ -2918,8 +3708,9 @@ def get_match_links_advanced(driver: webdriver.Chrome, date: str, sports: List[s
             # Niektóre sporty obsługują date w URLu
             date_url = f"{base_url}?date={date}"
             
+            apply_blocking_profile(driver, get_block_profile(), sport)
             driver.get(date_url)
-            time.sleep(2.5)
+            wait_for_any(driver, LISTING_READY_SELECTORS, get_wait_timeout(sport))
             
             # Próbuj kliknąć datę w kalendarzu (jeśli istnieje)
             try:
@@ -2930,7 +3721,8 @@ def get_match_links_advanced(driver: webdriver.Chrome, date: str, sports: List[s
                 logger.debug(f"Kalendarz nie znaleziony lub niedostępny: {e}")
             
             # Zbierz linki
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
+            soup = make_soup(driver.page_source, parse_only=LINKS_STRAINER)
+            collect_blocking_stats(driver)
             for a in soup.find_all('a', href=True):
                 href = a['href']
                 if any(p in href for p in ['/match/', '/mecz/']):
@@ -2951,6 +3743,105 @@ def get_match_links_advanced(driver: webdriver.Chrome, date: str, sports: List[s
 # ----------------------
 
 
+def process_url(url: str, driver: webdriver.Chrome, away_team_focus: bool = False, use_forebet: bool = False,
+                use_gemini: bool = False, use_sofascore: bool = False,
+                http_client: LivesportHttpClient = None, h2h_cache: H2HCache = None,
+                tennis_players: Dict[str, Dict] = None) -> Dict:
+    """
+    Przetwarza mecz dowolnego sportu: tenis przez process_match_tennis,
+    sporty drużynowe przez process_match (sport wykrywany z URL).
+    http_client (tryb --http-first) i h2h_cache (--h2h-cache) dotyczą tylko sportów drużynowych,
+    tennis_players (rekordy z TennisPrefetcher) tylko tenisa.
+    """
+    is_tennis = '/tenis/' in url.lower() or 'tennis' in url.lower()
+    if is_tennis:
+        return process_match_tennis(url, driver, players=tennis_players)
+    
+    current_sport = detect_sport_from_url(url)
+    return process_match(url, driver, away_team_focus=away_team_focus,
+                         use_forebet=use_forebet, use_gemini=use_gemini,
+                         use_sofascore=use_sofascore, sport=current_sport, http_client=http_client,
+                         h2h_cache=h2h_cache)
+
+
+def _print_match_outcome(info: Dict, away_team_focus: bool = False) -> None:
+    """Wypisuje podsumowanie przetworzonego meczu (wspólne dla trybu szeregowego i równoległego)."""
+    if info.get('sport') == 'tennis':
+        player_a_wins = info['home_wins_in_h2h_last5']
+        player_b_wins = info.get('away_wins_in_h2h', 0)
+        advanced_score = info.get('advanced_score', 0)
+        
+        if info['qualifies']:
+            favorite = info.get('favorite', 'unknown')
+            
+            # Określ kto jest faworytem
+            if favorite == 'player_a':
+                fav_name = info["home_team"]
+            elif favorite == 'player_b':
+                fav_name = info["away_team"]
+            else:
+                fav_name = "Równi"
+            
+            print(f'   ✅ KWALIFIKUJE SIĘ! {info["home_team"]} vs {info["away_team"]}')
+            print(f'      Faworytem: {fav_name} (Score: {advanced_score:.1f}/100)')
+            print(f'      H2H: {player_a_wins}-{player_b_wins}')
+            
+            # Pokaż breakdown jeśli dostępny
+            if 'score_breakdown' in info:
+                breakdown = info['score_breakdown']
+                print(f'      └─ H2H:{breakdown.get("h2h_score", 0):.0f} | Rank:{breakdown.get("ranking_score", 0):.0f} | Form:{breakdown.get("form_score", 0):.0f} | Surface:{breakdown.get("surface_score", 0):.0f}')
+            
+            # Pokaż dodatkowe info
+            if info.get('ranking_a') and info.get('ranking_b'):
+                print(f'      Rankings: #{info["ranking_a"]} vs #{info["ranking_b"]}')
+            if info.get('surface'):
+                print(f'      Surface: {info["surface"]}')
+        else:
+            print(f'   ❌ Nie kwalifikuje się (H2H: {player_a_wins}-{player_b_wins}, Score: {advanced_score:.1f}/100)')
+        return
+    
+    # Sporty drużynowe (football, basketball, etc.)
+    h2h_count = info.get('h2h_count', 0)
+    win_rate = info.get('win_rate', 0.0)
+    
+    if info['qualifies']:
+        home_form = info.get('home_form', [])
+        away_form = info.get('away_form', [])
+        
+        home_form_str = '-'.join(home_form) if home_form else 'N/A'
+        away_form_str = '-'.join(away_form) if away_form else 'N/A'
+        
+        # Wybierz co pokazać w zależności od trybu
+        if away_team_focus:
+            wins_count = info.get('away_wins_in_h2h_last5', 0)
+            team_name = info['away_team']
+        else:
+            wins_count = info['home_wins_in_h2h_last5']
+            team_name = info['home_team']
+        
+        print(f'   ✅ KWALIFIKUJE SIĘ! {info["home_team"]} vs {info["away_team"]}')
+        print(f'      Zespół fokusowany: {team_name}')
+        print(f'      H2H: {wins_count}/{h2h_count} ({win_rate*100:.0f}%)')
+        if home_form or away_form:
+            print(f'      Forma: {info["home_team"]} [{home_form_str}] | {info["away_team"]} [{away_form_str}]')
+            
+        # Pokaż szczegóły H2H dla kwalifikujących się
+        if info['h2h_last5']:
+            last_date = info.get('last_h2h_date', 'brak daty')
+            print(f'      Ostatnie H2H (ostatni mecz: {last_date}):')
+            for idx, h2h in enumerate(info['h2h_last5'][:5], 1):
+                print(f'        {idx}. {h2h.get("home", "?")} {h2h.get("score", "?")} {h2h.get("away", "?")}')
+    else:
+        if h2h_count > 0:
+            if away_team_focus:
+                wins_count = info.get('away_wins_in_h2h_last5', 0)
+            else:
+                wins_count = info['home_wins_in_h2h_last5']
+            print(f'   ❌ Nie kwalifikuje się ({wins_count}/{h2h_count} = {win_rate*100:.0f}%)')
+        else:
+            print(f'   ⚠️  Brak H2H')
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='Livesport H2H Scraper - zbiera mecze gdzie gospodarze lub goście wygrali ≥60% w ostatnich H2H',
@@ -2982,6 +3873,9 @@ Przykłady użycia:
                        help='Lista sportów do sprawdzenia (w trybie auto)')
     parser.add_argument('--leagues', nargs='+',
                        help='Lista slug-ów lig do filtrowania (np. ekstraklasa premier-league)')
+    parser.add_argument('--exclude-leagues', nargs='+', default=None,
+                       help='Pomiń ligi zawierające podany fragment nazwy (np. kobiety U19); '
+                            'domyślnie z LIVESPORT_EXCLUDE_LEAGUES')
     parser.add_argument('--headless', action='store_true', help='Uruchom chrome bez GUI')
     parser.add_argument('--advanced', action='store_true', help='Użyj zaawansowanego zbierania linków')
     parser.add_argument('--output-suffix', help='Dodatkowy sufiks do nazwy pliku wyjściowego')
@@ -2999,8 +3893,51 @@ Przykłady użycia:
                        help='Pobieraj kursy z Nordic Bet')
     parser.add_argument('--use-all', action='store_true',
                        help='Użyj wszystkich dostępnych źródeł (Forebet, Gemini, SofaScore, Nordic Bet, Supabase)')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='Liczba równoległych przeglądarek Chrome (domyślnie 1 = tryb szeregowy)')
+    parser.add_argument('--page-load-strategy', choices=['normal', 'eager'], default=None,
+                       help='Strategia ładowania stron Chrome (eager = nie czekaj na obrazki/reklamy)')
+    parser.add_argument('--block-profile', choices=['off', 'light', 'aggressive'], default=None,
+                       help='Blokowanie zasobów przez CDP (light = reklamy/analityka/wideo, aggressive = + obrazki/fonty/media)')
+    parser.add_argument('--http-first', action='store_true',
+                       help='Pobieraj strony H2H przez HTTP (curl_cffi), Chrome tylko jako fallback')
+    parser.add_argument('--h2h-cache', action='store_true',
+                       help='Trwały cache H2H par drużyn między runami (outputs/cache/*.sqlite)')
+    parser.add_argument('--resume', action='store_true',
+                       help='Wznów przerwany run: pomiń mecze zapisane już w dzienniku (outputs/*.journal.jsonl)')
+    parser.add_argument('--time-budget', type=float, default=None,
+                       help='Budżet czasu przetwarzania w minutach - najcenniejsze mecze najpierw, reszta pominięta')
+    parser.add_argument('--chrome-profile', metavar='DIR', default=None,
+                       help='Katalog trwałych profili Chrome (cookies zgody, cache); '
+                            'domyślnie LIVESPORT_CHROME_PROFILE lub outputs/chrome_profile, off = tymczasowe')
+    parser.add_argument('--warm-spares', type=int, default=1,
+                       help='Ile przeglądarek trzymać rozgrzanych w tle na start/restart (0 = wyłączone)')
+    parser.add_argument('--tennis-prefetch-workers', type=int, nargs='?', const=DEFAULT_PREFETCH_WORKERS, default=0,
+                       metavar='N', help=f'Zawodnicy tenisowi dnia pobierani raz przed meczami w N przeglądarkach (bez N: {DEFAULT_PREFETCH_WORKERS}; domyślnie wyłączone). '
+                            'Dokłada statystyki nawierzchni (surface_stats), więc zmienia wyniki i kwalifikację TennisScoringEngine')
+    parser.add_argument('--odds-batch', type=int, nargs='?', const=DEFAULT_BATCH_CONCURRENCY, default=0,
+                       metavar='N', help=f'Kursy wszystkich meczów dnia jednym batchem przed meczami, N równoległych zapytań (domyślnie {DEFAULT_BATCH_CONCURRENCY})')
+    parser.add_argument('--odds-best-price', action='store_true',
+                       help='Batch kursów: pytaj bukmacherów równolegle i bierz najwyższy kurs na każdy wynik')
+    parser.add_argument('--odds-history', action='store_true',
+                       help='Zapisz kursy meczów do historii (outputs/odds_history) - ruch linii odświeża odds_history.py')
+    parser.add_argument('--trace', action='store_true',
+                       help='Zapisuj czasy etapów meczów (JSONL obok CSV) + raport p50/p95/p99')
+    archive_group = parser.add_mutually_exclusive_group()
+    archive_group.add_argument('--record', metavar='DIR', default=None,
+                       help='Nagrywaj strony (page_source) i odpowiedzi HTTP do archiwum DIR')
+    archive_group.add_argument('--replay', metavar='DIR', default=None,
+                       help='Odtwórz run z archiwum DIR (bez sieci i bez Chrome)')
     args = parser.parse_args()
     
+    if args.record or args.replay:
+        enable_archive(args.record or args.replay, 'record' if args.record else 'replay')
+    
+    if args.page_load_strategy:
+        os.environ[PAGE_LOAD_STRATEGY_ENV] = args.page_load_strategy
+    if args.block_profile:
+        os.environ[BLOCK_PROFILE_ENV] = args.block_profile
+    
     # Handle --use-all flag
     if args.use_all:
         args.use_forebet = True
@@ -3008,6 +3945,9 @@ Przykłady użycia:
         args.use_sofascore = True
         args.use_nordic_bet = True
         args.use_supabase = True
+    if args.replay and args.use_supabase:
+        print('🎞️ Replay archiwum: zapis do Supabase wyłączony')
+        args.use_supabase = False
 
     # Walidacja
     if args.mode == 'urls' and not args.input:
@@ -3033,9 +3973,12 @@ Przykłady użycia:
         print(f'🏟️  Ligi: {", ".join(args.leagues)}')
     print('='*60)
 
-    driver = start_driver(headless=args.headless)
+    # 🧊 Trwałe profile Chrome + rozgrzany zapasowy driver (start i restarty bez czekania)
+    driver_factory = make_driver_factory(args.headless, args.chrome_profile, args.warm_spares)
+    driver = driver_factory()
 
-    # Zbieranie URLi
+    # Zbieranie URLi (+ stuby listingu: drużyny, liga, godzina, status, kursy)
+    listing_stubs = {}
     if args.mode == 'urls':
         print(f'\n📂 Wczytuję URLe z pliku: {args.input}')
         with open(args.input, 'r', encoding='utf-8') as f:
@@ -3045,217 +3988,258 @@ Przykłady użycia:
         if args.advanced:
             urls = get_match_links_advanced(driver, args.date, args.sports)
         else:
-            urls = get_match_links_from_day(driver, args.date, args.sports, args.leagues)
+            urls = get_match_links_from_day(driver, args.date, args.sports, args.leagues,
+                                            stubs=listing_stubs, exclude_leagues=args.exclude_leagues)
 
     print(f'\n✅ Znaleziono {len(urls)} meczów do sprawdzenia')
     
-    if len(urls) == 0:
+    # Nazwa pliku z opcjonalnym sufixem
+    suffix = f'_{args.output_suffix}' if args.output_suffix else ''
+    if args.sports and len(args.sports) == 1:
+        suffix = f'_{args.sports[0]}{suffix}'
+    
+    # Dodaj sufiks dla trybu away_team_focus
+    if args.away_team_focus:
+        suffix = f'{suffix}_AWAY_FOCUS'
+    
+    outfn = os.path.join('outputs', f'livesport_h2h_{args.date}{suffix}.csv')
+    
+    # 📓 Dziennik runu - każdy mecz dopisywany raz (JSONL), --resume pomija gotowe
+    journal = RunJournal(journal_path_for(outfn), fresh=not args.resume)
+    resumed_rows = []
+    if args.resume:
+        resumed_rows = [MatchRecord.from_dict(r) for r in journal.load_records()]
+        done_urls = journal.completed_urls()
+        urls = [u for u in urls if u not in done_urls]
+        print(f'📓 Wznowienie: {len(resumed_rows)} meczów z dziennika, zostało {len(urls)}')
+    
+    # 🔬 Spany etapów (navigate/parse/form/odds/...) do JSONL
+    tracer = enable_tracing(trace_path_for(outfn), fresh=not args.resume) if args.trace else None
+    
+    # ⏱️ Najcenniejsze mecze najpierw (liga, kursy, godzina) + budżet czasu
+    scheduler = MatchScheduler(
+        time_budget_s=args.time_budget * 60 if args.time_budget else None, day=args.date)
+    urls = scheduler.order(urls, listing_stubs)
+    scheduler.start()
+    
+    if len(urls) == 0 and not resumed_rows:
         print('❌ Nie znaleziono żadnych meczów. Spróbuj:')
         print('   - Uruchomić bez --headless aby zobaczyć co się dzieje')
         print('   - Sprawdzić czy data jest poprawna')
         print('   - Użyć trybu --mode urls z ręcznie przygotowanymi URLami')
         driver.quit()
+        driver_factory.close()
         return
 
+    # 🎾 Zawodnicy tenisowi dnia: każdy pobierany raz (forma, ranking, nawierzchnie)
+    prefetcher = None
+    tennis_players = {}
+    if args.tennis_prefetch_workers > 0 and any('/tenis/' in u.lower() or 'tennis' in u.lower() for u in urls):
+        print(f'\n🎾 Prefetch zawodników tenisowych ({args.tennis_prefetch_workers} przeglądarek)...')
+        prefetcher = TennisPrefetcher(driver_factory, workers=args.tennis_prefetch_workers)
+        tennis_players = prefetcher.run(urls, listing_stubs)
+
+    # 💰 Kursy całego dnia: jedna sesja keep-alive zamiast zapytań mecz po meczu
+    odds_batch = None
+    if args.odds_batch > 0:
+        print(f'\n💰 Batch kursów dla {len(urls)} meczów ({args.odds_batch} równolegle)...')
+        odds_batch = prefetch_day_odds(urls, listing_stubs, concurrency=args.odds_batch,
+                                       best_price=args.odds_best_price)
+        print(odds_batch.format_report())
+
     # Przetwarzanie meczów
     print('\n' + '='*60)
     print('🔄 Rozpoczynam przetwarzanie meczów...')
     print('='*60)
     
     rows = []
-    qualifying_count = 0
-    RESTART_INTERVAL = 80  # Restart Chrome co 80 meczów (zapobiega crashom po ~100)
+    # ♻️ Restart Chrome tylko gdy rośnie pamięć / opóźnienia (zamiast co 80 meczów);
+    # zapasowy driver trzyma fabryka, więc recycler nie startuje własnego
+    recycler_factory = (functools.partial(BrowserRecycler, prestart_ratio=None)
+                        if driver_factory.spares else BrowserRecycler)
+    recyclers = []
     
-    for i, url in enumerate(urls, 1):
-        print(f'\n[{i}/{len(urls)}] 🔍 Przetwarzam: {url[:80]}...')
-        try:
-            # Wykryj sport z URL (tennis ma '/tenis/' w URLu)
-            is_tennis = '/tenis/' in url.lower() or 'tennis' in url.lower()
-            
-            if is_tennis:
-                # Użyj dedykowanej funkcji dla tenisa (ADVANCED)
-                info = process_match_tennis(url, driver)
-                rows.append(info)
-                
-                if info['qualifies']:
-                    qualifying_count += 1
-                    player_a_wins = info['home_wins_in_h2h_last5']
-                    player_b_wins = info.get('away_wins_in_h2h', 0)
-                    advanced_score = info.get('advanced_score', 0)
-                    favorite = info.get('favorite', 'unknown')
-                    
-                    # Określ kto jest faworytem
-                    if favorite == 'player_a':
-                        fav_name = info["home_team"]
-                    elif favorite == 'player_b':
-                        fav_name = info["away_team"]
-                    else:
-                        fav_name = "Równi"
-                    
-                    print(f'   ✅ KWALIFIKUJE SIĘ! {info["home_team"]} vs {info["away_team"]}')
-                    print(f'      Faworytem: {fav_name} (Score: {advanced_score:.1f}/100)')
-                    print(f'      H2H: {player_a_wins}-{player_b_wins}')
-                    
-                    # Pokaż breakdown jeśli dostępny
-                    if 'score_breakdown' in info:
-                        breakdown = info['score_breakdown']
-                        print(f'      └─ H2H:{breakdown.get("h2h_score", 0):.0f} | Rank:{breakdown.get("ranking_score", 0):.0f} | Form:{breakdown.get("form_score", 0):.0f} | Surface:{breakdown.get("surface_score", 0):.0f}')
-                    
-                    # Pokaż dodatkowe info
-                    if info.get('ranking_a') and info.get('ranking_b'):
-                        print(f'      Rankings: #{info["ranking_a"]} vs #{info["ranking_b"]}')
-                    if info.get('surface'):
-                        print(f'      Surface: {info["surface"]}')
-                        
-                else:
-                    player_a_wins = info['home_wins_in_h2h_last5']
-                    player_b_wins = info.get('away_wins_in_h2h', 0)
-                    advanced_score = info.get('advanced_score', 0)
-                    print(f'   ❌ Nie kwalifikuje się (H2H: {player_a_wins}-{player_b_wins}, Score: {advanced_score:.1f}/100)')
+    http_client = LivesportHttpClient() if args.http_first else None
+    h2h_cache = H2HCache() if args.h2h_cache else None
+    if http_client is not None and not http_client.available:
+        print('⚠️  --http-first: curl_cffi niedostępne - wszystkie mecze przez Chrome')
+    
+    if args.workers > 1:
+        # Tryb równoległy: N przeglądarek, wyniki w kolejności wejściowej
+        driver.quit()
+        driver = None
+        print(f'⚡ Tryb równoległy: {args.workers} przeglądarek')
+        
+        def _on_result(index, url, info):
+            print(f'\n[{index + 1}/{len(urls)}] 🔍 {url[:80]}...')
+            if info is None:
+                print(f'   ⚠️  Błąd - mecz pominięty')
             else:
-                # Sporty drużynowe (football, basketball, etc.)
-                current_sport = detect_sport_from_url(url)
-                
-                # 🔥 QUADRUPLE FORCE: Intelligent delay between matches
-                if i > 0:  # Not first match
+                journal.append(url, info)
+                _print_match_outcome(info, args.away_team_focus)
+        
+        def _process(url, drv):
+            t0 = time.time()
+            info = process_url(
+                url, drv, away_team_focus=args.away_team_focus,
+                use_forebet=args.use_forebet, use_gemini=args.use_gemini,
+                use_sofascore=args.use_sofascore, http_client=http_client, h2h_cache=h2h_cache,
+                tennis_players=tennis_players)
+            apply_listing_stub(info, listing_stubs.get(url))
+            scheduler.record(url, info, time.time() - t0)
+            return info
+        
+        pool = MatchWorkerPool(
+            workers=args.workers,
+            driver_factory=driver_factory,
+            recycler_factory=recycler_factory,
+            on_result=_on_result,
+            should_stop=lambda: not scheduler.has_time(),
+        )
+        results = pool.map(urls, _process)
+        rows = [MatchRecord.from_dict(info) for info in results if info is not None]
+        if pool.skipped:
+            print(f'\n⏱️  Koniec budżetu czasu - pominięto {len(pool.skipped)} meczów (--resume je dokończy)')
+            journal.append_skipped(pool.skipped)
+            scheduler.mark_skipped(pool.skipped)
+        recyclers = pool.recyclers
+        print(f'\n⚡ Workery: {pool.stats["processed"]} OK, {pool.stats["failed"]} błędów, '
+              f'{pool.stats["restarts"]} restartów')
+    else:
+        recycler = recycler_factory(driver_factory)
+        recyclers = [recycler]
+        for i, url in enumerate(urls, 1):
+            if not scheduler.has_time():
+                skipped = urls[i - 1:]
+                print(f'\n⏱️  Koniec budżetu czasu - pominięto {len(skipped)} meczów (--resume je dokończy)')
+                journal.append_skipped(skipped)
+                scheduler.mark_skipped(skipped)
+                break
+            print(f'\n[{i}/{len(urls)}] 🔍 Przetwarzam: {url[:80]}...')
+            recycle_reason = None
+            try:
+                # 🔥 QUADRUPLE FORCE: Intelligent delay between matches (sporty drużynowe)
+                is_tennis = '/tenis/' in url.lower() or 'tennis' in url.lower()
+                if not is_tennis and i > 0:
                     delay = 2.0 + (i % 3) * 0.5  # Variable delay: 2.0s, 2.5s, 3.0s pattern
                     time.sleep(delay)
-                
-                info = process_match(url, driver, away_team_focus=args.away_team_focus, 
+            
+                t0 = time.time()
+                info = process_url(url, driver, away_team_focus=args.away_team_focus,
                                    use_forebet=args.use_forebet, use_gemini=args.use_gemini,
-                                   use_sofascore=args.use_sofascore, use_nordic_bet=args.use_nordic_bet,
-                                   sport=current_sport)
-                rows.append(info)
-                
-                if info['qualifies']:
-                    qualifying_count += 1
-                    h2h_count = info.get('h2h_count', 0)
-                    win_rate = info.get('win_rate', 0.0)
-                    home_form = info.get('home_form', [])
-                    away_form = info.get('away_form', [])
-                    
-                    home_form_str = '-'.join(home_form) if home_form else 'N/A'
-                    away_form_str = '-'.join(away_form) if away_form else 'N/A'
-                    
-                    # Wybierz co pokazać w zależności od trybu
-                    if args.away_team_focus:
-                        wins_count = info.get('away_wins_in_h2h_last5', 0)
-                        team_name = info['away_team']
-                    else:
-                        wins_count = info['home_wins_in_h2h_last5']
-                        team_name = info['home_team']
-                    
-                    print(f'   ✅ KWALIFIKUJE SIĘ! {info["home_team"]} vs {info["away_team"]}')
-                    print(f'      Zespół fokusowany: {team_name}')
-                    print(f'      H2H: {wins_count}/{h2h_count} ({win_rate*100:.0f}%)')
-                    if home_form or away_form:
-                        print(f'      Forma: {info["home_team"]} [{home_form_str}] | {info["away_team"]} [{away_form_str}]')
-                        
-                    # Pokaż szczegóły H2H dla kwalifikujących się
-                    if info['h2h_last5']:
-                        last_date = info.get('last_h2h_date', 'brak daty')
-                        print(f'      Ostatnie H2H (ostatni mecz: {last_date}):')
-                        for idx, h2h in enumerate(info['h2h_last5'][:5], 1):
-                            print(f'        {idx}. {h2h.get("home", "?")} {h2h.get("score", "?")} {h2h.get("away", "?")}')
-                else:
-                    h2h_count = info.get('h2h_count', 0)
-                    win_rate = info.get('win_rate', 0.0)
-                    if h2h_count > 0:
-                        if args.away_team_focus:
-                            wins_count = info.get('away_wins_in_h2h_last5', 0)
-                        else:
-                            wins_count = info['home_wins_in_h2h_last5']
-                        print(f'   ❌ Nie kwalifikuje się ({wins_count}/{h2h_count} = {win_rate*100:.0f}%)')
-                    else:
-                        print(f'   ⚠️  Brak H2H')
+                                   use_sofascore=args.use_sofascore, http_client=http_client,
+                                   h2h_cache=h2h_cache, tennis_players=tennis_players)
+                apply_listing_stub(info, listing_stubs.get(url))
+                elapsed = time.time() - t0
+                scheduler.record(url, info, elapsed)
+                recycle_reason = recycler.observe(driver, elapsed)
+                rows.append(MatchRecord.from_dict(info))
+                journal.append(url, info)
+                _print_match_outcome(info, args.away_team_focus)
                 
-        except (WebDriverException, ConnectionResetError, ConnectionError) as e:
-            logger.warning(f'Błąd połączenia przy meczu {url}: {type(e).__name__}: {str(e)[:100]}')
-            print(f'   ⚠️  Błąd połączenia: {type(e).__name__}')
-        except Exception as e:
-            logger.error(f'Nieoczekiwany błąd przy meczu {url}: {type(e).__name__}: {e}')
-            print(f'   ⚠️  Błąd: {e}')
+            except (WebDriverException, ConnectionResetError, ConnectionError) as e:
+                logger.warning(f'Błąd połączenia przy meczu {url}: {type(e).__name__}: {str(e)[:100]}')
+                print(f'   ⚠️  Błąd połączenia: {type(e).__name__}')
+            except Exception as e:
+                logger.error(f'Nieoczekiwany błąd przy meczu {url}: {type(e).__name__}: {e}')
+                print(f'   ⚠️  Błąd: {e}')
         
-        # AUTO-RESTART przeglądarki co N meczów (zapobiega crashom)
-        if i % RESTART_INTERVAL == 0 and i < len(urls):
-            print(f'\n🔄 AUTO-RESTART: Restartowanie przeglądarki po {i} meczach...')
-            print(f'   ✅ Przetworzone dane ({len(rows)} meczów) są bezpieczne w pamięci!')
+            # AUTO-RESTART przeglądarki gdy przekroczone progi pamięci / opóźnień
+            if recycle_reason and i < len(urls):
+                print(f'\n🔄 AUTO-RESTART: {recycle_reason} - restartowanie przeglądarki po {i} meczach...')
+                print(f'   ✅ Przetworzone dane ({len(rows)} meczów) są bezpieczne w dzienniku: {journal.path}')
             
-            restart_success = False
-            max_restart_attempts = 3
+                restart_success = False
+                max_restart_attempts = 3
             
-            for restart_attempt in range(max_restart_attempts):
-                try:
-                    # Zamknij stary driver
+                for restart_attempt in range(max_restart_attempts):
                     try:
-                        driver.quit()
-                    except Exception:
-                        pass  # Ignoruj błędy przy zamykaniu
-                    
-                    time.sleep(2)
-                    
-                    # Utwórz nowy driver
-                    driver = start_driver(headless=args.headless)
+                        if restart_attempt == 0:
+                            # Zapasowy driver z recyclera (uruchomiony w tle) albo nowy
+                            driver = recycler.recycle(driver, recycle_reason)
+                        else:
+                            try:
+                                driver.quit()
+                            except Exception:
+                                pass  # Ignoruj błędy przy zamykaniu
+                            time.sleep(2)
+                            driver = driver_factory()
                     
-                    # Sprawdź czy nowy driver działa
-                    if check_driver_health(driver):
-                        print(f'   ✅ Przeglądarka zrestartowana! Kontynuuję od meczu {i+1}...\n')
-                        restart_success = True
-                        break
-                    else:
-                        logger.warning(f"Driver health check failed po restarcie (próba {restart_attempt + 1})")
+                        # Sprawdź czy nowy driver działa
+                        if check_driver_health(driver):
+                            print(f'   ✅ Przeglądarka zrestartowana! Kontynuuję od meczu {i+1}...\n')
+                            restart_success = True
+                            break
+                        else:
+                            logger.warning(f"Driver health check failed po restarcie (próba {restart_attempt + 1})")
                         
-                except Exception as e:
-                    logger.warning(f'Błąd restartu (próba {restart_attempt + 1}/{max_restart_attempts}): {e}')
-                    time.sleep(2)
-            
-            if not restart_success:
-                logger.error("Nie udało się zrestartować przeglądarki po maksymalnej liczbie prób")
-                print(f'   ❌ Krytyczny błąd restartu - zapisuję częściowe wyniki...')
-                save_partial_results(rows, args)
-                # Ostatnia próba uruchomienia drivera
-                try:
-                    driver = start_driver(headless=args.headless)
-                    if not check_driver_health(driver):
-                        raise RuntimeError("Driver nie działa po ostatecznej próbie")
-                except Exception as e:
-                    logger.critical(f"Nie można kontynuować scrapowania: {e}")
-                    print(f'   ❌ Zapisano {len(rows)} meczów, kończę działanie.')
-                    break
+                    except Exception as e:
+                        logger.warning(f'Błąd restartu (próba {restart_attempt + 1}/{max_restart_attempts}): {e}')
+                        time.sleep(2)
+            
+                if not restart_success:
+                    logger.error("Nie udało się zrestartować przeglądarki po maksymalnej liczbie prób")
+                    print(f'   ❌ Krytyczny błąd restartu - zapisuję częściowe wyniki...')
+                    save_partial_results(rows, args)
+                    # Ostatnia próba uruchomienia drivera
+                    try:
+                        driver = driver_factory()
+                        if not check_driver_health(driver):
+                            raise RuntimeError("Driver nie działa po ostatecznej próbie")
+                    except Exception as e:
+                        logger.critical(f"Nie można kontynuować scrapowania: {e}")
+                        print(f'   ❌ Zapisano {len(rows)} meczów, kończę działanie.')
+                        break
         
-        # Rate limiting - adaptacyjny
-        elif i < len(urls):
-            delay = 1.0 + (i % 3) * 0.5
-            time.sleep(delay)
+            # Rate limiting - adaptacyjny
+            elif i < len(urls):
+                delay = 1.0 + (i % 3) * 0.5
+                time.sleep(delay)
 
-    driver.quit()
+        collect_blocking_stats(driver)
+        driver.quit()
+        recycler.close()
+    driver_factory.close()
+
+    rows = resumed_rows + rows
+    qualifying_count = sum(1 for info in rows if info.get('qualifies'))
+
+    if get_block_profile() != 'off':
+        print(BLOCKING_STATS.format_report())
+    if http_client is not None:
+        print(http_client.format_report())
+    for recycler in recyclers:
+        print(recycler.format_report())
+    print(driver_factory.format_report())
+    if prefetcher is not None:
+        print(prefetcher.format_report())
+    if odds_batch is not None:
+        print(odds_batch.format_report())
+    if get_transport().stats:
+        print(get_transport().format_report())
+    if h2h_cache is not None:
+        print(h2h_cache.format_report())
+    scheduler.save()
+    print(scheduler.format_report())
+    if tracer is not None:
+        print(tracer.format_report())
+        tracer.close()
+    if get_archive().mode != 'off':
+        print(get_archive().format_report())
 
     # Zapisywanie wyników
     print('\n' + '='*60)
     print('💾 Zapisywanie wyników...')
     print('='*60)
     
-    os.makedirs('outputs', exist_ok=True)
-    
-    # Nazwa pliku z opcjonalnym sufixem
-    suffix = f'_{args.output_suffix}' if args.output_suffix else ''
-    if args.sports and len(args.sports) == 1:
-        suffix = f'_{args.sports[0]}{suffix}'
-    
-    # Dodaj sufiks dla trybu away_team_focus
-    if args.away_team_focus:
-        suffix = f'{suffix}_AWAY_FOCUS'
-    
-    outfn = os.path.join('outputs', f'livesport_h2h_{args.date}{suffix}.csv')
+    # CSV budowany strumieniowo z dziennika (bez DataFrame całego runu)
+    journal.write_csv(outfn, transform=_journal_csv_row)
 
-    # Przygotowanie DataFrame
-    df = pd.DataFrame(rows)
-    
-    # Konwersja h2h_last5 (lista słowników) na string dla CSV
-    if 'h2h_last5' in df.columns:
-        df['h2h_last5'] = df['h2h_last5'].apply(lambda x: str(x) if x else '')
-    
-    df.to_csv(outfn, index=False, encoding='utf-8-sig')
+    # 📈 Pierwszy punkt serii kursów; dalsze dopisuje `python odds_history.py` przed startem meczów
+    if args.odds_history:
+        history = OddsHistory()
+        history.record_rows(rows, args.date, listing_stubs)
+        print(history.format_report())
 
     # ========================================================================
     # SUPABASE INTEGRATION - Save to database
@@ -3270,7 +4254,7 @@ Przykłady użycia:
             # Przygotuj dane dla Supabase (dodaj datę i sport)
             for row in rows:
                 row['match_date'] = args.date
-                row['sport'] = current_sport if 'current_sport' in locals() else 'football'
+                row['sport'] = row.get('sport') or detect_sport_from_url(row.get('match_url', ''))
             
             saved_count = supabase.save_bulk_predictions(rows)
             print(f'   ✅ Zapisano {saved_count}/{len(rows)} predykcji do Supabase')
@@ -0,0 +1,129 @@
+"""
+Livesport HTTP - tryb bez przeglądarki dla stron H2H
+=====================================================
+
+Pobiera dokument H2H (``.../h2h/ogolem/``, ``.../h2h/u-siebie/``) przez
+curl_cffi z impersonacją Chrome (tak jak forebet_scraper / sofascore_scraper)
+i oddaje HTML tym samym parserom co Selenium (``parse_h2h_from_soup``,
+parsery formy). Dokument jest uznawany za użyteczny tylko gdy zawiera
+sekcje i wiersze H2H - w przeciwnym razie zwracane jest None, a
+process_match przechodzi na Selenium.
+
+Statystyki (``stats``): ile dokumentów było użytecznych, ile wymagało
+fallbacku i ile zakończyło się błędem - pozwala ocenić trafność trybu.
+
+Użycie:
+    client = LivesportHttpClient()
+    info = process_match(url, driver, http_client=client)
+    print(client.format_report())
+"""
+
+import logging
+import threading
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# curl_cffi - impersonacja TLS Chrome (omija Cloudflare bez przeglądarki)
+try:
+    from curl_cffi import requests as curl_requests
+    CURL_CFFI_AVAILABLE = True
+except ImportError:
+    curl_requests = None
+    CURL_CFFI_AVAILABLE = False
+
+DEFAULT_HEADERS = {
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'pl-PL,pl;q=0.9,en;q=0.8',
+}
+
+# Znaczniki wyrenderowanej sekcji H2H (te same klasy czytają parsery)
+H2H_MARKERS = ('h2h__section', 'h2h__row')
+
+
+def is_usable_h2h_document(html: Optional[str]) -> bool:
+    """Czy dokument zawiera wyrenderowane sekcje i wiersze H2H."""
+    return bool(html) and all(marker in html for marker in H2H_MARKERS)
+
+
+class LivesportHttpClient:
+    """
+    Klient HTTP dla dokumentów H2H Livesport.
+
+    Args:
+        impersonate: Profil przeglądarki curl_cffi
+        timeout: Timeout pojedynczego żądania [s]
+        session_factory: Funkcja bez argumentów zwracająca sesję z metodą get()
+                         (domyślnie curl_cffi Session; jedna sesja na wątek)
+    """
+
+    def __init__(self, impersonate: str = 'chrome', timeout: float = 10.0, session_factory=None):
+        self.impersonate = impersonate
+        self.timeout = timeout
+        self.session_factory = session_factory
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.stats = {
+            'requests': 0,
+            'usable': 0,
+            'fallbacks': 0,
+            'errors': 0,
+            'seconds': 0.0,
+        }
+
+    @property
+    def available(self) -> bool:
+        return self.session_factory is not None or CURL_CFFI_AVAILABLE
+
+    def _session(self):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            if self.session_factory is not None:
+                session = self.session_factory()
+            else:
+                session = curl_requests.Session(impersonate=self.impersonate)
+            self._local.session = session
+        return session
+
+    def _count(self, key: str, elapsed: float) -> None:
+        with self._lock:
+            self.stats['requests'] += 1
+            self.stats[key] += 1
+            self.stats['seconds'] += elapsed
+
+    def fetch_h2h(self, url: str) -> Optional[str]:
+        """
+        Pobiera dokument H2H.
+
+        Returns:
+            HTML z sekcjami H2H albo None (brak curl_cffi, błąd, status != 200,
+            strona bez wyrenderowanego H2H) - wtedy wołający używa Selenium
+        """
+        if not url or not self.available:
+            return None
+
+        t0 = time.time()
+        try:
+            response = self._session().get(url, headers=DEFAULT_HEADERS, timeout=self.timeout)
+        except Exception as e:
+            self._count('errors', time.time() - t0)
+            logger.debug(f"LivesportHttpClient: błąd {type(e).__name__} dla {url[:80]}: {e}")
+            return None
+
+        html = response.text if response.status_code == 200 else None
+        if is_usable_h2h_document(html):
+            self._count('usable', time.time() - t0)
+            return html
+
+        self._count('fallbacks', time.time() - t0)
+        logger.debug(f"LivesportHttpClient: brak danych H2H (status {response.status_code}) dla {url[:80]}")
+        return None
+
+    def format_report(self) -> str:
+        s = self.stats
+        if not s['requests']:
+            return "🌐 HTTP H2H: brak żądań"
+        avg_ms = 1000.0 * s['seconds'] / s['requests']
+        return (f"🌐 HTTP H2H: {s['usable']}/{s['requests']} dokumentów bez Chrome "
+                f"(fallback Selenium: {s['fallbacks']}, błędy: {s['errors']}, śr. {avg_ms:.0f} ms)")
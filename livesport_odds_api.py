@@ -14,13 +14,41 @@ Bukmacherzy:
 - 14: Bwin
 - 24: Betfair
 - 3: Pinnacle
+
+Kursy całego dnia naraz (LivesportOddsBatch): jedna sesja keep-alive,
+ograniczona liczba równoległych zapytań i retry z backoffem; wyniki
+trafiają do pamięci procesu, z której korzysta get_livesport_odds.
+
+Użycie:
+    batch = LivesportOddsBatch(concurrency=8)
+    odds = batch.fetch({'KQAaF7d2': 'football', 'xYz12345': 'tennis'})   # {event_id: kursy}
+    remember_batch_odds(odds)
+    get_livesport_odds(match_url, 'football')   # z pamięci, bez zapytania
+
+Najlepszy kurs na każdy wynik (get_best_odds): wszyscy wybrani bukmacherzy
+odpytywani równolegle, wynik z bukmacherem-źródłem per wynik i marżą
+(overround) zestawu najlepszych kursów; first_hit=True pyta po kolei i
+kończy na pierwszym bukmacherze z kursami (pozostali nie są odpytywani).
+
+    best = LivesportOddsAPI().get_best_odds('KQAaF7d2', 'football', ['pinnacle', 'bet365', 'unibet'])
+    best['home_odds'], best['home_bookmaker'], best['margin']
 """
 
+import logging
+import queue
 import re
+import threading
 import requests
-from typing import Dict, Optional, List
+from typing import Dict, Iterable, Optional, List, Union
 import time
 
+from http_transport import CircuitOpenError, HttpTransport, get_transport
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BOOKMAKERS = ['pinnacle', 'bet365']
+DEFAULT_BATCH_CONCURRENCY = 8
+
 # Mapowanie bukmacherów ID
 BOOKMAKER_IDS = {
     'pinnacle': '3',
@@ -35,6 +63,26 @@ BOOKMAKER_IDS = {
     'betway': '10',
 }
 
+# Każdy bukmacher raz (BOOKMAKER_IDS zawiera aliasy tego samego ID)
+ALL_BOOKMAKERS = [name for name, bm_id in BOOKMAKER_IDS.items()
+                  if name == next(n for n, i in BOOKMAKER_IDS.items() if i == bm_id)]
+
+def implied_margin(prices: List[Optional[float]]) -> Optional[float]:
+    """
+    Marża (overround) zestawu kursów dziesiętnych: sum(1/kurs) - 1.
+
+    0.05 = 5% marży; wartość ujemna oznacza arbitraż między bukmacherami.
+    None, gdy brakuje któregoś kursu.
+    """
+    if not prices or any(p is None or p <= 1.0 for p in prices):
+        return None
+    return round(sum(1.0 / p for p in prices) - 1.0, 4)
+
+
+def bookmaker_label(name: str) -> str:
+    return name.replace('_', ' ').title()
+
+
 # Sporty i ich typy zakładów
 SPORT_BET_TYPES = {
     # Sporty z remisem (1X2)
@@ -65,20 +113,25 @@ class LivesportOddsAPI:
         odds = api.get_odds_for_match('https://www.livesport.com/pl/mecz/...', sport='basketball')
     """
     
-    def __init__(self, bookmaker_id: str = "3", geo_ip_code: str = "PL", geo_subdivision: str = "PL10"):
+    def __init__(self, bookmaker_id: str = "3", geo_ip_code: str = "PL", geo_subdivision: str = "PL10",
+                 verbose: bool = True, transport: Optional[HttpTransport] = None):
         """
         Args:
             bookmaker_id: ID bukmachera (domyślnie 3 = Pinnacle)
             geo_ip_code: Kod kraju
             geo_subdivision: Podregion
+            verbose: False = komunikaty per zapytanie tylko w logu (tryb batch)
+            transport: Transport HTTP (domyślnie wspólny: pula keep-alive, limit hosta, circuit breaker)
         """
         self.bookmaker_id = bookmaker_id
         self.api_url = "https://global.ds.lsapp.eu/odds/pq_graphql"
         self.geo_ip_code = geo_ip_code
         self.geo_subdivision = geo_subdivision
+        self.verbose = verbose
         
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.transport = transport or get_transport()
+        self.session = self.transport.session
+        self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/131.0.0.0 Safari/537.36',
             'Accept': 'application/json',
             'Accept-Language': 'en-US,en;q=0.9,pl;q=0.8',
@@ -86,7 +139,7 @@ class LivesportOddsAPI:
             'Referer': 'https://www.livesport.com/',
             'x-geoip-code': geo_ip_code,
             'x-geoip-subdivision': geo_subdivision,
-        })
+        }
     
     def extract_event_id_from_url(self, url: str) -> Optional[str]:
         """
@@ -140,17 +193,29 @@ class LivesportOddsAPI:
         
         return None
     
-    def get_odds_for_event(self, event_id: str, sport: str = 'football') -> Optional[Dict]:
+    def _say(self, message: str) -> None:
+        if self.verbose:
+            print(message)
+        else:
+            logger.debug(message.strip())
+    
+    def get_odds_for_event(self, event_id: str, sport: str = 'football', bookmaker_id: Optional[str] = None,
+                           retries: int = 0, backoff: float = 0.5) -> Optional[Dict]:
         """
         Pobiera kursy dla wydarzenia z API GraphQL.
         
         Args:
             event_id: ID wydarzenia (np. 'KQAaF7d2')
             sport: Typ sportu dla określenia formatu zakładu
+            bookmaker_id: ID bukmachera (domyślnie self.bookmaker_id) - bez zmiany stanu
+                          klienta, więc wywołania z wielu wątków są bezpieczne
+            retries: Ile razy ponowić po timeoucie / błędzie połączenia / HTTP 429, 5xx
+            backoff: Bazowa pauza przed ponowieniem [s] (rośnie 2x + jitter)
             
         Returns:
             Dict z kursami lub None
         """
+        bookmaker_id = bookmaker_id or self.bookmaker_id
         sport_config = SPORT_BET_TYPES.get(sport.lower(), SPORT_BET_TYPES['football'])
         bet_type = sport_config['betType']
         has_draw = sport_config['has_draw']
@@ -158,13 +223,13 @@ class LivesportOddsAPI:
         # Debug logging dla volleyball/tennis (sporty bez remisu)
         is_no_draw_sport = sport.lower() in ['volleyball', 'tennis', 'badminton', 'table_tennis']
         if is_no_draw_sport:
-            print(f"   🔍 {sport.title()} API: event_id={event_id}, betType={bet_type}, has_draw={has_draw}")
+            self._say(f"   🔍 {sport.title()} API: event_id={event_id}, betType={bet_type}, has_draw={has_draw}")
         
         result = {
             'home_odds': None,
             'draw_odds': None,
             'away_odds': None,
-            'bookmaker_id': self.bookmaker_id,
+            'bookmaker_id': bookmaker_id,
             'event_id': event_id,
             'success': False
         }
@@ -174,19 +239,27 @@ class LivesportOddsAPI:
             params = {
                 '_hash': 'ope2',
                 'eventId': event_id,
-                'bookmakerId': self.bookmaker_id,
+                'bookmakerId': bookmaker_id,
                 'betType': bet_type,
                 'betScope': 'FULL_TIME'
             }
             
-            response = self.session.get(
-                self.api_url, 
-                params=params, 
-                timeout=10
+            def count_retry(attempt: int, reason: str) -> None:
+                result['retries'] = attempt
+            
+            response = self.transport.get(
+                self.api_url,
+                session=self.session,
+                params=params,
+                headers=self.headers,
+                timeout=10,
+                retries=retries,
+                backoff=backoff,
+                on_retry=count_retry,
             )
             
             if response.status_code != 200:
-                print(f"   ⚠️ Livesport API: HTTP {response.status_code}")
+                self._say(f"   ⚠️ Livesport API: HTTP {response.status_code}")
                 return result
             
             data = response.json()
@@ -245,12 +318,14 @@ class LivesportOddsAPI:
                                 result['success'] = True
                                 break
                     
+        except CircuitOpenError as e:
+            self._say(f"   ⚠️ Livesport API: {e}")
         except requests.exceptions.Timeout:
-            print(f"   ⚠️ Livesport API: Timeout")
+            self._say(f"   ⚠️ Livesport API: Timeout")
         except requests.exceptions.RequestException as e:
-            print(f"   ⚠️ Livesport API error: {e}")
+            self._say(f"   ⚠️ Livesport API error: {e}")
         except Exception as e:
-            print(f"   ⚠️ Livesport API parsing error: {e}")
+            self._say(f"   ⚠️ Livesport API parsing error: {e}")
         
         # 🔧 Zawsze ustaw draw_odds na None dla sportów bez remisu
         if not has_draw:
@@ -258,12 +333,12 @@ class LivesportOddsAPI:
         
         # Debug logging dla volleyball/tennis gdy brak kursów
         if is_no_draw_sport and not result['success']:
-            print(f"   ⚠️ {sport.title()} API: Brak kursów dla event {event_id}")
+            self._say(f"   ⚠️ {sport.title()} API: Brak kursów dla event {event_id}")
         
         return result
     
     def get_odds_from_multiple_bookmakers(self, event_id: str, sport: str = 'football', 
-                                          bookmakers: List[str] = None) -> Dict:
+                                          bookmakers: List[str] = None, retries: int = 0) -> Dict:
         """
         Pobiera kursy od wielu bukmacherów i wybiera najlepsze.
         
@@ -277,7 +352,7 @@ class LivesportOddsAPI:
         """
         if bookmakers is None:
             # OPTYMALIZACJA: Tylko 2 bukmacherów (zamiast 6) — osczędza ~40s/mecz
-            bookmakers = ['pinnacle', 'bet365']
+            bookmakers = DEFAULT_BOOKMAKERS
         
         best_result = {
             'home_odds': None,
@@ -292,26 +367,105 @@ class LivesportOddsAPI:
             if not bookmaker_id:
                 continue
             
-            # Ustaw tymczasowo innego bukmachera
-            original_id = self.bookmaker_id
-            self.bookmaker_id = bookmaker_id
+            result = self.get_odds_for_event(event_id, sport, bookmaker_id=bookmaker_id, retries=retries)
             
-            try:
-                result = self.get_odds_for_event(event_id, sport)
-                
-                if result and result.get('success'):
-                    best_result['home_odds'] = result.get('home_odds')
-                    best_result['draw_odds'] = result.get('draw_odds')
-                    best_result['away_odds'] = result.get('away_odds')
-                    best_result['bookmaker'] = bookmaker_name.replace('_', ' ').title()
-                    best_result['success'] = True
-                    break  # Znaleziono, przerwij szukanie
-                    
-            finally:
-                self.bookmaker_id = original_id
+            if result and result.get('success'):
+                best_result['home_odds'] = result.get('home_odds')
+                best_result['draw_odds'] = result.get('draw_odds')
+                best_result['away_odds'] = result.get('away_odds')
+                best_result['bookmaker'] = bookmaker_label(bookmaker_name)
+                best_result['success'] = True
+                break  # Znaleziono, przerwij szukanie
         
         return best_result
     
+    def get_best_odds(self, event_id: str, sport: str = 'football', bookmakers: List[str] = None,
+                      first_hit: bool = False, retries: int = 0) -> Dict:
+        """
+        Odpytuje bukmacherów równolegle i wybiera najwyższy kurs na każdy wynik
+        (albo - ``first_hit`` - po kolei, do pierwszego z kursami).
+        
+        Args:
+            event_id: ID wydarzenia
+            sport: Typ sportu (bez remisu: porównywane tylko 1 i 2)
+            bookmakers: Nazwy z BOOKMAKER_IDS (domyślnie wszyscy, bez duplikatów ID);
+                        przy równych kursach wygrywa wcześniejszy na liście
+            first_hit: Pytaj bukmacherów po kolei (wg listy) i zwróć kursy pierwszego,
+                       który je ma - kolejne zapytanie wychodzi dopiero po pustej
+                       odpowiedzi poprzedniego, pozostali nie są odpytywani
+            retries: Ponowienia per zapytanie (jak get_odds_for_event)
+            
+        Returns:
+            Dict: home/draw/away_odds, home/draw/away_bookmaker (źródło kursu),
+            margin (marża najlepszych kursów), bookmakers ({nazwa: kursy + marża}),
+            queried, retries, success
+        """
+        if bookmakers is None:
+            bookmakers = ALL_BOOKMAKERS
+        names = [name for name in bookmakers if BOOKMAKER_IDS.get(name.lower())]
+        has_draw = SPORT_BET_TYPES.get(sport.lower(), SPORT_BET_TYPES['football'])['has_draw']
+        outcomes = ('home', 'draw', 'away') if has_draw else ('home', 'away')
+        
+        best = {
+            'event_id': event_id,
+            'home_odds': None, 'draw_odds': None, 'away_odds': None,
+            'home_bookmaker': None, 'draw_bookmaker': None, 'away_bookmaker': None,
+            'margin': None,
+            'bookmakers': {},
+            'queried': 0,
+            'retries': 0,
+            'success': False,
+        }
+        
+        def ask(name: str) -> Optional[Dict]:
+            try:
+                return self.get_odds_for_event(event_id, sport, bookmaker_id=BOOKMAKER_IDS[name.lower()], retries=retries)
+            except Exception as e:
+                logger.debug(f"{name}: {type(e).__name__}: {e}")
+                return None
+        
+        def collect(name: str, odds: Optional[Dict]) -> bool:
+            if odds is None:
+                return False
+            best['queried'] += 1
+            best['retries'] += odds.get('retries', 0)
+            if odds.get('success'):
+                answers[name] = odds
+                return True
+            return False
+        
+        answers = {}
+        if first_hit:
+            # Leniwie: następny bukmacher dopiero po pustej odpowiedzi poprzedniego
+            for name in names:
+                if collect(name, ask(name)):
+                    break
+        else:
+            results: "queue.Queue" = queue.Queue()
+            for name in names:
+                threading.Thread(target=lambda n=name: results.put((n, ask(n))),
+                                 name=f'odds-{name}', daemon=True).start()
+            for _ in names:
+                collect(*results.get())
+        
+        for name in names:
+            odds = answers.get(name)
+            if odds is None:
+                continue
+            prices = [odds.get(f'{o}_odds') for o in outcomes]
+            best['bookmakers'][bookmaker_label(name)] = {
+                **{f'{o}_odds': odds.get(f'{o}_odds') for o in outcomes},
+                'margin': implied_margin(prices),
+            }
+            for outcome, price in zip(outcomes, prices):
+                if price and (best[f'{outcome}_odds'] is None or price > best[f'{outcome}_odds']):
+                    best[f'{outcome}_odds'] = price
+                    best[f'{outcome}_bookmaker'] = bookmaker_label(name)
+        
+        best['success'] = bool(best['home_odds'] or best['away_odds'])
+        best['margin'] = implied_margin([best[f'{o}_odds'] for o in outcomes])
+        return best
+    
     def get_odds_for_match(self, match_url: str, sport: str = 'football') -> Dict:
         """
         Główna metoda - pobiera kursy dla meczu na podstawie URL.
@@ -358,14 +512,175 @@ class LivesportOddsAPI:
         return result
 
 
+# ============================================================================
+# BATCH - kursy całego dnia
+# ============================================================================
+
+class LivesportOddsBatch:
+    """
+    Kursy dla wielu wydarzeń naraz: wspólna sesja keep-alive transportu HTTP
+    (limit hosta, circuit breaker), ``concurrency`` wątków i retry z backoffem
+    per zapytanie.
+
+    Każde wydarzenie: bukmacherzy po kolei (jak get_odds_from_multiple_bookmakers),
+    pierwszy z kursami wygrywa; z ``best_price`` wszyscy równolegle i najlepszy
+    kurs na każdy wynik (get_best_odds).
+
+    Args:
+        concurrency: Liczba równoległych wydarzeń (wątków)
+        bookmakers: Nazwy z BOOKMAKER_IDS w kolejności priorytetu
+        retries: Ponowienia po timeoucie / błędzie połączenia / HTTP 429, 5xx
+        api: Gotowy klient (domyślnie nowy, cichy, na wspólnym transporcie HTTP)
+        best_price: Porównuj bukmacherów zamiast brać pierwszego z kursami
+    """
+
+    def __init__(self, concurrency: int = DEFAULT_BATCH_CONCURRENCY, bookmakers: List[str] = None,
+                 retries: int = 2, api: Optional[LivesportOddsAPI] = None, best_price: bool = False):
+        self.concurrency = max(1, int(concurrency))
+        self.bookmakers = bookmakers or DEFAULT_BOOKMAKERS
+        self.retries = retries
+        self.best_price = best_price
+        self.api = api or LivesportOddsAPI(verbose=False)
+        self._lock = threading.Lock()
+        self.stats = {
+            'events': 0,
+            'found': 0,
+            'requests': 0,
+            'retries': 0,
+            'time_s': 0.0,
+        }
+
+    def _fetch_event(self, event_id: str, sport: str) -> Dict:
+        result = {
+            'home_odds': None,
+            'draw_odds': None,
+            'away_odds': None,
+            'bookmaker': None,
+            'odds_found': False,
+            'event_id': event_id,
+        }
+        if self.best_price:
+            best = self.api.get_best_odds(event_id, sport, self.bookmakers, retries=self.retries)
+            with self._lock:
+                self.stats['requests'] += best['queried']
+                self.stats['retries'] += best['retries']
+            if best['success']:
+                sources = [best[f'{o}_bookmaker'] for o in ('home', 'draw', 'away') if best[f'{o}_bookmaker']]
+                result.update({k: best[k] for k in ('home_odds', 'draw_odds', 'away_odds', 'home_bookmaker',
+                                                    'draw_bookmaker', 'away_bookmaker', 'margin', 'bookmakers')})
+                result.update(bookmaker=' / '.join(dict.fromkeys(sources)), odds_found=True)
+            return result
+        for name in self.bookmakers:
+            bookmaker_id = BOOKMAKER_IDS.get(name.lower())
+            if not bookmaker_id:
+                continue
+            odds = self.api.get_odds_for_event(event_id, sport, bookmaker_id=bookmaker_id, retries=self.retries)
+            with self._lock:
+                self.stats['requests'] += 1
+                self.stats['retries'] += odds.get('retries', 0)
+            if odds.get('success'):
+                result.update(home_odds=odds['home_odds'], draw_odds=odds['draw_odds'],
+                              away_odds=odds['away_odds'], bookmaker=bookmaker_label(name),
+                              odds_found=True)
+                break
+        return result
+
+    def _worker(self, tasks: "queue.Queue", results: Dict[str, Dict]) -> None:
+        while True:
+            try:
+                event_id, sport = tasks.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                odds = self._fetch_event(event_id, sport)
+            except Exception as e:
+                logger.warning(f"Batch kursów: {event_id}: {type(e).__name__}: {e}")
+                continue
+            with self._lock:
+                results[event_id] = odds
+                if odds['odds_found']:
+                    self.stats['found'] += 1
+
+    def fetch(self, events: Union[Dict[str, str], Iterable[str]], sport: str = 'football') -> Dict[str, Dict]:
+        """
+        Args:
+            events: {event_id: sport} albo lista event_id (wszystkie ``sport``)
+
+        Returns:
+            {event_id: {'home_odds', 'draw_odds', 'away_odds', 'bookmaker', 'odds_found', 'event_id'}}
+            (wydarzenia z błędem pominięte)
+        """
+        if not isinstance(events, dict):
+            events = {event_id: sport for event_id in events}
+        t0 = time.time()
+        tasks: "queue.Queue" = queue.Queue()
+        for event_id, event_sport in events.items():
+            if event_id:
+                tasks.put((event_id, event_sport or sport))
+        self.stats['events'] += tasks.qsize()
+
+        results: Dict[str, Dict] = {}
+        threads = [threading.Thread(target=self._worker, args=(tasks, results), name=f'odds-batch-{i}', daemon=True)
+                   for i in range(min(self.concurrency, tasks.qsize()))]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.stats['time_s'] += time.time() - t0
+        return results
+
+    def format_report(self) -> str:
+        s = self.stats
+        return (f"💰 Batch kursów: {s['found']}/{s['events']} wydarzeń z kursami, "
+                f"{s['requests']} zapytań ({s['retries']} ponowień, {self.concurrency} równolegle) "
+                f"w {s['time_s']:.1f}s")
+
+
+# Kursy pobrane batchem w tym procesie: {event_id: wynik jak get_odds_for_match}
+_BATCH_ODDS: Dict[str, Dict] = {}
+_BATCH_LOCK = threading.Lock()
+_SHARED_API: Optional[LivesportOddsAPI] = None
+
+
+def remember_batch_odds(results: Dict[str, Dict]) -> None:
+    with _BATCH_LOCK:
+        _BATCH_ODDS.update(results)
+
+
+def get_batch_odds(event_id: Optional[str]) -> Optional[Dict]:
+    with _BATCH_LOCK:
+        odds = _BATCH_ODDS.get(event_id) if event_id else None
+    return dict(odds) if odds is not None else None
+
+
+def clear_batch_odds() -> None:
+    with _BATCH_LOCK:
+        _BATCH_ODDS.clear()
+
+
+def get_shared_odds_api() -> LivesportOddsAPI:
+    """Jeden klient (i sesja keep-alive) na proces zamiast nowego przy każdym meczu."""
+    global _SHARED_API
+    with _BATCH_LOCK:
+        if _SHARED_API is None:
+            _SHARED_API = LivesportOddsAPI()
+        return _SHARED_API
+
+
 def get_livesport_odds(match_url: str, sport: str = 'football') -> Dict:
     """
     Funkcja pomocnicza do szybkiego pobierania kursów.
     
+    Wydarzenie pobrane wcześniej batchem (remember_batch_odds) nie wymaga zapytania;
+    pozostałe idą przez współdzielony klient.
+    
     Przykład:
         odds = get_livesport_odds('https://www.livesport.com/pl/mecz/...', 'basketball')
     """
-    api = LivesportOddsAPI()
+    api = get_shared_odds_api()
+    cached = get_batch_odds(api.extract_event_id_from_url(match_url))
+    if cached is not None and cached.get('odds_found'):
+        return cached
     return api.get_odds_for_match(match_url, sport)
 
 
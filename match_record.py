@@ -0,0 +1,354 @@
+"""
+Match Record - zwarty rekord meczu w pamięci
+============================================
+
+Wynik ``process_match`` / ``process_match_tennis`` to dict z ~60-80
+kluczami (h2h_last5, home_form_overall, forebet_*, sofascore_*,
+gemini_*, ...). Przy kilku tysiącach meczów dnia każdy dict to kilka KB
+samej tablicy haszującej.
+
+``MatchRecord``:
+    - znane pola (FIELDS) w ``__slots__`` (bez ``__dict__`` na obiekt);
+      pozostałe klucze w małym słowniku ``extra``
+    - zachowuje się jak dict (MutableMapping): ``rec['qualifies']``,
+      ``rec.get(...)``, ``'x' in rec``, ``dict(rec)`` - kod operujący na
+      wierszach nie wymaga zmian; brak klucza = KeyError jak w dict
+    - ``to_dict()`` / ``MatchRecord.from_dict()`` do JSON / dziennika runu
+    - ``records_to_columns`` - forma kolumnowa wprost z rekordów
+    - ``records_to_frame`` - DataFrame z listy dictów (``to_dict()`` per
+      rekord), identyczny z ``pd.DataFrame(wiersze)`` sprzed MatchRecord
+
+Benchmark (``python match_record.py``): kontenery wierszy ~50% pamięci
+listy dictów. Zysk to pamięć, nie czas budowy DataFrame: gotowa lista
+dictów (ścieżka C w pandas) jest najszybsza, a budowa kolumnami z
+rekordów jej nie wyprzedza - zapis częściowy zostaje przy dictach.
+
+Użycie:
+    rows.append(MatchRecord.from_dict(info))
+    df = records_to_frame(rows)
+    json.dumps(rows[0].to_dict())
+
+    python match_record.py --rows 5000       # benchmark pamięci i budowy DataFrame
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from collections.abc import Mapping, MutableMapping
+from operator import attrgetter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Pola wierszy meczu (kolejność = kolejność kolumn); wartość None = brak danych
+FIELDS: Tuple[str, ...] = (
+    # Mecz
+    'match_url', 'sport', 'league', 'match_date', 'match_time',
+    'home_team', 'away_team',
+    # Kwalifikacja
+    'qualifies', 'advanced_score', 'win_rate', 'focus_team', 'favorite',
+    # H2H
+    'h2h_last5', 'h2h_count', 'home_wins_in_h2h_last5', 'away_wins_in_h2h_last5',
+    'last_h2h_date', 'last_h2h_home', 'last_h2h_away', 'last_h2h_score',
+    # Forma
+    'home_form', 'away_form', 'home_form_overall', 'away_form_overall',
+    'home_form_home', 'away_form_away', 'form_advantage',
+    # Kursy
+    'home_odds', 'draw_odds', 'away_odds', 'odds_bookmaker',
+    # Tenis
+    'ranking_a', 'ranking_b', 'form_a', 'form_b', 'surface', 'ranking_info',
+    # Scoring engine
+    'prob_a', 'prob_b', 'cal_a', 'cal_b', 'best_pick',
+    'best_prob', 'best_odds', 'ev', 'edge', 'kelly',
+    'confidence', 'data_quality', 'score_breakdown',
+    # Forebet
+    'forebet_prediction', 'forebet_probability', 'forebet_home_prob',
+    'forebet_draw_prob', 'forebet_away_prob', 'forebet_exact_score',
+    'forebet_over_under', 'forebet_btts', 'forebet_avg_goals',
+    # SofaScore
+    'sofascore_url', 'sofascore_total_votes', 'sofascore_home_win_prob',
+    'sofascore_draw_prob', 'sofascore_away_win_prob',
+    'sofascore_home_odds_avg', 'sofascore_away_odds_avg',
+    # Gemini
+    'gemini_prediction', 'gemini_confidence', 'gemini_recommendation',
+    'gemini_reasoning',
+    # FlashScore
+    'flashscore_found', 'flashscore_home_odds', 'flashscore_draw_odds',
+    'flashscore_away_odds', 'flashscore_bookmaker',
+    'flashscore_over_25', 'flashscore_under_25',
+)
+_FIELD_SET = frozenset(FIELDS)
+_MISSING = object()
+
+
+class MatchRecord(MutableMapping):
+    """
+    Wiersz meczu: pola ze slotów + rzadkie klucze w ``_extra``.
+
+    Nieustawiony slot = brak klucza (KeyError, ``in`` = False), jak w dict.
+    """
+
+    __slots__ = FIELDS + ('_extra',)
+
+    def __init__(self, data: Optional[Mapping] = None, **kwargs):
+        self._extra: Optional[Dict] = None
+        if data:
+            for key, value in data.items():
+                self[key] = value
+        for key, value in kwargs.items():
+            self[key] = value
+
+    @classmethod
+    def from_dict(cls, data: Optional[Mapping]) -> Optional['MatchRecord']:
+        """Rekord z dict (None -> None, MatchRecord zwracany bez kopii)."""
+        if data is None or isinstance(data, cls):
+            return data
+        return cls(data)
+
+    def to_dict(self) -> Dict:
+        out = {}
+        for name in FIELDS:
+            value = getattr(self, name, _MISSING)
+            if value is not _MISSING:
+                out[name] = value
+        if self._extra:
+            out.update(self._extra)
+        return out
+
+    @property
+    def extra(self) -> Dict:
+        """Klucze spoza FIELDS (tylko do odczytu - zmiany przez rec[key] = ...)."""
+        return dict(self._extra or {})
+
+    # ------------------------------------------------------------------
+    # Mapping
+    # ------------------------------------------------------------------
+    def __getitem__(self, key):
+        if key in _FIELD_SET:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value) -> None:
+        if key in _FIELD_SET:
+            setattr(self, key, value)
+            return
+        if self._extra is None:
+            self._extra = {}
+        self._extra[key] = value
+
+    def __delitem__(self, key) -> None:
+        if key in _FIELD_SET:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+            return
+        if self._extra is None or key not in self._extra:
+            raise KeyError(key)
+        del self._extra[key]
+
+    def __iter__(self):
+        return iter(self.to_dict())
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __contains__(self, key) -> bool:
+        if key in _FIELD_SET:
+            return hasattr(self, key)
+        return self._extra is not None and key in self._extra
+
+    def get(self, key, default=None):
+        if key in _FIELD_SET:
+            return getattr(self, key, default)
+        if self._extra is not None:
+            return self._extra.get(key, default)
+        return default
+
+    def copy(self) -> 'MatchRecord':
+        return MatchRecord(self)
+
+    def __getstate__(self):
+        return self.to_dict()
+
+    def __setstate__(self, state) -> None:
+        self._extra = None
+        for key, value in state.items():
+            self[key] = value
+
+    def __repr__(self) -> str:
+        return f"MatchRecord({self.to_dict()!r})"
+
+
+# ----------------------------------------------------------------------
+# Forma kolumnowa
+# ----------------------------------------------------------------------
+
+def _column_keys(records: List[Mapping]) -> List[str]:
+    """Pola FIELDS obecne w którymkolwiek wierszu, potem pozostałe klucze wg pojawienia się."""
+    keys = [name for name in FIELDS if any(name in rec for rec in records)]
+    seen = set()
+    for rec in records:
+        extra = (rec._extra or ()) if isinstance(rec, MatchRecord) else rec
+        for key in extra:
+            if key not in _FIELD_SET and key not in seen:
+                seen.add(key)
+                keys.append(key)
+    return keys
+
+
+def _split_keys(keys: List[str]) -> Tuple[List[str], List[str]]:
+    return [k for k in keys if k in _FIELD_SET], [k for k in keys if k not in _FIELD_SET]
+
+
+def _columns(records: List[Mapping], missing=None) -> Dict[str, List]:
+    slot_keys, extra_keys = _split_keys(_column_keys(records))
+    only_records = all(isinstance(rec, MatchRecord) for rec in records)
+    columns = {}
+    # Kolumna po kolumnie - bez pośrednich wierszy
+    for key in slot_keys:
+        if only_records:
+            try:
+                # Pełna kolumna: slot czytany w C (attrgetter), bez wywołań get
+                columns[key] = list(map(attrgetter(key), records))
+                continue
+            except AttributeError:
+                pass
+        columns[key] = [rec.get(key, missing) for rec in records]
+    for key in extra_keys:
+        columns[key] = [rec.get(key, missing) for rec in records]
+    return columns
+
+
+def records_to_columns(records: Iterable[Mapping]) -> Dict[str, List]:
+    """{kolumna: lista wartości} dla rekordów (MatchRecord albo dict); brak klucza = None."""
+    return _columns(list(records))
+
+
+def records_from_columns(columns: Mapping[str, List]) -> List[MatchRecord]:
+    """Odwrotność records_to_columns (brakujące klucze wracają jako None)."""
+    if not columns:
+        return []
+    keys = list(columns)
+    n = len(columns[keys[0]])
+    return [MatchRecord({key: columns[key][i] for key in keys}) for i in range(n)]
+
+
+def records_to_frame(records: Iterable[Mapping]):
+    """
+    DataFrame z listy dictów - ``pd.DataFrame(wiersze)`` jak przed MatchRecord.
+
+    Rekordy zamieniane przez ``to_dict()``; brak klucza = NaN.
+    """
+    import pandas as pd
+
+    return pd.DataFrame([rec.to_dict() if isinstance(rec, MatchRecord) else rec for rec in records])
+
+
+def frame_to_records(df) -> List[MatchRecord]:
+    return records_from_columns(df.to_dict('list'))
+
+
+# ----------------------------------------------------------------------
+# Benchmark
+# ----------------------------------------------------------------------
+
+# Pola tekstowe / listy / flagi w syntetycznym wierszu; pozostałe pola liczbowe
+_SAMPLE_TEXT = frozenset({
+    'match_url', 'sport', 'league', 'match_date', 'match_time', 'home_team', 'away_team',
+    'focus_team', 'favorite', 'last_h2h_date', 'last_h2h_home', 'last_h2h_away', 'last_h2h_score',
+    'odds_bookmaker', 'surface', 'ranking_info', 'best_pick', 'forebet_prediction',
+    'forebet_exact_score', 'forebet_over_under', 'forebet_btts', 'sofascore_url',
+    'gemini_prediction', 'gemini_recommendation', 'gemini_reasoning', 'flashscore_bookmaker',
+})
+_SAMPLE_LISTS = frozenset({'h2h_last5', 'home_form', 'away_form', 'home_form_overall', 'away_form_overall',
+                           'home_form_home', 'away_form_away', 'form_a', 'form_b'})
+_SAMPLE_FLAGS = frozenset({'qualifies', 'form_advantage', 'flashscore_found'})
+
+
+def sample_row(i: int) -> Dict:
+    """Syntetyczny wiersz o kształcie wyniku process_match (+ wzbogacanie)."""
+    row = {}
+    for name in FIELDS:
+        if name in _SAMPLE_LISTS:
+            row[name] = ['W', 'L', 'W', 'D', 'W'] if 'form' in name else []
+        elif name == 'score_breakdown':
+            row[name] = {}
+        elif name in _SAMPLE_FLAGS:
+            row[name] = i % 3 == 0
+        elif name in _SAMPLE_TEXT:
+            row[name] = f'{name}-{i}'
+        else:
+            row[name] = float(i % 7)
+    row['match_url'] = f'https://www.livesport.com/pl/mecz/pilka-nozna/a-{i:08d}/b-{i:08d}/'
+    row['home_wins_in_h2h'] = i % 5
+    return row
+
+
+def _allocated(build) -> Tuple[int, object]:
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        result = build()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    return size, result
+
+
+def benchmark(n: int = 2000) -> Dict[str, float]:
+    """
+    Pamięć kontenerów (wartości współdzielone) i czas budowy DataFrame:
+    lista dictów vs lista MatchRecord.
+    """
+    rows = [sample_row(i) for i in range(n)]
+    dict_bytes, dicts = _allocated(lambda: [dict(row) for row in rows])
+    record_bytes, records = _allocated(lambda: [MatchRecord.from_dict(row) for row in rows])
+
+    import pandas as pd
+    records_to_frame(records[:10])  # rozgrzewka (import numpy / pandas poza pomiarem)
+
+    t0 = time.perf_counter()
+    pd.DataFrame(dicts)
+    t_dicts = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    records_to_frame(records)
+    t_records = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    pd.DataFrame(_columns(records, float('nan')))
+    t_by_columns = time.perf_counter() - t0
+
+    return {
+        'rows': n,
+        'dict_bytes': dict_bytes,
+        'record_bytes': record_bytes,
+        'memory_ratio': record_bytes / dict_bytes if dict_bytes else 0.0,
+        'frame_from_dicts_s': t_dicts,
+        'frame_from_records_s': t_records,
+        'frame_by_columns_s': t_by_columns,
+    }
+
+
+def format_benchmark(stats: Dict[str, float]) -> str:
+    return (f"🧮 MatchRecord: {stats['rows']} wierszy - dict {stats['dict_bytes'] / 1024:.0f} KB, "
+            f"MatchRecord {stats['record_bytes'] / 1024:.0f} KB ({stats['memory_ratio']:.0%}); "
+            f"DataFrame: z dictów {stats['frame_from_dicts_s'] * 1000:.0f} ms, "
+            f"z rekordów (to_dict) {stats['frame_from_records_s'] * 1000:.0f} ms, "
+            f"z rekordów kolumnami {stats['frame_by_columns_s'] * 1000:.0f} ms")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark pamięci MatchRecord vs dict')
+    parser.add_argument('--rows', type=int, default=2000, help='Liczba syntetycznych wierszy')
+    args = parser.parse_args(argv)
+    print(format_benchmark(benchmark(args.rows)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
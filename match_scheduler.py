@@ -0,0 +1,229 @@
+"""
+Match Scheduler - kolejność meczów według wartości i budżet czasu
+==================================================================
+
+``get_match_links_from_day`` zwraca URLe w kolejności strony, więc gdy
+run trwa zbyt długo, brakuje meczów z "najlepszych" lig. Scheduler
+ustawia kolejkę według:
+
+    1. czy mecz jeszcze się nie zaczął (dla dzisiejszej daty)
+    2. priorytetu = historyczny odsetek kwalifikacji ligi
+       (wygładzony priorem) + premia gdy listing pokazuje kursy
+    3. godziny rozpoczęcia (wcześniejsze najpierw)
+    4. kolejności strony (stabilnie, bez wskazówek = bez zmian)
+
+Odsetki kwalifikacji lig są uczone z wyników runów i trzymane w
+DiskCache (namespace 'league_stats'). Z ``time_budget_s`` ``has_time()``
+mówi, czy kolejny mecz zmieści się przed terminem (średni czas meczu
++ margines bezpieczeństwa) - reszta kolejki jest zapisywana jako pominięta.
+
+Użycie:
+    stubs = {}
+    urls = get_match_links_from_day(driver, date, sports, stubs=stubs)
+    scheduler = MatchScheduler(time_budget_s=45 * 60, day=date)
+    urls = scheduler.order(urls, stubs)
+    scheduler.start()
+    for url in urls:
+        if not scheduler.has_time():
+            break
+        t0 = time.time(); info = process_match(url, driver)
+        scheduler.record(url, info, time.time() - t0)
+    scheduler.save()
+    print(scheduler.format_report())
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from disk_cache import DiskCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SAFETY_MARGIN_S = 120.0
+DEFAULT_MATCH_SECONDS = 20.0
+ODDS_BONUS = 0.15
+PRIOR_RATE = 0.15
+PRIOR_WEIGHT = 10.0
+EMA_ALPHA = 0.2
+
+
+def _kickoff_minutes(kickoff: Optional[str]) -> Optional[int]:
+    try:
+        hours, minutes = str(kickoff).split(':')
+        return int(hours) * 60 + int(minutes)
+    except (TypeError, ValueError):
+        return None
+
+
+def league_key(hint: Optional[Dict]) -> Optional[str]:
+    """Klucz ligi w statystykach: 'sport:Kraj: Liga' (None gdy brak ligi)."""
+    if not hint or not hint.get('league'):
+        return None
+    return f"{hint.get('sport') or 'football'}:{hint['league']}"
+
+
+class MatchScheduler:
+    """
+    Priorytetyzacja URLi meczów i pilnowanie budżetu czasu runu.
+
+    Args:
+        time_budget_s: Budżet czasu przetwarzania [s] (None = bez limitu)
+        stats_cache: DiskCache ze statystykami lig (domyślnie namespace 'league_stats',
+            otwierany dopiero gdy potrzebny)
+        safety_margin_s: Zapas na zapis wyników / email po zatrzymaniu
+        default_match_seconds: Szacowany czas meczu przed pierwszymi pomiarami
+        day: Data runu YYYY-MM-DD - dla dzisiejszej rozpoczęte mecze idą na koniec
+        clock: Źródło czasu (do testów)
+    """
+
+    def __init__(
+        self,
+        time_budget_s: Optional[float] = None,
+        stats_cache: Optional[DiskCache] = None,
+        safety_margin_s: float = DEFAULT_SAFETY_MARGIN_S,
+        default_match_seconds: float = DEFAULT_MATCH_SECONDS,
+        day: Optional[str] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.time_budget_s = time_budget_s
+        self._cache = stats_cache
+        self.safety_margin_s = safety_margin_s
+        self.avg_match_seconds = default_match_seconds
+        self.day = day
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._started_at: Optional[float] = None
+        self._hints: Dict[str, Dict] = {}
+        self._league_stats: Dict[str, Dict] = {}
+        self._new_counts: Dict[str, Dict] = {}
+        self.stats = {
+            'ordered': 0,
+            'with_hints': 0,
+            'processed': 0,
+            'skipped': 0,
+        }
+
+    @property
+    def cache(self) -> DiskCache:
+        """DiskCache statystyk lig - otwierany przy pierwszym odczycie / zapisie."""
+        if self._cache is None:
+            self._cache = DiskCache(namespace='league_stats')
+        return self._cache
+
+    # ------------------------------------------------------------------
+    # Priorytety
+    # ------------------------------------------------------------------
+    def _league(self, key: Optional[str]) -> Dict:
+        if key is None:
+            return {'matches': 0, 'qualified': 0}
+        if key not in self._league_stats:
+            self._league_stats[key] = self.cache.get(key) or {'matches': 0, 'qualified': 0}
+        return self._league_stats[key]
+
+    def league_rate(self, hint: Optional[Dict]) -> float:
+        """Wygładzony odsetek kwalifikacji ligi (nieznana liga = PRIOR_RATE)."""
+        stats = self._league(league_key(hint))
+        return (stats['qualified'] + PRIOR_RATE * PRIOR_WEIGHT) / (stats['matches'] + PRIOR_WEIGHT)
+
+    def priority(self, hint: Optional[Dict]) -> float:
+        value = self.league_rate(hint)
+        if hint and hint.get('has_odds'):
+            value += ODDS_BONUS
+        return value
+
+    def _now_minutes(self) -> Optional[int]:
+        if not self.day:
+            return None
+        now = datetime.fromtimestamp(self.clock())
+        if now.strftime('%Y-%m-%d') != self.day:
+            return None
+        return now.hour * 60 + now.minute
+
+    def order(self, urls: List[str], hints: Optional[Dict[str, Dict]] = None) -> List[str]:
+        """
+        Zwraca URLe w kolejności przetwarzania (bez wskazówek - kolejność wejściowa).
+        """
+        hints = hints or {}
+        self._hints = hints
+        now = self._now_minutes()
+
+        def sort_key(item):
+            index, url = item
+            hint = hints.get(url)
+            kickoff = _kickoff_minutes(hint.get('kickoff')) if hint else None
+            started = now is not None and kickoff is not None and kickoff <= now
+            return (started, -round(self.priority(hint), 4),
+                    kickoff if kickoff is not None else 24 * 60, index)
+
+        ordered = [url for _, url in sorted(enumerate(urls), key=sort_key)]
+        self.stats['ordered'] = len(ordered)
+        self.stats['with_hints'] = sum(1 for url in urls if url in hints)
+        return ordered
+
+    # ------------------------------------------------------------------
+    # Budżet czasu
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        self._started_at = self.clock()
+
+    def elapsed(self) -> float:
+        return self.clock() - self._started_at if self._started_at is not None else 0.0
+
+    def remaining(self) -> Optional[float]:
+        """Pozostały budżet [s] (None = bez limitu)."""
+        if self.time_budget_s is None:
+            return None
+        return self.time_budget_s - self.elapsed()
+
+    def has_time(self) -> bool:
+        """Czy kolejny mecz zmieści się w budżecie (z marginesem bezpieczeństwa)."""
+        remaining = self.remaining()
+        if remaining is None:
+            return True
+        return remaining - self.safety_margin_s >= self.avg_match_seconds
+
+    # ------------------------------------------------------------------
+    # Wyniki
+    # ------------------------------------------------------------------
+    def record(self, url: str, info: Optional[Dict], seconds: float) -> None:
+        """Rejestruje czas meczu i wynik kwalifikacji ligi (bezpieczne dla wątków)."""
+        with self._lock:
+            self.stats['processed'] += 1
+            self.avg_match_seconds = (1 - EMA_ALPHA) * self.avg_match_seconds + EMA_ALPHA * seconds
+            key = league_key(self._hints.get(url))
+            if key is None or info is None:
+                return
+            counts = self._new_counts.setdefault(key, {'matches': 0, 'qualified': 0})
+            counts['matches'] += 1
+            counts['qualified'] += 1 if info.get('qualifies') else 0
+
+    def mark_skipped(self, urls: List[str]) -> None:
+        with self._lock:
+            self.stats['skipped'] += len(urls)
+
+    def save(self) -> None:
+        """Dopisuje statystyki lig z tego runu do DiskCache."""
+        with self._lock:
+            new_counts, self._new_counts = self._new_counts, {}
+        for key, counts in new_counts.items():
+            stored = self.cache.get(key) or {'matches': 0, 'qualified': 0}
+            stored = {
+                'matches': stored['matches'] + counts['matches'],
+                'qualified': stored['qualified'] + counts['qualified'],
+            }
+            self.cache.set(key, stored)
+            self._league_stats[key] = stored
+        if new_counts:
+            logger.info(f"MatchScheduler: zapisano statystyki {len(new_counts)} lig")
+
+    def format_report(self) -> str:
+        s = self.stats
+        budget = (f"budżet {self.time_budget_s / 60:.0f} min, wykorzystano {self.elapsed() / 60:.1f} min"
+                  if self.time_budget_s is not None else 'bez limitu czasu')
+        return (f"⏱️  Harmonogram: przetworzono {s['processed']}, pominięto {s['skipped']} "
+                f"({budget}), wskazówki listingu: {s['with_hints']}/{s['ordered']}, "
+                f"śr. czas meczu {self.avg_match_seconds:.1f}s")
@@ -0,0 +1,285 @@
+"""
+Match Worker Pool - równoległe przetwarzanie meczów
+====================================================
+
+N niezależnych instancji Chrome (każda utworzona przez ``start_driver``)
+pobiera URL-e ze wspólnej kolejki i przetwarza je funkcją
+``process_match`` / ``process_match_tennis``. Każdy worker pilnuje
+własnego drivera: health-check przed meczem, restart po błędzie oraz
+restart co ``restart_interval`` meczów - albo, gdy podano
+``recycler_factory`` (np. ``BrowserRecycler``), tylko gdy recycler wykryje
+wzrost pamięci / opóźnień (z zapasowym driverem startowanym w tle).
+
+Wyniki są zwracane w KOLEJNOŚCI WEJŚCIOWEJ (indeks URL-a), więc dalsze
+etapy (CSV, email, scoring) nie widzą różnicy względem trybu szeregowego.
+Z ``should_stop`` (np. koniec budżetu czasu MatchScheduler) workery nie
+pobierają kolejnych meczów - nieprzetworzone URL-e trafiają do ``skipped``.
+
+Użycie:
+    pool = MatchWorkerPool(workers=4, driver_factory=lambda: start_driver(headless=True))
+    results = pool.map(urls, process_url)   # lista dict/None w kolejności urls
+"""
+
+import logging
+import queue
+import random
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _default_health_check(driver) -> bool:
+    """Minimalny health-check: driver odpowiada na current_url."""
+    if driver is None:
+        return False
+    try:
+        _ = driver.current_url
+        return True
+    except Exception:
+        return False
+
+
+def _safe_quit(driver) -> None:
+    if driver is None:
+        return
+    try:
+        driver.quit()
+    except Exception:
+        pass  # Ignoruj błędy przy zamykaniu
+
+
+class MatchWorkerPool:
+    """
+    Pula workerów Selenium przetwarzających mecze równolegle.
+
+    Args:
+        workers: Liczba równoległych przeglądarek (>= 1)
+        driver_factory: Funkcja bez argumentów zwracająca nowy driver
+        restart_interval: Restart drivera co N meczów danego workera
+        max_retries: Liczba prób na mecz (restart drivera między próbami)
+        delay_range: (min, max) opóźnienie między meczami jednego workera [s]
+        health_check: Funkcja driver -> bool (domyślnie current_url)
+        on_result: Callback (index, url, info) wołany po każdym meczu
+                   (wywołania są serializowane lockiem puli)
+        restart_delay: Bazowa pauza między próbami startu drivera [s]
+        recycler_factory: Funkcja (driver_factory, name=...) -> recycler z metodami
+                          observe/recycle/close (np. klasa BrowserRecycler);
+                          zastępuje restart co restart_interval
+        should_stop: Funkcja () -> bool sprawdzana przed każdym meczem;
+                     True = worker kończy, reszta kolejki w self.skipped
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        driver_factory: Callable[[], object],
+        restart_interval: int = 80,
+        max_retries: int = 2,
+        delay_range: Tuple[float, float] = (1.0, 2.0),
+        health_check: Callable[[object], bool] = None,
+        on_result: Callable[[int, str, Optional[Dict]], None] = None,
+        restart_delay: float = 1.0,
+        recycler_factory: Callable[..., object] = None,
+        should_stop: Callable[[], bool] = None,
+    ):
+        self.workers = max(1, int(workers or 1))
+        self.driver_factory = driver_factory
+        self.restart_interval = max(1, int(restart_interval))
+        self.max_retries = max(1, int(max_retries))
+        self.delay_range = delay_range
+        self.health_check = health_check or _default_health_check
+        self.on_result = on_result
+        self.restart_delay = restart_delay
+        self.recycler_factory = recycler_factory
+        self.recyclers: List[object] = []
+        self.should_stop = should_stop
+        self.skipped: List[str] = []
+
+        self._lock = threading.Lock()
+        self.stats = {
+            'processed': 0,
+            'failed': 0,
+            'restarts': 0,
+            'workers_lost': 0,
+            'skipped': 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Driver lifecycle
+    # ------------------------------------------------------------------
+    def _start_driver(self, worker_id: int, attempts: int = 3):
+        """Uruchamia driver dla workera (z kilkoma próbami)."""
+        for attempt in range(attempts):
+            try:
+                driver = self.driver_factory()
+                if self.health_check(driver):
+                    return driver
+                _safe_quit(driver)
+                logger.warning(f"[worker {worker_id}] Driver nie przeszedł health-check (próba {attempt + 1})")
+            except Exception as e:
+                logger.warning(f"[worker {worker_id}] Błąd startu drivera (próba {attempt + 1}/{attempts}): {e}")
+            time.sleep(self.restart_delay * (1 + attempt))
+        return None
+
+    def _restart_driver(self, worker_id: int, driver, reason: str, recycler=None):
+        print(f"   🔄 [worker {worker_id}] Restart przeglądarki ({reason})")
+        with self._lock:
+            self.stats['restarts'] += 1
+        if recycler is not None:
+            # Zapasowy driver recyclera (jeśli gotowy) - inaczej zwykły start z próbami
+            try:
+                new_driver = recycler.recycle(driver, reason)
+                if self.health_check(new_driver):
+                    return new_driver
+                _safe_quit(new_driver)
+            except Exception as e:
+                logger.warning(f"[worker {worker_id}] Błąd recyklingu drivera: {e}")
+            return self._start_driver(worker_id)
+        _safe_quit(driver)
+        return self._start_driver(worker_id)
+
+    # ------------------------------------------------------------------
+    # Worker loop
+    # ------------------------------------------------------------------
+    def _worker(self, worker_id: int, tasks: "queue.Queue", results: List[Optional[Dict]],
+                process_fn: Callable[[str, object], Dict]) -> None:
+        driver = self._start_driver(worker_id)
+        if driver is None:
+            logger.error(f"[worker {worker_id}] Nie udało się uruchomić przeglądarki - worker kończy pracę")
+            with self._lock:
+                self.stats['workers_lost'] += 1
+            return
+
+        recycler = None
+        if self.recycler_factory is not None:
+            recycler = self.recycler_factory(self.driver_factory, name=f'worker {worker_id}')
+            with self._lock:
+                self.recyclers.append(recycler)
+
+        handled = 0
+        try:
+            while True:
+                if self.should_stop is not None and self.should_stop():
+                    break
+                try:
+                    item = tasks.get_nowait()
+                except queue.Empty:
+                    break
+                index, url = item
+
+                info = None
+                elapsed = 0.0
+                for attempt in range(self.max_retries):
+                    if not self.health_check(driver):
+                        driver = self._restart_driver(worker_id, driver, 'health-check', recycler)
+                        if driver is None:
+                            break
+                    try:
+                        t0 = time.time()
+                        info = process_fn(url, driver)
+                        elapsed = time.time() - t0
+                        break
+                    except Exception as e:
+                        logger.warning(f"[worker {worker_id}] Błąd przy {url[:80]} "
+                                       f"(próba {attempt + 1}/{self.max_retries}): {type(e).__name__}: {str(e)[:100]}")
+                        if attempt < self.max_retries - 1:
+                            driver = self._restart_driver(worker_id, driver, 'błąd meczu', recycler)
+                            if driver is None:
+                                break
+
+                results[index] = info
+                with self._lock:
+                    if info is None:
+                        self.stats['failed'] += 1
+                    else:
+                        self.stats['processed'] += 1
+                    if self.on_result:
+                        try:
+                            self.on_result(index, url, info)
+                        except Exception as e:
+                            logger.warning(f"on_result callback error: {e}")
+                tasks.task_done()
+
+                if driver is None:
+                    # Nie da się kontynuować na tym workerze - reszta kolejki dla pozostałych
+                    with self._lock:
+                        self.stats['workers_lost'] += 1
+                    logger.error(f"[worker {worker_id}] Utracono przeglądarkę - worker kończy pracę")
+                    return
+
+                handled += 1
+                if recycler is not None:
+                    reason = recycler.observe(driver, elapsed) if info is not None else None
+                    restart_reason = reason
+                else:
+                    restart_reason = f'po {handled} meczach' if handled % self.restart_interval == 0 else None
+                if restart_reason and not tasks.empty():
+                    driver = self._restart_driver(worker_id, driver, restart_reason, recycler)
+                    if driver is None:
+                        with self._lock:
+                            self.stats['workers_lost'] += 1
+                        return
+                elif self.delay_range and not tasks.empty():
+                    time.sleep(random.uniform(*self.delay_range))
+        finally:
+            _safe_quit(driver)
+            if recycler is not None:
+                recycler.close()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def map(self, urls: List[str], process_fn: Callable[[str, object], Dict]) -> List[Optional[Dict]]:
+        """
+        Przetwarza wszystkie URL-e i zwraca wyniki w kolejności wejściowej.
+
+        Args:
+            urls: Lista URL-i meczów
+            process_fn: Funkcja (url, driver) -> dict
+
+        Returns:
+            Lista o długości len(urls); None dla meczów, których nie udało się przetworzyć
+        """
+        results: List[Optional[Dict]] = [None] * len(urls)
+        if not urls:
+            return results
+
+        tasks: "queue.Queue" = queue.Queue()
+        for index, url in enumerate(urls):
+            tasks.put((index, url))
+
+        n_workers = min(self.workers, len(urls))
+        threads = []
+        for worker_id in range(1, n_workers + 1):
+            t = threading.Thread(
+                target=self._worker,
+                args=(worker_id, tasks, results, process_fn),
+                name=f'match-worker-{worker_id}',
+                daemon=True,
+            )
+            threads.append(t)
+            t.start()
+            # Rozłóż starty Chrome w czasie (mniej skoków CPU/RAM)
+            if worker_id < n_workers:
+                time.sleep(0.5)
+
+        for t in threads:
+            t.join()
+
+        remaining = []
+        while True:
+            try:
+                remaining.append(tasks.get_nowait())
+            except queue.Empty:
+                break
+        if remaining:
+            self.skipped = [url for _, url in sorted(remaining)]
+            self.stats['skipped'] = len(remaining)
+            if self.should_stop is not None and self.should_stop():
+                logger.info(f"Zatrzymano pulę (should_stop) - {len(remaining)} meczów pominiętych")
+            else:
+                logger.error(f"Wszystkie workery zakończyły pracę - {len(remaining)} meczów nieprzetworzonych")
+
+        return results
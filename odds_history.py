@@ -0,0 +1,410 @@
+"""
+Odds History - ruch kursów od scrapu do startu meczu
+====================================================
+
+Kursy były pobierane raz, przy scrapowaniu meczu - zmiana linii między
+scrapem a rozpoczęciem nie była widoczna. Historia trzyma znaczniki
+czasowe kursów per wydarzenie i bukmacher:
+
+    outputs/odds_history/2025-10-01.events.jsonl   jedno wydarzenie = jedna linia
+                                                   (event_id, kickoff, sport, url, drużyny)
+    outputs/odds_history/2025-10-01.odds.csv       ts,event_id,bookmaker,home,draw,away
+
+    - partycja = dzień meczu, pliki tylko dopisywane (append-only)
+    - snapshot zapisywany tylko, gdy kursy bukmachera się zmieniły
+      (niezmieniona linia nie zajmuje miejsca)
+    - refresh czyta wyłącznie partycje dni, w które wpada okno przed
+      startem (zwykle 1-2 pliki) i odpytuje tylko mecze z kickoff w oknie
+      - koszt zapisu, odczytu i odświeżania nie rośnie z liczbą dni
+
+Użycie:
+    history = OddsHistory()
+    history.record_rows(rows, day='2025-10-01', stubs=listing_stubs)   # po runie scrapera
+    refresher = OddsRefresher(history, window_hours=6)
+    refresher.run()                                                     # np. co 15 min z crona
+    history.movement('KQAaF7d2', day='2025-10-01')                      # seria per bukmacher
+
+    python odds_history.py --window-hours 6 --every-minutes 15
+"""
+
+import argparse
+import csv
+import json
+import logging
+import os
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ODDS_HISTORY_DIR_ENV = 'LIVESPORT_ODDS_HISTORY'
+DEFAULT_HISTORY_DIR = os.path.join('outputs', 'odds_history')
+DEFAULT_WINDOW_HOURS = 6.0
+
+EVENTS_SUFFIX = '.events.jsonl'
+ODDS_SUFFIX = '.odds.csv'
+ODDS_COLUMNS = ('ts', 'event_id', 'bookmaker', 'home', 'draw', 'away')
+
+_EVENT_ID_RE = re.compile(r'[?&]mid=([A-Za-z0-9]+)')
+_DAY_RE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+
+def history_dir() -> str:
+    return os.getenv(ODDS_HISTORY_DIR_ENV) or DEFAULT_HISTORY_DIR
+
+
+def kickoff_timestamp(day: str, kickoff: Optional[str]) -> Optional[float]:
+    """
+    Czas startu (epoch, czas lokalny) z dnia meczu i godziny.
+
+    ``kickoff``: 'HH:MM' (stub listingu) albo 'DD.MM.YYYY HH:MM' (match_time ze strony).
+    """
+    if not kickoff:
+        return None
+    text = str(kickoff).strip()
+    for fmt in ('%d.%m.%Y %H:%M', '%d.%m.%y %H:%M'):
+        try:
+            return datetime.strptime(text, fmt).timestamp()
+        except ValueError:
+            pass
+    match = re.search(r'(\d{1,2}):(\d{2})', text)
+    if not match or not day:
+        return None
+    try:
+        base = datetime.strptime(day, '%Y-%m-%d')
+    except ValueError:
+        return None
+    return base.replace(hour=int(match.group(1)), minute=int(match.group(2))).timestamp()
+
+
+def _price(value) -> Optional[float]:
+    try:
+        price = float(value)
+    except (TypeError, ValueError):
+        return None
+    return price if price == price and price > 1.0 else None
+
+
+def _csv_price(value: Optional[float]) -> str:
+    return '' if value is None else f'{value:g}'
+
+
+def _odds_row(values: List[str]) -> Optional[Dict]:
+    if len(values) != len(ODDS_COLUMNS):
+        return None
+    try:
+        ts = float(values[0])
+    except ValueError:
+        return None
+    return {'ts': ts, 'event_id': values[1], 'bookmaker': values[2],
+            'home': _price(values[3]), 'draw': _price(values[4]), 'away': _price(values[5])}
+
+
+class OddsHistory:
+    """
+    Dzienne partycje wydarzeń i snapshotów kursów.
+
+    Bezpieczne dla wątków jednego procesu; linie są dopisywane pojedynczym
+    write() w trybie append, więc kilka procesów może pisać do tej samej partycji,
+    a każda partycja w pamięci jest doczytywana przyrostowo (od zapamiętanego offsetu).
+
+    Args:
+        root: Katalog partycji (domyślnie LIVESPORT_ODDS_HISTORY lub outputs/odds_history)
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or history_dir()
+        self._lock = threading.Lock()
+        # Wczytane partycje: dzień -> {event_id: wydarzenie} / {(event_id, bukmacher): ostatnie kursy}
+        self._events: Dict[str, Dict[str, Dict]] = {}
+        self._last: Dict[str, Dict[Tuple[str, str], Tuple]] = {}
+        self._offsets: Dict[str, int] = {}
+        self.stats = {
+            'events': 0,
+            'snapshots': 0,
+            'unchanged': 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Partycje
+    # ------------------------------------------------------------------
+
+    def _path(self, day: str, suffix: str) -> str:
+        if not _DAY_RE.match(day or ''):
+            raise ValueError(f'Niepoprawny dzień partycji: {day!r}')
+        return os.path.join(self.root, day + suffix)
+
+    def _append(self, path: str, line: str) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        with open(path, 'a', encoding='utf-8', newline='') as fh:
+            fh.write(line)
+
+    def days(self) -> List[str]:
+        """Dni z partycjami (rosnąco)."""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name[:-len(EVENTS_SUFFIX)] for name in os.listdir(self.root) if name.endswith(EVENTS_SUFFIX))
+
+    def _read_new(self, day: str, suffix: str) -> List[str]:
+        # Linie dopisane od ostatniego odczytu (także przez inne procesy); urwana ostatnia linia czeka
+        path = self._path(day, suffix)
+        offset = self._offsets.get(path, 0)
+        if not os.path.exists(path) or os.path.getsize(path) <= offset:
+            return []
+        with open(path, 'rb') as fh:
+            fh.seek(offset)
+            data = fh.read()
+        end = data.rfind(b'\n') + 1
+        self._offsets[path] = offset + end
+        return data[:end].decode('utf-8', errors='replace').splitlines()
+
+    def _load(self, day: str) -> None:
+        # Wywoływane pod self._lock
+        events = self._events.setdefault(day, {})
+        last = self._last.setdefault(day, {})
+        for line in self._read_new(day, EVENTS_SUFFIX):
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            events.setdefault(event['event_id'], event)
+        for values in csv.reader(self._read_new(day, ODDS_SUFFIX)):
+            row = _odds_row(values)
+            if row:
+                last[(row['event_id'], row['bookmaker'])] = (row['home'], row['draw'], row['away'])
+
+    def forget(self, before_day: Optional[str] = None) -> None:
+        """Zwalnia z pamięci partycje dni wcześniejszych niż ``before_day`` (None = wszystkie)."""
+        with self._lock:
+            for day in [d for d in self._events if before_day is None or d < before_day]:
+                self._events.pop(day, None)
+                self._last.pop(day, None)
+                for suffix in (EVENTS_SUFFIX, ODDS_SUFFIX):
+                    self._offsets.pop(self._path(day, suffix), None)
+
+    def _read_odds(self, day: str, event_id: Optional[str] = None) -> Iterable[Dict]:
+        path = self._path(day, ODDS_SUFFIX)
+        if not os.path.exists(path):
+            return
+        with open(path, encoding='utf-8', newline='') as fh:
+            for values in csv.reader(fh):
+                row = _odds_row(values)
+                if row and (not event_id or row['event_id'] == event_id):
+                    yield row
+
+    # ------------------------------------------------------------------
+    # Zapis
+    # ------------------------------------------------------------------
+
+    def register(self, event_id: str, day: str, kickoff_ts: Optional[float], sport: str = 'football',
+                 url: Optional[str] = None, home_team: Optional[str] = None, away_team: Optional[str] = None) -> bool:
+        """Dodaje wydarzenie do partycji dnia (raz); zwraca True, gdy nowe."""
+        with self._lock:
+            self._load(day)
+            if event_id in self._events[day]:
+                return False
+            event = {'event_id': event_id, 'kickoff': kickoff_ts, 'sport': sport, 'url': url,
+                     'home_team': home_team, 'away_team': away_team}
+            self._append(self._path(day, EVENTS_SUFFIX), json.dumps(event, ensure_ascii=False) + '\n')
+            self._events[day][event_id] = event
+            self.stats['events'] += 1
+            return True
+
+    def record(self, event_id: str, day: str, bookmaker: str, home_odds=None, draw_odds=None, away_odds=None,
+               ts: Optional[float] = None) -> bool:
+        """Dopisuje snapshot kursów bukmachera; pomija brak kursów i niezmienioną linię."""
+        prices = (_price(home_odds), _price(draw_odds), _price(away_odds))
+        if not bookmaker or not any(prices):
+            return False
+        with self._lock:
+            self._load(day)
+            key = (event_id, bookmaker)
+            if self._last[day].get(key) == prices:
+                self.stats['unchanged'] += 1
+                return False
+            ts = time.time() if ts is None else ts
+            line = ','.join([f'{ts:.0f}', event_id, bookmaker.replace(',', ' ')] + [_csv_price(p) for p in prices])
+            self._append(self._path(day, ODDS_SUFFIX), line + '\n')
+            self._last[day][key] = prices
+            self.stats['snapshots'] += 1
+            return True
+
+    def record_rows(self, rows: Iterable[Dict], day: str, stubs: Optional[Dict[str, Dict]] = None,
+                    ts: Optional[float] = None, odds: Optional[Dict[str, Dict]] = None) -> int:
+        """
+        Rejestruje mecze runu scrapera i ich kursy (pierwszy punkt serii).
+
+        event_id i godzina startu ze stubu listingu, inaczej z URL-a / match_time.
+        Kursy zapisywane per bukmacher - z ``bookmakers`` wyniku batcha kursów
+        (``odds``: {event_id: kursy}, domyślnie pamięć batcha runu), tak jak
+        zapisuje je OddsRefresher; łączona etykieta '--odds-best-price'
+        ('Pinnacle / Bet365') nigdy nie trafia do historii.
+        Zwraca liczbę zarejestrowanych wydarzeń.
+        """
+        if odds is None:
+            from livesport_odds_api import get_batch_odds
+        else:
+            get_batch_odds = odds.get
+        registered = 0
+        for row in rows:
+            url = row.get('match_url') or ''
+            stub = (stubs or {}).get(url) or {}
+            match = _EVENT_ID_RE.search(url)
+            event_id = stub.get('event_id') or (match.group(1) if match else None)
+            if not event_id:
+                continue
+            kickoff = kickoff_timestamp(day, stub.get('kickoff')) or kickoff_timestamp(day, row.get('match_time'))
+            registered += self.register(event_id, day, kickoff, row.get('sport') or stub.get('sport') or 'football',
+                                        url, row.get('home_team'), row.get('away_team'))
+            bookmakers = (get_batch_odds(event_id) or {}).get('bookmakers')
+            if bookmakers:
+                for bookmaker, prices in bookmakers.items():
+                    self.record(event_id, day, bookmaker, prices.get('home_odds'), prices.get('draw_odds'),
+                                prices.get('away_odds'), ts=ts)
+            elif ' / ' not in (row.get('odds_bookmaker') or ''):
+                self.record(event_id, day, row.get('odds_bookmaker'), row.get('home_odds'), row.get('draw_odds'),
+                            row.get('away_odds'), ts=ts)
+        return registered
+
+    # ------------------------------------------------------------------
+    # Odczyt
+    # ------------------------------------------------------------------
+
+    def events(self, day: str) -> Dict[str, Dict]:
+        with self._lock:
+            self._load(day)
+            return dict(self._events[day])
+
+    def events_in_window(self, now: Optional[float] = None,
+                         window_hours: float = DEFAULT_WINDOW_HOURS) -> List[Tuple[str, Dict]]:
+        """
+        [(dzień, wydarzenie)] z kickoff w (now, now + okno].
+
+        Czytane są tylko partycje dni pokrywających okno (+ poprzedni dzień:
+        mecz po północy bywa na liście poprzedniego dnia).
+        """
+        now = time.time() if now is None else now
+        end = now + window_hours * 3600
+        day = datetime.fromtimestamp(now).date() - timedelta(days=1)
+        last_day = datetime.fromtimestamp(end).date()
+        self.forget(day.isoformat())
+        found = []
+        while day <= last_day:
+            day_str = day.isoformat()
+            for event in self.events(day_str).values():
+                kickoff = event.get('kickoff')
+                if kickoff and now < kickoff <= end:
+                    found.append((day_str, event))
+            day += timedelta(days=1)
+        return found
+
+    def find_day(self, event_id: str, around: Optional[str] = None, days: int = 1) -> Optional[str]:
+        """Dzień partycji wydarzenia - szukany w ``around`` ± ``days`` (domyślnie dziś)."""
+        center = datetime.strptime(around, '%Y-%m-%d').date() if around else datetime.now().date()
+        for offset in sorted(range(-days, days + 1), key=abs):
+            day = (center + timedelta(days=offset)).isoformat()
+            if event_id in self.events(day):
+                return day
+        return None
+
+    def movement(self, event_id: str, day: str) -> Dict:
+        """
+        Seria kursów wydarzenia: {'event': ..., 'series': {bukmacher: [{'ts', 'home', 'draw', 'away'}]},
+        'change': {bukmacher: {'home': różnica ostatni - pierwszy, ...}}}.
+        """
+        series: Dict[str, List[Dict]] = {}
+        for row in self._read_odds(day, event_id):
+            series.setdefault(row['bookmaker'], []).append(
+                {'ts': row['ts'], 'home': row['home'], 'draw': row['draw'], 'away': row['away']})
+        change = {}
+        for bookmaker, points in series.items():
+            points.sort(key=lambda p: p['ts'])
+            first, last = points[0], points[-1]
+            change[bookmaker] = {o: round(last[o] - first[o], 3) if first[o] and last[o] else None
+                                 for o in ('home', 'draw', 'away')}
+        return {'event': self.events(day).get(event_id), 'day': day, 'series': series, 'change': change}
+
+    def format_report(self) -> str:
+        s = self.stats
+        return (f"📈 Historia kursów: {s['events']} nowych wydarzeń, {s['snapshots']} snapshotów "
+                f"({s['unchanged']} bez zmian pominiętych) w {self.root}")
+
+
+class OddsRefresher:
+    """
+    Odświeża kursy tylko meczów startujących w oknie ``window_hours``.
+
+    Args:
+        history: OddsHistory
+        window_hours: Okno przed startem meczu [h]
+        fetch: Funkcja {event_id: sport} -> {event_id: {'bookmakers': {nazwa: kursy}}}
+               (domyślnie LivesportOddsBatch z porównaniem bukmacherów)
+        concurrency: Równoległe wydarzenia domyślnego batcha
+    """
+
+    def __init__(self, history: OddsHistory, window_hours: float = DEFAULT_WINDOW_HOURS,
+                 fetch: Callable[[Dict[str, str]], Dict[str, Dict]] = None, concurrency: int = 8):
+        self.history = history
+        self.window_hours = window_hours
+        self.fetch = fetch or self._batch_fetch
+        self.concurrency = concurrency
+        self.stats = {
+            'runs': 0,
+            'polled': 0,
+            'snapshots': 0,
+            'time_s': 0.0,
+        }
+
+    def _batch_fetch(self, events: Dict[str, str]) -> Dict[str, Dict]:
+        from livesport_odds_api import LivesportOddsBatch
+        return LivesportOddsBatch(concurrency=self.concurrency, best_price=True).fetch(events)
+
+    def run(self, now: Optional[float] = None) -> int:
+        """Jedno odświeżenie; zwraca liczbę nowych snapshotów."""
+        t0 = time.time()
+        due = self.history.events_in_window(now, self.window_hours)
+        days = {event['event_id']: day for day, event in due}
+        added = 0
+        if due:
+            results = self.fetch({event['event_id']: event.get('sport') or 'football' for _, event in due})
+            ts = time.time() if now is None else now
+            for event_id, odds in results.items():
+                for bookmaker, prices in (odds.get('bookmakers') or {}).items():
+                    added += self.history.record(event_id, days[event_id], bookmaker, prices.get('home_odds'),
+                                                 prices.get('draw_odds'), prices.get('away_odds'), ts=ts)
+        self.stats['runs'] += 1
+        self.stats['polled'] += len(due)
+        self.stats['snapshots'] += added
+        self.stats['time_s'] += time.time() - t0
+        return added
+
+    def format_report(self) -> str:
+        s = self.stats
+        return (f"📈 Odświeżanie kursów: {s['runs']} przebiegów, {s['polled']} meczów w oknie "
+                f"{self.window_hours:g}h, {s['snapshots']} nowych snapshotów w {s['time_s']:.1f}s")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Odświeżanie historii kursów meczów przed startem')
+    parser.add_argument('--window-hours', type=float, default=DEFAULT_WINDOW_HOURS,
+                        help=f'Okno przed startem meczu [h] (domyślnie {DEFAULT_WINDOW_HOURS:g})')
+    parser.add_argument('--every-minutes', type=float, default=0,
+                        help='Powtarzaj co N minut (0 = jeden przebieg)')
+    parser.add_argument('--dir', default=None, help=f'Katalog historii (domyślnie {ODDS_HISTORY_DIR_ENV} lub {DEFAULT_HISTORY_DIR})')
+    parser.add_argument('--concurrency', type=int, default=8, help='Równoległe zapytania o kursy')
+    args = parser.parse_args(argv)
+
+    refresher = OddsRefresher(OddsHistory(args.dir), window_hours=args.window_hours, concurrency=args.concurrency)
+    while True:
+        refresher.run()
+        print(refresher.format_report())
+        if args.every_minutes <= 0:
+            return 0
+        time.sleep(args.every_minutes * 60)
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
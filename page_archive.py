@@ -0,0 +1,510 @@
+"""
+Page Archive - nagrywanie i odtwarzanie stron (record / replay)
+===============================================================
+
+Każdy run scrapera trafia na żywe strony, więc pomiarów wydajności nie da
+się powtórzyć. Archiwum zapisuje lokalnie wszystko, co scraper odczytał:
+
+    page   - ``driver.page_source`` (Chrome: Livesport, Forebet, SofaScore)
+    http   - odpowiedzi requests / curl_cffi (SofaScore API, Forebet,
+             Livesport odds GraphQL, dokumenty H2H przez HTTP)
+
+Treść jest adresowana zawartością (``blobs/ab/<sha256>`` - ta sama strona
+zapisana raz), a ``index.jsonl`` mapuje klucz (URL żądany w ``driver.get``
+albo metoda + URL + parametry + hash body) na kolejne odczyty. Replay
+oddaje odczyty w tej samej kolejności (po ostatnim - ostatni), więc
+powtórzony dzień ``scrape_and_send_email`` daje te same wyniki bez sieci.
+
+W replay ``ReplayDriver`` zastępuje Chrome: ``get()`` tylko zmienia URL,
+``page_source`` zwraca nagranie, ``find_elements`` (CSS) szuka w nagranym
+HTML, kliknięcie linku zmienia tylko ``current_url``, skrypty są no-op.
+Brak nagrania żądania HTTP = wyjątek ``ArchiveMiss`` (ConnectionError -
+obsługiwany jak błąd sieci).
+
+Nie są archiwizowane: Gemini (SDK Google), SMTP, Supabase - w replay
+scrape_and_notify nie wysyła emaili ani danych na zewnątrz.
+
+Użycie:
+    archive = enable_archive('archives/2025-11-17', 'record')   # albo 'replay'
+    driver = archived_driver(lambda: start_driver(headless=True))
+    ...
+    print(archive.format_report())
+    archive.close()
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlencode, urljoin
+
+logger = logging.getLogger(__name__)
+
+MODES = ('off', 'record', 'replay')
+INDEX_FILE = 'index.jsonl'
+BLOBS_DIR = 'blobs'
+
+
+class ArchiveMiss(ConnectionError):
+    """Żądanie nie zostało nagrane (replay)."""
+
+
+def _sha256(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def request_key(method: str, url: str, params=None, data=None, json_body=None) -> str:
+    """Klucz żądania HTTP: metoda + URL z parametrami + hash body (bez nagłówków)."""
+    key = f"{(method or 'GET').upper()} {url}"
+    if params:
+        items = sorted(params.items()) if isinstance(params, dict) else list(params)
+        key += ('&' if '?' in url else '?') + urlencode(items, doseq=True)
+    body = None
+    if json_body is not None:
+        body = json.dumps(json_body, sort_keys=True, default=str).encode('utf-8')
+    elif data is not None:
+        if isinstance(data, dict):
+            data = urlencode(sorted(data.items()), doseq=True)
+        body = data if isinstance(data, bytes) else str(data).encode('utf-8')
+    if body:
+        key += f" body={_sha256(body)[:16]}"
+    return key
+
+
+class PageArchive:
+    """
+    Archiwum stron i odpowiedzi HTTP adresowane zawartością.
+
+    Args:
+        root: Katalog archiwum (None = wyłączone)
+        mode: 'off' / 'record' / 'replay'
+        fresh: W record - zacznij nowy indeks (bloby zostają, deduplikacja)
+    """
+
+    def __init__(self, root: Optional[str] = None, mode: str = 'off', fresh: bool = True):
+        if mode not in MODES:
+            raise ValueError(f"Nieznany tryb archiwum: {mode} (dozwolone: {', '.join(MODES)})")
+        if mode != 'off' and not root:
+            raise ValueError("Archiwum w trybie record/replay wymaga katalogu")
+        self.root = root
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, str], List[Dict]] = {}
+        self._cursor: Dict[Tuple[str, str], int] = {}
+        self._index = None
+        self.stats = {
+            'recorded': 0,
+            'replayed': 0,
+            'misses': 0,
+            'dedup': 0,       # zapisy, których treść była już w archiwum
+            'bytes': 0,       # nowe bajty zapisane (record) / oddane (replay)
+        }
+
+        if mode == 'record':
+            os.makedirs(os.path.join(root, BLOBS_DIR), exist_ok=True)
+            self._index = open(self.index_path, 'w' if fresh else 'a', encoding='utf-8')
+        elif mode == 'replay':
+            self._load_index()
+
+    @property
+    def index_path(self) -> str:
+        return os.path.join(self.root, INDEX_FILE)
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == 'record'
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == 'replay'
+
+    def _blob_path(self, sha: str) -> str:
+        return os.path.join(self.root, BLOBS_DIR, sha[:2], sha)
+
+    def _load_index(self) -> None:
+        if not os.path.exists(self.index_path):
+            raise FileNotFoundError(f"Brak archiwum do odtworzenia: {self.index_path}")
+        with open(self.index_path, encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # urwana ostatnia linia (przerwany record)
+                self._entries.setdefault((entry['kind'], entry['key']), []).append(entry)
+
+    # ------------------------------------------------------------------
+    # Zapis / odczyt
+    # ------------------------------------------------------------------
+    def store(self, kind: str, key: str, content: bytes, **meta) -> Optional[str]:
+        """Zapisuje kolejny odczyt ``key`` (record). Zwraca sha256 treści."""
+        if not self.recording:
+            return None
+        content = content or b''
+        sha = _sha256(content)
+        path = self._blob_path(sha)
+        with self._lock:
+            if os.path.exists(path):
+                self.stats['dedup'] += 1
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp = f"{path}.{threading.get_ident()}.tmp"
+                with open(tmp, 'wb') as f:
+                    f.write(content)
+                os.replace(tmp, path)
+                self.stats['bytes'] += len(content)
+            seq = self._cursor.get((kind, key), 0)
+            self._cursor[(kind, key)] = seq + 1
+            entry = {'kind': kind, 'key': key, 'seq': seq, 'sha': sha, 'ts': round(time.time(), 3)}
+            entry.update(meta)
+            self._index.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            self._index.flush()
+            self.stats['recorded'] += 1
+        return sha
+
+    def _select(self, kind: str, key: str, advance: bool) -> Optional[Dict]:
+        with self._lock:
+            entries = self._entries.get((kind, key))
+            if not entries:
+                if advance:
+                    self.stats['misses'] += 1
+                return None
+            seq = self._cursor.get((kind, key), 0)
+            if advance:
+                self._cursor[(kind, key)] = seq + 1
+            return entries[min(seq, len(entries) - 1)]
+
+    def load(self, kind: str, key: str, advance: bool = True) -> Optional[Tuple[Dict, bytes]]:
+        """Kolejny nagrany odczyt ``key`` (replay) albo None."""
+        entry = self._select(kind, key, advance)
+        if entry is None:
+            return None
+        with open(self._blob_path(entry['sha']), 'rb') as f:
+            content = f.read()
+        if advance:
+            with self._lock:
+                self.stats['replayed'] += 1
+                self.stats['bytes'] += len(content)
+        return entry, content
+
+    # ------------------------------------------------------------------
+    # Strony (driver.page_source)
+    # ------------------------------------------------------------------
+    def record_page(self, url: str, html: Optional[str]) -> None:
+        self.store('page', url or '', (html or '').encode('utf-8'))
+
+    def replay_page(self, url: str, advance: bool = True) -> Optional[str]:
+        hit = self.load('page', url or '', advance=advance)
+        return hit[1].decode('utf-8') if hit else None
+
+    def wrap_driver(self, driver):
+        """RecordingDriver w trybie record, w pozostałych driver bez zmian."""
+        return RecordingDriver(driver, self) if self.recording and driver is not None else driver
+
+    # ------------------------------------------------------------------
+    # HTTP (requests / curl_cffi)
+    # ------------------------------------------------------------------
+    def http_request(self, original: Callable, session, method: str, url: str, *args, **kwargs):
+        """Wywołanie ``Session.request`` przez archiwum (patrz install_http_hooks)."""
+        key = request_key(method, url,
+                          params=kwargs.get('params', args[0] if args else None),
+                          data=kwargs.get('data', args[1] if len(args) > 1 else None),
+                          json_body=kwargs.get('json'))
+        if self.replaying:
+            hit = self.load('http', key)
+            if hit is None:
+                raise ArchiveMiss(f"Brak nagrania: {key[:160]}")
+            return ArchivedResponse(hit[0], hit[1])
+
+        response = original(session, method, url, *args, **kwargs)
+        if self.recording:
+            try:
+                headers = getattr(response, 'headers', None) or {}
+                self.store('http', key, response.content or b'',
+                           status=response.status_code,
+                           url=str(getattr(response, 'url', url)),
+                           content_type=headers.get('content-type', ''),
+                           encoding=getattr(response, 'encoding', None))
+            except Exception as e:
+                logger.warning(f"PageArchive: nie zapisano {key[:120]}: {type(e).__name__}: {e}")
+        return response
+
+    def format_report(self) -> str:
+        s = self.stats
+        if self.mode == 'record':
+            return (f"🎞️ Archiwum (record {self.root}): {s['recorded']} odczytów, "
+                    f"{s['dedup']} zduplikowanych, {s['bytes'] / 1024 / 1024:.1f} MB nowych danych")
+        if self.mode == 'replay':
+            return (f"🎞️ Archiwum (replay {self.root}): {s['replayed']} odczytów z archiwum, "
+                    f"brak nagrania: {s['misses']}")
+        return "🎞️ Archiwum: wyłączone"
+
+    def close(self) -> None:
+        with self._lock:
+            if self._index is not None:
+                self._index.close()
+                self._index = None
+
+
+class ArchivedResponse:
+    """Odpowiedź HTTP odtworzona z archiwum (podzbiór API requests / curl_cffi)."""
+
+    def __init__(self, entry: Dict, content: bytes):
+        self.status_code = entry.get('status', 200)
+        self.url = entry.get('url') or entry['key']
+        self.content = content
+        self.encoding = entry.get('encoding') or 'utf-8'
+        self.headers = {'content-type': entry.get('content_type', '')}
+        self.cookies = {}
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding, errors='replace')
+
+    def json(self, **kwargs):
+        return json.loads(self.text, **kwargs)
+
+    def raise_for_status(self) -> None:
+        if not self.ok:
+            import requests
+            raise requests.HTTPError(f"{self.status_code} (archiwum) dla {self.url}", response=self)
+
+
+class RecordingDriver:
+    """Proxy WebDrivera zapisujące każdy ``page_source`` pod URL z ostatniego ``get()``."""
+
+    def __init__(self, driver, archive: PageArchive):
+        object.__setattr__(self, '_driver', driver)
+        object.__setattr__(self, '_archive', archive)
+        object.__setattr__(self, '_requested_url', None)
+
+    def get(self, url: str):
+        object.__setattr__(self, '_requested_url', url)
+        return self._driver.get(url)
+
+    @property
+    def page_source(self) -> str:
+        html = self._driver.page_source
+        self._archive.record_page(self._requested_url or self._driver.current_url, html)
+        return html
+
+    def __getattr__(self, name):
+        return getattr(self._driver, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._driver, name, value)
+
+
+class ReplayElement:
+    """
+    Element z nagranego HTML (tekst i atrybuty). Kliknięcie linku zmienia tylko
+    ``current_url`` drivera (jak przełączenie zakładki SPA) - treść nadal pochodzi
+    z nagrań pod URL z ostatniego ``get()``.
+    """
+
+    def __init__(self, tag, driver: 'ReplayDriver' = None):
+        self._tag = tag
+        self._driver = driver
+
+    @property
+    def text(self) -> str:
+        return self._tag.get_text(' ', strip=True)
+
+    @property
+    def tag_name(self) -> str:
+        return self._tag.name
+
+    def get_attribute(self, name: str):
+        value = self._tag.get(name)
+        return ' '.join(value) if isinstance(value, list) else value
+
+    def is_displayed(self) -> bool:
+        return True
+
+    def click(self) -> None:
+        href = self._tag.get('href')
+        if href and self._driver is not None:
+            self._driver.current_url = urljoin(self._driver.current_url, href)
+
+    def find_elements(self, by: str, value: str) -> List['ReplayElement']:
+        if by != 'css selector':
+            return []
+        return [ReplayElement(tag, self._driver) for tag in self._tag.select(value)]
+
+    def find_element(self, by: str, value: str) -> 'ReplayElement':
+        found = self.find_elements(by, value)
+        if not found:
+            from selenium.common.exceptions import NoSuchElementException
+            raise NoSuchElementException(f"Replay: brak elementu {value}")
+        return found[0]
+
+
+class ReplayDriver:
+    """
+    Zastępuje Chrome w replay. Wspiera to, czego używa scraper: get, current_url,
+    page_source, title, find_element(s) po CSS, kliknięcie linku; skrypty i timeouty są no-op.
+    """
+
+    def __init__(self, archive: PageArchive):
+        self._archive = archive
+        self.current_url = 'about:blank'
+        self._requested_url = 'about:blank'
+        self._html = None
+        self._soup = None
+        self.service = None
+
+    def get(self, url: str) -> None:
+        self.current_url = url
+        self._requested_url = url
+        self._html = None
+        self._soup = None
+
+    @property
+    def page_source(self) -> str:
+        html = self._archive.replay_page(self._requested_url)
+        self._html = html or '<html><head></head><body></body></html>'
+        self._soup = None
+        return self._html
+
+    def _current_soup(self):
+        if self._soup is None:
+            from html_parsing import make_soup
+            html = self._html
+            if html is None:  # find_elements przed page_source - podgląd bez przesuwania kolejki
+                html = self._archive.replay_page(self._requested_url, advance=False) or ''
+            self._soup = make_soup(html)
+        return self._soup
+
+    @property
+    def title(self) -> str:
+        soup = self._current_soup()
+        return soup.title.get_text(strip=True) if soup.title else ''
+
+    def find_elements(self, by: str, value: str) -> List[ReplayElement]:
+        if by != 'css selector':
+            return []  # XPath / link text - brak wsparcia, scraper ma fallbacki
+        return [ReplayElement(tag, self) for tag in self._current_soup().select(value)]
+
+    def find_element(self, by: str, value: str) -> ReplayElement:
+        found = self.find_elements(by, value)
+        if not found:
+            from selenium.common.exceptions import NoSuchElementException
+            raise NoSuchElementException(f"Replay: brak elementu {value}")
+        return found[0]
+
+    def execute_script(self, script: str, *args):
+        return None
+
+    def execute_cdp_cmd(self, cmd: str, params: Dict = None) -> Dict:
+        return {}
+
+    def get_log(self, log_type: str) -> List:
+        return []
+
+    def refresh(self) -> None:
+        self._html = None
+        self._soup = None
+
+    def set_page_load_timeout(self, seconds: float) -> None:
+        pass
+
+    def set_script_timeout(self, seconds: float) -> None:
+        pass
+
+    def implicitly_wait(self, seconds: float) -> None:
+        pass
+
+    def delete_all_cookies(self) -> None:
+        pass
+
+    def quit(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+# ----------------------------------------------------------------------
+# Globalne archiwum (domyślnie wyłączone) + hooki HTTP
+# ----------------------------------------------------------------------
+ARCHIVE = PageArchive()
+
+_ORIGINAL_REQUEST: Dict[type, Callable] = {}
+
+
+def _session_classes() -> List[type]:
+    classes = []
+    try:
+        import requests
+        classes.append(requests.Session)
+    except ImportError:
+        pass
+    try:
+        from curl_cffi import requests as curl_requests
+        classes.append(curl_requests.Session)
+    except ImportError:
+        pass
+    return classes
+
+
+def install_http_hooks() -> None:
+    """
+    Podpina archiwum pod ``Session.request`` requests i curl_cffi - obejmuje też
+    ``requests.get`` / ``curl_requests.get``, które tworzą sesję wewnętrznie.
+    """
+    for cls in _session_classes():
+        if cls in _ORIGINAL_REQUEST:
+            continue
+        original = cls.request
+        _ORIGINAL_REQUEST[cls] = original
+
+        def request(session, method, url, *args, _original=original, **kwargs):
+            if ARCHIVE.mode == 'off':
+                return _original(session, method, url, *args, **kwargs)
+            return ARCHIVE.http_request(_original, session, method, url, *args, **kwargs)
+
+        cls.request = request
+
+
+def uninstall_http_hooks() -> None:
+    for cls, original in _ORIGINAL_REQUEST.items():
+        cls.request = original
+    _ORIGINAL_REQUEST.clear()
+
+
+def enable_archive(root: str, mode: str, fresh: bool = True) -> PageArchive:
+    """Włącza archiwum dla całego procesu (--record / --replay) i zwraca je."""
+    global ARCHIVE
+    ARCHIVE.close()
+    ARCHIVE = PageArchive(root, mode, fresh=fresh)
+    if mode != 'off':
+        install_http_hooks()
+    logger.info(f"Archiwum stron: {mode} {root}")
+    return ARCHIVE
+
+
+def disable_archive() -> None:
+    global ARCHIVE
+    ARCHIVE.close()
+    ARCHIVE = PageArchive()
+    uninstall_http_hooks()
+
+
+def get_archive() -> PageArchive:
+    return ARCHIVE
+
+
+def archived_driver(factory: Callable[[], object]):
+    """Driver z ``factory`` nagrywany w record; w replay ReplayDriver bez uruchamiania Chrome."""
+    if ARCHIVE.replaying:
+        return ReplayDriver(ARCHIVE)
+    return ARCHIVE.wrap_driver(factory())
@@ -0,0 +1,286 @@
+"""
+Resource Blocking - profile blokowania zasobów Chrome (CDP)
+============================================================
+
+Strony Livesport ciągną obrazki, fonty, iframe'y reklamowe, analitykę
+i odtwarzacze wideo, których parser nigdy nie czyta. Profil blokowania
+ustawia ``Network.setBlockedURLs`` przez Chrome DevTools Protocol oraz
+content-settings prefs (pluginy, geolokalizacja, kamera).
+
+Profile:
+    off        - nic nie blokujemy (domyślnie)
+    light      - reklamy, analityka, odtwarzacze wideo
+    aggressive - light + obrazki, fonty, media
+
+Każdy sport może mieć własną allowlistę grup (SPORT_ALLOWLISTS) -
+zablokowane wzorce są przeliczane przy zmianie sportu na tym samym driverze.
+
+Raport per run (BLOCKING_STATS): liczba zablokowanych requestów per typ,
+przesłane bajty oraz SZACOWANE oszczędności bajtów i czasu.
+
+Użycie:
+    chrome_options = Options()
+    configure_chrome_options(chrome_options, 'aggressive')
+    driver = webdriver.Chrome(options=chrome_options)
+    apply_blocking_profile(driver, 'aggressive', sport='football')
+    ...
+    collect_blocking_stats(driver)
+    print(BLOCKING_STATS.format_report())
+"""
+
+import json
+import logging
+import os
+import threading
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+BLOCK_PROFILE_ENV = 'LIVESPORT_BLOCK_PROFILE'
+
+# Grupy wzorców URL (składnia Network.setBlockedURLs: '*' = dowolny ciąg)
+RESOURCE_GROUPS: Dict[str, List[str]] = {
+    'images': ['*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.avif', '*.svg', '*.ico',
+               '*/res/image/*'],
+    'fonts': ['*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot'],
+    'media': ['*.mp4', '*.webm', '*.m3u8', '*.mp3'],
+    'ads': ['*doubleclick.net*', '*googlesyndication.com*', '*adservice.google.*',
+            '*googleadservices.com*', '*adnxs.com*', '*criteo.*', '*taboola.com*',
+            '*outbrain.com*', '*amazon-adsystem.com*', '*smartadserver.com*', '*rubiconproject.com*'],
+    'analytics': ['*googletagmanager.com*', '*google-analytics.com*', '*scorecardresearch.com*',
+                  '*hotjar.com*', '*facebook.net*', '*connect.facebook.*', '*gemius.pl*',
+                  '*chartbeat.*', '*newrelic.com*', '*nr-data.net*'],
+    'video': ['*imasdk.googleapis.com*', '*jwplayer*', '*jwpcdn.com*', '*youtube.com/embed*',
+              '*vimeo.com*'],
+}
+
+BLOCKING_PROFILES: Dict[str, List[str]] = {
+    'off': [],
+    'light': ['ads', 'analytics', 'video'],
+    'aggressive': ['ads', 'analytics', 'video', 'images', 'fonts', 'media'],
+}
+
+# Grupy, których dany sport NIE chce blokować (nadpisuje profil).
+# Parsery czytają tekst i klasy CSS, więc domyślnie allowlisty są puste;
+# wpis tutaj wystarczy, gdy jakiś widok zacznie polegać na zasobie.
+SPORT_ALLOWLISTS: Dict[str, List[str]] = {
+    'football': [],
+    'basketball': [],
+    'volleyball': [],
+    'handball': [],
+    'rugby': [],
+    'hockey': [],
+    'tennis': [],
+}
+
+# Typowy rozmiar zablokowanego zasobu (bajty) - używany tylko gdy w tym
+# runie nie pobrano żadnego zasobu danego typu, z którego dałoby się policzyć średnią.
+TYPICAL_RESOURCE_BYTES: Dict[str, int] = {
+    'Image': 18_000,
+    'Font': 40_000,
+    'Media': 250_000,
+    'Script': 60_000,
+    'XHR': 4_000,
+    'Fetch': 4_000,
+    'Document': 30_000,
+    'Stylesheet': 20_000,
+    'Other': 5_000,
+}
+
+
+def get_block_profile(profile: Optional[str] = None) -> str:
+    """Nazwa profilu: argument > zmienna środowiskowa > 'off'."""
+    profile = profile or os.getenv(BLOCK_PROFILE_ENV, 'off')
+    if profile not in BLOCKING_PROFILES:
+        logger.warning(f"Nieznany profil blokowania '{profile}' - używam 'off'")
+        return 'off'
+    return profile
+
+
+def blocked_groups(profile: str, sport: Optional[str] = None) -> List[str]:
+    """Grupy zasobów blokowane w profilu po odjęciu allowlisty sportu."""
+    allow = set(SPORT_ALLOWLISTS.get(sport, []) if sport else [])
+    return [g for g in BLOCKING_PROFILES.get(profile, []) if g not in allow]
+
+
+def blocked_url_patterns(profile: str, sport: Optional[str] = None) -> List[str]:
+    """Lista wzorców dla Network.setBlockedURLs."""
+    patterns = []
+    for group in blocked_groups(profile, sport):
+        patterns.extend(RESOURCE_GROUPS[group])
+    return patterns
+
+
+def configure_chrome_options(chrome_options, profile: str) -> None:
+    """
+    Ustawienia startowe Chrome dla profilu: content-settings prefs i performance log.
+
+    Obrazki/fonty/media blokuje CDP (nie prefs) - wtedy każdy zablokowany request
+    trafia do performance logu jako Network.loadingFailed i jest liczony w raporcie.
+    Prefs wyłączają to, czego parser nigdy nie potrzebuje (pluginy, geolokalizacja, kamera).
+    """
+    groups = BLOCKING_PROFILES.get(profile, [])
+    if not groups:
+        return
+
+    prefs = {
+        'profile.managed_default_content_settings.plugins': 2,
+        'profile.managed_default_content_settings.geolocation': 2,
+        'profile.managed_default_content_settings.media_stream': 2,
+    }
+
+    # Dołącz do istniejących prefs (start_driver ustawia już notifications/popups)
+    existing = chrome_options.experimental_options.get('prefs', {})
+    existing.update(prefs)
+    chrome_options.add_experimental_option('prefs', existing)
+
+    # Performance log = zdarzenia Network.* do raportu oszczędności
+    chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+
+def apply_blocking_profile(driver, profile: str, sport: Optional[str] = None) -> bool:
+    """
+    Ustawia (lub przelicza przy zmianie sportu) blokowane URL-e przez CDP.
+    Wywołanie dla tego samego (profil, sport) jest no-op.
+
+    Returns:
+        True jeśli blokowanie jest aktywne na driverze
+    """
+    if not BLOCKING_PROFILES.get(profile):
+        return False
+
+    key = (profile, sport)
+    if getattr(driver, '_blocking_key', None) == key:
+        return True
+
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': blocked_url_patterns(profile, sport)})
+        driver._blocking_key = key
+        return True
+    except Exception as e:
+        logger.debug(f"apply_blocking_profile: CDP niedostępne ({type(e).__name__}: {e})")
+        return False
+
+
+class BlockingStats:
+    """Zbiorcze statystyki blokowania dla całego runu (thread-safe)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.requests = 0
+        self.blocked_by_type: Dict[str, int] = {}
+        self.transferred_bytes = 0
+        self.bytes_by_type: Dict[str, int] = {}
+        self.finished_by_type: Dict[str, int] = {}
+        self.load_time_s = 0.0
+        self.pages = 0
+
+    def ingest(self, events: List[Dict], load_time_s: float = 0.0) -> None:
+        """Przetwarza zdarzenia Network.* (params z performance log)."""
+        types: Dict[str, str] = {}
+        with self._lock:
+            for event in events:
+                method = event.get('method')
+                params = event.get('params', {})
+                request_id = params.get('requestId')
+                if method == 'Network.requestWillBeSent':
+                    self.requests += 1
+                    types[request_id] = params.get('type', 'Other')
+                elif method == 'Network.loadingFailed':
+                    if params.get('blockedReason') or 'BLOCKED_BY_CLIENT' in params.get('errorText', ''):
+                        rtype = params.get('type') or types.get(request_id, 'Other')
+                        self.blocked_by_type[rtype] = self.blocked_by_type.get(rtype, 0) + 1
+                elif method == 'Network.loadingFinished':
+                    size = int(params.get('encodedDataLength', 0) or 0)
+                    rtype = types.get(request_id, 'Other')
+                    self.transferred_bytes += size
+                    self.bytes_by_type[rtype] = self.bytes_by_type.get(rtype, 0) + size
+                    self.finished_by_type[rtype] = self.finished_by_type.get(rtype, 0) + 1
+            if load_time_s > 0:
+                self.load_time_s += load_time_s
+                self.pages += 1
+
+    @property
+    def blocked_requests(self) -> int:
+        return sum(self.blocked_by_type.values())
+
+    def estimated_saved_bytes(self) -> int:
+        """Bajty niepobrane: średni rozmiar zasobu danego typu z tego runu (lub typowy)."""
+        saved = 0
+        for rtype, count in self.blocked_by_type.items():
+            finished = self.finished_by_type.get(rtype, 0)
+            if finished:
+                avg = self.bytes_by_type.get(rtype, 0) / finished
+            else:
+                avg = TYPICAL_RESOURCE_BYTES.get(rtype, TYPICAL_RESOURCE_BYTES['Other'])
+            saved += int(avg * count)
+        return saved
+
+    def estimated_saved_seconds(self) -> float:
+        """Czas niepobranych bajtów przy przepustowości zmierzonej w tym runie."""
+        if self.load_time_s <= 0 or self.transferred_bytes <= 0:
+            return 0.0
+        throughput = self.transferred_bytes / self.load_time_s
+        return self.estimated_saved_bytes() / throughput
+
+    def summary(self) -> Dict:
+        return {
+            'requests': self.requests,
+            'blocked_requests': self.blocked_requests,
+            'blocked_by_type': dict(self.blocked_by_type),
+            'transferred_mb': round(self.transferred_bytes / 1_048_576, 2),
+            'est_saved_mb': round(self.estimated_saved_bytes() / 1_048_576, 2),
+            'est_saved_s': round(self.estimated_saved_seconds(), 1),
+            'pages': self.pages,
+        }
+
+    def format_report(self) -> str:
+        s = self.summary()
+        if not s['requests']:
+            return "🚫 Blokowanie zasobów: brak danych"
+        by_type = ', '.join(f"{k}:{v}" for k, v in sorted(s['blocked_by_type'].items())) or '-'
+        return (f"🚫 Blokowanie zasobów: {s['blocked_requests']}/{s['requests']} requestów zablokowanych ({by_type})\n"
+                f"   📦 Pobrano: {s['transferred_mb']} MB | zaoszczędzono ~{s['est_saved_mb']} MB, "
+                f"~{s['est_saved_s']}s (szacunek, {s['pages']} stron)")
+
+
+BLOCKING_STATS = BlockingStats()
+
+
+def collect_blocking_stats(driver, stats: BlockingStats = None) -> None:
+    """
+    Opróżnia performance log drivera i dolicza zdarzenia do statystyk runu.
+    Bezpieczne dla driverów bez performance logu (no-op).
+    """
+    if getattr(driver, '_blocking_key', None) is None:
+        return
+    stats = stats or BLOCKING_STATS
+    try:
+        entries = driver.get_log('performance')
+    except Exception:
+        return
+
+    events = []
+    for entry in entries:
+        try:
+            message = json.loads(entry['message'])['message']
+        except (KeyError, ValueError, TypeError):
+            continue
+        if message.get('method', '').startswith('Network.'):
+            events.append(message)
+
+    load_time_s = 0.0
+    try:
+        timing = driver.execute_script(
+            "var t = performance.timing; return [t.navigationStart, t.domContentLoadedEventEnd];"
+        )
+        if timing and timing[0] and timing[1] and timing[1] > timing[0]:
+            load_time_s = (timing[1] - timing[0]) / 1000.0
+    except Exception:
+        pass
+
+    stats.ingest(events, load_time_s)
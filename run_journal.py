@@ -0,0 +1,193 @@
+"""
+Run Journal - dziennik przebiegu scrapowania (JSONL, append-only)
+=================================================================
+
+Każdy przetworzony mecz jest dopisywany raz jako jedna linia JSON
+(``{"url", "status", "ts", "record"}``) - koszt checkpointu nie rośnie
+z długością runu (wcześniej cały CSV był przepisywany przez pandas co
+CHECKPOINT_INTERVAL meczów). Po crashu ``--resume`` pomija URLe, które
+są już w dzienniku.
+
+Ten sam URL może pojawić się kilka razy (np. FAZA 1 -> wzbogacenie w
+FAZIE 2) - obowiązuje ostatni wpis, a kolejność wierszy to kolejność
+pierwszego wystąpienia. Finalny CSV/JSON jest budowany strumieniowo:
+w pamięci trzymane są tylko offsety linii, nie rekordy.
+
+Mecze nieprzetworzone przed końcem budżetu czasu (--time-budget) mają
+status SKIPPED - nie trafiają do wyników, a --resume przetwarza je ponownie.
+
+Użycie:
+    journal = RunJournal(journal_path_for(outfn))
+    done = journal.completed_urls()          # --resume
+    journal.append(url, info)                # po każdym meczu
+    journal.write_csv(outfn)                 # na koniec runu
+"""
+
+import csv
+import json
+import logging
+import math
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_SUFFIX = '.journal.jsonl'
+SKIPPED = 'skipped'
+
+
+def journal_path_for(outfn: str) -> str:
+    """Ścieżka dziennika obok pliku wynikowego (outputs/x.csv -> outputs/x.journal.jsonl)."""
+    base, _ = os.path.splitext(outfn)
+    return base + JOURNAL_SUFFIX
+
+
+def _json_default(value):
+    # numpy / pandas skalary -> typy Pythona, reszta jako tekst
+    if hasattr(value, 'item'):
+        try:
+            return value.item()
+        except (TypeError, ValueError):
+            pass
+    return str(value)
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, float) and math.isnan(value):
+        return ''
+    return value
+
+
+class RunJournal:
+    """
+    Dziennik JSONL jednego runu.
+
+    Args:
+        path: Ścieżka pliku .jsonl (katalog tworzony automatycznie)
+        fresh: True = zacznij od pustego dziennika (run bez --resume)
+    """
+
+    def __init__(self, path: str, fresh: bool = False):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if fresh and os.path.exists(path):
+            os.remove(path)
+
+    def append(self, url: str, record: Dict, status: str = 'done') -> None:
+        """Dopisuje rekord meczu (bezpieczne dla wielu wątków)."""
+        line = json.dumps({'url': url, 'status': status, 'ts': time.time(), 'record': record},
+                          ensure_ascii=False, default=_json_default)
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+                f.flush()
+
+    def _scan(self) -> Iterator[tuple]:
+        """(offset, wpis) dla każdej poprawnej linii; urwana ostatnia linia jest pomijana."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb') as f:
+            offset = 0
+            for raw in f:
+                try:
+                    entry = json.loads(raw)
+                except ValueError:
+                    logger.warning(f"RunJournal: pomijam uszkodzoną linię w {self.path} (offset {offset})")
+                else:
+                    if isinstance(entry, dict) and entry.get('url'):
+                        yield offset, entry
+                offset += len(raw)
+
+    def _latest(self) -> Dict[str, tuple]:
+        """url -> (offset, status) ostatniego wpisu; dict zachowuje kolejność pierwszego wstawienia."""
+        latest: Dict[str, tuple] = {}
+        for offset, entry in self._scan():
+            latest[entry['url']] = (offset, entry.get('status'))
+        return latest
+
+    def completed_urls(self) -> Set[str]:
+        """URLe, które mają już wpis w dzienniku (bez pominiętych)."""
+        return {url for url, (_, status) in self._latest().items() if status != SKIPPED}
+
+    def skipped_urls(self) -> List[str]:
+        """URLe, których ostatni wpis to SKIPPED (w kolejności dziennika)."""
+        return [url for url, (_, status) in self._latest().items() if status == SKIPPED]
+
+    def append_skipped(self, urls: List[str]) -> None:
+        """Zapisuje mecze pominięte przez koniec budżetu czasu."""
+        for url in urls:
+            self.append(url, {'match_url': url}, status=SKIPPED)
+
+    def iter_entries(self, include_skipped: bool = False) -> Iterator[Dict]:
+        """
+        Ostatni wpis dla każdego URLa, w kolejności pierwszego wystąpienia.
+
+        Pierwszy przebieg zapamiętuje tylko offset ostatniej linii danego URLa,
+        drugi czyta te linie po kolei - rekordy nie są trzymane w pamięci.
+        """
+        latest = self._latest()
+        if not latest:
+            return
+        with open(self.path, 'rb') as f:
+            for offset, status in latest.values():
+                if status == SKIPPED and not include_skipped:
+                    continue
+                f.seek(offset)
+                yield json.loads(f.readline())
+
+    def iter_records(self, predicate: Optional[Callable[[Dict], bool]] = None) -> Iterator[Dict]:
+        """Aktualne rekordy meczów (opcjonalnie przefiltrowane)."""
+        for entry in self.iter_entries():
+            record = entry.get('record') or {}
+            if predicate is None or predicate(record):
+                yield record
+
+    def write_csv(self, outfn: str, transform: Optional[Callable[[Dict], Dict]] = None) -> int:
+        """
+        Buduje CSV z dziennika (kolumny = suma kluczy w kolejności wystąpienia).
+
+        Args:
+            outfn: Plik wynikowy (utf-8-sig, jak wcześniejszy zapis przez pandas)
+            transform: Opcjonalna funkcja rekord -> wiersz CSV
+
+        Returns:
+            Liczba zapisanych wierszy
+        """
+        fieldnames: Dict[str, None] = {}
+        for record in self.iter_records():
+            row = transform(dict(record)) if transform else record
+            for key in row:
+                fieldnames.setdefault(key, None)
+
+        count = 0
+        with open(outfn, 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(fieldnames))
+            writer.writeheader()
+            for record in self.iter_records():
+                row = transform(dict(record)) if transform else record
+                writer.writerow({key: _csv_value(value) for key, value in row.items()})
+                count += 1
+        return count
+
+    def write_json(self, outfn: str, predicate: Optional[Callable[[Dict], bool]] = None) -> int:
+        """Zapisuje rekordy jako tablicę JSON (strumieniowo). Zwraca liczbę rekordów."""
+        count = 0
+        with open(outfn, 'w', encoding='utf-8') as f:
+            f.write('[')
+            for record in self.iter_records(predicate):
+                f.write(',\n  ' if count else '\n  ')
+                f.write(json.dumps(record, ensure_ascii=False, indent=2).replace('\n', '\n  '))
+                count += 1
+            f.write('\n]' if count else ']')
+        return count
+
+    def load_records(self) -> List[Dict]:
+        """Wszystkie aktualne rekordy (do wznowienia runu, który i tak trzyma wiersze w pamięci)."""
+        return list(self.iter_records())
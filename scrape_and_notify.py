@@ -10,13 +10,28 @@ FLOW:
 """
 
 import argparse
+import functools
 import os
 import sys
 import json
 import math
 import re
 from datetime import datetime
-from livesport_h2h_scraper import start_driver, get_match_links_from_day, process_match, process_match_tennis, detect_sport_from_url
+from livesport_h2h_scraper import make_driver_factory, get_match_links_from_day, process_match, process_match_tennis, process_url, detect_sport_from_url, PAGE_LOAD_STRATEGY_ENV, apply_listing_stub, prefetch_day_odds
+from resource_blocking import BLOCK_PROFILE_ENV, BLOCKING_STATS, get_block_profile
+from livesport_http import LivesportHttpClient
+from run_journal import RunJournal, journal_path_for
+from browser_recycler import BrowserRecycler
+from disk_cache import H2HCache
+from match_scheduler import MatchScheduler
+from match_worker_pool import MatchWorkerPool
+from tennis_prefetch import DEFAULT_PREFETCH_WORKERS, TennisPrefetcher
+from livesport_odds_api import DEFAULT_BATCH_CONCURRENCY
+from odds_history import OddsHistory
+from enrichment_pipeline import EnrichmentPipeline
+from stage_tracer import enable_tracing, set_trace_match, trace_path_for, trace_span
+from page_archive import enable_archive
+from http_transport import get_transport
 from email_notifier import send_email_notification, send_split_emails_by_sport
 from app_integrator import AppIntegrator, create_integrator_from_config
 import pandas as pd
@@ -91,6 +106,17 @@ def clean_dataframe_for_csv(df):
     
     return df
 
+def clean_journal_row_for_csv(record: dict) -> dict:
+    """
+    Odpowiednik clean_dataframe_for_csv dla pojedynczego rekordu z dziennika runu.
+    """
+    if 'h2h_last5' in record:
+        record['h2h_last5'] = str(record['h2h_last5']) if record['h2h_last5'] else ''
+    for col in ('home_odds', 'draw_odds', 'away_odds'):
+        if col in record:
+            record[col] = clean_odds_value(record[col])
+    return record
+
 # Import FlashScore odds scraper
 try:
     from flashscore_odds_scraper import FlashScoreOddsScraper
@@ -100,6 +126,157 @@ except ImportError:
     print("⚠️ flashscore_odds_scraper.py not found - odds will not be fetched")
 
 
+def _match_date_from_row(row: dict, default_date: str) -> str:
+    """Data meczu YYYY-MM-DD z match_time (DD.MM.YYYY HH:MM) albo data runu."""
+    match_time = row.get('match_time', '')
+    if match_time:
+        date_match = re.search(r'(\d{1,2}\.\d{1,2}\.\d{4})', match_time)
+        if date_match:
+            day, month, year = date_match.group(1).split('.')
+            return f"{year}-{month.zfill(2)}-{day.zfill(2)}"
+    return default_date
+
+
+def enrich_row(row: dict, date: str, search_forebet=None, get_sofascore=None, use_gemini: bool = False) -> bool:
+    """
+    FAZA 2 dla jednego kwalifikującego się meczu: Forebet, SofaScore, Gemini.
+    
+    Wiersz jest modyfikowany w miejscu; komunikaty są wypisywane jednym
+    printem (workery EnrichmentPipeline działają równolegle z FAZĄ 1).
+    
+    Args:
+        search_forebet: forebet_scraper.search_forebet_prediction (None = pomiń)
+        get_sofascore: sofascore_scraper.get_sofascore_prediction (None = pomiń)
+    
+    Returns:
+        True jeśli dodano dane z któregokolwiek źródła
+    """
+    home_team = row.get('home_team', '')
+    away_team = row.get('away_team', '')
+    current_sport = detect_sport_from_url(row.get('match_url', ''))
+    match_date = _match_date_from_row(row, date)
+    log = [f"\n[FAZA 2] {home_team} vs {away_team}"]
+    set_trace_match(row.get('match_url'), current_sport)
+    
+    # FOREBET
+    if search_forebet is not None:
+        try:
+            with trace_span('forebet') as span:
+                forebet_result = search_forebet(
+                    home_team=home_team,
+                    away_team=away_team,
+                    match_date=match_date,
+                    sport=current_sport
+                )
+                if not (forebet_result.get('success') or forebet_result.get('found')):
+                    span['outcome'] = 'miss'
+            
+            if forebet_result.get('success') or forebet_result.get('found'):
+                row['forebet_prediction'] = forebet_result.get('prediction')
+                row['forebet_probability'] = forebet_result.get('probability')
+                row['forebet_exact_score'] = forebet_result.get('exact_score')
+                row['forebet_over_under'] = forebet_result.get('over_under')
+                row['forebet_btts'] = forebet_result.get('btts')
+                row['forebet_avg_goals'] = forebet_result.get('avg_goals')
+                log.append(f"   ✅ Forebet: {row['forebet_prediction']} ({row['forebet_probability']}%)")
+            else:
+                log.append(f"   ⚠️ Forebet: nie znaleziono ({forebet_result.get('error', 'brak')})")
+        except Exception as e:
+            log.append(f"   ❌ Forebet błąd: {str(e)[:50]}")
+    
+    # SOFASCORE
+    if get_sofascore is not None:
+        try:
+            with trace_span('sofascore') as span:
+                sofascore_result = get_sofascore(
+                    home_team=home_team,
+                    away_team=away_team,
+                    sport=current_sport,
+                    date_str=match_date
+                )
+                if not sofascore_result.get('found'):
+                    span['outcome'] = 'miss'
+            
+            if sofascore_result.get('found'):
+                row['sofascore_home_win_prob'] = sofascore_result.get('home_win_prob')
+                row['sofascore_draw_prob'] = sofascore_result.get('draw_prob')
+                row['sofascore_away_win_prob'] = sofascore_result.get('away_win_prob')
+                row['sofascore_total_votes'] = sofascore_result.get('total_votes')
+                log.append(f"   ✅ SofaScore: H:{row['sofascore_home_win_prob']}% D:{row['sofascore_draw_prob']}% A:{row['sofascore_away_win_prob']}%")
+            else:
+                log.append(f"   ⚠️ SofaScore: nie znaleziono")
+        except Exception as e:
+            log.append(f"   ❌ SofaScore błąd: {str(e)[:50]}")
+    
+    # GEMINI AI (jeśli włączone)
+    if use_gemini:
+        try:
+            from gemini_analyzer import analyze_match_with_gemini
+            with trace_span('gemini') as span:
+                gemini_result = analyze_match_with_gemini(row)
+                if not gemini_result:
+                    span['outcome'] = 'miss'
+            if gemini_result:
+                row['gemini_prediction'] = gemini_result.get('prediction')
+                row['gemini_confidence'] = gemini_result.get('confidence')
+                row['gemini_reasoning'] = gemini_result.get('reasoning')
+                row['gemini_recommendation'] = gemini_result.get('recommendation')
+                row['gemini_key_factors'] = gemini_result.get('key_factors', [])
+                row['gemini_risk_factors'] = gemini_result.get('risk_factors', [])
+                log.append(f"   ✅ Gemini: {row['gemini_recommendation']} ({row['gemini_confidence']}%)")
+        except Exception as e:
+            log.append(f"   ❌ Gemini błąd: {str(e)[:50]}")
+    
+    print('\n'.join(log))
+    return bool(row.get('forebet_prediction') or row.get('sofascore_home_win_prob') or row.get('gemini_prediction'))
+
+
+def _print_phase1_outcome(info: dict, away_team_focus: bool = False):
+    """Wypisuje wynik kwalifikacji meczu w FAZIE 1 (tenis / sporty drużynowe)"""
+    if info.get('sport') == 'tennis':
+        player_a_wins = info['home_wins_in_h2h_last5']
+        player_b_wins = info.get('away_wins_in_h2h_last5', 0)
+        advanced_score = info.get('advanced_score', 0)
+        if info['qualifies']:
+            favorite = info.get('favorite', 'unknown')
+            
+            # Określ faworyta
+            if favorite == 'player_a':
+                fav_name = info['home_team']
+            elif favorite == 'player_b':
+                fav_name = info['away_team']
+            else:
+                fav_name = "Równi"
+            
+            print(f"   ✅ KWALIFIKUJE! {info['home_team']} vs {info['away_team']}")
+            print(f"      Faworytem: {fav_name} (Score: {advanced_score:.1f}/100)")
+        else:
+            print(f"   ❌ Nie kwalifikuje (Score: {advanced_score:.1f}/100, H2H: {player_a_wins}-{player_b_wins})")
+        return
+    
+    h2h_count = info.get('h2h_count', 0)
+    win_rate = info.get('win_rate', 0.0)
+    if info['qualifies']:
+        if away_team_focus:
+            wins_count = info.get('away_wins_in_h2h_last5', 0)
+            focused_team = info['away_team']
+        else:
+            wins_count = info['home_wins_in_h2h_last5']
+            focused_team = info['home_team']
+        
+        print(f"   ✅ KWALIFIKUJE! {info['home_team']} vs {info['away_team']}")
+        print(f"      Fokus: {focused_team}, H2H: {wins_count}/{h2h_count} ({win_rate*100:.0f}%)")
+    else:
+        if h2h_count > 0:
+            if away_team_focus:
+                wins_count = info.get('away_wins_in_h2h_last5', 0)
+            else:
+                wins_count = info['home_wins_in_h2h_last5']
+            print(f"   ❌ Nie kwalifikuje ({wins_count}/{h2h_count} = {win_rate*100:.0f}%)")
+        else:
+            print(f"   ⚠️  Brak H2H")
+
+
 def scrape_and_send_email(
     date: str,
     sports: list,
@@ -123,6 +300,22 @@ def scrape_and_send_email(
     odds_limit: int = 15,
     split_emails: bool = False,
     min_odds_threshold: float = 0.0,
+    workers: int = 1,
+    http_first: bool = False,
+    resume: bool = False,
+    use_h2h_cache: bool = False,
+    time_budget_min: float = None,
+    enrich_workers: int = 2,
+    trace: bool = False,
+    record_archive: str = None,
+    replay_archive: str = None,
+    exclude_leagues: list = None,
+    chrome_profile: str = None,
+    warm_spares: int = 1,
+    tennis_prefetch_workers: int = 0,
+    odds_batch: int = 0,
+    odds_best_price: bool = False,
+    odds_history: bool = False,
 ):
     """
     Scrapuje mecze i automatycznie wysyła email z wynikami
@@ -148,6 +341,24 @@ def scrape_and_send_email(
         skip_no_odds: Pomijaj mecze bez kursów bukmacherskich (💰)
         away_team_focus: Szukaj meczów gdzie GOŚCIE mają ≥60% H2H (zamiast gospodarzy) (🏃)
         use_odds: Pobieraj kursy z FlashScore (💰)
+        workers: Liczba równoległych przeglądarek w FAZIE 1 (1 = szeregowo)
+        http_first: Strony H2H w FAZIE 1 przez HTTP (curl_cffi), Chrome tylko jako fallback
+        resume: Wznów przerwany run - mecze z dziennika (outputs/*.journal.jsonl) nie są scrapowane ponownie
+        use_h2h_cache: Trwały cache H2H par drużyn (ten sam mecz w kolejnym runie bez strony H2H)
+        time_budget_min: Budżet czasu scrapowania [min] - najcenniejsze mecze najpierw,
+                         po jego końcu reszta pominięta (email wysyłany z tym, co zebrano)
+        enrich_workers: Liczba wątków FAZY 2 (Forebet/SofaScore/Gemini) działających w tle FAZY 1
+        trace: Spany etapów meczów do outputs/*.trace.jsonl + raport p50/p95/p99
+        record_archive: Katalog archiwum - nagraj strony i odpowiedzi HTTP tego runu
+        replay_archive: Katalog archiwum - odtwórz run bez sieci (email/Supabase/aplikacja pominięte)
+        exclude_leagues: Fragmenty nazw lig pomijanych już na listingu (domyślnie z LIVESPORT_EXCLUDE_LEAGUES)
+        chrome_profile: Katalog trwałych profili Chrome (domyślnie LIVESPORT_CHROME_PROFILE lub outputs/chrome_profile)
+        warm_spares: Ile przeglądarek trzymać rozgrzanych w tle na start/restart (0 = wyłączone)
+        tennis_prefetch_workers: Przeglądarki do pobrania zawodników tenisowych dnia przed meczami
+            (0 = wyłączone; włączony dokłada surface_stats i zmienia scoring tenisa)
+        odds_batch: Równoległe zapytania batcha kursów całego dnia przed meczami (0 = kursy mecz po meczu)
+        odds_best_price: Batch kursów porównuje bukmacherów (najwyższy kurs na wynik) zamiast brać pierwszego
+        odds_history: Zapisz kursy meczów jako pierwszy punkt historii kursów (outputs/odds_history)
     """
     import time as time_module
     import os
@@ -190,22 +401,62 @@ def scrape_and_send_email(
         print(f"🎯 TRYB: Pobieranie predykcji z Forebet")
     if use_gemini:
         print(f"🤖 TRYB: Analiza Gemini AI")
+    if workers > 1:
+        print(f"⚡ TRYB: {workers} równoległych przeglądarek (faza 1)")
+    if http_first:
+        print(f"🌐 TRYB: H2H przez HTTP (Chrome tylko jako fallback)")
+    if resume:
+        print(f"📓 TRYB: Wznowienie z dziennika runu")
+    if use_h2h_cache:
+        print(f"🗄️  TRYB: Cache H2H między runami")
+    if time_budget_min:
+        print(f"⏱️  TRYB: Budżet czasu {time_budget_min:.0f} min (najcenniejsze mecze najpierw)")
     if max_matches:
         print(f"⚠️  TRYB TESTOWY: Limit {max_matches} meczów")
+    archive = None
+    if record_archive or replay_archive:
+        archive = enable_archive(record_archive or replay_archive, 'record' if record_archive else 'replay')
+        print(f"🎞️  TRYB: {'Nagrywanie' if archive.recording else 'Odtwarzanie'} archiwum {archive.root}")
+    replaying = archive is not None and archive.replaying
     print("="*70)
     
-    driver = start_driver(headless=headless)
+    # 🧊 Trwałe profile Chrome + rozgrzany zapasowy driver (start i restarty bez czekania)
+    driver_factory = make_driver_factory(headless, chrome_profile, warm_spares)
+    driver = driver_factory()
     
     try:
         # KROK 1: Zbierz linki
         print("\n🔍 KROK 1/3: Zbieranie linków do meczów...")
-        urls = get_match_links_from_day(driver, date, sports=sports, leagues=None)
+        listing_stubs = {}
+        urls = get_match_links_from_day(driver, date, sports=sports, leagues=None,
+                                        stubs=listing_stubs, exclude_leagues=exclude_leagues)
         print(f"✅ Znaleziono {len(urls)} meczów")
         
+        # ⏱️ Najcenniejsze mecze najpierw (liga, kursy, godzina) + budżet czasu
+        scheduler = MatchScheduler(
+            time_budget_s=time_budget_min * 60 if time_budget_min else None, day=date)
+        urls = scheduler.order(urls, listing_stubs)
+        scheduler.start()
+        
         if max_matches and len(urls) > max_matches:
             urls = urls[:max_matches]
             print(f"⚠️  Ograniczono do {max_matches} meczów (tryb testowy)")
         
+        # 🎾 Zawodnicy tenisowi dnia: każdy pobierany raz (forma, ranking, nawierzchnie)
+        prefetcher = None
+        tennis_players = {}
+        if tennis_prefetch_workers > 0 and any('/tenis/' in u.lower() or 'tennis' in u.lower() for u in urls):
+            print(f"\n🎾 Prefetch zawodników tenisowych ({tennis_prefetch_workers} przeglądarek)...")
+            prefetcher = TennisPrefetcher(driver_factory, workers=tennis_prefetch_workers)
+            tennis_players = prefetcher.run(urls, listing_stubs)
+        
+        # 💰 Kursy całego dnia: jedna sesja keep-alive zamiast zapytań mecz po meczu
+        day_odds = None
+        if odds_batch > 0:
+            print(f"\n💰 Batch kursów dla {len(urls)} meczów ({odds_batch} równolegle)...")
+            day_odds = prefetch_day_odds(urls, listing_stubs, concurrency=odds_batch, best_price=odds_best_price)
+            print(day_odds.format_report())
+        
         # ========================================================================
         # DWUFAZOWY PROCES OPTYMALIZACJI CZASOWEJ
         # FAZA 1: Szybkie sprawdzenie kwalifikacji (bez Forebet/SofaScore)
@@ -223,8 +474,82 @@ def scrape_and_send_email(
         rows = []
         qualifying_count = 0
         qualifying_indices = []  # Indeksy kwalifikujących się meczów
-        RESTART_INTERVAL = 80  # Zwiększone — mniej restartów = szybciej
-        CHECKPOINT_INTERVAL = 80  # Co 80 meczów checkpoint
+        # ♻️ Restart Chrome tylko gdy rośnie pamięć / opóźnienia (zamiast co 80 meczów)
+        # zapasowy driver trzyma fabryka, więc recycler nie startuje własnego
+        recycler_factory = (functools.partial(BrowserRecycler, prestart_ratio=None)
+                            if driver_factory.spares else BrowserRecycler)
+        recyclers = []
+        http_client = LivesportHttpClient() if http_first else None
+        h2h_cache = H2HCache() if use_h2h_cache else None
+        
+        # 📓 Dziennik runu zamiast checkpointów CSV - każdy mecz dopisywany raz
+        journal = RunJournal(journal_path_for(outfn), fresh=not resume)
+        # 🔬 Spany etapów (FAZA 1 + wzbogacanie) do JSONL
+        tracer = enable_tracing(trace_path_for(outfn), fresh=not resume) if trace else None
+        enriched_urls = set()  # mecze, które przeszły już FAZĘ 2 (przy wznowieniu)
+        if resume:
+            for entry in journal.iter_entries():
+                info = entry['record']
+                rows.append(info)
+                if info.get('qualifies'):
+                    qualifying_count += 1
+                    qualifying_indices.append(len(rows) - 1)
+                if entry['status'] in ('enriched', 'final'):
+                    enriched_urls.add(entry['url'])
+            done_urls = journal.completed_urls()
+            urls = [u for u in urls if u not in done_urls]
+            print(f"📓 Wznowienie: {len(rows)} meczów z dziennika ({qualifying_count} kwalifikujących), "
+                  f"zostało {len(urls)}")
+        
+        # ========================================================================
+        # 🔀 FAZA 2 W TLE: kwalifikujące się mecze trafiają do kolejki zaraz po
+        # process_match, a Forebet/SofaScore/Gemini pracują równolegle z FAZĄ 1
+        # ========================================================================
+        enrichment = None
+        if use_forebet or use_sofascore or use_gemini:
+            sources = {}
+            
+            def _setup_enrichment():
+                # 🔥 PRE-FETCH: HTML Forebet dla wszystkich sportów (w tle, razem z FAZĄ 1)
+                if use_forebet:
+                    try:
+                        from forebet_scraper import prefetch_all_sports, search_forebet_prediction
+                        prefetch_results = prefetch_all_sports(list(set(sports)), date)
+                        sources['forebet'] = search_forebet_prediction
+                        print(f"\n🔥 PRE-FETCH Forebet: " + ', '.join(
+                            f"{'✅' if ok else '❌'} {sport_name}" for sport_name, ok in prefetch_results.items()))
+                    except ImportError as ie:
+                        print(f"   ⚠️ Forebet scraper niedostępny: ImportError - {ie}")
+                    except Exception as e:
+                        print(f"   ⚠️ Forebet scraper niedostępny: {type(e).__name__} - {e}")
+                if use_sofascore:
+                    try:
+                        from sofascore_scraper import get_sofascore_prediction
+                        sources['sofascore'] = get_sofascore_prediction
+                    except ImportError as ie:
+                        print(f"   ⚠️ SofaScore scraper niedostępny: ImportError - {ie}")
+                    except Exception as e:
+                        print(f"   ⚠️ SofaScore scraper niedostępny: {type(e).__name__} - {e}")
+            
+            def _on_enriched(row, enriched):
+                if row.get('match_url'):
+                    journal.append(row['match_url'], row, status='enriched')
+            
+            enrichment = EnrichmentPipeline(
+                lambda row: enrich_row(row, date, search_forebet=sources.get('forebet'),
+                                       get_sofascore=sources.get('sofascore'), use_gemini=use_gemini),
+                workers=enrich_workers,
+                on_done=_on_enriched,
+                should_stop=lambda: not scheduler.has_time(),
+                delay=0.5 if IS_CI else 1.0,
+                setup_fn=_setup_enrichment,
+            )
+            enrichment.start()
+            print(f"🔀 FAZA 2 w tle: {enrichment.workers} workerów wzbogacania "
+                  f"({', '.join(n for n, on in (('Forebet', use_forebet), ('SofaScore', use_sofascore), ('Gemini', use_gemini)) if on)})")
+            for idx in qualifying_indices:
+                if rows[idx].get('match_url') not in enriched_urls:
+                    enrichment.submit(rows[idx])  # wznowione mecze bez FAZY 2
         
         # ========================================================================
         # FAZA 1: SZYBKIE SPRAWDZENIE KWALIFIKACJI (BEZ Forebet/SofaScore)
@@ -235,145 +560,160 @@ def scrape_and_send_email(
         print(f"   (bez Forebet/SofaScore - tylko H2H + forma)")
         print("="*70)
         
-        for i, url in enumerate(urls, 1):
-            # Oblicz ETA
-            if i > 1:
-                elapsed = time_module.time() - phase1_start
-                avg_per_match = elapsed / (i - 1)
-                remaining = (len(urls) - i + 1) * avg_per_match
-                eta_min = remaining / 60
-                progress_pct = (i / len(urls)) * 100
-                print(f"\n[FAZA 1: {i}/{len(urls)} ({progress_pct:.0f}%)] ETA: {eta_min:.1f} min")
-            else:
-                print(f"\n[FAZA 1: {i}/{len(urls)}] Przetwarzam...")
+        if workers > 1:
+            # ⚡ Tryb równoległy: N przeglądarek, wyniki w kolejności wejściowej
+            print(f"   ⚡ Równolegle: {workers} przeglądarek")
+            driver.quit()
+            driver = None
             
-            # RETRY LOGIC - w CI tylko 1 próba, lokalnie 3 próby
-            max_retries = 1 if IS_CI else 3
-            retry_count = 0
-            success = False
+            def _on_result(index, url, info):
+                print(f"\n[FAZA 1: {index + 1}/{len(urls)}] {url[:80]}")
+                if info is None:
+                    print(f"   ❌ Błąd - pomijam ten mecz")
+                else:
+                    journal.append(url, info)
+                    _print_phase1_outcome(info, away_team_focus)
+                    if enrichment is not None and info.get('qualifies'):
+                        enrichment.submit(info)
             
-            while retry_count < max_retries and not success:
-                try:
-                    # Wykryj sport z URL (tennis ma '/tenis/' w URLu)
-                    is_tennis = '/tenis/' in url.lower() or 'tennis' in url.lower()
+            def _process(url, drv):
+                t0 = time_module.time()
+                info = process_url(url, drv, away_team_focus=away_team_focus,
+                                   http_client=http_client, h2h_cache=h2h_cache,
+                                   tennis_players=tennis_players)
+                apply_listing_stub(info, listing_stubs.get(url))
+                scheduler.record(url, info, time_module.time() - t0)
+                return info
+            
+            pool = MatchWorkerPool(
+                workers=workers,
+                driver_factory=driver_factory,
+                recycler_factory=recycler_factory,
+                max_retries=1 if IS_CI else 3,
+                delay_range=(0.15, 0.3) if IS_CI else (0.8, 1.2),
+                on_result=_on_result,
+                should_stop=lambda: not scheduler.has_time(),
+            )
+            results = pool.map(urls, _process)
+            recyclers = pool.recyclers
+            if pool.skipped:
+                print(f"\n⏱️  Koniec budżetu czasu - pominięto {len(pool.skipped)} meczów (--resume je dokończy)")
+                journal.append_skipped(pool.skipped)
+                scheduler.mark_skipped(pool.skipped)
+            
+            for info in results:
+                if info is None:
+                    continue
+                rows.append(info)
+                if info['qualifies']:
+                    qualifying_count += 1
+                    qualifying_indices.append(len(rows) - 1)
+            
+            print(f"\n   ⚡ Workery: {pool.stats['processed']} OK, {pool.stats['failed']} błędów, "
+                  f"{pool.stats['restarts']} restartów")
+        else:
+            recycler = recycler_factory(driver_factory)
+            recyclers = [recycler]
+            for i, url in enumerate(urls, 1):
+                if not scheduler.has_time():
+                    skipped = urls[i - 1:]
+                    print(f"\n⏱️  Koniec budżetu czasu - pominięto {len(skipped)} meczów (--resume je dokończy)")
+                    journal.append_skipped(skipped)
+                    scheduler.mark_skipped(skipped)
+                    break
+                # Oblicz ETA
+                if i > 1:
+                    elapsed = time_module.time() - phase1_start
+                    avg_per_match = elapsed / (i - 1)
+                    remaining = (len(urls) - i + 1) * avg_per_match
+                    eta_min = remaining / 60
+                    progress_pct = (i / len(urls)) * 100
+                    print(f"\n[FAZA 1: {i}/{len(urls)} ({progress_pct:.0f}%)] ETA: {eta_min:.1f} min")
+                else:
+                    print(f"\n[FAZA 1: {i}/{len(urls)}] Przetwarzam...")
+            
+                # RETRY LOGIC - w CI tylko 1 próba, lokalnie 3 próby
+                max_retries = 1 if IS_CI else 3
+                retry_count = 0
+                success = False
+                recycle_reason = None
+            
+                while retry_count < max_retries and not success:
+                    try:
+                        t0 = time_module.time()
+                        # Wykryj sport z URL (tennis ma '/tenis/' w URLu)
+                        is_tennis = '/tenis/' in url.lower() or 'tennis' in url.lower()
                     
-                    if is_tennis:
-                        # Użyj dedykowanej funkcji dla tenisa (ADVANCED)
-                        info = process_match_tennis(url, driver)
-                        rows.append(info)
+                        if is_tennis:
+                            # Użyj dedykowanej funkcji dla tenisa (ADVANCED)
+                            info = process_match_tennis(url, driver, players=tennis_players)
+                            apply_listing_stub(info, listing_stubs.get(url))
+                            scheduler.record(url, info, time_module.time() - t0)
+                            recycle_reason = recycler.observe(driver, time_module.time() - t0)
+                            rows.append(info)
+                            journal.append(url, info)
                         
-                        if info['qualifies']:
-                            qualifying_count += 1
-                            qualifying_indices.append(len(rows) - 1)
-                            player_a_wins = info['home_wins_in_h2h_last5']
-                            player_b_wins = info.get('away_wins_in_h2h_last5', 0)
-                            advanced_score = info.get('advanced_score', 0)
-                            favorite = info.get('favorite', 'unknown')
-                            
-                            # Określ faworyta
-                            if favorite == 'player_a':
-                                fav_name = info['home_team']
-                            elif favorite == 'player_b':
-                                fav_name = info['away_team']
-                            else:
-                                fav_name = "Równi"
-                            
-                            print(f"   ✅ KWALIFIKUJE! {info['home_team']} vs {info['away_team']}")
-                            print(f"      Faworytem: {fav_name} (Score: {advanced_score:.1f}/100)")
-                        else:
-                            player_a_wins = info['home_wins_in_h2h_last5']
-                            player_b_wins = info.get('away_wins_in_h2h_last5', 0)
-                            advanced_score = info.get('advanced_score', 0)
-                            print(f"   ❌ Nie kwalifikuje (Score: {advanced_score:.1f}/100, H2H: {player_a_wins}-{player_b_wins})")
+                            if info['qualifies']:
+                                qualifying_count += 1
+                                qualifying_indices.append(len(rows) - 1)
+                                if enrichment is not None:
+                                    enrichment.submit(info)
+                            _print_phase1_outcome(info, away_team_focus)
                         
-                        success = True
+                            success = True
                     
-                    else:
-                        # Sporty drużynowe - FAZA 1: BEZ Forebet/SofaScore
-                        current_sport = detect_sport_from_url(url)
-                        info = process_match(url, driver, away_team_focus=away_team_focus,
-                                           use_forebet=False, use_gemini=False, 
-                                           use_sofascore=False, sport=current_sport)
-                        rows.append(info)
-                        
-                        if info['qualifies']:
-                            qualifying_count += 1
-                            qualifying_indices.append(len(rows) - 1)
-                            h2h_count = info.get('h2h_count', 0)
-                            win_rate = info.get('win_rate', 0.0)
-                            home_form = info.get('home_form', [])
-                            away_form = info.get('away_form', [])
-                            
-                            home_form_str = '-'.join(home_form) if home_form else 'N/A'
-                            away_form_str = '-'.join(away_form) if away_form else 'N/A'
-                            
-                            if away_team_focus:
-                                wins_count = info.get('away_wins_in_h2h_last5', 0)
-                                focused_team = info['away_team']
-                            else:
-                                wins_count = info['home_wins_in_h2h_last5']
-                                focused_team = info['home_team']
-                            
-                            print(f"   ✅ KWALIFIKUJE! {info['home_team']} vs {info['away_team']}")
-                            print(f"      Fokus: {focused_team}, H2H: {wins_count}/{h2h_count} ({win_rate*100:.0f}%)")
                         else:
-                            h2h_count = info.get('h2h_count', 0)
-                            win_rate = info.get('win_rate', 0.0)
-                            if h2h_count > 0:
-                                if away_team_focus:
-                                    wins_count = info.get('away_wins_in_h2h_last5', 0)
-                                else:
-                                    wins_count = info['home_wins_in_h2h_last5']
-                                print(f"   ❌ Nie kwalifikuje ({wins_count}/{h2h_count} = {win_rate*100:.0f}%)")
-                            else:
-                                print(f"   ⚠️  Brak H2H")
+                            # Sporty drużynowe - FAZA 1: BEZ Forebet/SofaScore
+                            current_sport = detect_sport_from_url(url)
+                            info = process_match(url, driver, away_team_focus=away_team_focus,
+                                               use_forebet=False, use_gemini=False, 
+                                               use_sofascore=False, sport=current_sport,
+                                               http_client=http_client, h2h_cache=h2h_cache)
+                            apply_listing_stub(info, listing_stubs.get(url))
+                            scheduler.record(url, info, time_module.time() - t0)
+                            recycle_reason = recycler.observe(driver, time_module.time() - t0)
+                            rows.append(info)
+                            journal.append(url, info)
                         
-                        success = True
+                            if info['qualifies']:
+                                qualifying_count += 1
+                                qualifying_indices.append(len(rows) - 1)
+                                if enrichment is not None:
+                                    enrichment.submit(info)
+                            _print_phase1_outcome(info, away_team_focus)
+                        
+                            success = True
                     
-                except (ConnectionResetError, ConnectionError, Exception) as e:
-                    retry_count += 1
-                    if retry_count < max_retries:
-                        print(f"   ⚠️  Błąd połączenia (próba {retry_count}/{max_retries}): {str(e)[:100]}")
-                        print(f"   🔄 Restartowanie przeglądarki i ponowienie próby...")
-                        try:
-                            driver.quit()
-                        except:
-                            pass
-                        time.sleep(2 if IS_CI else 3)
-                        driver = start_driver(headless=headless)
-                    else:
-                        print(f"   ❌ Błąd po {max_retries} próbach: {str(e)[:100]}")
-                        print(f"   ⏭️  Pomijam ten mecz i kontynuuję...")
-            
-            # CHECKPOINT - zapisz co 40 meczów
-            if i % CHECKPOINT_INTERVAL == 0 and len(rows) > 0:
-                print(f"\n💾 CHECKPOINT FAZA 1: ({i}/{len(urls)} meczów)...")
-                try:
-                    df_checkpoint = pd.DataFrame(rows)
-                    if 'h2h_last5' in df_checkpoint.columns:
-                        df_checkpoint['h2h_last5'] = df_checkpoint['h2h_last5'].apply(lambda x: str(x) if x else '')
-                    # 🔧 Czyść kursy przed zapisem - zamień NaN na None
-                    df_checkpoint = clean_dataframe_for_csv(df_checkpoint)
-                    df_checkpoint.to_csv(outfn, index=False, encoding='utf-8-sig')
-                    print(f"   ✅ Zapisano! ({qualifying_count} kwalifikujących)")
-                except Exception as e:
-                    print(f"   ⚠️  Błąd zapisu: {e}")
+                    except (ConnectionResetError, ConnectionError, Exception) as e:
+                        retry_count += 1
+                        if retry_count < max_retries:
+                            print(f"   ⚠️  Błąd połączenia (próba {retry_count}/{max_retries}): {str(e)[:100]}")
+                            print(f"   🔄 Restartowanie przeglądarki i ponowienie próby...")
+                            try:
+                                driver = recycler.recycle(driver, f'błąd {type(e).__name__}')
+                            except Exception:
+                                time.sleep(2 if IS_CI else 3)
+                                driver = driver_factory()
+                        else:
+                            print(f"   ❌ Błąd po {max_retries} próbach: {str(e)[:100]}")
+                            print(f"   ⏭️  Pomijam ten mecz i kontynuuję...")
             
-            # AUTO-RESTART przeglądarki
-            if i % RESTART_INTERVAL == 0 and i < len(urls):
-                print(f"\n🔄 AUTO-RESTART po {i} meczach...")
-                try:
-                    driver.quit()
-                    time.sleep(1.5 if IS_CI else 2)
-                    driver = start_driver(headless=headless)
-                    print(f"   ✅ OK! Kontynuuję...")
-                except Exception as e:
-                    print(f"   ⚠️  Błąd restartu: {e}")
-                    driver = start_driver(headless=headless)
+                # AUTO-RESTART przeglądarki gdy przekroczone progi pamięci / opóźnień
+                if recycle_reason and i < len(urls):
+                    print(f"\n🔄 AUTO-RESTART po {i} meczach: {recycle_reason}")
+                    try:
+                        driver = recycler.recycle(driver, recycle_reason)
+                        print(f"   ✅ OK! Kontynuuję...")
+                    except Exception as e:
+                        print(f"   ⚠️  Błąd restartu: {e}")
+                        driver = driver_factory()
             
-            # Rate limiting - minimalne w CI dla szybkości
-            elif i < len(urls):
-                time.sleep(0.15 if IS_CI else 0.8)
+                # Rate limiting - minimalne w CI dla szybkości
+                elif i < len(urls):
+                    time.sleep(0.15 if IS_CI else 0.8)
+        
+        for recycler in recyclers:
+            recycler.close()  # niewykorzystany zapasowy driver
         
         phase1_end = time_module.time()
         phase1_duration = phase1_end - phase1_start
@@ -438,163 +778,29 @@ def scrape_and_send_email(
         print("="*70)
         
         # ========================================================================
-        # FAZA 2: WZBOGACENIE DANYCH (tylko kwalifikujące się mecze)
+        # FAZA 2: WZBOGACENIE DANYCH - dokończenie kolejki (workery działały w tle)
         # ========================================================================
-        if qualifying_count > 0 and (use_forebet or use_sofascore or use_gemini):
+        if enrichment is None:
+            print(f"\n⚠️ Forebet/SofaScore/Gemini wyłączone - pomijam FAZĘ 2")
+        elif enrichment.stats['submitted'] == 0:
+            enrichment.close()
+            print(f"\n⚠️ Brak kwalifikujących się meczów - pomijam FAZĘ 2")
+        else:
             phase2_start = time_module.time()
             print(f"\n" + "="*70)
-            print(f"🎯 FAZA 2/2: WZBOGACENIE DANYCH ({qualifying_count} kwalifikujących meczów)")
-            if use_forebet:
-                print(f"   ✓ Forebet: predykcje i prawdopodobieństwa")
-            if use_sofascore:
-                print(f"   ✓ SofaScore: Fan Vote")
-            if use_gemini:
-                print(f"   ✓ Gemini AI: analiza")
+            print(f"🎯 FAZA 2/2: WZBOGACENIE DANYCH ({enrichment.stats['submitted']} kwalifikujących meczów, "
+                  f"w kolejce: {enrichment.pending()})")
             print("="*70)
-            
-            # 🔥 PRE-FETCH: Pobierz HTML Forebet dla wszystkich sportów na raz
-            if use_forebet:
-                try:
-                    from forebet_scraper import prefetch_all_sports, search_forebet_prediction
-                    FOREBET_AVAILABLE = True
-                    print(f"\n🔥 PRE-FETCH: Pobieranie HTML Forebet dla wszystkich sportów...")
-                    unique_sports = list(set(sports))
-                    prefetch_results = prefetch_all_sports(unique_sports, date)
-                    for sport_name, success in prefetch_results.items():
-                        status = "✅" if success else "❌"
-                        print(f"   {status} {sport_name}")
-                except ImportError as ie:
-                    FOREBET_AVAILABLE = False
-                    print(f"   ⚠️ Forebet scraper niedostępny: ImportError - {ie}")
-                except Exception as e:
-                    FOREBET_AVAILABLE = False
-                    print(f"   ⚠️ Forebet scraper niedostępny: {type(e).__name__} - {e}")
-            
-            # Import SofaScore jeśli potrzebny
-            if use_sofascore:
-                try:
-                    from sofascore_scraper import get_sofascore_prediction
-                    SOFASCORE_AVAILABLE = True
-                except ImportError as ie:
-                    SOFASCORE_AVAILABLE = False
-                    print(f"   ⚠️ SofaScore scraper niedostępny: ImportError - {ie}")
-                except Exception as e:
-                    SOFASCORE_AVAILABLE = False
-                    print(f"   ⚠️ SofaScore scraper niedostępny: {type(e).__name__} - {e}")
-            
-            # Przetwórz każdy kwalifikujący się mecz
-            enriched_count = 0
-            for j, idx in enumerate(qualifying_indices, 1):
-                row = rows[idx]
-                home_team = row.get('home_team', '')
-                away_team = row.get('away_team', '')
-                match_time = row.get('match_time', '')
-                current_sport = detect_sport_from_url(row.get('match_url', ''))
-                
-                # ETA dla FAZY 2
-                if j > 1:
-                    elapsed = time_module.time() - phase2_start
-                    avg_per_match = elapsed / (j - 1)
-                    remaining = (qualifying_count - j + 1) * avg_per_match
-                    eta_min = remaining / 60
-                    print(f"\n[FAZA 2: {j}/{qualifying_count}] {home_team} vs {away_team} (ETA: {eta_min:.1f} min)")
-                else:
-                    print(f"\n[FAZA 2: {j}/{qualifying_count}] {home_team} vs {away_team}")
-                
-                # Wyciągnij datę z match_time (wspólne dla Forebet i SofaScore)
-                match_date = None
-                if match_time:
-                    date_match = re.search(r'(\d{1,2}\.\d{1,2}\.\d{4})', match_time)
-                    if date_match:
-                        day, month, year = date_match.group(1).split('.')
-                        match_date = f"{year}-{month.zfill(2)}-{day.zfill(2)}"
-                if not match_date:
-                    match_date = date
-                
-                # FOREBET
-                if use_forebet and FOREBET_AVAILABLE:
-                    try:
-                        forebet_result = search_forebet_prediction(
-                            home_team=home_team,
-                            away_team=away_team,
-                            match_date=match_date,
-                            sport=current_sport
-                        )
-                        
-                        if forebet_result.get('success') or forebet_result.get('found'):
-                            row['forebet_prediction'] = forebet_result.get('prediction')
-                            row['forebet_probability'] = forebet_result.get('probability')
-                            row['forebet_exact_score'] = forebet_result.get('exact_score')
-                            row['forebet_over_under'] = forebet_result.get('over_under')
-                            row['forebet_btts'] = forebet_result.get('btts')
-                            row['forebet_avg_goals'] = forebet_result.get('avg_goals')
-                            print(f"   ✅ Forebet: {row['forebet_prediction']} ({row['forebet_probability']}%)")
-                        else:
-                            print(f"   ⚠️ Forebet: nie znaleziono ({forebet_result.get('error', 'brak')})")
-                    except Exception as e:
-                        print(f"   ❌ Forebet błąd: {str(e)[:50]}")
-                
-                # SOFASCORE
-                if use_sofascore and SOFASCORE_AVAILABLE:
-                    try:
-                        sofascore_result = get_sofascore_prediction(
-                            home_team=home_team,
-                            away_team=away_team,
-                            sport=current_sport,
-                            date_str=match_date
-                        )
-                        
-                        if sofascore_result.get('found'):
-                            row['sofascore_home_win_prob'] = sofascore_result.get('home_win_prob')
-                            row['sofascore_draw_prob'] = sofascore_result.get('draw_prob')
-                            row['sofascore_away_win_prob'] = sofascore_result.get('away_win_prob')
-                            row['sofascore_total_votes'] = sofascore_result.get('total_votes')
-                            print(f"   ✅ SofaScore: H:{row['sofascore_home_win_prob']}% D:{row['sofascore_draw_prob']}% A:{row['sofascore_away_win_prob']}%")
-                        else:
-                            print(f"   ⚠️ SofaScore: nie znaleziono")
-                    except Exception as e:
-                        print(f"   ❌ SofaScore błąd: {str(e)[:50]}")
-                
-                # GEMINI AI (jeśli włączone)
-                if use_gemini:
-                    try:
-                        from gemini_analyzer import analyze_match_with_gemini
-                        gemini_result = analyze_match_with_gemini(row)
-                        if gemini_result:
-                            row['gemini_prediction'] = gemini_result.get('prediction')
-                            row['gemini_confidence'] = gemini_result.get('confidence')
-                            row['gemini_reasoning'] = gemini_result.get('reasoning')
-                            row['gemini_recommendation'] = gemini_result.get('recommendation')
-                            row['gemini_key_factors'] = gemini_result.get('key_factors', [])
-                            row['gemini_risk_factors'] = gemini_result.get('risk_factors', [])
-                            print(f"   ✅ Gemini: {row['gemini_recommendation']} ({row['gemini_confidence']}%)")
-                    except Exception as e:
-                        print(f"   ❌ Gemini błąd: {str(e)[:50]}")
-                
-                # Oznacz jako wzbogacony
-                if row.get('forebet_prediction') or row.get('sofascore_home_win_prob') or row.get('gemini_prediction'):
-                    enriched_count += 1
-                
-                # Rate limiting między meczami w FAZIE 2
-                if j < qualifying_count:
-                    time.sleep(0.5 if IS_CI else 1.0)
-            
-            phase2_end = time_module.time()
-            phase2_duration = phase2_end - phase2_start
+            enrichment.close()
+            phase2_duration = time_module.time() - phase2_start
             
             print(f"\n" + "="*70)
             print(f"🎯 FAZA 2 ZAKOŃCZONA!")
-            print(f"   Czas: {phase2_duration/60:.1f} min ({phase2_duration:.0f}s)")
-            print(f"   Wzbogaconych: {enriched_count}/{qualifying_count}")
-            print(f"   Średni czas/mecz: {phase2_duration/qualifying_count:.2f}s" if qualifying_count > 0 else "")
+            print(f"   Czekanie po FAZIE 1: {phase2_duration/60:.1f} min ({phase2_duration:.0f}s)")
+            print(f"   {enrichment.format_report()}")
             print("="*70)
-        else:
-            if qualifying_count == 0:
-                print(f"\n⚠️ Brak kwalifikujących się meczów - pomijam FAZĘ 2")
-            elif not (use_forebet or use_sofascore or use_gemini):
-                print(f"\n⚠️ Forebet/SofaScore/Gemini wyłączone - pomijam FAZĘ 2")
         
-        # Zapisz finalne wyniki (plik już istnieje jeśli były checkpointy)
+        # Zapisz finalne wyniki (wiersze FAZY 1/2 są już w dzienniku runu)
         # ========================================================================
         # FAZA 2.5: SCORING ENGINE (tylko piłka nożna)
         # ========================================================================
@@ -695,20 +901,26 @@ def scrape_and_send_email(
         print("\n💾 Zapisywanie finalnych wyników...")
         
         # 🔧 Upewnij się, że odds_source jest ustawiony (dla emaila)
+        updated_rows = {id(r): r for r in qualifying_rows + tennis_rows}
         for row in rows:
             if row.get('odds_bookmaker') and not row.get('odds_source'):
                 row['odds_source'] = row.get('odds_bookmaker')
+                updated_rows[id(row)] = row
         
-        df = pd.DataFrame(rows)
-        if 'h2h_last5' in df.columns:
-            df['h2h_last5'] = df['h2h_last5'].apply(lambda x: str(x) if x else '')
-        
-        # 🔧 Czyść kursy przed zapisem - zamień NaN na None
-        df = clean_dataframe_for_csv(df)
-        
-        df.to_csv(outfn, index=False, encoding='utf-8-sig')
+        # 📓 Dopisz tylko wiersze zmienione po FAZIE 1 (scoring / AI / odds_source),
+        # CSV budowany strumieniowo z dziennika
+        for row in updated_rows.values():
+            if row.get('match_url'):
+                journal.append(row['match_url'], row, status='final')
+        journal.write_csv(outfn, transform=clean_journal_row_for_csv)
         print(f"✅ Zapisano do: {outfn}")
         
+        # 📈 Pierwszy punkt serii kursów; dalsze dopisuje `python odds_history.py` przed startem meczów
+        if odds_history:
+            history = OddsHistory()
+            history.record_rows(rows, date, listing_stubs)
+            print(history.format_report())
+        
         # ========================================================================
         # CI STATS: Podsumowanie wydajności
         # ========================================================================
@@ -732,15 +944,34 @@ def scrape_and_send_email(
         if _ci_stats['total_matches'] >= 100:
             est_3000 = avg_per_match * 3000 / 3600
             print(f"   Est. dla 3000:     {est_3000:.1f}h")
+        if get_block_profile() != 'off':
+            print(BLOCKING_STATS.format_report())
+        if http_client is not None:
+            print(http_client.format_report())
+        for recycler in recyclers:
+            print(recycler.format_report())
+        print(driver_factory.format_report())
+        if prefetcher is not None:
+            print(prefetcher.format_report())
+        if day_odds is not None:
+            print(day_odds.format_report())
+        if get_transport().stats:
+            print(get_transport().format_report())
+        if h2h_cache is not None:
+            print(h2h_cache.format_report())
+        scheduler.save()
+        print(scheduler.format_report())
+        if tracer is not None:
+            print(tracer.format_report())
+            tracer.close()
+        if archive is not None:
+            print(archive.format_report())
         print("="*70 + "\n")
         
         # Zapisz przewidywania do JSON (dla późniejszej weryfikacji)
         if qualifying_count > 0:
             predictions_file = outfn.replace('.csv', '_predictions.json')
-            qualifying_rows = [r for r in rows if r.get('qualifies', False)]
-            
-            with open(predictions_file, 'w', encoding='utf-8') as f:
-                json.dump(qualifying_rows, f, ensure_ascii=False, indent=2)
+            journal.write_json(predictions_file, predicate=lambda r: r.get('qualifies', False))
             print(f"✅ Przewidywania zapisane do: {predictions_file}")
         
         # 📝 UWAGA: Kursy są pobierane z Livesport API w FAZIE 1 (process_match)
@@ -856,7 +1087,7 @@ def scrape_and_send_email(
         
         print(f"   ✅ JSON zapisany: {json_filename}")
                 # \u2601\ufe0f SUPABASE: Zapisz mecze do bazy danych
-        if SUPABASE_AVAILABLE and _supabase_mgr:
+        if SUPABASE_AVAILABLE and _supabase_mgr and not replaying:
             print(f"\n\u2601\ufe0f Zapisywanie {len(rows)} mecz\u00f3w do Supabase...")
             _sb_saved = 0
             _sb_failed = 0
@@ -879,7 +1110,9 @@ def scrape_and_send_email(
             print(f"   Procent: {percent:.1f}%")
         
         # KROK 3: Wyślij email (tylko jeśli są kwalifikujące się mecze)
-        if qualifying_count > 0:
+        if replaying:
+            print(f"\n🎞️ Replay archiwum: email, Supabase i aplikacja UI pominięte")
+        elif qualifying_count > 0:
             print(f"\n📧 KROK 3/4: Wysyłanie powiadomienia email...")
             print("="*70)
             
@@ -940,7 +1173,7 @@ def scrape_and_send_email(
                 print(f"\n⚠️  Brak kwalifikujących się meczów - email nie został wysłany")
         
         # KROK 4: Wyślij dane do aplikacji UI (jeśli skonfigurowane)
-        if app_url:
+        if app_url and not replaying:
             print(f"\n🔗 KROK 4/4: Wysyłanie danych do aplikacji UI...")
             print("="*70)
             
@@ -968,7 +1201,7 @@ def scrape_and_send_email(
             except Exception as e:
                 print(f"   ⚠️  Błąd wysyłania do aplikacji: {e}")
                 print("   💡 Scraping i email zakończone pomyślnie")
-        else:
+        elif not replaying:
             # Spróbuj załadować z pliku konfiguracyjnego
             integrator = create_integrator_from_config()
             if integrator and integrator.test_connection():
@@ -982,7 +1215,11 @@ def scrape_and_send_email(
         traceback.print_exc()
     
     finally:
-        driver.quit()
+        if driver is not None:
+            driver.quit()
+        driver_factory.close()
+        if archive is not None:
+            archive.close()
         print("\n🔒 Przeglądarka zamknięta")
 
 
@@ -1040,6 +1277,8 @@ WAŻNE dla Gmail:
     parser.add_argument('--password', required=True, help='Hasło email (lub App Password dla Gmail)')
     parser.add_argument('--provider', default='gmail', choices=['gmail', 'outlook', 'yahoo'],
                        help='Provider email (domyślnie: gmail)')
+    parser.add_argument('--exclude-leagues', nargs='+', default=None,
+                       help='🧹 Pomiń ligi zawierające podany fragment nazwy (np. kobiety U19) już na listingu')
     parser.add_argument('--headless', action='store_true', help='Uruchom bez wyświetlania przeglądarki')
     parser.add_argument('--max-matches', type=int, help='Limit meczów (dla testów)')
     parser.add_argument('--sort', default='time', choices=['time', 'wins', 'team'],
@@ -1074,9 +1313,50 @@ WAŻNE dla Gmail:
                        help='📧 Wyślij 2 osobne maile na każdy sport (forma vs zwykłe)')
     parser.add_argument('--min-odds', type=float, default=0.0,
                        help='📉 Minimalny kurs — mecze z kursem poniżej są pomijane (np. 1.19)')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='⚡ Liczba równoległych przeglądarek w fazie 1 (domyślnie 1 = szeregowo)')
+    parser.add_argument('--page-load-strategy', choices=['normal', 'eager'], default=None,
+                       help='⚡ Strategia ładowania stron Chrome (eager = nie czekaj na obrazki/reklamy)')
+    parser.add_argument('--h2h-cache', action='store_true',
+                       help='Trwały cache H2H par drużyn między runami (outputs/cache/*.sqlite)')
+    parser.add_argument('--resume', action='store_true',
+                       help='Wznów przerwany run: pomiń mecze zapisane już w dzienniku (outputs/*.journal.jsonl)')
+    parser.add_argument('--time-budget', type=float, default=None,
+                       help='⏱️ Budżet czasu scrapowania w minutach - najcenniejsze mecze najpierw, reszta pominięta')
+    parser.add_argument('--enrich-workers', type=int, default=2,
+                       help='🔀 Liczba wątków wzbogacania (Forebet/SofaScore/Gemini) działających równolegle z fazą 1')
+    parser.add_argument('--chrome-profile', metavar='DIR', default=None,
+                       help='🧊 Katalog trwałych profili Chrome (cookies zgody, cache); off = tymczasowe')
+    parser.add_argument('--warm-spares', type=int, default=1,
+                       help='🧊 Ile przeglądarek trzymać rozgrzanych w tle na start/restart (0 = wyłączone)')
+    parser.add_argument('--tennis-prefetch-workers', type=int, nargs='?', const=DEFAULT_PREFETCH_WORKERS, default=0,
+                       metavar='N', help=f'🎾 Zawodnicy tenisowi dnia pobierani raz przed meczami w N przeglądarkach (bez N: {DEFAULT_PREFETCH_WORKERS}; domyślnie wyłączone). '
+                            'Dokłada statystyki nawierzchni (surface_stats), więc zmienia wyniki i kwalifikację TennisScoringEngine')
+    parser.add_argument('--odds-batch', type=int, nargs='?', const=DEFAULT_BATCH_CONCURRENCY, default=0,
+                       metavar='N', help=f'💰 Kursy wszystkich meczów dnia jednym batchem przed meczami, N równoległych zapytań (domyślnie {DEFAULT_BATCH_CONCURRENCY})')
+    parser.add_argument('--odds-best-price', action='store_true',
+                       help='💰 Batch kursów: pytaj bukmacherów równolegle i bierz najwyższy kurs na każdy wynik')
+    parser.add_argument('--odds-history', action='store_true',
+                       help='📈 Zapisz kursy meczów do historii (outputs/odds_history) - ruch linii odświeża odds_history.py')
+    parser.add_argument('--trace', action='store_true',
+                       help='🔬 Zapisuj czasy etapów meczów (JSONL obok CSV) + raport p50/p95/p99')
+    archive_group = parser.add_mutually_exclusive_group()
+    archive_group.add_argument('--record', metavar='DIR', default=None,
+                       help='🎞️ Nagrywaj strony (page_source) i odpowiedzi HTTP do archiwum DIR')
+    archive_group.add_argument('--replay', metavar='DIR', default=None,
+                       help='🎞️ Odtwórz dzień z archiwum DIR - bez sieci, Chrome i wysyłki (benchmark)')
+    parser.add_argument('--http-first', action='store_true',
+                       help='🌐 Strony H2H przez HTTP (curl_cffi), Chrome tylko jako fallback')
+    parser.add_argument('--block-profile', choices=['off', 'light', 'aggressive'], default=None,
+                       help='🚫 Blokowanie zasobów przez CDP (light = reklamy/analityka/wideo, aggressive = + obrazki/fonty/media)')
     
     args = parser.parse_args()
     
+    if args.page_load_strategy:
+        os.environ[PAGE_LOAD_STRATEGY_ENV] = args.page_load_strategy
+    if args.block_profile:
+        os.environ[BLOCK_PROFILE_ENV] = args.block_profile
+    
     # Sorted odds - domyślnie włączone, chyba że --no-sorted-odds
     include_sorted_odds = not args.no_sorted_odds
     # SofaScore - domyślnie włączone, chyba że --no-sofascore
@@ -1105,6 +1385,22 @@ WAŻNE dla Gmail:
         odds_limit=args.odds_limit,
         split_emails=args.split_emails,
         min_odds_threshold=args.min_odds,
+        workers=args.workers,
+        http_first=args.http_first,
+        resume=args.resume,
+        use_h2h_cache=args.h2h_cache,
+        time_budget_min=args.time_budget,
+        enrich_workers=args.enrich_workers,
+        trace=args.trace,
+        record_archive=args.record,
+        replay_archive=args.replay,
+        exclude_leagues=args.exclude_leagues,
+        chrome_profile=args.chrome_profile,
+        warm_spares=args.warm_spares,
+        tennis_prefetch_workers=args.tennis_prefetch_workers,
+        odds_batch=args.odds_batch,
+        odds_best_price=args.odds_best_price,
+        odds_history=args.odds_history,
     )
     
     print("\n✨ ZAKOŃCZONO!")
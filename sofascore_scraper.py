@@ -57,6 +57,8 @@ except ImportError:
     if not CURL_CFFI_AVAILABLE:
         REQUESTS_AVAILABLE = False
 
+from http_transport import CircuitOpenError, get_transport
+
 try:
     from selenium import webdriver
     from selenium.webdriver.common.by import By
@@ -74,6 +76,8 @@ try:
     SELENIUM_AVAILABLE = True
 except ImportError:
     SELENIUM_AVAILABLE = False
+
+from page_archive import archived_driver
     
 # Globalny timeout dla całej operacji SofaScore (sekundy)
 # W CI: 30s (wystarczająco na 3 daty × retry), lokalnie: 35s
@@ -234,9 +238,16 @@ MAX_RETRIES = 2 if IS_CI else 3
 RETRY_BACKOFF = [0.5, 1, 2] if IS_CI else [1, 2, 4]  # Szybsze w CI
 
 
+def _is_empty_response(response) -> bool:
+    """200 bez treści - SofaScore tak odpowiada przy chwilowym throttlingu."""
+    return response.status_code == 200 and not (response.content and len(response.content) > 2)
+
+
 def _retry_request_with_session(url: str, timeout: int = 10, **kwargs):
     """
-    Wykonuje request z exponential backoff.
+    Wykonuje request przez wspólny transport HTTP (http_transport): limit
+    zapytań hosta, backoff z jitterem i circuit breaker - przy niedostępnym
+    API kolejne zapytania kończą się od razu.
     v4.0: Preferuje curl_cffi (omija Cloudflare), fallback do requests session.
     
     Args:
@@ -253,57 +264,42 @@ def _retry_request_with_session(url: str, timeout: int = 10, **kwargs):
     
     use_curl = CURL_CFFI_AVAILABLE and session == 'curl_cffi'
     
-    last_exception = None
+    def on_retry(attempt: int, reason: str) -> None:
+        logger.debug(f"SofaScore API: {reason}, próba {attempt + 1}/{MAX_RETRIES}...")
+        if IS_CI and reason.startswith('HTTP'):
+            print(f"   ⚠️ SofaScore API: {reason} - retry")
     
-    for attempt in range(MAX_RETRIES):
-        try:
-            if use_curl:
-                response = curl_requests.get(url, impersonate='chrome', timeout=timeout)
-            else:
-                response = session.get(url, timeout=timeout, **kwargs)
-            if response.status_code == 200:
-                # Walidacja odpowiedzi - sprawdź czy jest content
-                if response.content and len(response.content) > 2:
-                    return response
-                else:
-                    logger.debug(f"SofaScore API: Pusta odpowiedź (200 ale {len(response.content or b'')}B)")
-                    if attempt < MAX_RETRIES - 1:
-                        time.sleep(RETRY_BACKOFF[attempt] if attempt < len(RETRY_BACKOFF) else RETRY_BACKOFF[-1])
-                    continue
-            elif response.status_code in [429, 503]:  # Rate limited lub service unavailable
-                wait_time = RETRY_BACKOFF[attempt] if attempt < len(RETRY_BACKOFF) else RETRY_BACKOFF[-1]
-                logger.debug(f"SofaScore API: Status {response.status_code}, czekam {wait_time}s...")
-                if IS_CI:
-                    print(f"   ⚠️ SofaScore API: {response.status_code} - retry za {wait_time}s")
-                time.sleep(wait_time)
-                continue
-            elif response.status_code == 403:
-                logger.debug(f"SofaScore API: 403 Forbidden - prawdopodobnie brak cookies lub rate limit")
-                if IS_CI:
-                    print(f"   ⚠️ SofaScore API: 403 Forbidden")
-                return response  # Zwróć 403 - caller zdecyduje
-            else:
-                return response  # Inne błędy - zwróć natychmiast
-        except (TimeoutError, OSError) as e:
-            last_exception = e
-            if attempt < MAX_RETRIES - 1:
-                wait_time = RETRY_BACKOFF[attempt]
-                logger.debug(f"SofaScore API: Timeout/Connection error, próba {attempt + 2}/{MAX_RETRIES}...")
-                time.sleep(wait_time)
-            else:
-                if IS_CI:
-                    print(f"   ⚠️ SofaScore API: {type(e).__name__} po {MAX_RETRIES} próbach")
-        except Exception as e:
-            last_exception = e
-            logger.debug(f"SofaScore API: Nieoczekiwany błąd: {type(e).__name__}: {str(e)[:100]}")
-            if attempt < MAX_RETRIES - 1:
-                time.sleep(RETRY_BACKOFF[attempt] if attempt < len(RETRY_BACKOFF) else RETRY_BACKOFF[-1])
-            else:
-                break
+    try:
+        response = get_transport().get(
+            url,
+            session=None if use_curl else session,
+            impersonate='chrome' if use_curl else None,
+            timeout=timeout,
+            retries=MAX_RETRIES - 1,
+            backoff=RETRY_BACKOFF[0],
+            retry_on=_is_empty_response,
+            on_retry=on_retry,
+            **kwargs
+        )
+    except CircuitOpenError as e:
+        logger.debug(f"SofaScore API: {e}")
+        return None
+    except Exception as e:
+        logger.debug(f"SofaScore API: Wszystkie próby zawiodły - {type(e).__name__}: {str(e)[:100]}")
+        if IS_CI:
+            print(f"   ⚠️ SofaScore API: {type(e).__name__} po {MAX_RETRIES} próbach")
+        return None
     
-    if last_exception:
-        logger.debug(f"SofaScore API: Wszystkie próby zawiodły - {type(last_exception).__name__}")
-    return None
+    if _is_empty_response(response):
+        logger.debug(f"SofaScore API: Pusta odpowiedź (200 ale {len(response.content or b'')}B)")
+        return None
+    if response.status_code in [429, 503]:  # Rate limited lub service unavailable po wszystkich próbach
+        return None
+    if response.status_code == 403:
+        logger.debug(f"SofaScore API: 403 Forbidden - prawdopodobnie brak cookies lub rate limit")
+        if IS_CI:
+            print(f"   ⚠️ SofaScore API: 403 Forbidden")
+    return response  # 403 i inne błędy - caller zdecyduje
 
 
 def _retry_request(request_func, *args, **kwargs):
@@ -1481,7 +1477,8 @@ def scrape_sofascore_full(
         chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
         chrome_options.page_load_strategy = 'eager'
         
-        sofascore_driver = webdriver.Chrome(options=chrome_options)
+        # 🎞️ Archiwum stron: nagrywanie page_source / replay bez Chrome
+        sofascore_driver = archived_driver(lambda: webdriver.Chrome(options=chrome_options))
         sofascore_driver.set_page_load_timeout(10)
         sofascore_driver.set_script_timeout(5)
         
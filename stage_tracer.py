@@ -0,0 +1,213 @@
+"""
+Stage Tracer - czasy etapów każdego meczu (JSONL + percentyle)
+==============================================================
+
+``process_match`` liczył czasy etapów (``_timings``) tylko do jednej linii
+logu, a wzbogacanie nie było mierzone wcale. Z ``--trace`` każdy etap
+jest zapisywany jako span w pliku JSONL:
+
+    {"ts", "stage", "match_id", "sport", "outcome", "duration_ms", "thread", ...}
+
+Etapy: match, navigate, click_h2h, parse (HTML -> soup), extract (nagłówek
++ H2H z soup), form, odds, forebet, sofascore, gemini. ``outcome`` to 'ok',
+'error' (wyjątek) albo wartość ustawiona przez kod (np. 'miss', 'fallback').
+
+Kontekst meczu (match_id, sport) jest per wątek - ``set_trace_match()``
+na początku meczu, a spany w MatchWorkerPool / EnrichmentPipeline nie
+mieszają się między wątkami. Bez ``enable_tracing()`` wszystkie
+wywołania są no-op.
+
+Na koniec runu ``get_tracer().format_report()`` - p50/p95/p99 per etap.
+
+Użycie:
+    tracer = enable_tracing(trace_path_for(outfn))
+    set_trace_match(url, 'football')
+    with trace_span('navigate', via='http') as span:
+        html = fetch(...)
+        if not html:
+            span['outcome'] = 'miss'
+    tracer.record('forebet', 1.2, outcome='ok')
+    print(tracer.format_report())
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+TRACE_SUFFIX = '.trace.jsonl'
+
+# Kolejność etapów w raporcie (pozostałe alfabetycznie na końcu)
+STAGE_ORDER = ('match', 'navigate', 'click_h2h', 'parse', 'extract', 'form', 'odds',
+               'forebet', 'sofascore', 'gemini')
+
+
+def trace_path_for(outfn: str) -> str:
+    """Ścieżka pliku spanów obok wyniku (outputs/x.csv -> outputs/x.trace.jsonl)."""
+    base, _ = os.path.splitext(outfn)
+    return base + TRACE_SUFFIX
+
+
+def match_id_from_url(url: str) -> Optional[str]:
+    """ID meczu Livesport z parametru ``mid`` (albo None)."""
+    m = re.search(r'[?&]mid=([^&#]+)', url or '')
+    return m.group(1) if m else None
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Percentyl metodą nearest-rank (lista posortowana rosnąco, niepusta)."""
+    rank = max(1, int(-(-pct * len(sorted_values) // 100)))  # ceil
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class StageTracer:
+    """
+    Zapis spanów etapów do JSONL + statystyki w pamięci.
+
+    Args:
+        path: Plik JSONL (None = tylko statystyki w pamięci)
+        enabled: False = wszystkie metody są no-op
+        fresh: True = usuń istniejący plik (run bez --resume)
+    """
+
+    def __init__(self, path: Optional[str] = None, enabled: bool = True, fresh: bool = False):
+        self.path = path
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._durations: Dict[str, List[float]] = {}
+        self._outcomes: Dict[str, Dict[str, int]] = {}
+        self._file = None
+        if enabled and path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(path, 'w' if fresh else 'a', encoding='utf-8')
+
+    # ------------------------------------------------------------------
+    # Kontekst meczu (per wątek)
+    # ------------------------------------------------------------------
+    def set_match(self, match_url: Optional[str], sport: Optional[str] = None) -> None:
+        self._local.match_id = match_id_from_url(match_url) or match_url
+        self._local.sport = sport
+
+    # ------------------------------------------------------------------
+    # Spany
+    # ------------------------------------------------------------------
+    def record(self, stage: str, seconds: float, outcome: str = 'ok', **attrs) -> None:
+        """Zapisuje zmierzony już etap (np. z ``_timings`` process_match)."""
+        if not self.enabled:
+            return
+        entry = {
+            'ts': round(time.time(), 3),
+            'stage': stage,
+            'match_id': getattr(self._local, 'match_id', None),
+            'sport': getattr(self._local, 'sport', None),
+            'outcome': outcome,
+            'duration_ms': round(seconds * 1000, 1),
+            'thread': threading.current_thread().name,
+        }
+        entry.update(attrs)
+        with self._lock:
+            self._durations.setdefault(stage, []).append(seconds)
+            outcomes = self._outcomes.setdefault(stage, {})
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+            if self._file is not None:
+                self._file.write(json.dumps(entry, ensure_ascii=False, default=str) + '\n')
+                self._file.flush()
+
+    @contextmanager
+    def span(self, stage: str, **attrs) -> Iterator[Dict]:
+        """
+        Mierzy blok kodu. Zwracany dict można uzupełnić (``span['outcome'] = 'miss'``,
+        dodatkowe atrybuty) - trafia do wpisu JSONL. Wyjątek = outcome 'error'.
+        """
+        data = {'outcome': 'ok'}
+        data.update(attrs)
+        if not self.enabled:
+            yield data
+            return
+        t0 = time.perf_counter()
+        try:
+            yield data
+        except BaseException as e:
+            data['outcome'] = 'error'
+            data.setdefault('error', type(e).__name__)
+            raise
+        finally:
+            outcome = data.pop('outcome')
+            self.record(stage, time.perf_counter() - t0, outcome=outcome, **data)
+
+    # ------------------------------------------------------------------
+    # Raport
+    # ------------------------------------------------------------------
+    def summary(self) -> Dict[str, Dict]:
+        """{etap: {count, p50, p95, p99, outcomes}} - czasy w sekundach."""
+        with self._lock:
+            durations = {stage: sorted(values) for stage, values in self._durations.items()}
+            outcomes = {stage: dict(counts) for stage, counts in self._outcomes.items()}
+        result = {}
+        order = {stage: i for i, stage in enumerate(STAGE_ORDER)}
+        for stage in sorted(durations, key=lambda s: (order.get(s, len(order)), s)):
+            values = durations[stage]
+            result[stage] = {
+                'count': len(values),
+                'p50': percentile(values, 50),
+                'p95': percentile(values, 95),
+                'p99': percentile(values, 99),
+                'outcomes': outcomes.get(stage, {}),
+            }
+        return result
+
+    def format_report(self) -> str:
+        summary = self.summary()
+        if not summary:
+            return "🔬 Trace: brak spanów"
+        lines = [f"🔬 Trace etapów ({self.path or 'tylko pamięć'}):",
+                 f"   {'etap':<10} {'n':>5} {'p50':>8} {'p95':>8} {'p99':>8}  wyniki"]
+        for stage, s in summary.items():
+            outcomes = ', '.join(f'{k}:{v}' for k, v in sorted(s['outcomes'].items()))
+            lines.append(f"   {stage:<10} {s['count']:>5} {s['p50']:>7.2f}s {s['p95']:>7.2f}s "
+                         f"{s['p99']:>7.2f}s  {outcomes}")
+        return '\n'.join(lines)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+# Globalny tracer (domyślnie wyłączony - zero kosztu bez --trace)
+TRACER = StageTracer(enabled=False)
+
+
+def enable_tracing(path: Optional[str], fresh: bool = False) -> StageTracer:
+    """Włącza tracing dla całego procesu (--trace) i zwraca tracer."""
+    global TRACER
+    TRACER.close()
+    TRACER = StageTracer(path, fresh=fresh)
+    logger.info(f"Trace etapów: {path}")
+    return TRACER
+
+
+def get_tracer() -> StageTracer:
+    return TRACER
+
+
+def set_trace_match(match_url: Optional[str], sport: Optional[str] = None) -> None:
+    TRACER.set_match(match_url, sport)
+
+
+def trace_span(stage: str, **attrs):
+    return TRACER.span(stage, **attrs)
+
+
+def trace_record(stage: str, seconds: float, outcome: str = 'ok', **attrs) -> None:
+    TRACER.record(stage, seconds, outcome=outcome, **attrs)
@@ -19,6 +19,8 @@ import urllib.request
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+from http_transport import CircuitOpenError, RateLimitedError, get_transport
+
 # ---------------------------------------------------------------------------
 # Configuration
 # ---------------------------------------------------------------------------
@@ -92,13 +94,21 @@ def get_logo_url(team_name: str) -> Optional[str]:
     req = urllib.request.Request(api_url, headers={"User-Agent": "PicklySportsApp/1.0"})
 
     url: Optional[str] = None
-    try:
+    def fetch() -> Dict[str, Any]:
         with urllib.request.urlopen(req, timeout=_REQUEST_TIMEOUT) as resp:
-            data: Dict[str, Any] = json.loads(resp.read().decode())
+            return json.loads(resp.read().decode())
+
+    try:
+        # Shared transport: TheSportsDB rate limit + circuit breaker. Called from API
+        # requests, so never wait for a token - skip and resolve on a later request.
+        data: Dict[str, Any] = get_transport().call(api_url, fetch, retries=0, max_wait=0)
         teams: List[Any] = data.get("teams") or []
         if teams:
             t: Dict[str, Any] = teams[0]
             url = t.get("strBadge") or t.get("strLogo") or None
+    except (RateLimitedError, CircuitOpenError):
+        # Not asked at all - don't cache a miss
+        return cached.get("url") if cached else None
     except Exception:
         # On network error keep stale cache entry if exists, else store None
         if cached and cached.get("url"):
@@ -0,0 +1,235 @@
+"""
+Tennis Prefetch - dane zawodników dnia pobierane raz, przed meczami
+===================================================================
+
+W turnieju ten sam zawodnik gra w wielu meczach (rundy, debel, kolejne
+dni). Zamiast zbierać jego formę / ranking / nawierzchnie przy każdym
+meczu, po zebraniu linków:
+
+    - z URL-i meczów tenisowych (``/mecz/tenis/<slug-id>/<slug-id>/``)
+      wyznaczamy profile obu zawodników - bez wyszukiwarki
+    - deduplikujemy zawodników całej karty dnia
+    - każdego pobieramy RAZ (forma z /wyniki/ + ranking z nagłówka,
+      nawierzchnie z /statystyki/) w ``workers`` przeglądarkach
+      (MatchWorkerPool); zawodnicy ze świeżym wpisem w cache dyskowym
+      (tennis_scraper_v3_helpers / PlayerCache) nie zajmują drivera
+    - ``process_match_tennis(url, driver, players=records)`` uzupełnia
+      brakujący ranking / formę i dokłada statystyki nawierzchni
+
+Prefetch jest opcjonalny (``--tennis-prefetch-workers``, domyślnie wyłączony):
+dodatkowe ``surface_stats`` zmieniają wyniki TennisScoringEngine, więc
+kwalifikacja meczów z prefetchem i bez niego może się różnić.
+
+Rekord zawodnika:
+    {'name': 'Świątek I.', 'url': 'https://.../gracz/swiatek-iga/jGHFoXjb/',
+     'form': ['W', 'W', 'L', ...], 'ranking': 2,
+     'surface_stats': {'clay': 0.75, 'hard': 0.68}}
+
+Użycie:
+    prefetcher = TennisPrefetcher(driver_factory, workers=2)
+    players = prefetcher.run(urls, listing_stubs)     # {url profilu: rekord}
+    info = process_match_tennis(url, driver, players=players)
+    print(prefetcher.format_report())
+"""
+
+import logging
+import re
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from match_worker_pool import MatchWorkerPool
+import tennis_scraper_v3_helpers as helpers
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PREFETCH_WORKERS = 2
+
+# Segment URL meczu: "<slug>-<8-znakowe id Livesport>"
+_PARTICIPANT_RE = re.compile(r'^([a-z0-9-]+?)-([A-Za-z0-9]{8})$')
+_TENNIS_SEGMENTS = ('tenis', 'tennis')
+# Ścieżka profilu zawodnika per wersja językowa serwisu
+PLAYER_PATHS = {'pl': 'gracz'}
+DEFAULT_PLAYER_PATH = 'player'
+
+
+def is_tennis_url(url: str) -> bool:
+    return bool(url) and ('/tenis/' in url.lower() or 'tennis' in url.lower())
+
+
+def player_refs_from_url(url: str) -> List[Tuple[str, str]]:
+    """
+    Profile obu zawodników z URL-a meczu tenisowego, w kolejności A (home), B (away).
+
+    Returns:
+        [(url profilu, nazwa ze sluga), ...] - pusta lista, gdy URL nie ma
+        dwóch segmentów zawodników (np. inny format linku)
+    """
+    parsed = urlparse(url or '')
+    parts = [p for p in parsed.path.split('/') if p]
+    sport_index = next((i for i, p in enumerate(parts) if p.lower() in _TENNIS_SEGMENTS), None)
+    if sport_index is None or not parsed.netloc:
+        return []
+
+    refs = []
+    for part in parts[sport_index + 1:sport_index + 3]:
+        match = _PARTICIPANT_RE.match(part)
+        if not match:
+            return []
+        slug, player_id = match.groups()
+        lang = parts[0] if len(parts[0]) == 2 else None
+        player_path = PLAYER_PATHS.get(lang, DEFAULT_PLAYER_PATH)
+        prefix = f'/{lang}' if lang else ''
+        profile = f'{parsed.scheme or "https"}://{parsed.netloc}{prefix}/{player_path}/{slug}/{player_id}/'
+        refs.append((profile, slug.replace('-', ' ').title()))
+    return refs if len(refs) == 2 else []
+
+
+def collect_day_players(urls: List[str], stubs: Optional[Dict[str, Dict]] = None) -> Dict[str, str]:
+    """
+    Unikalni zawodnicy karty dnia: {url profilu: nazwa}.
+
+    Nazwa ze stubu listingu (home_team / away_team), gdy jest, inaczej ze sluga.
+    Debel (para "A / B") jest pomijany - profile par nie mają statystyk gracza.
+    """
+    players: Dict[str, str] = {}
+    for url in urls:
+        if not is_tennis_url(url):
+            continue
+        stub = (stubs or {}).get(url) or {}
+        names = (stub.get('home_team'), stub.get('away_team'))
+        if any(name and '/' in name for name in names):
+            continue
+        for (profile, slug_name), name in zip(player_refs_from_url(url), names):
+            players.setdefault(profile, name or slug_name)
+    return players
+
+
+def _build_record(name: str, profile: str, form: List[Dict], ranking: Optional[int],
+                  surface: Optional[Dict[str, Dict]]) -> Dict:
+    return {
+        'name': name,
+        'url': profile,
+        'form': [m['result'] for m in (form or []) if m.get('result') in ('W', 'L')][:5],
+        'ranking': ranking,
+        'surface_stats': {s: v['win_rate'] for s, v in (surface or {}).items() if v.get('total')},
+    }
+
+
+def cached_player_record(profile: str, name: str) -> Optional[Dict]:
+    """Rekord z cache zawodników (pamięć / dysk), gdy forma i nawierzchnie są świeże."""
+    form = helpers.cached_player_data(profile, 'form')
+    surface = helpers.cached_player_data(profile, 'surface')
+    if form is None or surface is None:
+        return None
+    return _build_record(name, profile, form, helpers.cached_player_data(profile, 'ranking'), surface)
+
+
+def fetch_player_record(driver, profile: str, name: str) -> Dict:
+    """Pobiera formę (+ ranking) i nawierzchnie zawodnika; wyniki trafiają do cache."""
+    form = helpers.extract_player_detailed_form(driver, name, profile)
+    surface = helpers.extract_surface_statistics(driver, profile)
+    return _build_record(name, profile, form, helpers.cached_player_data(profile, 'ranking'), surface)
+
+
+def match_player_records(url: str, players: Optional[Dict[str, Dict]]) -> Tuple[Optional[Dict], Optional[Dict]]:
+    """Rekordy zawodnika A i B meczu (po profilach z URL-a)."""
+    refs = player_refs_from_url(url) if players else []
+    if not refs:
+        return None, None
+    return players.get(refs[0][0]), players.get(refs[1][0])
+
+
+def apply_player_records(out: Dict, url: str, players: Optional[Dict[str, Dict]]) -> Dict:
+    """
+    Uzupełnia wynik process_match_tennis danymi z prefetchu.
+
+    Ranking i forma tylko gdy strona meczu ich nie dała; statystyki
+    nawierzchni (surface_stats_a/b) gdy są dla obu zawodników.
+    """
+    rec_a, rec_b = match_player_records(url, players)
+    for rec, side in ((rec_a, 'a'), (rec_b, 'b')):
+        if not rec:
+            continue
+        if not out.get(f'ranking_{side}') and rec.get('ranking'):
+            out[f'ranking_{side}'] = rec['ranking']
+        if not out.get(f'form_{side}') and rec.get('form'):
+            out[f'form_{side}'] = list(rec['form'])
+    if rec_a and rec_b and rec_a.get('surface_stats') and rec_b.get('surface_stats'):
+        out['surface_stats_a'] = dict(rec_a['surface_stats'])
+        out['surface_stats_b'] = dict(rec_b['surface_stats'])
+    return out
+
+
+class TennisPrefetcher:
+    """
+    Prefetch zawodników tenisowych karty dnia w ograniczonej liczbie przeglądarek.
+
+    Args:
+        driver_factory: Funkcja bez argumentów zwracająca driver (np. DriverFactory)
+        workers: Maksymalna liczba równoległych przeglądarek
+        fetch: Funkcja (driver, url profilu, nazwa) -> rekord (domyślnie fetch_player_record)
+        delay_range: Opóźnienie między zawodnikami jednego workera [s]
+    """
+
+    def __init__(
+        self,
+        driver_factory: Callable[[], object],
+        workers: int = DEFAULT_PREFETCH_WORKERS,
+        fetch: Callable[[object, str, str], Dict] = None,
+        delay_range: Tuple[float, float] = (0.5, 1.0),
+    ):
+        self.driver_factory = driver_factory
+        self.workers = max(1, int(workers or 1))
+        self.fetch = fetch or fetch_player_record
+        self.delay_range = delay_range
+        self.records: Dict[str, Dict] = {}
+        self.stats = {
+            'matches': 0,
+            'players': 0,
+            'cached': 0,
+            'fetched': 0,
+            'failed': 0,
+            'time_s': 0.0,
+        }
+
+    def run(self, urls: List[str], stubs: Optional[Dict[str, Dict]] = None) -> Dict[str, Dict]:
+        """Pobiera rekordy wszystkich zawodników z ``urls``; zwraca {url profilu: rekord}."""
+        t0 = time.time()
+        tennis_urls = [u for u in urls if is_tennis_url(u)]
+        players = collect_day_players(tennis_urls, stubs)
+        self.stats['matches'] += len(tennis_urls)
+        self.stats['players'] += len(players)
+
+        missing = []
+        for profile, name in players.items():
+            record = cached_player_record(profile, name)
+            if record is not None:
+                self.records[profile] = record
+                self.stats['cached'] += 1
+            else:
+                missing.append(profile)
+
+        if missing:
+            pool = MatchWorkerPool(
+                workers=min(self.workers, len(missing)),
+                driver_factory=self.driver_factory,
+                delay_range=self.delay_range,
+            )
+            results = pool.map(missing, lambda profile, driver: self.fetch(driver, profile, players[profile]))
+            for profile, record in zip(missing, results):
+                if record is None:
+                    self.stats['failed'] += 1
+                    continue
+                self.records[profile] = record
+                self.stats['fetched'] += 1
+
+        self.stats['time_s'] += time.time() - t0
+        logger.info(self.format_report())
+        return self.records
+
+    def format_report(self) -> str:
+        s = self.stats
+        return (f"🎾 Prefetch zawodników: {s['players']} unikalnych z {s['matches']} meczów "
+                f"({s['cached']} z cache, {s['fetched']} pobranych, {s['failed']} błędów) "
+                f"w {s['time_s']:.1f}s")
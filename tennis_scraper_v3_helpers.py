@@ -10,6 +10,7 @@ Wymagania:
 """
 
 import re
+import threading
 import time
 from typing import List, Dict, Optional
 from bs4 import BeautifulSoup
@@ -19,13 +20,80 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+from disk_cache import PlayerCache
+
 
 # ==========================================
 # CACHE dla wydajności
 # ==========================================
 
+# Pamięć procesu przed cache dyskowym: {nazwa: url}, {(rodzaj, url/nazwa): dane}
 PLAYER_URL_CACHE = {}
 PLAYER_DATA_CACHE = {}
+_MEMO_LOCK = threading.Lock()
+
+# Trwały cache między runami (URL ~90 dni, forma/ranking/nawierzchnie kilka godzin)
+PLAYER_CACHE: Optional[PlayerCache] = None
+
+
+def get_player_cache() -> PlayerCache:
+    """Cache dyskowy zawodników (tworzony przy pierwszym użyciu)."""
+    global PLAYER_CACHE
+    with _MEMO_LOCK:
+        if PLAYER_CACHE is None:
+            PLAYER_CACHE = PlayerCache()
+        return PLAYER_CACHE
+
+
+def set_player_cache(cache: Optional[PlayerCache]) -> None:
+    """Podmienia cache dyskowy (np. inny plik); czyści pamięć procesu."""
+    global PLAYER_CACHE
+    with _MEMO_LOCK:
+        PLAYER_CACHE = cache
+        PLAYER_URL_CACHE.clear()
+        PLAYER_DATA_CACHE.clear()
+
+
+def cached_player_url(player_name: str) -> Optional[str]:
+    """URL profilu z pamięci procesu albo z cache dyskowego (bez nawigacji)."""
+    with _MEMO_LOCK:
+        url = PLAYER_URL_CACHE.get(player_name)
+    if url:
+        return url
+    url = get_player_cache().get_url(player_name)
+    if url:
+        with _MEMO_LOCK:
+            PLAYER_URL_CACHE[player_name] = url
+    return url
+
+
+def remember_player_url(player_name: str, player_url: str) -> None:
+    if not player_name or not player_url:
+        return
+    with _MEMO_LOCK:
+        PLAYER_URL_CACHE[player_name] = player_url
+    get_player_cache().set_url(player_name, player_url)
+
+
+def cached_player_data(player: str, kind: str):
+    """Forma / ranking / nawierzchnie zawodnika (``player`` = URL profilu albo nazwa) bez nawigacji."""
+    with _MEMO_LOCK:
+        value = PLAYER_DATA_CACHE.get((kind, player))
+    if value is not None:
+        return value
+    value = get_player_cache().get_data(player, kind)
+    if value is not None:
+        with _MEMO_LOCK:
+            PLAYER_DATA_CACHE[(kind, player)] = value
+    return value
+
+
+def remember_player_data(player: str, kind: str, value) -> None:
+    if not player or value in (None, [], {}):
+        return
+    with _MEMO_LOCK:
+        PLAYER_DATA_CACHE[(kind, player)] = value
+    get_player_cache().set_data(player, kind, value)
 
 
 # ==========================================
@@ -219,7 +287,12 @@ def extract_player_detailed_form(driver: webdriver.Chrome, player_name: str, pla
                 return []
         
         # Cache URL
-        PLAYER_URL_CACHE[player_name] = player_url
+        remember_player_url(player_name, player_url)
+        
+        # Forma z cache (świeża) - bez wchodzenia na profil
+        cached = cached_player_data(player_url, 'form')
+        if cached is not None:
+            return cached
         
         # 2. Odwiedź stronę wyników zawodnika
         results_url = player_url.rstrip('/') + '/wyniki/'
@@ -282,12 +355,30 @@ def extract_player_detailed_form(driver: webdriver.Chrome, player_name: str, pla
             if match_info.get('result'):
                 form.append(match_info)
         
+        remember_player_data(player_url, 'form', form[:10])
+        # Nagłówek profilu jest na każdej podstronie - ranking bez osobnej nawigacji
+        remember_player_data(player_url, 'ranking', parse_player_ranking(soup))
+        
     except Exception as e:
         print(f"   ⚠️ Błąd pobierania formy zawodnika {player_name}: {e}")
     
     return form[:10]  # Maksymalnie 10 ostatnich meczów
 
 
+def parse_player_ranking(soup: BeautifulSoup) -> Optional[int]:
+    """
+    Ranking ATP/WTA z nagłówka strony profilu zawodnika.
+
+    Livesport trzyma go w JSON strony ("rank":["ATP","13",...]),
+    fallback: tekst "ATP: 13" / "WTA: 42".
+    """
+    html_source = str(soup)
+    match = re.search(r'"rank":\["(?:ATP|WTA)","(\d+)",', html_source, re.IGNORECASE)
+    if not match:
+        match = re.search(r'(?:ATP|WTA):\s*(\d+)', soup.get_text(), re.IGNORECASE)
+    return int(match.group(1)) if match else None
+
+
 def find_player_url_from_search(driver: webdriver.Chrome, player_name: str) -> Optional[str]:
     """
     Znajduje URL profilu zawodnika przez wyszukiwarkę Livesport.
@@ -300,9 +391,10 @@ def find_player_url_from_search(driver: webdriver.Chrome, player_name: str) -> O
         URL profilu zawodnika lub None
     """
     try:
-        # Sprawdź cache
-        if player_name in PLAYER_URL_CACHE:
-            return PLAYER_URL_CACHE[player_name]
+        # Sprawdź cache (pamięć procesu, potem dysk)
+        cached = cached_player_url(player_name)
+        if cached:
+            return cached
         
         # Livesport search URL
         search_url = f"https://www.livesport.com/pl/szukaj/?q={player_name.replace(' ', '+')}"
@@ -321,10 +413,9 @@ def find_player_url_from_search(driver: webdriver.Chrome, player_name: str) -> O
             
             # Sprawdź czy to właściwy zawodnik
             if player_name.lower() in link_text:
-                if href.startswith('http'):
-                    return href
-                else:
-                    return f"https://www.livesport.com{href}"
+                url = href if href.startswith('http') else f"https://www.livesport.com{href}"
+                remember_player_url(player_name, url)
+                return url
         
         return None
         
@@ -363,6 +454,10 @@ def extract_surface_statistics(driver: webdriver.Chrome, player_url: str) -> Dic
         'grass': {'wins': 0, 'total': 0, 'win_rate': 0.0, 'recent_form': []}
     }
     
+    cached = cached_player_data(player_url, 'surface')
+    if cached is not None:
+        return cached
+    
     try:
         # Przejdź na stronę statystyk zawodnika
         stats_url = player_url.rstrip('/') + '/statystyki/'
@@ -404,6 +499,9 @@ def extract_surface_statistics(driver: webdriver.Chrome, player_url: str) -> Dic
         if all(s['total'] == 0 for s in stats.values()):
             stats = calculate_surface_stats_from_form(driver, player_url)
         
+        if any(s['total'] for s in stats.values()):
+            remember_player_data(player_url, 'surface', stats)
+        
     except Exception as e:
         print(f"   ⚠️ Błąd pobierania statystyk nawierzchni: {e}")
     
@@ -497,6 +595,13 @@ __all__ = [
     'extract_surface_statistics',
     'find_player_url_from_match_page',
     'find_player_url_from_search',
+    'parse_player_ranking',
+    'get_player_cache',
+    'set_player_cache',
+    'cached_player_url',
+    'cached_player_data',
+    'remember_player_url',
+    'remember_player_data',
     'PLAYER_URL_CACHE',
     'PLAYER_DATA_CACHE'
 ]
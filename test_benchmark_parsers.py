@@ -0,0 +1,71 @@
+"""
+Tests for benchmark_parsers (offline parser benchmark + golden outputs).
+
+Covers:
+  - Current parsers match debug_html/parser_golden.json for every fixture
+  - A broken parser is reported as a golden mismatch
+  - run(): ops/s and allocation stats per parser, report
+  - compare_baseline(): slowdown beyond --max-slowdown flagged
+"""
+
+import sys
+import os
+
+import pytest
+
+# Ensure project root is on path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import benchmark_parsers as bp
+import livesport_h2h_scraper as ls
+
+
+@pytest.fixture(scope='module')
+def bench():
+    return bp.ParserBenchmark(iterations=1)
+
+
+class TestGolden:
+
+    def test_fixtures_loaded(self, bench):
+        assert len(bench.h2h_fixtures) >= 1 and len(bench.forebet_fixtures) == 1
+        qualifying = next(fx for fx in bench.h2h_fixtures if fx['name'] == 'h2h_page_1763382582.html')
+        assert qualifying['home'] == 'Cuprum Stilon Gorzów'
+
+    def test_outputs_match_golden(self, bench):
+        assert bench.check_golden() == []
+        golden = bench.load_golden()
+        assert set(golden) == set(bp.BENCH_NAMES)
+        assert len(golden['h2h']['h2h_page_1763382582.html']) == 5
+        assert len(golden['forebet']['forebet_football_puppeteer.html']) > 0
+
+    def test_broken_parser_detected(self, bench, monkeypatch):
+        monkeypatch.setattr(ls, 'parse_h2h_from_soup', lambda soup, home_team: [])
+        mismatches = bench.check_golden()
+        assert 'h2h/h2h_page_1763382582.html: wynik różni się od golden' in mismatches
+        assert all(m.startswith('h2h/') for m in mismatches)
+
+    def test_missing_golden(self, tmp_path):
+        b = bp.ParserBenchmark(h2h_fixtures=[], forebet_fixtures=[],
+                               golden_path=str(tmp_path / 'golden.json'))
+        assert b.check_golden() and 'brak pliku golden' in b.check_golden()[0]
+        b.save_golden()
+        assert b.check_golden() == []
+
+
+class TestTiming:
+
+    def test_run_stats_and_report(self, bench):
+        stats = bench.run(benches=('h2h', 'links'))
+        for name in ('h2h', 'links'):
+            assert stats[name]['ops'] == len(bench.h2h_fixtures)
+            assert stats[name]['ops_per_s'] > 0 and stats[name]['peak_kb'] >= 0
+        report = bench.format_report()
+        assert 'h2h' in report and 'ops/s' in report
+
+    def test_compare_baseline(self):
+        b = bp.ParserBenchmark(h2h_fixtures=[], forebet_fixtures=[])
+        b.stats = {'h2h': {'ops_per_s': 100.0}, 'links': {'ops_per_s': 50.0}}
+        baseline = {'h2h': {'ops_per_s': 120.0}, 'links': {'ops_per_s': 100.0}}
+        regressions = b.compare_baseline(baseline, max_slowdown=1.5)
+        assert len(regressions) == 1 and regressions[0].startswith('links:')
@@ -0,0 +1,178 @@
+"""
+Tests for browser_recycler.BrowserRecycler.
+
+Covers:
+  - No restart while RSS and latency stay under thresholds
+  - Restart on RSS threshold, latency drift and the max_matches safety net
+  - Spare driver pre-started in the background and handed out on recycle
+  - driver_rss_mb() on the current process tree / without a PID
+  - MatchWorkerPool(recycler_factory=...) restarting only on recycler signal
+"""
+
+import sys
+import os
+import threading
+
+# Ensure project root is on path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import browser_recycler as br
+from browser_recycler import BrowserRecycler
+from match_worker_pool import MatchWorkerPool
+
+
+class FakeDriver:
+    _ids = 0
+    _lock = threading.Lock()
+
+    def __init__(self):
+        with FakeDriver._lock:
+            FakeDriver._ids += 1
+            self.id = FakeDriver._ids
+        self.quit_called = False
+
+    @property
+    def current_url(self):
+        if self.quit_called:
+            raise RuntimeError("driver dead")
+        return "about:blank"
+
+    def quit(self):
+        self.quit_called = True
+
+
+def _recycler(rss=None, **kwargs):
+    created = []
+
+    def factory():
+        d = FakeDriver()
+        created.append(d)
+        return d
+
+    kwargs.setdefault('sample_every', 1)
+    kwargs.setdefault('window', 3)
+    kwargs.setdefault('min_latency_increase', 0.5)
+    probe = (lambda driver: rss[0]) if rss is not None else (lambda driver: None)
+    return BrowserRecycler(factory, rss_probe=probe, **kwargs), created
+
+
+class TestThresholds:
+
+    def test_steady_driver_not_recycled(self):
+        recycler, created = _recycler(rss=[300.0], max_rss_mb=1000)
+        driver = FakeDriver()
+        assert all(recycler.observe(driver, 1.0) is None for _ in range(50))
+        assert created == []
+
+    def test_rss_threshold(self):
+        rss = [300.0]
+        recycler, _ = _recycler(rss=rss, max_rss_mb=1000, prestart_ratio=None)
+        driver = FakeDriver()
+        assert recycler.observe(driver, 1.0) is None
+        rss[0] = 1200.0
+        reason = recycler.observe(driver, 1.0)
+        assert reason.startswith('RSS 1200')
+        assert recycler.stats['peak_rss_mb'] == 1200.0
+
+    def test_latency_drift(self):
+        recycler, _ = _recycler(prestart_ratio=None)
+        driver = FakeDriver()
+        for _ in range(3):
+            assert recycler.observe(driver, 1.0) is None  # okno bazowe
+        assert recycler.observe(driver, 1.5) is None
+        assert recycler.observe(driver, 3.0) is None
+        assert recycler.observe(driver, 3.0).startswith('opóźnienie')
+
+    def test_small_absolute_drift_ignored(self):
+        recycler, _ = _recycler(prestart_ratio=None, min_latency_increase=2.0)
+        driver = FakeDriver()
+        for t in [0.1, 0.1, 0.1, 0.5, 0.5, 0.5]:
+            assert recycler.observe(driver, t) is None
+
+    def test_max_matches_safety_net(self):
+        recycler, _ = _recycler(max_matches=5, prestart_ratio=None)
+        driver = FakeDriver()
+        reasons = [recycler.observe(driver, 1.0) for _ in range(5)]
+        assert reasons[:4] == [None] * 4
+        assert reasons[4].startswith('limit')
+
+
+class TestRecycle:
+
+    def test_spare_prestarted_and_used(self):
+        rss = [850.0]  # >= 0.8 x próg -> zapasowy driver w tle
+        recycler, created = _recycler(rss=rss, max_rss_mb=1000)
+        old = FakeDriver()
+        assert recycler.observe(old, 1.0) is None
+        recycler._spare_thread.join()
+        assert len(created) == 1
+
+        rss[0] = 1100.0
+        reason = recycler.observe(old, 1.0)
+        new = recycler.recycle(old, reason)
+        assert old.quit_called
+        assert new is created[0]
+        assert recycler.stats['spare_hits'] == 1
+        assert recycler.matches == 0  # metryki od nowa dla nowego drivera
+        assert 'RSS:1' in recycler.format_report()
+
+    def test_recycle_without_spare_and_close(self):
+        recycler, created = _recycler(prestart_ratio=None)
+        new = recycler.recycle(FakeDriver(), 'limit 5 meczów')
+        assert new is created[0]
+        assert recycler.stats['spare_hits'] == 0
+
+        recycler.prestart()
+        recycler._spare_thread.join()
+        spare = created[-1]
+        recycler.close()
+        assert spare.quit_called
+
+
+class TestRssProbe:
+
+    def test_current_process(self):
+        class Proc:
+            pid = os.getpid()
+
+        class Service:
+            process = Proc()
+
+        class Driver:
+            service = Service()
+
+        rss = br.driver_rss_mb(Driver())
+        if br.PSUTIL_AVAILABLE:
+            assert rss > 1
+        else:
+            assert rss is None
+
+    def test_no_pid(self):
+        assert br.driver_rss_mb(object()) is None
+
+
+class TestPoolIntegration:
+
+    def test_restarts_only_on_recycler_signal(self):
+        created = []
+
+        def factory():
+            d = FakeDriver()
+            created.append(d)
+            return d
+
+        def recycler_factory(driver_factory, name):
+            return BrowserRecycler(driver_factory, name=name, max_matches=4,
+                                   prestart_ratio=None, rss_probe=lambda d: None)
+
+        pool = MatchWorkerPool(workers=1, driver_factory=factory, delay_range=None,
+                               restart_delay=0, restart_interval=1,
+                               recycler_factory=recycler_factory)
+        results = pool.map([f'u{i}' for i in range(10)], lambda url, drv: {'url': url, 'driver': drv.id})
+
+        assert [r['url'] for r in results] == [f'u{i}' for i in range(10)]
+        # restart_interval=1 ignorowany - restart tylko po 4 meczach na driverze
+        assert pool.stats['restarts'] == 2
+        assert len({r['driver'] for r in results}) == 3
+        assert len(pool.recyclers) == 1
+        assert pool.recyclers[0].stats['reasons'] == {'limit': 2}
@@ -0,0 +1,185 @@
+"""
+Tests for disk_cache (persistent SQLite cache + team-pair H2H cache).
+
+Covers:
+  - DiskCache: get/set/delete across instances, namespaces, TTL
+  - h2h_pair_key(): canonical (order-independent) team-pair key from Livesport URLs
+  - H2HCache: hit for the same fixture, invalidation on a new fixture of the pair,
+    newer-meeting detection and hit-rate report; empty H2H never stored
+  - process_match(h2h_cache=...): non-qualifying cache hit without any page load,
+    qualifying cache hit loading the H2H page once for form, H2H wait miss not cached
+"""
+
+import sys
+import os
+import time
+import pytest
+
+# Ensure project root is on path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import livesport_h2h_scraper as ls
+from disk_cache import DiskCache, H2HCache, h2h_pair_key
+from livesport_http import LivesportHttpClient
+from page_archive import PageArchive, ReplayDriver
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+QUALIFYING = os.path.join(ROOT, 'debug_html', 'h2h_page_1763382582.html')
+NOT_QUALIFYING = os.path.join(ROOT, 'debug_html', 'h2h_page_1763382658.html')
+MATCH_URL = ('https://www.livesport.com/pl/mecz/siatkowka/cuprum-stilon-gorzow-K4CJzoda/'
+             'slepsk-malow-suwalki-2kggPBWE/?mid=AByAQtGc')
+SWAPPED_URL = ('https://www.livesport.com/pl/mecz/siatkowka/slepsk-malow-suwalki-2kggPBWE/'
+               'cuprum-stilon-gorzow-K4CJzoda/?mid=NEXTMTCH')
+
+
+def _read(path):
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+        self.status_code = 200
+
+
+class FakeSession:
+    def __init__(self, html):
+        self.html = html
+        self.requested = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.requested.append(url)
+        return FakeResponse(self.html)
+
+
+class UntouchableDriver:
+    """Fails the test if process_match touches Selenium."""
+
+    def __getattr__(self, name):
+        raise AssertionError(f"driver.{name} used on a cache hit")
+
+
+class PageDriver(ReplayDriver):
+    """Udaje Chrome na stronie z debug_html."""
+
+    def __init__(self, html):
+        super().__init__(PageArchive())
+        self._fixture = html
+
+    @property
+    def page_source(self):
+        self._html = self._fixture
+        return self._fixture
+
+    def _current_soup(self):
+        self._html = self._fixture
+        return super()._current_soup()
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return H2HCache(DiskCache(str(tmp_path / 'cache.sqlite'), namespace='h2h'))
+
+
+class TestDiskCache:
+
+    def test_roundtrip_and_namespaces(self, tmp_path):
+        path = str(tmp_path / 'c.sqlite')
+        a = DiskCache(path, namespace='a')
+        a.set('k', {'x': [1, 2]})
+        assert DiskCache(path, namespace='a').get('k') == {'x': [1, 2]}
+        assert DiskCache(path, namespace='b').get('k') is None
+        a.delete('k')
+        assert a.get('k') is None and len(a) == 0
+
+    def test_ttl(self, tmp_path, monkeypatch):
+        c = DiskCache(str(tmp_path / 'c.sqlite'), max_age_days=1)
+        c.set('k', 1)
+        now = time.time()
+        monkeypatch.setattr(time, 'time', lambda: now + 2 * 86400)
+        assert c.get('k') is None
+
+
+class TestH2HCache:
+
+    def test_pair_key_is_order_independent(self):
+        assert h2h_pair_key(MATCH_URL, 'volleyball') == 'volleyball:2kggPBWE|K4CJzoda'
+        assert h2h_pair_key(SWAPPED_URL, 'volleyball') == h2h_pair_key(MATCH_URL, 'volleyball')
+        assert h2h_pair_key('https://www.livesport.com/pl/', 'football') is None
+
+    def test_same_fixture_hits_new_fixture_invalidates(self, cache):
+        info = {'home_team': 'A', 'away_team': 'B', 'h2h_last5': [{'date': '01.02.2025'}],
+                'last_h2h_date': '01.02.2025'}
+        assert cache.lookup(MATCH_URL, 'volleyball') is None
+        assert cache.store(MATCH_URL, 'volleyball', info)
+
+        entry = cache.lookup(MATCH_URL, 'volleyball')
+        assert entry['h2h_last5'] == info['h2h_last5']
+        assert entry['mid'] == 'AByAQtGc'
+
+        # kolejny mecz tej pary -> zapisany mecz to nowsze spotkanie
+        assert cache.lookup(SWAPPED_URL, 'volleyball') is None
+        assert cache.stats['invalidated'] == 1
+        cache.store(SWAPPED_URL, 'volleyball', dict(info, last_h2h_date='15.03.2025'))
+        assert cache.stats['newer_meetings'] == 1
+        assert cache.lookup(SWAPPED_URL, 'volleyball')['last_meeting_date'] == '15.03.2025'
+
+        assert cache.stats['hits'] == 2 and cache.stats['lookups'] == 4
+        assert '2/4' in cache.format_report()
+
+    def test_page_without_teams_not_stored(self, cache):
+        assert not cache.store(MATCH_URL, 'volleyball', {'home_team': None, 'h2h_last5': []})
+
+    def test_empty_h2h_not_stored(self, cache):
+        assert not cache.store(MATCH_URL, 'volleyball', {'home_team': 'A', 'away_team': 'B', 'h2h_last5': []})
+        assert cache.lookup(MATCH_URL, 'volleyball') is None
+
+
+class TestProcessMatchCache:
+
+    @pytest.fixture(autouse=True)
+    def _no_odds(self, monkeypatch):
+        monkeypatch.setattr(ls, 'fetch_odds_from_livesport',
+                            lambda driver, url, sport='football': {'odds_found': False})
+
+    def _first_run(self, cache, html):
+        session = FakeSession(html)
+        info = ls.process_match(MATCH_URL, UntouchableDriver(), sport='volleyball',
+                                http_client=LivesportHttpClient(session_factory=lambda: session),
+                                h2h_cache=cache)
+        return info, session
+
+    def test_non_qualifying_hit_skips_page(self, cache):
+        first, _ = self._first_run(cache, _read(NOT_QUALIFYING))
+        assert not first['qualifies'] and first['h2h_count'] > 0
+
+        second = ls.process_match(MATCH_URL, UntouchableDriver(), sport='volleyball', h2h_cache=cache)
+        assert cache.stats['hits'] == 1
+        for field in ('home_team', 'away_team', 'match_time', 'h2h_last5', 'h2h_count',
+                      'home_wins_in_h2h_last5', 'win_rate', 'qualifies', 'last_h2h_date',
+                      'home_form', 'away_form'):
+            assert second[field] == first[field], field
+
+    def test_failed_h2h_load_not_cached(self, cache, monkeypatch):
+        # Strona otwarta (nagłówek z nazwami), ale sekcji H2H nie doczekano się po kliknięciu zakładki
+        monkeypatch.setattr(ls, 'wait_for_h2h_content', lambda driver, sport=None: False)
+        monkeypatch.setattr(ls, 'click_h2h_tab', lambda driver: None)
+        info = ls.process_match(MATCH_URL, PageDriver(_read(QUALIFYING)), sport='volleyball', h2h_cache=cache)
+        assert info['home_team'] and info['away_team']
+        assert cache.stats['stores'] == 0
+        assert cache.lookup(MATCH_URL, 'volleyball') is None
+
+    def test_qualifying_hit_loads_page_once_for_form(self, cache):
+        first, _ = self._first_run(cache, _read(QUALIFYING))
+        assert first['qualifies']
+
+        session = FakeSession(_read(QUALIFYING))
+        second = ls.process_match(MATCH_URL, UntouchableDriver(), sport='volleyball',
+                                  http_client=LivesportHttpClient(session_factory=lambda: session),
+                                  h2h_cache=cache)
+        urls = ls.build_h2h_urls(MATCH_URL)
+        assert session.requested == [urls['overall'], urls['home']]
+        assert second['h2h_last5'] == first['h2h_last5']
+        assert second['home_form_overall'] == first['home_form_overall']
+        assert second['home_form_home'] == first['home_form_home']
@@ -0,0 +1,186 @@
+"""
+Tests for driver_factory (persistent Chrome profiles + warm spare driver).
+
+Covers:
+  - Warm spare: second call served from the background start, pool refilled
+  - Profile slots: one per live driver, reused after quit, stale lock files removed
+  - ChromeDriver path resolved once and persisted next to the profiles
+  - Warmup (consent) once per fresh profile slot, only for spares
+  - Crashed spare discarded; close() quits unused spares
+  - Profiles disabled ('off'), make_driver_factory in archive replay
+"""
+
+import sys
+import os
+import threading
+
+import pytest
+
+# Ensure project root is on path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import driver_factory as df
+from driver_factory import DriverFactory, get_profile_root
+import livesport_h2h_scraper as ls
+import page_archive as pa
+
+
+class FakeProcess:
+    def __init__(self):
+        self.returncode = None
+
+    def poll(self):
+        return self.returncode
+
+
+class FakeDriver:
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.service = type('Service', (), {'process': FakeProcess()})()
+        self.quit_calls = 0
+
+    def quit(self):
+        self.quit_calls += 1
+        self.service.process.returncode = 0
+
+
+class Starter:
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def __call__(self, **kwargs):
+        driver = FakeDriver(**kwargs)
+        with self.lock:
+            self.calls.append(driver)
+        return driver
+
+
+def _factory(tmp_path, spares=1, warmup=None, resolve=None):
+    starter = Starter()
+    factory = DriverFactory(starter, profile_root=str(tmp_path / 'profiles'), spares=spares,
+                            resolve_driver_path=resolve, warmup=warmup)
+    return factory, starter
+
+
+def _join_spares(factory):
+    for thread in list(factory._spare_threads):
+        thread.join()
+
+
+class TestSpare:
+
+    def test_second_call_uses_spare(self, tmp_path):
+        factory, starter = _factory(tmp_path)
+        first = factory()
+        _join_spares(factory)
+        assert len(starter.calls) == 2        # bieżący + zapasowy w tle
+        second = factory()
+        assert second is starter.calls[1] and second is not first
+        assert factory.stats['spare_hits'] == 1 and factory.stats['spare_misses'] == 1
+        _join_spares(factory)
+        assert len(factory._spare_pool) == 1  # zapas uzupełniony
+        factory.close()
+        assert starter.calls[2].quit_calls == 1
+
+    def test_no_spares(self, tmp_path):
+        factory, starter = _factory(tmp_path, spares=0)
+        factory()
+        factory()
+        assert len(starter.calls) == 2 and factory._spare_threads == []
+
+    def test_crashed_spare_discarded(self, tmp_path):
+        factory, starter = _factory(tmp_path)
+        factory()
+        _join_spares(factory)
+        factory._spare_pool[0].service.process.returncode = -9
+        driver = factory()
+        assert driver is starter.calls[2] and starter.calls[1].quit_calls == 1
+        factory.close()
+
+
+class TestProfiles:
+
+    def test_slots_reused_after_quit(self, tmp_path):
+        factory, starter = _factory(tmp_path, spares=0)
+        a = factory()
+        b = factory()
+        assert a.kwargs['profile_dir'] != b.kwargs['profile_dir']
+        assert a.kwargs['profile_dir'].endswith('slot-0') and os.path.isdir(a.kwargs['profile_dir'])
+        a.quit()
+        c = factory()
+        assert c.kwargs['profile_dir'] == a.kwargs['profile_dir']
+
+    def test_stale_lock_removed(self, tmp_path):
+        factory, _ = _factory(tmp_path, spares=0)
+        slot = tmp_path / 'profiles' / 'slot-0'
+        slot.mkdir(parents=True)
+        (slot / 'SingletonLock').write_text('host-123')
+        factory()
+        assert not (slot / 'SingletonLock').exists()
+
+    def test_driver_path_resolved_once(self, tmp_path):
+        binary = tmp_path / 'chromedriver'
+        binary.write_text('')
+        resolved = []
+        factory, starter = _factory(tmp_path, spares=0, resolve=lambda: resolved.append(1) or str(binary))
+        factory()
+        factory()
+        assert resolved == [1]
+        assert all(d.kwargs['driver_path'] == str(binary) for d in starter.calls)
+
+        # kolejny run: ścieżka z pliku w katalogu profili
+        next_run, _ = _factory(tmp_path, spares=0, resolve=lambda: pytest.fail('resolve'))
+        assert next_run.driver_path() == str(binary)
+
+    def test_warmup_once_per_slot(self, tmp_path):
+        warmed = []
+        factory, starter = _factory(tmp_path, warmup=warmed.append)
+        factory()
+        _join_spares(factory)
+        assert warmed == [starter.calls[1]]  # tylko zapasowy, nie bieżący
+        spare = factory()
+        _join_spares(factory)
+        assert len(warmed) == 2              # nowy zapas na slot-2
+        spare.quit()
+        factory.close()
+
+        # kolejny run: zapas na slot-1 (rozgrzany wcześniej) - bez warmup
+        again, again_starter = _factory(tmp_path, warmup=warmed.append)
+        again()
+        _join_spares(again)
+        assert again_starter.calls[1].kwargs['profile_dir'].endswith('slot-1')
+        assert len(warmed) == 2
+        again.close()
+
+    def test_profiles_off(self, tmp_path, monkeypatch):
+        monkeypatch.setenv(df.CHROME_PROFILE_ENV, 'off')
+        assert get_profile_root() is None
+        factory = DriverFactory(Starter(), spares=0)
+        assert 'profile_dir' not in factory().kwargs
+        monkeypatch.delenv(df.CHROME_PROFILE_ENV)
+        assert get_profile_root() == df.DEFAULT_PROFILE_ROOT
+        assert get_profile_root(str(tmp_path)) == str(tmp_path)
+
+
+class TestScraperIntegration:
+
+    def test_replay_factory_without_chrome(self, tmp_path):
+        pa.PageArchive(str(tmp_path / 'archive'), 'record').close()
+        pa.enable_archive(str(tmp_path / 'archive'), 'replay')
+        try:
+            factory = ls.make_driver_factory(headless=True)
+            assert factory.spares == 0 and factory.profile_root is None
+            assert isinstance(factory(), pa.ReplayDriver)
+        finally:
+            pa.disable_archive()
+
+    def test_resolved_path_cached(self, monkeypatch):
+        import glob
+        calls = []
+        monkeypatch.setattr(ls, '_CHROMEDRIVER_PATH', None)
+        monkeypatch.setattr(glob, 'glob', lambda pattern, recursive=False: calls.append(pattern) or
+                            ['/wdm/119/chromedriver.exe', '/wdm/120/chromedriver.exe'])
+        assert ls.resolve_chromedriver_path() == '/wdm/120/chromedriver.exe'
+        assert ls.resolve_chromedriver_path() == '/wdm/120/chromedriver.exe'
+        assert len(calls) == 1
@@ -0,0 +1,119 @@
+"""
+Tests for enrichment_pipeline (phase 2 running alongside phase 1).
+
+Covers:
+  - Rows enriched while the producer is still submitting (overlap, not sum)
+  - on_done called once per row, failures counted without killing workers
+  - setup_fn runs first, should_stop leaves remaining rows unenriched
+  - scrape_and_notify.enrich_row() with injected Forebet / SofaScore sources
+"""
+
+import sys
+import os
+import time
+import threading
+
+import pytest
+
+# Ensure project root is on path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from enrichment_pipeline import EnrichmentPipeline
+import scrape_and_notify as sn
+
+
+class TestPipeline:
+
+    def test_overlaps_with_producer(self):
+        done = []
+
+        def enrich(row):
+            time.sleep(0.05)
+            row['enriched'] = True
+            return True
+
+        pipeline = EnrichmentPipeline(enrich, workers=2, on_done=lambda row, ok: done.append(row['n']))
+        pipeline.start()
+        t0 = time.time()
+        rows = [{'n': n} for n in range(10)]
+        for row in rows:
+            time.sleep(0.05)  # "FAZA 1" - process_match
+            pipeline.submit(row)
+        produced = time.time() - t0
+        pipeline.close()
+        total = time.time() - t0
+
+        assert sorted(done) == list(range(10))
+        assert all(row['enriched'] for row in rows)
+        # sekwencyjnie: 0.5 s + 0.5 s; w tle zostaje najwyżej ogon kolejki
+        assert total < produced + 0.25
+        assert pipeline.stats['enriched'] == 10 and pipeline.stats['submitted'] == 10
+
+    def test_failures_counted(self):
+        def enrich(row):
+            if row['n'] % 2:
+                raise RuntimeError('boom')
+            return False
+
+        done = []
+        pipeline = EnrichmentPipeline(enrich, workers=1, on_done=lambda row, ok: done.append((row['n'], ok)))
+        pipeline.start()
+        for n in range(4):
+            pipeline.submit({'n': n})
+        pipeline.close()
+        assert done == [(0, False), (1, False), (2, False), (3, False)]
+        assert pipeline.stats['failed'] == 2 and pipeline.stats['enriched'] == 0
+        assert 'błędy: 2' in pipeline.format_report()
+
+    def test_setup_before_rows_and_should_stop(self):
+        events = []
+        stop = threading.Event()
+
+        def setup():
+            time.sleep(0.05)
+            events.append('setup')
+
+        def enrich(row):
+            events.append(row['n'])
+            if row['n'] == 1:
+                stop.set()
+            return True
+
+        pipeline = EnrichmentPipeline(enrich, workers=1, setup_fn=setup, should_stop=stop.is_set)
+        pipeline.start()
+        for n in range(4):
+            pipeline.submit({'n': n})
+        pipeline.close()
+        assert events == ['setup', 0, 1]
+        assert pipeline.stats['dropped'] == 2
+
+    def test_submit_after_close(self):
+        pipeline = EnrichmentPipeline(lambda row: True)
+        pipeline.start()
+        pipeline.close()
+        with pytest.raises(RuntimeError):
+            pipeline.submit({})
+
+
+class TestEnrichRow:
+
+    def test_sources(self):
+        calls = {}
+
+        def forebet(home_team, away_team, match_date, sport):
+            calls['forebet'] = (home_team, away_team, match_date, sport)
+            return {'success': True, 'prediction': '1', 'probability': 55}
+
+        def sofascore(home_team, away_team, sport, date_str):
+            return {'found': False}
+
+        row = {'home_team': 'A', 'away_team': 'B', 'match_time': '05.10.2025 18:00',
+               'match_url': 'https://www.livesport.com/pl/mecz/pilka-nozna/a-AAAAAAAA/b-BBBBBBBB/?mid=X'}
+        assert sn.enrich_row(row, '2025-10-04', search_forebet=forebet, get_sofascore=sofascore)
+        assert calls['forebet'] == ('A', 'B', '2025-10-05', 'football')
+        assert row['forebet_prediction'] == '1' and row['forebet_probability'] == 55
+        assert 'sofascore_home_win_prob' not in row
+
+    def test_no_sources(self):
+        row = {'home_team': 'A', 'away_team': 'B'}
+        assert not sn.enrich_row(row, '2025-10-04')
@@ -0,0 +1,87 @@
+"""
+Tests for the explicit-wait helpers in livesport_h2h_scraper.
+
+Covers:
+  - wait_for_any returns as soon as any selector matches
+  - wait_for_any gives up after the timeout (no implicit wait stalls)
+  - wait_for_h2h_content: sections + short grace for rows
+  - Per-sport timeouts and the CI factor
+"""
+
+import sys
+import os
+import time
+import pytest
+
+# Ensure project root is on path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import livesport_h2h_scraper as ls
+
+
+class FakeDriver:
+    """Driver whose elements 'appear' after a given delay per selector."""
+
+    def __init__(self, appear_after=None):
+        self.appear_after = appear_after or {}
+        self.t0 = time.time()
+        self.calls = 0
+
+    def find_elements(self, by, selector):
+        self.calls += 1
+        delay = self.appear_after.get(selector)
+        if delay is not None and time.time() - self.t0 >= delay:
+            return [object()]
+        return []
+
+
+class TestWaitForAny:
+
+    def test_returns_matching_selector(self):
+        d = FakeDriver({'div.b': 0})
+        assert ls.wait_for_any(d, ['div.a', 'div.b'], timeout=1) == 'div.b'
+
+    def test_waits_until_element_appears(self):
+        d = FakeDriver({'div.a': 0.3})
+        t = time.time()
+        assert ls.wait_for_any(d, ['div.a'], timeout=2, poll_frequency=0.05) == 'div.a'
+        elapsed = time.time() - t
+        assert 0.25 <= elapsed < 1.0
+
+    def test_timeout_returns_none(self):
+        d = FakeDriver()
+        t = time.time()
+        assert ls.wait_for_any(d, ['div.missing'], timeout=0.3, poll_frequency=0.05) is None
+        assert time.time() - t < 1.0
+
+
+class TestWaitForH2H:
+
+    def test_sections_and_rows(self):
+        d = FakeDriver({'div.h2h__section': 0, 'a.h2h__row': 0})
+        assert ls.wait_for_h2h_content(d, 'football') is True
+
+    def test_no_rows_only_grace_period(self, monkeypatch):
+        monkeypatch.setattr(ls, 'H2H_ROWS_GRACE', 0.2)
+        d = FakeDriver({'div.h2h__section': 0})
+        t = time.time()
+        assert ls.wait_for_h2h_content(d, 'football') is True
+        assert time.time() - t < 1.0
+
+    def test_no_sections(self, monkeypatch):
+        monkeypatch.setattr(ls, 'get_wait_timeout', lambda sport=None: 0.2)
+        assert ls.wait_for_h2h_content(FakeDriver(), 'football') is False
+
+
+class TestTimeouts:
+
+    def test_per_sport(self, monkeypatch):
+        monkeypatch.delenv('CI', raising=False)
+        monkeypatch.delenv('GITHUB_ACTIONS', raising=False)
+        assert ls.get_wait_timeout('volleyball') == ls.SPORT_WAIT_TIMEOUTS['volleyball']
+        assert ls.get_wait_timeout('unknown') == ls.DEFAULT_WAIT_TIMEOUT
+
+    def test_ci_factor(self, monkeypatch):
+        monkeypatch.setenv('CI', 'true')
+        expected = ls.SPORT_WAIT_TIMEOUTS['football'] * ls.CI_WAIT_FACTOR
+        assert ls.get_wait_timeout('football') == pytest.approx(expected)
@@ -0,0 +1,103 @@
+"""
+Tests for html_parsing (pluggable BeautifulSoup backend + partial parsing).
+
+Covers:
+  - Backend selection (argument > env > auto) and fallback to html.parser
+  - Livesport parsers (H2H, form, listing links) give identical output on
+    html.parser, lxml and strainer-limited soups (debug_html fixtures)
+  - Forebet row counting with FOREBET_ROWS_STRAINER and search_forebet_prediction
+    returning the same result for html.parser and make_soup soups
+"""
+
+import sys
+import os
+import glob
+import time
+import pytest
+from bs4 import BeautifulSoup
+
+# Ensure project root is on path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import html_parsing as hp
+from html_parsing import make_soup, H2H_STRAINER, LINKS_STRAINER, FOREBET_ROWS_STRAINER
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+H2H_FIXTURES = sorted(glob.glob(os.path.join(ROOT, 'debug_html', 'h2h_page_*.html')))
+FOREBET_FIXTURE = os.path.join(ROOT, 'forebet_football_puppeteer.html')
+
+
+def _read(path):
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+
+class TestBackend:
+
+    def test_auto_prefers_lxml(self, monkeypatch):
+        monkeypatch.delenv(hp.PARSER_BACKEND_ENV, raising=False)
+        expected = 'lxml' if hp.LXML_AVAILABLE else 'html.parser'
+        assert hp.get_parser_backend() == expected
+
+    def test_env_and_argument(self, monkeypatch):
+        monkeypatch.setenv(hp.PARSER_BACKEND_ENV, 'html.parser')
+        assert hp.get_parser_backend() == 'html.parser'
+        assert make_soup('<p>x</p>').builder.NAME == 'html.parser'
+        assert hp.get_parser_backend('bogus') == 'html.parser'
+
+    def test_lxml_missing_falls_back(self, monkeypatch):
+        monkeypatch.setattr(hp, 'LXML_AVAILABLE', False)
+        assert hp.get_parser_backend('lxml') == 'html.parser'
+
+    def test_empty_html(self):
+        assert make_soup(None).get_text() == ''
+
+
+@pytest.mark.parametrize('path', H2H_FIXTURES, ids=os.path.basename)
+def test_livesport_parsers_identical(path):
+    import livesport_h2h_scraper as ls
+
+    html = _read(path)
+    reference = BeautifulSoup(html, 'html.parser')
+    soups = [make_soup(html, backend='lxml'), make_soup(html, parse_only=H2H_STRAINER)]
+
+    expected_h2h = ls.parse_h2h_from_soup(reference, '')
+    expected_form = ls._parse_form_from_h2h_soup(reference, 'overall')
+    expected_away = ls._parse_away_form_from_soup(reference, [])
+    for soup in soups:
+        assert ls.parse_h2h_from_soup(soup, '') == expected_h2h
+        assert ls._parse_form_from_h2h_soup(soup, 'overall') == expected_form
+        assert ls._parse_away_form_from_soup(soup, []) == expected_away
+
+    expected_links = ls._extract_match_links_from_soup(reference, 'https://x', set())
+    for soup in (make_soup(html, backend='lxml'), make_soup(html, parse_only=LINKS_STRAINER)):
+        assert ls._extract_match_links_from_soup(soup, 'https://x', set()) == expected_links
+
+
+class TestForebet:
+
+    def test_row_strainer_counts(self):
+        html = _read(FOREBET_FIXTURE)
+        full = BeautifulSoup(html, 'html.parser').find_all('div', class_='rcnt')
+        strained = make_soup(html, parse_only=FOREBET_ROWS_STRAINER).find_all('div', class_='rcnt')
+        assert len(strained) == len(full) > 0
+        assert [r.get_text(' ', strip=True) for r in strained] == [r.get_text(' ', strip=True) for r in full]
+
+    def test_search_prediction_identical(self, monkeypatch, tmp_path, capsys):
+        import forebet_scraper as fs
+
+        monkeypatch.chdir(tmp_path)  # pliki debug forebet_debug*.html
+        html = _read(FOREBET_FIXTURE)
+        row = make_soup(html).find_all('div', class_='rcnt')[3]
+        home_span, away_span, _, _ = fs._forebet_row_team_spans(row)
+        home, away = home_span.get_text(strip=True), away_span.get_text(strip=True)
+
+        results = []
+        for soup in (BeautifulSoup(html, 'html.parser'), make_soup(html)):
+            monkeypatch.setattr(fs, '_forebet_cache', {})
+            monkeypatch.setattr(fs, '_forebet_html_cache', {'football_2025-11-17': (html, soup, time.time())})
+            results.append(fs.search_forebet_prediction(home, away, '2025-11-17', sport='football'))
+
+        assert results[0] == results[1]
+        assert results[0]['home_team_forebet'] == home
+        assert results[0]['away_team_forebet'] == away
@@ -0,0 +1,246 @@
+"""
+Tests for the on-disk HTTP response cache (http_cache) wired into HttpTransport.
+
+Covers:
+  - Canonical keys: method + URL + params, query order irrelevant
+  - Per-endpoint TTL rules; endpoints without a rule bypass the cache
+  - Fresh hit served without a request; stale entry revalidated with
+    If-None-Match / If-Modified-Since and 304 extending it
+  - Only 200 responses stored (no-store, errors and retry_on rejects skipped)
+  - Stale entry served when upstream fails (exception, 5xx, open circuit)
+  - LRU eviction to the size bound; entries shared between cache instances
+    (separate connections, as in separate processes / after fork)
+  - Cache bypassed while the page archive records / replays: a run recorded
+    with a warm cache replays with an empty cache
+"""
+
+import sys
+import os
+import json
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+
+# Ensure project root is on path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import http_transport
+import page_archive as pa
+from http_cache import CachedResponse, HttpCache, cache_key
+from http_transport import CircuitOpenError, HttpTransport
+
+URL = 'https://api.sofascore.com/api/v1/sport/football/scheduled-events/2025-10-01'
+OTHER = 'https://global.ds.lsapp.eu/odds/pq_graphql'
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeResponse:
+
+    def __init__(self, status, payload=None, headers=None):
+        self.status_code = status
+        self.content = json.dumps(payload).encode() if payload is not None else b''
+        self.headers = headers or {}
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class FakeSession:
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def get(self, url, **kwargs):
+        self.calls.append((url, kwargs))
+        response = self.responses.pop(0) if len(self.responses) > 1 else self.responses[0]
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    monkeypatch.setattr(http_transport.time, 'sleep', lambda s: None)
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    cache = HttpCache(str(tmp_path / 'http.sqlite'), clock=clock)
+    yield cache
+    cache.close()
+
+
+def _transport(cache, **kwargs):
+    return HttpTransport(cache=cache, backoff=0.01, **kwargs)
+
+
+class TestKeysAndRules:
+
+    def test_canonical_key(self):
+        assert cache_key('get', 'https://API.x.com/a?b=2&a=1') == cache_key('GET', 'https://api.x.com/a', {'a': 1, 'b': '2'})
+        assert cache_key('GET', 'https://api.x.com/a', {'a': 1}) != cache_key('POST', 'https://api.x.com/a', {'a': 1})
+        assert cache_key('GET', 'https://api.x.com/a', {'a': None}) == cache_key('GET', 'https://api.x.com/a')
+
+    def test_ttl_rules(self, cache):
+        assert cache.ttl_for(URL) == 15 * 60
+        assert cache.ttl_for('https://site.api.espn.com/apis/site/v2/sports/soccer/eng.1/scoreboard') == 60
+        assert cache.ttl_for('https://www.thesportsdb.com/api/v1/json/1/searchteams.php?t=Arsenal') == 24 * 3600
+        assert cache.ttl_for(OTHER) == 0
+
+
+class TestTransportCache:
+
+    def test_fresh_hit_without_request(self, cache, clock):
+        session = FakeSession(FakeResponse(200, {'events': [1]}))
+        transport = _transport(cache)
+        first = transport.get(URL, session=session, timeout=10)
+        second = transport.get(URL, session=session, timeout=10)
+        assert first.json() == second.json() == {'events': [1]}
+        assert isinstance(second, CachedResponse) and len(session.calls) == 1
+        assert cache.stats['hits'] == 1 and cache.stats['misses'] == 1
+        assert '1 trafień' in transport.format_report()
+
+    def test_revalidation_304(self, cache, clock):
+        session = FakeSession(FakeResponse(200, {'v': 1}, {'ETag': '"abc"', 'Last-Modified': 'Wed, 01 Oct 2025 10:00:00 GMT'}),
+                              FakeResponse(304, headers={'ETag': '"abc"'}))
+        transport = _transport(cache)
+        transport.get(URL, session=session, headers={'Accept': 'application/json'})
+        clock.now += 16 * 60
+        response = transport.get(URL, session=session, headers={'Accept': 'application/json'})
+
+        assert response.json() == {'v': 1} and response.from_cache
+        assert session.calls[1][1]['headers'] == {'Accept': 'application/json', 'If-None-Match': '"abc"',
+                                                  'If-Modified-Since': 'Wed, 01 Oct 2025 10:00:00 GMT'}
+        assert cache.stats['revalidated'] == 1
+        transport.get(URL, session=session)                  # 304 przedłużył TTL
+        assert len(session.calls) == 2
+
+    def test_changed_content_replaces_entry(self, cache, clock):
+        session = FakeSession(FakeResponse(200, {'v': 1}, {'ETag': '"1"'}), FakeResponse(200, {'v': 2}, {'ETag': '"2"'}))
+        transport = _transport(cache)
+        transport.get(URL, session=session)
+        clock.now += 16 * 60
+        assert transport.get(URL, session=session).json() == {'v': 2}
+        assert cache.lookup(cache_key('GET', URL))['etag'] == '"2"'
+
+    def test_not_stored(self, cache):
+        transport = _transport(cache)
+        transport.get(URL, session=FakeSession(FakeResponse(200, {'a': 1}, {'Cache-Control': 'private, no-store'})))
+        transport.get(URL, session=FakeSession(FakeResponse(404)))
+        transport.get(URL, session=FakeSession(FakeResponse(200)), retries=0, retry_on=lambda r: not r.content)
+        session = FakeSession(FakeResponse(200, {'a': 1}))
+        transport.get(OTHER, session=session)
+        transport.get(OTHER, session=session)
+        transport.get(URL, session=session, cache_ttl=0)
+        assert cache.size() == (0, 0) and len(session.calls) == 3
+
+    def test_stale_on_failure(self, cache, clock):
+        transport = _transport(cache, failure_threshold=2)
+        transport.get(URL, session=FakeSession(FakeResponse(200, {'v': 1})))
+        clock.now += 16 * 60
+
+        assert transport.get(URL, session=FakeSession(ConnectionError()), retries=0).json() == {'v': 1}
+        stale = transport.get(URL, session=FakeSession(FakeResponse(503)), retries=0)
+        assert stale.stale and stale.status_code == 200
+        with_open_circuit = FakeSession(FakeResponse(200, {'v': 2}))
+        assert transport.get(URL, session=with_open_circuit).json() == {'v': 1}
+        assert with_open_circuit.calls == [] and cache.stats['stale'] == 3
+
+        with pytest.raises(CircuitOpenError):                        # bez wpisu - błąd jak dotąd
+            transport.get(URL.replace('2025-10-01', '2025-10-02'), session=with_open_circuit)
+
+
+class TestStorage:
+
+    def test_lru_eviction(self, tmp_path, clock):
+        cache = HttpCache(str(tmp_path / 'lru.sqlite'), max_mb=250 / 1024 / 1024, clock=clock)
+        transport = _transport(cache)
+        body = {'x': 'y' * 80}                                # ~90 B na wpis
+        for day in ('01', '02'):
+            transport.get(URL[:-2] + day, session=FakeSession(FakeResponse(200, body)))
+            clock.now += 120
+        transport.get(URL[:-2] + '01', session=FakeSession(FakeResponse(500)))   # trafienie - świeższe użycie
+        clock.now += 120
+        transport.get(URL[:-2] + '03', session=FakeSession(FakeResponse(200, body)))
+
+        assert cache.lookup(cache_key('GET', URL[:-2] + '02')) is None
+        assert cache.lookup(cache_key('GET', URL[:-2] + '01')) and cache.lookup(cache_key('GET', URL[:-2] + '03'))
+        assert cache.stats['evicted'] == 1 and cache.size()[1] <= 250
+        cache.close()
+
+    def test_shared_between_instances(self, cache, tmp_path, clock):
+        _transport(cache).get(URL, session=FakeSession(FakeResponse(200, {'v': 1})))
+        other = HttpCache(cache.path, clock=clock)                   # inny proces / worker
+        session = FakeSession(FakeResponse(200, {'v': 9}))
+        assert _transport(other).get(URL, session=session).json() == {'v': 1} and session.calls == []
+
+        other._pid = -1                                               # jak po forku: nowe połączenie
+        assert other.lookup(cache_key('GET', URL))['fresh']
+        other.close()
+
+    def test_from_env(self, monkeypatch):
+        monkeypatch.setenv('HTTP_CACHE_PATH', 'off')
+        assert HttpCache.from_env() is None
+
+
+class CannedAdapter(BaseAdapter):
+    """Transport requests zwracający stałą odpowiedź (bez sieci)."""
+
+    def __init__(self, body):
+        super().__init__()
+        self.body = body
+        self.calls = 0
+
+    def send(self, request, **kwargs):
+        self.calls += 1
+        response = requests.Response()
+        response.status_code = 200
+        response._content = self.body
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+class TestArchive:
+
+    def test_record_warm_cache_replay_cold(self, tmp_path, clock):
+        warm = HttpCache(str(tmp_path / 'warm.sqlite'), clock=clock)
+        session = requests.Session()
+        adapter = CannedAdapter(b'{"events": [1]}')
+        session.mount('https://', adapter)
+        _transport(warm).get(URL, session=session)              # wcześniejszy run bez archiwum
+        assert adapter.calls == 1
+
+        try:
+            pa.enable_archive(str(tmp_path / 'archive'), 'record')
+            assert _transport(warm).get(URL, session=session).json() == {'events': [1]}
+            assert adapter.calls == 2                           # świeży wpis pominięty - zapytanie nagrane
+            pa.get_archive().close()
+
+            pa.enable_archive(str(tmp_path / 'archive'), 'replay')
+            cold = HttpCache(str(tmp_path / 'cold.sqlite'), clock=clock)
+            response = _transport(cold).get(URL, session=requests.Session())
+            assert response.json() == {'events': [1]} and adapter.calls == 2
+            assert cold.size() == (0, 0)
+            cold.close()
+        finally:
+            pa.disable_archive()
+            warm.close()
@@ -0,0 +1,244 @@
+"""
+Tests for the shared HTTP transport (http_transport).
+
+Covers:
+  - TokenBucket: burst then paced reservations, max_wait rejection without spending a token
+  - CircuitBreaker: opens after N consecutive failures, half-open single probe, closes on success
+  - HttpTransport.call(): retries on exceptions / 429 / 5xx with Retry-After, retry_on predicate,
+    4xx counted as success, CircuitOpenError / RateLimitedError without calling upstream,
+    last response / error returned when the circuit opens mid-retries
+  - Per-host isolation of limits and breakers, HTTP_HOST_RATE_LIMITS parsing
+  - request(): explicit session object, method dispatch and kwargs pass-through
+"""
+
+import sys
+import os
+
+import pytest
+
+# Ensure project root is on path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import http_transport
+from http_transport import (CircuitBreaker, CircuitOpenError, HttpTransport, RateLimitedError,
+                            TokenBucket, parse_host_limits)
+
+URL = 'https://api.example.com/v1/data'
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeResponse:
+
+    def __init__(self, status, headers=None, text='ok'):
+        self.status_code = status
+        self.headers = headers or {}
+        self.text = text
+
+
+class Upstream:
+    """fn() dla call(): kolejne odpowiedzi / wyjątki z listy (ostatnia się powtarza)."""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        result = self.results.pop(0) if len(self.results) > 1 else self.results[0]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+@pytest.fixture
+def pauses(monkeypatch):
+    slept = []
+    monkeypatch.setattr(http_transport.time, 'sleep', slept.append)
+    monkeypatch.setattr(http_transport.random, 'uniform', lambda a, b: 0.0)
+    return slept
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def _transport(clock, **kwargs):
+    kwargs.setdefault('limits', {'api.example.com': (100.0, 100)})
+    return HttpTransport(backoff=0.5, clock=clock, **kwargs)
+
+
+class TestTokenBucket:
+
+    def test_burst_then_paced(self, clock):
+        bucket = TokenBucket(rate=2.0, burst=2, clock=clock)
+        assert [bucket.reserve(), bucket.reserve()] == [0.0, 0.0]
+        assert bucket.reserve() == pytest.approx(0.5)
+        assert bucket.reserve() == pytest.approx(1.0)   # kolejka za zarezerwowanym tokenem
+        clock.now += 10
+        assert bucket.reserve() == 0.0                   # uzupełnione, ale nie ponad burst
+        assert bucket.reserve() == 0.0 and bucket.reserve() > 0
+
+    def test_max_wait_keeps_token(self, clock):
+        bucket = TokenBucket(rate=1.0, burst=1, clock=clock)
+        assert bucket.reserve(max_wait=0) == 0.0
+        assert bucket.reserve(max_wait=0) is None
+        assert bucket.reserve(max_wait=0.5) is None
+        clock.now += 1
+        assert bucket.reserve(max_wait=0) == 0.0
+
+
+class TestCircuitBreaker:
+
+    def test_open_half_open_closed(self, clock):
+        breaker = CircuitBreaker(failure_threshold=3, cooldown_s=60, clock=clock)
+        for _ in range(2):
+            breaker.record_failure()
+        breaker.record_success()          # przerwana seria
+        for _ in range(3):
+            assert breaker.allow()
+            breaker.record_failure()
+        assert breaker.state == 'open' and not breaker.allow()
+
+        clock.now += 60
+        assert breaker.state == 'half-open'
+        assert breaker.allow() and not breaker.allow()   # tylko jedno zapytanie próbne
+        breaker.record_failure()
+        assert breaker.state == 'open'
+
+        clock.now += 60
+        assert breaker.allow()
+        breaker.record_success()
+        assert breaker.state == 'closed' and breaker.allow() and breaker.allow()
+
+
+class TestCall:
+
+    def test_retries_exceptions_and_statuses(self, clock, pauses):
+        transport = _transport(clock)
+        upstream = Upstream(ConnectionError('reset'), FakeResponse(429, {'Retry-After': '7'}),
+                            FakeResponse(200))
+        retried = []
+        result = transport.call(URL, upstream, retries=2, on_retry=lambda n, why: retried.append((n, why)))
+
+        assert result.status_code == 200 and upstream.calls == 3
+        assert retried == [(1, 'ConnectionError'), (2, 'HTTP 429')]
+        assert pauses == [0.5, 7.0]                      # backoff, potem Retry-After
+        assert transport.stats['api.example.com']['retries'] == 2
+        assert '3 zapytań, 2 ponowień' in transport.format_report()
+
+    def test_exhausted(self, clock, pauses):
+        transport = _transport(clock)
+        assert transport.call(URL, Upstream(FakeResponse(503)), retries=1).status_code == 503
+        with pytest.raises(TimeoutError):
+            transport.call(URL, Upstream(TimeoutError()), retries=1)
+        assert pauses == [0.5, 0.5]
+
+    def test_client_errors_not_retried(self, clock, pauses):
+        transport = _transport(clock, failure_threshold=2)
+        upstream = Upstream(FakeResponse(404))
+        for _ in range(3):
+            assert transport.call(URL, upstream, retries=2).status_code == 404
+        assert upstream.calls == 3 and pauses == []
+        assert transport.breaker('api.example.com').state == 'closed'
+
+    def test_retry_on(self, clock, pauses):
+        transport = _transport(clock)
+        upstream = Upstream(FakeResponse(200, text=''), FakeResponse(200, text='{}'))
+        result = transport.call(URL, upstream, retries=2, retry_on=lambda r: not r.text)
+        assert result.text == '{}' and upstream.calls == 2
+
+    def test_circuit_fails_fast(self, clock, pauses):
+        transport = _transport(clock, failure_threshold=3, cooldown_s=30)
+        upstream = Upstream(FakeResponse(502))
+        transport.call(URL, upstream, retries=2)
+        with pytest.raises(CircuitOpenError):
+            transport.call(URL, upstream)
+        assert upstream.calls == 3
+        assert 'odrzuconych (obwód open)' in transport.format_report()
+
+        clock.now += 30
+        upstream.results = [FakeResponse(200)]
+        assert transport.call(URL, upstream).status_code == 200
+        assert transport.breaker('api.example.com').state == 'closed'
+
+    def test_circuit_trips_during_retries(self, clock, pauses):
+        transport = _transport(clock, failure_threshold=2)
+        upstream = Upstream(FakeResponse(503))
+        assert transport.call(URL, upstream, retries=4).status_code == 503   # ostatnia odpowiedź, nie wyjątek
+        assert upstream.calls == 2 and pauses == [0.5]                       # bez dobijania po otwarciu
+
+        transport = _transport(clock, failure_threshold=2)
+        with pytest.raises(ConnectionError):
+            transport.call(URL, Upstream(ConnectionError('reset')), retries=4)
+        with pytest.raises(CircuitOpenError):
+            transport.call(URL, Upstream(FakeResponse(200)))
+
+    def test_rate_limited_does_not_block(self, clock, pauses):
+        transport = _transport(clock, limits={'api.example.com': (0.5, 1)})
+        upstream = Upstream(FakeResponse(200))
+        transport.call(URL, upstream, max_wait=0)
+        with pytest.raises(RateLimitedError):
+            transport.call(URL, upstream, max_wait=0)
+        assert upstream.calls == 1 and pauses == []
+
+        transport.call(URL, upstream)                    # bez max_wait: czeka na token
+        assert pauses == [pytest.approx(2.0)]
+
+    def test_hosts_isolated(self, clock, pauses):
+        transport = _transport(clock, failure_threshold=1)
+        transport.call(URL, Upstream(FakeResponse(500)), retries=0)
+        with pytest.raises(CircuitOpenError):
+            transport.call(URL, Upstream(FakeResponse(200)))
+        assert transport.call('https://other.example.com/x', Upstream(FakeResponse(200))).status_code == 200
+        assert transport.bucket('other.example.com').rate == http_transport.DEFAULT_LIMIT[0]
+
+
+class TestRequest:
+
+    def test_session_dispatch(self, clock, pauses):
+        class Session:
+            def __init__(self):
+                self.calls = []
+
+            def get(self, url, **kwargs):
+                self.calls.append(('get', url, kwargs))
+                return FakeResponse(200)
+
+            def post(self, url, **kwargs):
+                self.calls.append(('post', url, kwargs))
+                return FakeResponse(201)
+
+        session = Session()
+        transport = _transport(clock)
+        assert transport.get(URL, session=session, params={'a': 1}, timeout=5).status_code == 200
+        assert transport.request('POST', URL, session=session, json={}).status_code == 201
+        assert session.calls == [('get', URL, {'params': {'a': 1}, 'timeout': 5}),
+                                 ('post', URL, {'json': {}})]
+
+    def test_shared_session_and_singleton(self, clock):
+        transport = _transport(clock)
+        assert transport.session is transport.session
+        assert http_transport.get_transport() is http_transport.get_transport()
+
+
+class TestLimitsConfig:
+
+    def test_parse(self):
+        assert parse_host_limits('A.com=4:8, b.com=0.5 ,bad, c.com=x:1,') == {
+            'a.com': (4.0, 8), 'b.com': (0.5, 1)}
+        assert parse_host_limits(None) == {}
+
+    def test_env_override(self, monkeypatch, clock):
+        monkeypatch.setenv(http_transport.HOST_LIMITS_ENV, 'www.forebet.com=2:3')
+        transport = HttpTransport(clock=clock)
+        assert transport.limits['www.forebet.com'] == (2.0, 3)
+        assert transport.limits['api.sofascore.com'] == http_transport.HOST_LIMITS['api.sofascore.com']
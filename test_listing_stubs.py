@@ -0,0 +1,127 @@
+"""
+Tests for listing stubs (match metadata harvested from Livesport listing rows).
+
+Covers:
+  - Stub fields from a listing row: event id (row id / mid), teams, league, kickoff
+  - Row status: scheduled, live, finished (stage text or final score), postponed,
+    cancelled, abandoned
+  - filter_listing_stubs(): dropped statuses, excluded leagues (argument and env),
+    URLs without a stub kept
+  - apply_listing_stub(): fills only missing league / team fields
+"""
+
+import sys
+import os
+
+# Ensure project root is on path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import livesport_h2h_scraper as ls
+from html_parsing import make_soup, LISTING_ROWS_STRAINER
+
+BASE = 'https://www.livesport.com/pl/mecz/pilka-nozna/'
+
+
+def _row(slug, extra_class='', stage='', scores=('', ''), row_id=None, time='20:45'):
+    row_id_attr = f' id="{row_id}"' if row_id else ''
+    return f"""
+  <div class="event__match {extra_class}"{row_id_attr}>
+    <a href="/pl/mecz/pilka-nozna/{slug}/"></a>
+    <div class="event__time">{time}</div>
+    <div class="event__stage">{stage}</div>
+    <div class="event__participant event__participant--home">Home {slug[:1].upper()}</div>
+    <div class="event__participant event__participant--away">Away {slug[:1].upper()}</div>
+    <div class="event__score event__score--home">{scores[0]}</div>
+    <div class="event__score event__score--away">{scores[1]}</div>
+  </div>"""
+
+
+LISTING_HTML = f"""
+<div class="sportName soccer">
+  <div class="headerLeague__wrapper">
+    <span class="headerLeague__category-text">HISZPANIA</span>
+    <a class="headerLeague__title-text">LaLiga</a>
+  </div>
+  {_row('a-AAAAAAAA/b-BBBBBBBB', 'event__match--scheduled', row_id='g_1_AByAQtGc')}
+  {_row('c-CCCCCCCC/d-DDDDDDDD', 'event__match--live', stage='67', scores=('1', '0'))}
+  {_row('e-EEEEEEEE/f-FFFFFFFF', stage='Koniec', scores=('2', '2'))}
+  {_row('g-GGGGGGGG/h-HHHHHHHH', scores=('3', '1'))}
+  <div class="headerLeague__wrapper">
+    <span class="headerLeague__category-text">POLSKA</span>
+    <a class="headerLeague__title-text">Ekstraliga kobiet</a>
+  </div>
+  {_row('i-IIIIIIII/j-JJJJJJJJ', stage='Przełożony')}
+  {_row('k-KKKKKKKK/l-LLLLLLLL', stage='Odwołany')}
+  {_row('m-MMMMMMMM/n-NNNNNNNN', stage='Przerwany')}
+  {_row('o-OOOOOOOO/p-PPPPPPPP', 'event__match--scheduled')}
+</div>
+"""
+
+
+def _stubs():
+    return ls._extract_listing_stubs_from_soup(
+        make_soup(LISTING_HTML, parse_only=LISTING_ROWS_STRAINER), 'football')
+
+
+def _url(slug):
+    return f'{BASE}{slug}/'
+
+
+class TestStubs:
+
+    def test_fields(self):
+        stub = _stubs()[_url('a-AAAAAAAA/b-BBBBBBBB')]
+        assert stub == {
+            'event_id': 'AByAQtGc', 'sport': 'football', 'league': 'HISZPANIA: LaLiga',
+            'home_team': 'Home A', 'away_team': 'Away A', 'kickoff': '20:45',
+            'status': 'scheduled', 'has_odds': False,
+        }
+
+    def test_statuses(self):
+        statuses = [s['status'] for s in _stubs().values()]
+        assert statuses == ['scheduled', 'live', 'finished', 'finished',
+                            'postponed', 'cancelled', 'abandoned', 'scheduled']
+
+    def test_league_switches_with_header(self):
+        stubs = _stubs()
+        assert stubs[_url('o-OOOOOOOO/p-PPPPPPPP')]['league'] == 'POLSKA: Ekstraliga kobiet'
+
+
+class TestFilter:
+
+    def test_drops_statuses_and_keeps_unknown(self):
+        stubs = _stubs()
+        urls = list(stubs) + ['https://www.livesport.com/pl/mecz/x/']
+        kept, dropped = ls.filter_listing_stubs(urls, stubs, exclude_leagues=[])
+        assert kept == [_url('a-AAAAAAAA/b-BBBBBBBB'), _url('c-CCCCCCCC/d-DDDDDDDD'),
+                        _url('o-OOOOOOOO/p-PPPPPPPP'), 'https://www.livesport.com/pl/mecz/x/']
+        assert dropped == {'finished': 2, 'postponed': 1, 'cancelled': 1, 'abandoned': 1}
+
+    def test_past_day_keeps_finished(self):
+        stubs = _stubs()
+        drop = tuple(s for s in ls.LISTING_DROP_STATUSES if s != 'finished')
+        kept, dropped = ls.filter_listing_stubs(list(stubs), stubs, drop, exclude_leagues=[])
+        assert len(kept) == 5 and 'finished' not in dropped
+
+    def test_excluded_leagues(self, monkeypatch):
+        stubs = _stubs()
+        kept, dropped = ls.filter_listing_stubs(list(stubs), stubs, exclude_leagues=['Kobiet'])
+        assert _url('o-OOOOOOOO/p-PPPPPPPP') not in kept
+        assert dropped['excluded_league'] == 1
+
+        monkeypatch.setenv(ls.EXCLUDE_LEAGUES_ENV, 'laliga, ')
+        kept, dropped = ls.filter_listing_stubs(list(stubs), stubs)
+        assert kept == [_url('o-OOOOOOOO/p-PPPPPPPP')]
+        assert dropped['excluded_league'] == 2
+
+
+class TestApplyStub:
+
+    def test_fills_missing_only(self):
+        stub = _stubs()[_url('a-AAAAAAAA/b-BBBBBBBB')]
+        info = {'home_team': 'Real Madrid', 'away_team': None, 'qualifies': True}
+        assert ls.apply_listing_stub(info, stub) is info
+        assert info['home_team'] == 'Real Madrid' and info['away_team'] == 'Away A'
+        assert info['league'] == 'HISZPANIA: LaLiga'
+        assert ls.apply_listing_stub(None, stub) is None
+        assert ls.apply_listing_stub(info, None) is info
@@ -0,0 +1,160 @@
+"""
+Tests for concurrent multi-sport link collection in livesport_h2h_scraper.
+
+Covers:
+  - All sport listings navigated (tabs opened) before the first one is parsed
+  - Per-tab blocking profile, tabs closed and original window restored afterwards
+  - Scroll stops on the MutationObserver "rows settled" signal, no fixed sleeps
+  - Fallback without async scripts: sleep + three scrolls without new links
+  - LIVESPORT_LISTING_TABS=0 and single sport keep the sequential driver.get path
+"""
+
+import sys
+import os
+
+import pytest
+from selenium.common.exceptions import NoSuchElementException
+
+# Ensure project root is on path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import livesport_h2h_scraper as ls
+
+DATE = '2099-01-01'
+
+
+def _listing(path, mid):
+    return (f'<html><body><div class="event__match event__match--scheduled">'
+            f'<a href="/pl/mecz/{path}/a-AAAAAAAA/b-BBBBBBBB/?mid={mid}"></a>'
+            f'<div class="event__time">20:00</div></div></body></html>')
+
+
+PAGES = {
+    f"{ls.SPORT_URLS['football']}?date={DATE}": _listing('pilka-nozna', 'F1'),
+    f"{ls.SPORT_URLS['basketball']}?date={DATE}": _listing('koszykowka', 'B1'),
+    f"{ls.SPORT_URLS['volleyball']}?date={DATE}": _listing('siatkowka', 'V1'),
+}
+
+
+class FakeSwitchTo:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def new_window(self, kind):
+        handle = f'tab-{len(self.driver.windows)}'
+        self.driver.windows[handle] = 'about:blank'
+        self.driver.handle = handle
+
+    def window(self, handle):
+        self.driver.handle = handle
+
+
+class FakeTabDriver:
+    """Chrome z kartami: URL per karta, HTML listingu per URL, log zdarzeń."""
+
+    def __init__(self, async_scripts=True):
+        self.windows = {'main': 'about:blank'}
+        self.handle = 'main'
+        self.switch_to = FakeSwitchTo(self)
+        self.events = []
+        self.settle_calls = 0
+        self.async_scripts = async_scripts
+
+    @property
+    def current_window_handle(self):
+        return self.handle
+
+    @property
+    def current_url(self):
+        return self.windows[self.handle]
+
+    @property
+    def title(self):
+        return 'Livesport'
+
+    @property
+    def page_source(self):
+        self.events.append(('parse', self.current_url))
+        return PAGES.get(self.current_url, '<html></html>')
+
+    def get(self, url):
+        self.windows[self.handle] = url
+        self.events.append(('navigate', url))
+
+    def execute_script(self, script, *args):
+        if 'window.location.href' in script:
+            self.get(args[0])
+        elif 'querySelectorAll' in script:
+            return PAGES.get(self.current_url, '').count('/mecz/')
+        return None
+
+    def execute_async_script(self, script, *args):
+        if not self.async_scripts:
+            raise AttributeError('execute_async_script')
+        self.settle_calls += 1
+        return {'settled': True, 'added': 0, 'waited_ms': 700}
+
+    def execute_cdp_cmd(self, cmd, params=None):
+        self.events.append(('cdp', cmd, self.handle))
+        return {}
+
+    def find_elements(self, by, selector):
+        return [object()] if self.current_url in PAGES else []
+
+    def find_element(self, by, selector):
+        raise NoSuchElementException(selector)
+
+    def close(self):
+        self.events.append(('close', self.handle))
+        del self.windows[self.handle]
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(ls.time, 'sleep', sleeps.append)
+    return sleeps
+
+
+class TestConcurrentTabs:
+
+    def test_all_listings_navigated_before_parsing(self, no_sleep):
+        driver = FakeTabDriver()
+        stubs = {}
+        links = ls.get_match_links_from_day(driver, DATE, ['football', 'basketball', 'volleyball'], stubs=stubs)
+        assert [link.split('mid=')[1] for link in links] == ['F1', 'B1', 'V1']
+        assert len(stubs) == 3
+
+        kinds = [e[0] for e in driver.events if e[0] in ('navigate', 'parse')]
+        assert kinds[:3] == ['navigate'] * 3 and 'navigate' not in kinds[3:]
+        assert driver.windows == {'main': f"{ls.SPORT_URLS['football']}?date={DATE}"}
+        assert driver.handle == 'main' and driver._blocking_key is None
+        assert ('cdp', 'Page.bringToFront', 'tab-1') in driver.events
+
+    def test_settled_signal_replaces_sleep(self, no_sleep):
+        driver = FakeTabDriver()
+        ls.get_match_links_from_day(driver, DATE, ['football', 'basketball'])
+        assert driver.settle_calls == 2  # jeden scroll na sport - wiersze ucichły
+        assert no_sleep == []
+
+    def test_fallback_without_observer(self, no_sleep):
+        driver = FakeTabDriver(async_scripts=False)
+        assert ls.wait_for_dom_settled(driver) is None
+        ls._scroll_listing_until_settled(driver, 'volleyball', initial_count=0)
+        assert no_sleep == [0.6, 0.6, 0.6]
+
+
+class TestSequential:
+
+    def test_env_disables_tabs(self, no_sleep, monkeypatch):
+        monkeypatch.setenv(ls.LISTING_TABS_ENV, '0')
+        driver = FakeTabDriver()
+        links = ls.get_match_links_from_day(driver, DATE, ['football', 'basketball'])
+        assert len(links) == 2 and list(driver.windows) == ['main']
+        kinds = [e[0] for e in driver.events if e[0] in ('navigate', 'parse')]
+        assert kinds == ['navigate', 'parse', 'navigate', 'parse']
+
+    def test_single_sport(self):
+        assert not ls._use_listing_tabs(FakeTabDriver(), ['football'])
+        assert not ls._use_listing_tabs(FakeTabDriver(), ['football', 'darts'])
+        assert ls._use_listing_tabs(FakeTabDriver(), ['football', 'tennis'])
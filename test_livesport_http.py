@@ -0,0 +1,146 @@
+"""
+Tests for livesport_http (browserless H2H mode).
+
+Covers:
+  - is_usable_h2h_document() on real H2H pages vs block pages (debug_html)
+  - LivesportHttpClient: status/exception handling and stats
+  - process_match(http_client=...) parsing recorded H2H documents without
+    touching the driver, and falling back to Selenium when HTTP has no data
+"""
+
+import sys
+import os
+import glob
+import pytest
+
+# Ensure project root is on path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import livesport_h2h_scraper as ls
+from livesport_http import LivesportHttpClient, is_usable_h2h_document
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+FIXTURE = os.path.join(ROOT, 'debug_html', 'h2h_page_1763382582.html')
+BLOCK_PAGE = os.path.join(ROOT, 'debug_html', 'h2h_page_1763382441.html')
+MATCH_URL = ('https://www.livesport.com/pl/mecz/siatkowka/cuprum-stilon-gorzow-K4CJzoda/'
+             'slepsk-malow-suwalki-2kggPBWE/?mid=AByAQtGc')
+
+
+def _read(path):
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+
+class FakeResponse:
+    def __init__(self, text, status_code=200):
+        self.text = text
+        self.status_code = status_code
+
+
+class FakeSession:
+    """Serves recorded documents per URL and records requests."""
+
+    def __init__(self, pages, status_code=200, error=None):
+        self.pages = pages
+        self.status_code = status_code
+        self.error = error
+        self.requested = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.requested.append(url)
+        if self.error:
+            raise self.error
+        return FakeResponse(self.pages.get(url, ''), self.status_code)
+
+
+def _client(session):
+    return LivesportHttpClient(session_factory=lambda: session)
+
+
+class UntouchableDriver:
+    """Fails the test if process_match falls back to Selenium."""
+
+    def __getattr__(self, name):
+        raise AssertionError(f"driver.{name} used in HTTP mode")
+
+
+class TestUsableDocument:
+
+    def test_real_h2h_pages(self):
+        real = [p for p in glob.glob(os.path.join(ROOT, 'debug_html', '*.html'))
+                if 'h2h__section' in _read(p)]
+        assert real
+        assert all(is_usable_h2h_document(_read(p)) for p in real)
+
+    def test_block_page_and_empty(self):
+        assert not is_usable_h2h_document(_read(BLOCK_PAGE))
+        assert not is_usable_h2h_document('')
+        assert not is_usable_h2h_document(None)
+
+
+class TestClient:
+
+    def test_usable_document(self):
+        html = _read(FIXTURE)
+        client = _client(FakeSession({'u': html}))
+        assert client.fetch_h2h('u') == html
+        assert client.stats['usable'] == 1 and client.stats['requests'] == 1
+
+    def test_non_200_and_block_page_fall_back(self):
+        client = _client(FakeSession({'u': _read(FIXTURE)}, status_code=403))
+        assert client.fetch_h2h('u') is None
+        client = _client(FakeSession({'u': _read(BLOCK_PAGE)}))
+        assert client.fetch_h2h('u') is None
+        assert client.stats['fallbacks'] == 1
+
+    def test_exception_counts_error(self):
+        client = _client(FakeSession({}, error=ConnectionError('reset')))
+        assert client.fetch_h2h('u') is None
+        assert client.stats['errors'] == 1
+        assert '0/1' in client.format_report()
+
+
+class TestProcessMatchHttp:
+
+    @pytest.fixture(autouse=True)
+    def _no_odds(self, monkeypatch):
+        monkeypatch.setattr(ls, 'fetch_odds_from_livesport',
+                            lambda driver, url, sport='football': {'odds_found': False})
+
+    def test_h2h_without_driver(self):
+        html = _read(FIXTURE)
+        urls = ls.build_h2h_urls(MATCH_URL)
+        session = FakeSession({urls['overall']: html, urls['home']: html})
+
+        info = ls.process_match(MATCH_URL, UntouchableDriver(), sport='volleyball',
+                                http_client=_client(session))
+
+        assert info['h2h_count'] == 5
+        assert info['home_team'] and info['away_team']
+        # mecz kwalifikuje się -> forma "u siebie" też przez HTTP, bez Selenium
+        assert info['qualifies']
+        assert session.requested == [urls['overall'], urls['home']]
+        assert len(info['home_form_overall']) == 5
+        assert len(info['home_form_home']) == 5
+
+    def test_same_h2h_as_selenium_soup(self):
+        html = _read(FIXTURE)
+        urls = ls.build_h2h_urls(MATCH_URL)
+        info = ls.process_match(MATCH_URL, UntouchableDriver(), sport='volleyball',
+                                http_client=_client(FakeSession({urls['overall']: html, urls['home']: html})))
+        expected = ls.parse_h2h_from_soup(ls.make_soup(html), info['home_team'])
+        expected.sort(key=lambda x: ls._parse_h2h_date(x.get('date', '')), reverse=True)
+        assert info['h2h_last5'] == expected
+
+    def test_falls_back_to_selenium(self, monkeypatch):
+        navigated = []
+        monkeypatch.setattr(ls, '_open_h2h_page',
+                            lambda driver, url, target, sport=None, status=None: navigated.append(target) or False)
+
+        class HealthyDriver:
+            current_url = 'about:blank'
+
+        session = FakeSession({})  # pusta odpowiedź - brak H2H
+        info = ls.process_match(MATCH_URL, HealthyDriver(), sport='volleyball', http_client=_client(session))
+        assert navigated == [ls.build_h2h_urls(MATCH_URL)['overall']]
+        assert info['h2h_count'] == 0
@@ -0,0 +1,106 @@
+"""
+Tests for match_record (compact __slots__ row for scraped matches).
+
+Covers:
+  - Dict behaviour: getitem/get/in/len/iteration, KeyError for unset fields,
+    unknown keys kept in the extra dict, deletion
+  - No per-instance __dict__; to_dict/from_dict, copy and pickle round-trips
+  - Columnar form: union of keys, missing -> None, round-trip back to records
+  - records_to_frame() matches pd.DataFrame(dicts) cell by cell
+  - Benchmark: record containers smaller than the dict rows
+"""
+
+import sys
+import os
+import copy
+import json
+import pickle
+
+import pandas as pd
+import pytest
+
+# Ensure project root is on path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from match_record import (FIELDS, MatchRecord, benchmark, frame_to_records, records_from_columns,
+                          records_to_columns, records_to_frame, sample_row)
+
+ROW = {
+    'match_url': 'https://www.livesport.com/pl/mecz/pilka-nozna/a-AAAAAAAA/b-BBBBBBBB/',
+    'home_team': 'Legia', 'away_team': 'Lech', 'qualifies': True,
+    'h2h_last5': [{'home': 'Legia', 'away': 'Lech', 'score': '2-1'}],
+    'home_odds': None, 'forebet_prediction': '1', 'ai_prediction': {'pick': '1'},
+}
+
+
+class TestMapping:
+
+    def test_dict_behaviour(self):
+        rec = MatchRecord.from_dict(ROW)
+        assert rec['home_team'] == 'Legia' and rec['home_odds'] is None
+        assert rec.get('away_odds') is None and rec.get('away_odds', 0) == 0
+        assert 'home_odds' in rec and 'away_odds' not in rec
+        assert rec['ai_prediction'] == {'pick': '1'} and rec.extra == {'ai_prediction': {'pick': '1'}}
+        assert len(rec) == len(ROW) and dict(rec) == ROW and rec == ROW
+        with pytest.raises(KeyError):
+            rec['away_odds']
+        with pytest.raises(KeyError):
+            rec['nope']
+
+    def test_mutation(self):
+        rec = MatchRecord(ROW, sport='football')
+        rec['match_date'] = '2025-10-01'
+        rec.setdefault('league', 'Ekstraklasa')
+        rec.update({'gemini_confidence': 80.0, 'custom': 1})
+        del rec['home_odds']
+        del rec['custom']
+        assert rec['sport'] == 'football' and rec['league'] == 'Ekstraklasa'
+        assert 'home_odds' not in rec and 'custom' not in rec
+        with pytest.raises(KeyError):
+            del rec['home_odds']
+
+    def test_slots_and_roundtrips(self):
+        rec = MatchRecord.from_dict(ROW)
+        assert not hasattr(rec, '__dict__')
+        assert MatchRecord.from_dict(rec) is rec and MatchRecord.from_dict(None) is None
+        assert json.loads(json.dumps(rec.to_dict())) == ROW
+        assert pickle.loads(pickle.dumps(rec)) == ROW
+        clone = copy.copy(rec)
+        clone['home_team'] = 'Wisła'
+        assert rec['home_team'] == 'Legia' and rec.copy() == ROW
+
+
+class TestColumns:
+
+    def test_columns_roundtrip(self):
+        other = {'match_url': 'u2', 'draw_odds': 3.4, 'tip': 'X'}
+        columns = records_to_columns([MatchRecord(ROW), other])
+        assert list(columns)[:2] == ['match_url', 'home_team']
+        assert list(columns)[-2:] == ['ai_prediction', 'tip']
+        assert columns['draw_odds'] == [None, 3.4] and columns['home_team'] == ['Legia', None]
+
+        back = records_from_columns(columns)
+        assert back[0]['h2h_last5'] == ROW['h2h_last5'] and back[1]['tip'] == 'X'
+        assert back[1]['home_team'] is None
+        assert records_from_columns({}) == []
+
+    def test_frame_matches_pandas(self):
+        rows = [sample_row(i) for i in range(20)] + [ROW]
+        expected = pd.DataFrame(rows)
+        frame = records_to_frame([MatchRecord(r) for r in rows])
+        assert sorted(frame.columns) == sorted(expected.columns)
+        pd.testing.assert_frame_equal(frame[expected.columns], expected)
+        assert frame_to_records(frame)[-1]['h2h_last5'] == ROW['h2h_last5']
+
+    def test_fields_are_slots(self):
+        assert len(set(FIELDS)) == len(FIELDS)
+        assert set(FIELDS) <= set(MatchRecord.__slots__)
+        assert set(sample_row(0)) == set(FIELDS) | {'home_wins_in_h2h'}
+
+
+class TestBenchmark:
+
+    def test_records_smaller_than_dicts(self):
+        stats = benchmark(300)
+        assert stats['rows'] == 300
+        assert 0 < stats['record_bytes'] < stats['dict_bytes']
@@ -0,0 +1,192 @@
+"""
+Tests for match_scheduler (priority ordering + time budget).
+
+Covers:
+  - Listing stubs parsed from Livesport listing rows (league, kickoff, odds)
+  - order(): league qualification rate, odds bonus, kickoff, stable without hints,
+    already started matches last
+  - has_time(): budget with safety margin and measured match time
+  - record() / save(): league stats persisted in DiskCache between runs;
+    the default DiskCache opened only when league stats are needed
+  - MatchWorkerPool(should_stop=...) leaving the rest of the queue in skipped
+  - RunJournal skipped status: excluded from results, retried on --resume
+"""
+
+import sys
+import os
+from datetime import datetime
+
+# Ensure project root is on path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import livesport_h2h_scraper as ls
+from disk_cache import DiskCache
+from html_parsing import make_soup, LISTING_ROWS_STRAINER
+from match_scheduler import MatchScheduler
+from match_worker_pool import MatchWorkerPool
+from run_journal import RunJournal
+
+LISTING_HTML = """
+<div class="sportName soccer">
+  <div class="headerLeague__wrapper">
+    <span class="headerLeague__category-text">POLSKA</span>
+    <a class="headerLeague__title-text">Ekstraklasa</a>
+  </div>
+  <div class="event__match event__match--scheduled">
+    <a href="/pl/mecz/pilka-nozna/a-AAAAAAAA/b-BBBBBBBB/?mid=X1"></a>
+    <div class="event__time">18:30</div>
+    <div class="event__odd--odd1">1.85</div>
+  </div>
+  <div class="event__header">
+    <span class="event__title--type">ANGLIA</span>
+    <span class="event__title--name">Premier League</span>
+  </div>
+  <div class="event__match">
+    <a href="/pl/mecz/pilka-nozna/c-CCCCCCCC/d-DDDDDDDD/?mid=X2"></a>
+    <div class="event__time">9:05</div>
+    <div class="event__odd--odd1">-</div>
+  </div>
+</div>
+"""
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _scheduler(tmp_path, **kwargs):
+    cache = DiskCache(str(tmp_path / 'cache.sqlite'), namespace='league_stats')
+    return MatchScheduler(stats_cache=cache, **kwargs), cache
+
+
+def _hint(league, kickoff=None, has_odds=False):
+    return {'sport': 'football', 'league': league, 'kickoff': kickoff, 'has_odds': has_odds}
+
+
+class TestListingHints:
+
+    def test_rows_and_headers(self):
+        soup = make_soup(LISTING_HTML, parse_only=LISTING_ROWS_STRAINER)
+        hints = ls._extract_listing_stubs_from_soup(soup, 'football')
+        first, second = hints.values()
+        assert list(hints)[0] == 'https://www.livesport.com/pl/mecz/pilka-nozna/a-AAAAAAAA/b-BBBBBBBB/?mid=X1'
+        stub = dict(event_id='X1', home_team=None, away_team=None, status='scheduled')
+        assert first == {**_hint('POLSKA: Ekstraklasa', '18:30', True), **stub}
+        assert second == {**_hint('ANGLIA: Premier League', '09:05', False), **stub, 'event_id': 'X2'}
+
+
+class TestOrder:
+
+    def test_without_hints_keeps_page_order(self, tmp_path):
+        scheduler, _ = _scheduler(tmp_path)
+        assert scheduler.order(['u3', 'u1', 'u2']) == ['u3', 'u1', 'u2']
+
+    def test_stats_cache_opened_lazily(self, tmp_path, monkeypatch):
+        import match_scheduler
+        opened = []
+
+        def factory(**kwargs):
+            opened.append(kwargs)
+            return DiskCache(str(tmp_path / 'lazy.sqlite'), **kwargs)
+
+        monkeypatch.setattr(match_scheduler, 'DiskCache', factory)
+        scheduler = MatchScheduler()
+        scheduler.order(['u1', 'u2'])
+        scheduler.save()
+        assert opened == []
+        scheduler.order(['u1'], {'u1': _hint('L')})
+        scheduler.order(['u1'], {'u1': _hint('M')})
+        assert opened == [{'namespace': 'league_stats'}]
+
+    def test_league_rate_odds_and_kickoff(self, tmp_path):
+        scheduler, cache = _scheduler(tmp_path)
+        cache.set('football:Good', {'matches': 40, 'qualified': 20})
+        cache.set('football:Bad', {'matches': 40, 'qualified': 0})
+        hints = {
+            'bad': _hint('Bad', '10:00'),
+            'good_late': _hint('Good', '21:00'),
+            'good_early': _hint('Good', '12:00'),
+            'unknown': _hint('New', '08:00'),
+            'unknown_odds': _hint('New', '23:00', has_odds=True),
+        }
+        order = scheduler.order(['bad', 'no_hint', 'good_late', 'unknown', 'good_early', 'unknown_odds'], hints)
+        assert order == ['good_early', 'good_late', 'unknown_odds', 'unknown', 'no_hint', 'bad']
+        assert scheduler.stats['with_hints'] == 5
+
+    def test_started_matches_last_today(self, tmp_path):
+        now = datetime(2025, 10, 5, 15, 0).timestamp()
+        scheduler, _ = _scheduler(tmp_path, day='2025-10-05', clock=Clock(now))
+        hints = {'past': _hint('L', '14:00', True), 'future': _hint('L', '18:00')}
+        assert scheduler.order(['past', 'future'], hints) == ['future', 'past']
+
+
+class TestBudget:
+
+    def test_has_time_with_margin(self, tmp_path):
+        clock = Clock()
+        scheduler, _ = _scheduler(tmp_path, time_budget_s=600, safety_margin_s=100,
+                                  default_match_seconds=20, clock=clock)
+        scheduler.start()
+        assert scheduler.has_time()
+        clock.now += 470
+        assert scheduler.has_time()        # 130 s - 100 s margin >= 20 s
+        clock.now += 20
+        assert not scheduler.has_time()
+        assert scheduler.remaining() == 110
+
+    def test_unlimited(self, tmp_path):
+        scheduler, _ = _scheduler(tmp_path)
+        scheduler.start()
+        assert scheduler.has_time() and scheduler.remaining() is None
+
+    def test_record_updates_average_and_league_stats(self, tmp_path):
+        scheduler, cache = _scheduler(tmp_path, default_match_seconds=10)
+        scheduler.order(['a', 'b'], {'a': _hint('L'), 'b': _hint('L')})
+        scheduler.record('a', {'qualifies': True}, 20)
+        scheduler.record('b', {'qualifies': False}, 20)
+        assert scheduler.avg_match_seconds > 10
+        scheduler.save()
+        assert cache.get('football:L') == {'matches': 2, 'qualified': 1}
+
+        # kolejny run: statystyki dopisywane do zapisanych
+        again = MatchScheduler(stats_cache=cache)
+        again.order(['c'], {'c': _hint('L')})
+        again.record('c', {'qualifies': True}, 5)
+        again.save()
+        assert cache.get('football:L') == {'matches': 3, 'qualified': 2}
+        assert 'przetworzono 1' in again.format_report()
+
+
+class TestSkipping:
+
+    def test_pool_should_stop(self):
+        processed = []
+
+        def process(url, driver):
+            processed.append(url)
+            return {'url': url}
+
+        pool = MatchWorkerPool(workers=1, driver_factory=object, delay_range=None,
+                               health_check=lambda d: True,
+                               should_stop=lambda: len(processed) >= 3)
+        results = pool.map([f'u{i}' for i in range(6)], process)
+        assert [r['url'] for r in results if r] == ['u0', 'u1', 'u2']
+        assert pool.skipped == ['u3', 'u4', 'u5']
+        assert pool.stats['skipped'] == 3
+
+    def test_journal_skipped_entries(self, tmp_path):
+        journal = RunJournal(str(tmp_path / 'run.journal.jsonl'))
+        journal.append('u1', {'match_url': 'u1'})
+        journal.append_skipped(['u2', 'u3'])
+        assert journal.completed_urls() == {'u1'}
+        assert journal.skipped_urls() == ['u2', 'u3']
+        assert [r['match_url'] for r in journal.iter_records()] == ['u1']
+
+        # --resume: pominięty mecz przetworzony w kolejnym runie
+        journal.append('u2', {'match_url': 'u2'})
+        assert journal.completed_urls() == {'u1', 'u2'}
+        assert [r['match_url'] for r in journal.iter_records()] == ['u1', 'u2']
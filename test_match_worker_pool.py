@@ -0,0 +1,156 @@
+"""
+Tests for match_worker_pool.MatchWorkerPool.
+
+Covers:
+  - Results come back in input order regardless of completion order
+  - Failed matches yield None, other workers keep going
+  - Per-worker restart after errors and every restart_interval matches
+  - Unhealthy drivers are replaced before processing
+"""
+
+import sys
+import os
+import random
+import threading
+import time
+
+# Ensure project root is on path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from match_worker_pool import MatchWorkerPool
+
+
+class FakeDriver:
+    """Minimal stand-in for a Selenium driver."""
+
+    _ids = 0
+    _lock = threading.Lock()
+
+    def __init__(self, healthy=True):
+        with FakeDriver._lock:
+            FakeDriver._ids += 1
+            self.id = FakeDriver._ids
+        self.healthy = healthy
+        self.quit_called = False
+
+    @property
+    def current_url(self):
+        if not self.healthy or self.quit_called:
+            raise RuntimeError("driver dead")
+        return "about:blank"
+
+    def quit(self):
+        self.quit_called = True
+
+
+def _make_pool(workers=3, **kwargs):
+    created = []
+
+    def factory():
+        d = FakeDriver()
+        created.append(d)
+        return d
+
+    kwargs.setdefault('delay_range', None)
+    kwargs.setdefault('restart_delay', 0)
+    pool = MatchWorkerPool(workers=workers, driver_factory=factory, **kwargs)
+    return pool, created
+
+
+class TestOrdering:
+
+    def test_results_in_input_order(self):
+        pool, _ = _make_pool(workers=4)
+        urls = [f"https://example.com/mecz/{i}" for i in range(20)]
+
+        def process(url, driver):
+            time.sleep(random.uniform(0, 0.01))
+            return {'match_url': url, 'driver': driver.id}
+
+        results = pool.map(urls, process)
+        assert [r['match_url'] for r in results] == urls
+        assert pool.stats['processed'] == 20
+
+    def test_empty_input(self):
+        pool, created = _make_pool()
+        assert pool.map([], lambda u, d: {}) == []
+        assert created == []
+
+    def test_workers_capped_by_url_count(self):
+        pool, created = _make_pool(workers=8)
+        pool.map(["a", "b"], lambda u, d: {'u': u})
+        assert len(created) == 2
+
+    def test_all_drivers_quit(self):
+        pool, created = _make_pool(workers=3)
+        pool.map([str(i) for i in range(9)], lambda u, d: {'u': u})
+        assert all(d.quit_called for d in created)
+
+
+class TestFailures:
+
+    def test_failing_match_returns_none(self):
+        pool, _ = _make_pool(workers=2, max_retries=2)
+
+        def process(url, driver):
+            if url == "bad":
+                raise RuntimeError("boom")
+            return {'u': url}
+
+        results = pool.map(["a", "bad", "c"], process)
+        assert results[0] == {'u': 'a'}
+        assert results[1] is None
+        assert results[2] == {'u': 'c'}
+        assert pool.stats['failed'] == 1
+
+    def test_retry_restarts_driver(self):
+        pool, created = _make_pool(workers=1, max_retries=2)
+        calls = []
+
+        def process(url, driver):
+            calls.append(driver.id)
+            if len(calls) == 1:
+                raise RuntimeError("transient")
+            return {'u': url}
+
+        results = pool.map(["a"], process)
+        assert results == [{'u': 'a'}]
+        assert len(set(calls)) == 2  # druga próba na nowym driverze
+        assert pool.stats['restarts'] == 1
+
+    def test_unhealthy_driver_replaced(self):
+        pool, created = _make_pool(workers=1)
+
+        def process(url, driver):
+            if url == "a":
+                driver.healthy = False  # kolejny mecz musi dostać nowy driver
+            return {'u': url, 'd': driver.id}
+
+        results = pool.map(["a", "b"], process)
+        assert results[0]['d'] != results[1]['d']
+
+    def test_worker_without_driver_leaves_work_for_others(self):
+        def factory():
+            if threading.current_thread().name == 'match-worker-1':
+                raise RuntimeError("no chrome")  # pierwszy worker nie wstaje
+            return FakeDriver()
+
+        pool = MatchWorkerPool(workers=2, driver_factory=factory, delay_range=None, restart_delay=0)
+        results = pool.map(["a", "b", "c"], lambda u, d: {'u': u})
+        assert [r['u'] for r in results] == ["a", "b", "c"]
+        assert pool.stats['workers_lost'] == 1
+
+
+class TestRestartInterval:
+
+    def test_restart_every_n_matches(self):
+        pool, created = _make_pool(workers=1, restart_interval=2)
+        pool.map([str(i) for i in range(5)], lambda u, d: {'u': u})
+        # 5 meczów, restart po 2. i 4. -> 3 drivery
+        assert len(created) == 3
+
+    def test_on_result_called_for_each(self):
+        seen = []
+        pool, _ = _make_pool(workers=3, on_result=lambda i, u, info: seen.append(i))
+        pool.map([str(i) for i in range(10)], lambda u, d: {'u': u})
+        assert sorted(seen) == list(range(10))
@@ -0,0 +1,149 @@
+"""
+Tests for the H2H navigation plan in livesport_h2h_scraper.
+
+Covers:
+  - build_h2h_urls() canonical URLs from match / h2h / szczegoly URLs
+  - Form parsers working on an already loaded DOM (debug_html fixtures)
+  - extract_advanced_team_form() reusing the overall DOM and switching
+    the "u siebie" sub-tab in-page instead of navigating again
+"""
+
+import sys
+import os
+import re
+import pytest
+from bs4 import BeautifulSoup
+
+# Ensure project root is on path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import livesport_h2h_scraper as ls
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+FIXTURE = os.path.join(ROOT, 'debug_html', 'h2h_page_1763382582.html')
+MATCH_URL = ('https://www.livesport.com/pl/mecz/siatkowka/cuprum-stilon-gorzow-K4CJzoda/'
+             'slepsk-malow-suwalki-2kggPBWE/?mid=AByAQtGc')
+
+
+@pytest.fixture(scope='module')
+def overall_html():
+    with open(FIXTURE, encoding='utf-8') as f:
+        return f.read()
+
+
+class FakeLink:
+    def __init__(self, driver, target):
+        self.driver = driver
+        self.target = target
+
+    def click(self):
+        # SPA: zmiana URL i DOM bez driver.get()
+        self.driver.current_url = self.target
+        self.driver.clicks += 1
+
+
+class FakeDriver:
+    """Serves the fixture for every H2H view and counts full navigations."""
+
+    def __init__(self, html, subtab_links=True):
+        self.html = html
+        self.page_source = html
+        self.current_url = 'about:blank'
+        self.subtab_links = subtab_links
+        self.navigations = []
+        self.clicks = 0
+
+    def get(self, url):
+        self.navigations.append(url)
+        self.current_url = url
+
+    def execute_script(self, script, *args):
+        return None
+
+    def find_elements(self, by, selector):
+        m = re.match(r"a\[href\*='/h2h/([a-z-]+)/'\]", selector)
+        if m:
+            if not self.subtab_links:
+                return []
+            return [FakeLink(self, ls.build_h2h_urls(MATCH_URL)[
+                {v: k for k, v in ls.H2H_SUBTABS.items()}[m.group(1)]])]
+        if 'h2h__section' in selector or 'h2h__row' in selector:
+            return [object()] if 'h2h__section' in self.page_source else []
+        return []
+
+
+class TestBuildH2HUrls:
+
+    def test_match_url(self):
+        urls = ls.build_h2h_urls(MATCH_URL)
+        base = MATCH_URL.split('?')[0]
+        assert urls['overall'] == f"{base}h2h/ogolem/?mid=AByAQtGc"
+        assert urls['home'] == f"{base}h2h/u-siebie/?mid=AByAQtGc"
+        assert urls['away'] == f"{base}h2h/na-wyjezdzie/?mid=AByAQtGc"
+
+    @pytest.mark.parametrize('variant', [
+        'h2h/ogolem/?mid=AByAQtGc',
+        'h2h/u-siebie/?mid=AByAQtGc',
+        'szczegoly/?mid=AByAQtGc',
+    ])
+    def test_subpage_urls_are_canonicalised(self, variant):
+        url = MATCH_URL.split('?')[0] + variant
+        assert ls.build_h2h_urls(url) == ls.build_h2h_urls(MATCH_URL)
+
+    def test_unsupported_url(self):
+        assert ls.build_h2h_urls('https://www.livesport.com/pl/pilka-nozna/') == {}
+        assert ls.build_h2h_urls(None) == {}
+
+
+class TestFormParsersOnFixture:
+
+    def test_overall_form(self, overall_html):
+        soup = BeautifulSoup(overall_html, 'html.parser')
+        home, away = ls._parse_form_from_h2h_soup(soup, 'overall')
+        assert len(home) == 5 and len(away) == 5
+        assert set(home + away) <= {'W', 'D', 'L'}
+
+    def test_away_form_from_same_dom(self, overall_html):
+        soup = BeautifulSoup(overall_html, 'html.parser')
+        away_away = ls._parse_away_form_from_soup(soup, [])
+        assert len(away_away) == 5
+
+    def test_parse_matches_navigating_wrapper(self, overall_html):
+        soup = BeautifulSoup(overall_html, 'html.parser')
+        driver = FakeDriver(overall_html)
+        assert ls._extract_form_from_h2h_page('u', driver, 'overall') == ls._parse_form_from_h2h_soup(soup, 'overall')
+        assert ls._extract_away_form_from_overall('u', driver, []) == ls._parse_away_form_from_soup(soup, [])
+
+
+class TestSingleNavigation:
+
+    @pytest.fixture(autouse=True)
+    def _fast(self, monkeypatch):
+        monkeypatch.setattr(ls, 'H2H_ROWS_GRACE', 0.05)
+        monkeypatch.setattr(ls, 'get_wait_timeout', lambda sport=None: 0.3)
+
+    def test_reuses_dom_and_switches_tab_in_page(self, overall_html):
+        driver = FakeDriver(overall_html)
+        soup = BeautifulSoup(overall_html, 'html.parser')
+        result = ls.extract_advanced_team_form(MATCH_URL, driver, overall_soup=soup)
+
+        assert driver.navigations == []   # zero dodatkowych driver.get()
+        assert driver.clicks == 1         # tylko przełączenie "u siebie"
+        assert len(result['home_form_overall']) == 5
+        assert len(result['home_form_home']) == 5
+        assert len(result['away_form_away']) == 5
+
+    def test_falls_back_to_navigation_without_subtab(self, overall_html):
+        driver = FakeDriver(overall_html, subtab_links=False)
+        soup = BeautifulSoup(overall_html, 'html.parser')
+        ls.extract_advanced_team_form(MATCH_URL, driver, overall_soup=soup)
+        assert driver.navigations == [ls.build_h2h_urls(MATCH_URL)['home']]
+
+    def test_legacy_path_without_soup(self, overall_html):
+        driver = FakeDriver(overall_html)
+        with_dom = ls.extract_advanced_team_form(
+            MATCH_URL, FakeDriver(overall_html), overall_soup=BeautifulSoup(overall_html, 'html.parser'))
+        legacy = ls.extract_advanced_team_form(MATCH_URL, driver)
+        assert len(driver.navigations) == 3
+        for key in ('home_form_overall', 'away_form_overall', 'home_form_home', 'away_form_away'):
+            assert legacy[key] == with_dom[key]
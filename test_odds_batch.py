@@ -0,0 +1,223 @@
+"""
+Tests for the batched Livesport odds fetcher (livesport_odds_api.LivesportOddsBatch).
+
+Covers:
+  - One pooled session for the whole batch, concurrency bounded by the worker count
+  - Retries with backoff on HTTP 429 / timeouts; bookmakers tried in priority order
+  - get_odds_for_event(bookmaker_id=...) leaves the client's bookmaker untouched
+  - get_livesport_odds() served from remembered batch odds without a request
+  - day_odds_events(): event IDs from listing stubs or URLs, sport per match
+  - get_best_odds(): bookmakers queried in parallel, best price per outcome with
+    its source and implied margin, lazy first-hit mode, best-price batch
+"""
+
+import sys
+import os
+import threading
+import time
+
+import pytest
+import requests
+
+# Ensure project root is on path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import livesport_odds_api as odds_api
+from livesport_odds_api import LivesportOddsAPI, LivesportOddsBatch, remember_batch_odds
+
+REAL_SLEEP = time.sleep
+MATCH_URL = 'https://www.livesport.com/pl/mecz/pilka-nozna/legia-AAAAAAAA/lech-BBBBBBBB/?mid=KQAaF7d2'
+
+
+def _payload(home, draw, away):
+    return {'data': {'findPrematchOddsForBookmaker': {
+        'home': {'value': str(home)}, 'draw': {'value': str(draw)}, 'away': {'value': str(away)}}}}
+
+
+class FakeResponse:
+
+    def __init__(self, status, payload=None):
+        self.status_code = status
+        self._payload = payload or {}
+
+    def json(self):
+        return self._payload
+
+
+class FakeSession:
+    """Zamiast requests.Session.get: odpowiedzi per (event, bukmacher), licznik równoległości."""
+
+    def __init__(self, responses=None, delay=0.0, delays=None):
+        self.responses = responses or {}
+        self.delay = delay
+        self.delays = delays or {}
+        self.calls = []
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def get(self, url, params=None, timeout=None, **kwargs):
+        key = (params['eventId'], params['bookmakerId'])
+        with self.lock:
+            self.calls.append(key)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            REAL_SLEEP(self.delays.get(params['bookmakerId'], self.delay))
+            queued = self.responses.get(key)
+            response = queued.pop(0) if isinstance(queued, list) and len(queued) > 1 else (
+                queued[0] if isinstance(queued, list) else queued)
+            if isinstance(response, Exception):
+                raise response
+            return response or FakeResponse(200, _payload(1.9, 3.4, 4.1))
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+@pytest.fixture(autouse=True)
+def no_sleep_and_clean(monkeypatch):
+    monkeypatch.setattr(odds_api.time, 'sleep', lambda s: None)
+    odds_api.clear_batch_odds()
+    yield
+    odds_api.clear_batch_odds()
+
+
+def _api(session):
+    api = LivesportOddsAPI(verbose=False)
+    api.session = session
+    return api
+
+
+class TestBatch:
+
+    def test_all_events_one_session_bounded(self):
+        session = FakeSession(delay=0.02)
+        batch = LivesportOddsBatch(concurrency=3, api=_api(session))
+        events = {f'EV{i:06d}': 'football' for i in range(12)}
+        results = batch.fetch(events)
+
+        assert set(results) == set(events)
+        assert all(r['odds_found'] and r['bookmaker'] == 'Pinnacle' for r in results.values())
+        assert results['EV000000']['home_odds'] == 1.9
+        assert 1 < session.peak <= 3
+        assert batch.stats['requests'] == 12 and batch.stats['found'] == 12
+        assert '12/12' in batch.format_report()
+
+    def test_retries_then_next_bookmaker(self):
+        session = FakeSession({
+            ('A1', '3'): [FakeResponse(429), requests.exceptions.Timeout(), FakeResponse(200, _payload(2.0, 3.0, 4.0))],
+            ('B1', '3'): FakeResponse(200, {'data': {}}),
+            ('B1', '16'): FakeResponse(200, _payload(1.5, 4.0, 6.0)),
+            ('C1', '3'): FakeResponse(503),
+            ('C1', '16'): FakeResponse(404),
+        })
+        batch = LivesportOddsBatch(concurrency=2, retries=2, api=_api(session))
+        results = batch.fetch(['A1', 'B1', 'C1'], sport='football')
+
+        assert results['A1']['home_odds'] == 2.0 and session.calls.count(('A1', '3')) == 3
+        assert results['B1']['bookmaker'] == 'Bet365' and results['B1']['away_odds'] == 6.0
+        assert not results['C1']['odds_found'] and session.calls.count(('C1', '3')) == 3
+        assert batch.stats['retries'] == 4
+
+    def test_no_draw_sport(self):
+        batch = LivesportOddsBatch(api=_api(FakeSession()))
+        assert batch.fetch({'T1': 'tennis'})['T1']['draw_odds'] is None
+
+    def test_bookmaker_not_mutated(self):
+        session = FakeSession()
+        api = _api(session)
+        result = api.get_odds_for_event('X1', bookmaker_id='16')
+        assert result['bookmaker_id'] == '16' and api.bookmaker_id == '3'
+        assert session.calls == [('X1', '16')]
+
+
+class TestPrefetchedOdds:
+
+    def test_served_from_memory(self, monkeypatch):
+        remember_batch_odds({'KQAaF7d2': {'home_odds': 1.8, 'draw_odds': 3.5, 'away_odds': 4.5,
+                                          'bookmaker': 'Pinnacle', 'odds_found': True, 'event_id': 'KQAaF7d2'}})
+        session = FakeSession()
+        monkeypatch.setattr(odds_api, '_SHARED_API', _api(session))
+        odds = odds_api.get_livesport_odds(MATCH_URL, 'football')
+        assert odds['home_odds'] == 1.8 and session.calls == []
+
+        odds['home_odds'] = 0   # kopia - pamięć batcha nienaruszona
+        assert odds_api.get_batch_odds('KQAaF7d2')['home_odds'] == 1.8
+
+    def test_missing_event_goes_to_api(self, monkeypatch):
+        session = FakeSession()
+        monkeypatch.setattr(odds_api, '_SHARED_API', _api(session))
+        assert odds_api.get_livesport_odds(MATCH_URL, 'football')['odds_found']
+        assert session.calls == [('KQAaF7d2', '3')]
+        assert odds_api.get_shared_odds_api() is odds_api.get_shared_odds_api()
+
+
+class TestDayEvents:
+
+    def test_ids_from_stubs_or_urls(self):
+        from livesport_h2h_scraper import day_odds_events
+        tennis = 'https://www.livesport.com/pl/mecz/tenis/a-name-AbCd1234/b-name-ZzYy9876/?mid=TnS00001'
+        events = day_odds_events([MATCH_URL, tennis, MATCH_URL], {tennis: {'event_id': 'TnS00001'}})
+        assert events == {'KQAaF7d2': 'football', 'TnS00001': 'tennis'}
+
+
+class TestBestOdds:
+
+    RESPONSES = {
+        ('E1', '3'): FakeResponse(200, _payload(2.0, 3.2, 3.9)),
+        ('E1', '16'): FakeResponse(200, _payload(1.9, 3.5, 3.9)),
+        ('E1', '8'): FakeResponse(200, _payload(1.95, 3.3, 4.2)),
+        ('E1', '43'): FakeResponse(404),
+    }
+
+    def test_best_price_per_outcome(self):
+        session = FakeSession(self.RESPONSES, delay=0.05)
+        best = _api(session).get_best_odds('E1', 'football', ['pinnacle', 'bet365', 'unibet', 'william_hill'])
+
+        assert (best['home_odds'], best['home_bookmaker']) == (2.0, 'Pinnacle')
+        assert (best['draw_odds'], best['draw_bookmaker']) == (3.5, 'Bet365')
+        assert (best['away_odds'], best['away_bookmaker']) == (4.2, 'Unibet')
+        assert best['margin'] == odds_api.implied_margin([2.0, 3.5, 4.2]) == 0.0238
+        assert set(best['bookmakers']) == {'Pinnacle', 'Bet365', 'Unibet'}
+        assert best['bookmakers']['Pinnacle']['margin'] == pytest.approx(1 / 2.0 + 1 / 3.2 + 1 / 3.9 - 1, abs=1e-4)
+        assert best['queried'] == 4 and best['success']
+        assert session.peak == 4   # wszyscy naraz
+
+    def test_tie_goes_to_earlier_and_no_draw(self):
+        session = FakeSession({('T1', '3'): FakeResponse(200, _payload(1.5, 9.0, 2.6)),
+                               ('T1', '16'): FakeResponse(200, _payload(1.5, 9.0, 2.5))}, delays={'3': 0.05})
+        best = _api(session).get_best_odds('T1', 'tennis', ['pinnacle', 'bet365'])
+        assert best['home_bookmaker'] == 'Pinnacle' and best['away_bookmaker'] == 'Pinnacle'
+        assert best['draw_odds'] is None and best['draw_bookmaker'] is None
+        assert best['margin'] == odds_api.implied_margin([1.5, 2.6])
+
+    def test_first_hit_asks_lazily(self):
+        session = FakeSession(self.RESPONSES)
+        best = _api(session).get_best_odds('E1', 'football', ['pinnacle', 'bet365', 'unibet'], first_hit=True)
+        assert session.calls == [('E1', '3')]                       # reszta nieodpytana
+        assert best['home_bookmaker'] == best['away_bookmaker'] == 'Pinnacle'
+        assert list(best['bookmakers']) == ['Pinnacle'] and best['queried'] == 1
+
+        session = FakeSession(self.RESPONSES)
+        best = _api(session).get_best_odds('E1', 'football', ['william_hill', 'bet365', 'unibet'], first_hit=True)
+        assert session.calls == [('E1', '43'), ('E1', '16')]        # następny dopiero po pustej odpowiedzi
+        assert best['home_bookmaker'] == 'Bet365' and best['queried'] == 2
+
+    def test_no_odds_anywhere(self):
+        best = _api(FakeSession({('Z1', '3'): FakeResponse(404)})).get_best_odds('Z1', bookmakers=['pinnacle', 'nope'])
+        assert not best['success'] and best['margin'] is None and best['queried'] == 1
+
+    def test_implied_margin(self):
+        assert odds_api.implied_margin([2.0, 2.0]) == 0.0
+        assert odds_api.implied_margin([1.9, 1.9]) == pytest.approx(0.0526, abs=1e-4)
+        assert odds_api.implied_margin([1.9, None]) is None and odds_api.implied_margin([]) is None
+        assert 'nordicbet' not in odds_api.ALL_BOOKMAKERS and 'nordic_bet' in odds_api.ALL_BOOKMAKERS
+
+    def test_best_price_batch(self):
+        session = FakeSession(self.RESPONSES)
+        batch = LivesportOddsBatch(bookmakers=['pinnacle', 'bet365', 'unibet'], api=_api(session), best_price=True)
+        odds = batch.fetch(['E1'])['E1']
+        assert odds['odds_found'] and odds['bookmaker'] == 'Pinnacle / Bet365 / Unibet'
+        assert (odds['home_odds'], odds['draw_odds'], odds['away_odds']) == (2.0, 3.5, 4.2)
+        assert odds['margin'] == 0.0238 and batch.stats['requests'] == 3
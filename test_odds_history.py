@@ -0,0 +1,170 @@
+"""
+Tests for the odds line-movement store (odds_history).
+
+Covers:
+  - Kickoff timestamps from listing 'HH:MM' and page 'DD.MM.YYYY HH:MM'
+  - Append-only day partitions: events registered once, unchanged odds not re-written,
+    state rebuilt from disk and lines appended by another process picked up
+  - record_rows(): event IDs from stubs / URLs, first snapshot per match and per
+    bookmaker for best-price rows (never under the combined label)
+  - events_in_window(): only kickoffs inside the window, only nearby partitions read
+  - OddsRefresher: polls only due events, records every bookmaker's prices
+  - movement(): series per bookmaker with first -> last change; the API endpoint
+    releases the partitions it read
+"""
+
+import sys
+import os
+from datetime import datetime
+
+import pytest
+
+# Ensure project root is on path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from odds_history import OddsHistory, OddsRefresher, kickoff_timestamp
+
+DAY = '2025-10-01'
+NOON = datetime(2025, 10, 1, 12, 0).timestamp()
+URL = 'https://www.livesport.com/pl/mecz/pilka-nozna/legia-AAAAAAAA/lech-BBBBBBBB/?mid=KQAaF7d2'
+
+
+@pytest.fixture
+def history(tmp_path):
+    return OddsHistory(str(tmp_path))
+
+
+class TestKickoff:
+
+    def test_formats(self):
+        assert kickoff_timestamp(DAY, '12:00') == NOON
+        assert kickoff_timestamp(None, '01.10.2025 12:00') == NOON
+        assert kickoff_timestamp(DAY, 'Sob 12:00') == NOON
+        assert kickoff_timestamp(DAY, None) is None and kickoff_timestamp(DAY, 'FT') is None
+
+
+class TestStore:
+
+    def test_append_only_dedup(self, history, tmp_path):
+        assert history.register('E1', DAY, NOON, 'football', URL, 'Legia', 'Lech')
+        assert not history.register('E1', DAY, NOON + 60)
+        assert history.record('E1', DAY, 'Pinnacle', 1.9, 3.4, 4.1, ts=NOON - 7200)
+        assert not history.record('E1', DAY, 'Pinnacle', '1.90', 3.4, 4.1, ts=NOON - 3600)
+        assert history.record('E1', DAY, 'Pinnacle', 1.85, 3.5, 4.2, ts=NOON - 600)
+        assert not history.record('E1', DAY, 'Pinnacle', None, float('nan'), None)
+        assert history.stats == {'events': 1, 'snapshots': 2, 'unchanged': 1}
+
+        lines = (tmp_path / f'{DAY}.odds.csv').read_text().splitlines()
+        assert lines == [f'{NOON - 7200:.0f},E1,Pinnacle,1.9,3.4,4.1', f'{NOON - 600:.0f},E1,Pinnacle,1.85,3.5,4.2']
+        assert history.days() == [DAY]
+
+    def test_state_from_disk_and_other_writers(self, history, tmp_path):
+        history.register('E1', DAY, NOON)
+        history.record('E1', DAY, 'Pinnacle', 1.9, 3.4, 4.1)
+
+        other = OddsHistory(str(tmp_path))
+        assert not other.record('E1', DAY, 'Pinnacle', 1.9, 3.4, 4.1)   # ta sama linia z dysku
+        other.register('E2', DAY, NOON + 3600)
+        with open(tmp_path / f'{DAY}.events.jsonl', 'a') as fh:
+            fh.write('{"event_id": "E3"')                                 # urwana linia
+        assert set(history.events(DAY)) == {'E1', 'E2'}
+        with open(tmp_path / f'{DAY}.events.jsonl', 'a') as fh:
+            fh.write(', "kickoff": null}\n')
+        assert set(history.events(DAY)) == {'E1', 'E2', 'E3'}
+
+    def test_record_rows(self, history):
+        rows = [
+            {'match_url': URL, 'home_team': 'Legia', 'away_team': 'Lech', 'sport': 'football',
+             'home_odds': 1.9, 'draw_odds': 3.4, 'away_odds': 4.1, 'odds_bookmaker': 'Pinnacle'},
+            {'match_url': 'https://www.livesport.com/pl/mecz/tenis/x/', 'match_time': '01.10.2025 15:30'},
+            {'match_url': 'https://www.livesport.com/pl/mecz/tenis/no-id/'},
+        ]
+        stubs = {URL: {'event_id': 'KQAaF7d2', 'kickoff': '12:00'},
+                 rows[1]['match_url']: {'event_id': 'TnS00001'}}
+        assert history.record_rows(rows, DAY, stubs, ts=NOON - 7200) == 2
+        events = history.events(DAY)
+        assert events['KQAaF7d2']['kickoff'] == NOON and events['KQAaF7d2']['home_team'] == 'Legia'
+        assert events['TnS00001']['kickoff'] == NOON + 3.5 * 3600
+        assert history.stats['snapshots'] == 1
+
+    def test_record_rows_best_price_per_bookmaker(self, history):
+        rows = [{'match_url': URL, 'home_odds': 2.0, 'draw_odds': 3.5, 'away_odds': 4.2,
+                 'odds_bookmaker': 'Pinnacle / Bet365 / Unibet'}]
+        odds = {'KQAaF7d2': {'bookmakers': {'Pinnacle': {'home_odds': 2.0, 'draw_odds': 3.2, 'away_odds': 3.9},
+                                            'Bet365': {'home_odds': 1.9, 'draw_odds': 3.5, 'away_odds': 3.9}}}}
+        history.record_rows(rows, DAY, ts=NOON - 7200, odds=odds)
+        history.record('KQAaF7d2', DAY, 'Pinnacle', 1.95, 3.2, 4.0, ts=NOON - 600)   # jak OddsRefresher
+
+        movement = history.movement('KQAaF7d2', DAY)
+        assert sorted(movement['series']) == ['Bet365', 'Pinnacle']                  # bez łączonej etykiety
+        assert movement['change']['Pinnacle']['home'] == -0.05
+
+        history.record_rows([dict(rows[0], match_url=URL.replace('KQAaF7d2', 'ZZZZZZZZ'))], DAY, odds={})
+        assert 'ZZZZZZZZ' in history.events(DAY) and not history.movement('ZZZZZZZZ', DAY)['series']
+
+    def test_bad_day_rejected(self, history):
+        with pytest.raises(ValueError):
+            history.register('E1', '../etc', NOON)
+
+
+class TestWindow:
+
+    def test_only_due_events_and_nearby_days(self, history, tmp_path):
+        history.register('SOON', DAY, NOON + 3600)
+        history.register('LATER', DAY, NOON + 8 * 3600)
+        history.register('STARTED', DAY, NOON - 60)
+        history.register('OLD', '2025-09-01', NOON)
+        history.register('NIGHT', '2025-09-30', datetime(2025, 10, 1, 13, 30).timestamp())
+
+        fresh = OddsHistory(str(tmp_path))
+        due = fresh.events_in_window(NOON, window_hours=6)
+        assert sorted(e['event_id'] for _, e in due) == ['NIGHT', 'SOON']
+        assert sorted(fresh._events) == ['2025-09-30', DAY]   # stare partycje nieczytane
+
+    def test_refresher(self, history):
+        history.register('SOON', DAY, NOON + 3600, 'tennis')
+        history.register('LATER', DAY, NOON + 8 * 3600)
+        history.record('SOON', DAY, 'Pinnacle', 1.5, None, 2.6, ts=NOON - 3600)
+        asked = []
+
+        def fetch(events):
+            asked.append(events)
+            return {'SOON': {'bookmakers': {'Pinnacle': {'home_odds': 1.45, 'away_odds': 2.8},
+                                            'Bet365': {'home_odds': 1.5, 'away_odds': 2.7}}}}
+
+        refresher = OddsRefresher(history, window_hours=6, fetch=fetch)
+        assert refresher.run(NOON) == 2
+        assert asked == [{'SOON': 'tennis'}]
+        assert refresher.run(NOON + 900) == 0   # kursy bez zmian
+        assert '2 przebiegów' in refresher.format_report()
+
+        movement = history.movement('SOON', DAY)
+        assert [p['home'] for p in movement['series']['Pinnacle']] == [1.5, 1.45]
+        assert movement['change']['Pinnacle'] == {'home': -0.05, 'draw': None, 'away': 0.2}
+        assert movement['change']['Bet365'] == {'home': 0.0, 'draw': None, 'away': 0.0}
+        assert history.find_day('SOON', around='2025-10-02') == DAY
+        assert history.find_day('SOON', around='2025-10-05') is None
+
+    def test_refresh_nothing_due(self, history):
+        refresher = OddsRefresher(history, fetch=lambda events: pytest.fail('fetch'))
+        assert refresher.run(NOON) == 0
+
+
+class TestApi:
+
+    def test_movement_endpoint(self, tmp_path, monkeypatch):
+        import api_server
+        store = OddsHistory(str(tmp_path))
+        store.register('E1', DAY, NOON, 'football', URL, 'Legia', 'Lech')
+        store.record('E1', DAY, 'Pinnacle', 1.9, 3.4, 4.1, ts=NOON - 7200)
+        store.record('E1', DAY, 'Pinnacle', 1.8, 3.5, 4.4, ts=NOON - 600)
+        monkeypatch.setattr(api_server, 'odds_history', OddsHistory(str(tmp_path)))
+        client = api_server.app.test_client()
+
+        data = client.get(f'/api/odds-movement/E1?date={DAY}').get_json()
+        assert data['homeTeam'] == 'Legia' and data['kickoff'] == NOON
+        assert [p['away'] for p in data['series']['Pinnacle']] == [4.1, 4.4]
+        assert client.get('/api/odds-movement/E1?date=2025-10-02').status_code == 200
+        assert client.get('/api/odds-movement/NOPE?date=2025-10-01').status_code == 404
+        assert client.get('/api/odds-movement/E1?date=jutro').status_code == 400
+        assert api_server.odds_history._events == {}                                  # partycje zwolnione
@@ -0,0 +1,194 @@
+"""
+Tests for page_archive (record / replay of page snapshots and HTTP responses).
+
+Covers:
+  - Content-addressed blobs: identical content stored once
+  - Replay order per key: recorded reads in sequence, then the last one repeated
+  - requests.Session / curl_cffi hooks: recorded via a transport adapter, replayed
+    without network; unrecorded request raises ArchiveMiss
+  - ReplayDriver: CSS find_elements on the recorded HTML, SPA link click, start_driver
+  - process_match() recorded and replayed offline with identical results
+"""
+
+import sys
+import os
+import glob
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.common.by import By
+
+# Ensure project root is on path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import page_archive as pa
+from page_archive import ArchiveMiss, PageArchive, ReplayDriver, enable_archive, request_key
+import livesport_h2h_scraper as ls
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+QUALIFYING = os.path.join(ROOT, 'debug_html', 'h2h_page_1763382582.html')
+MATCH_URL = ('https://www.livesport.com/pl/mecz/siatkowka/cuprum-stilon-gorzow-K4CJzoda/'
+             'slepsk-malow-suwalki-2kggPBWE/?mid=AByAQtGc')
+ODDS_URL = 'https://global.ds.lsapp.eu/odds/pq_graphql'
+
+
+class CannedAdapter(BaseAdapter):
+    """Transport requests zwracający stałą odpowiedź (bez sieci)."""
+
+    def __init__(self, body):
+        super().__init__()
+        self.body = body
+        self.calls = 0
+
+    def send(self, request, **kwargs):
+        self.calls += 1
+        response = requests.Response()
+        response.status_code = 200
+        response._content = self.body
+        response.headers['content-type'] = 'application/json'
+        response.url = request.url
+        response.encoding = 'utf-8'
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def archive_dir(tmp_path):
+    yield str(tmp_path / 'archive')
+    pa.disable_archive()
+
+
+def _record_session(body):
+    session = requests.Session()
+    adapter = CannedAdapter(body)
+    session.mount('https://', adapter)
+    return session, adapter
+
+
+class TestStore:
+
+    def test_content_addressed(self, archive_dir):
+        archive = PageArchive(archive_dir, 'record')
+        archive.record_page('https://a', '<html>same</html>')
+        archive.record_page('https://b', '<html>same</html>')
+        archive.close()
+        assert len(glob.glob(os.path.join(archive_dir, 'blobs', '*', '*'))) == 1
+        assert archive.stats['recorded'] == 2 and archive.stats['dedup'] == 1
+
+    def test_replay_sequence(self, archive_dir):
+        archive = PageArchive(archive_dir, 'record')
+        for html in ('<p>1</p>', '<p>2</p>'):
+            archive.record_page('https://a', html)
+        archive.close()
+
+        replay = PageArchive(archive_dir, 'replay')
+        assert [replay.replay_page('https://a') for _ in range(3)] == ['<p>1</p>', '<p>2</p>', '<p>2</p>']
+        assert replay.replay_page('https://other') is None
+        assert replay.stats['replayed'] == 3 and replay.stats['misses'] == 1
+
+    def test_request_key(self):
+        assert request_key('get', ODDS_URL, params={'b': 2, 'a': 1}) == f'GET {ODDS_URL}?a=1&b=2'
+        assert request_key('POST', ODDS_URL, json_body={'x': 1}) != request_key('POST', ODDS_URL, json_body={'x': 2})
+
+
+class TestHttpHooks:
+
+    def test_record_then_replay_requests(self, archive_dir):
+        enable_archive(archive_dir, 'record')
+        session, adapter = _record_session(b'{"data": {"odds": 1.85}}')
+        assert session.get(ODDS_URL, params={'eventId': 'X'}, timeout=5).json()['data']['odds'] == 1.85
+        assert adapter.calls == 1
+        pa.get_archive().close()
+
+        enable_archive(archive_dir, 'replay')
+        response = requests.Session().get(ODDS_URL, params={'eventId': 'X'}, timeout=5)
+        assert response.status_code == 200 and response.json() == {'data': {'odds': 1.85}}
+        assert response.headers['content-type'] == 'application/json'
+        with pytest.raises(ArchiveMiss):
+            requests.get(ODDS_URL, params={'eventId': 'other'})
+
+    def test_curl_cffi_replay(self, archive_dir):
+        curl_requests = pytest.importorskip('curl_cffi.requests')
+        archive = PageArchive(archive_dir, 'record')
+        archive.store('http', request_key('GET', 'https://www.forebet.com/en/x'), b'<div class="rcnt"></div>',
+                      status=200)
+        archive.close()
+
+        enable_archive(archive_dir, 'replay')
+        response = curl_requests.get('https://www.forebet.com/en/x', impersonate='chrome', timeout=20)
+        assert response.text == '<div class="rcnt"></div>'
+
+    def test_off_passes_through(self, archive_dir):
+        enable_archive(archive_dir, 'record')
+        pa.disable_archive()
+        session, adapter = _record_session(b'{}')
+        session.get(ODDS_URL)
+        assert adapter.calls == 1
+        assert not pa._ORIGINAL_REQUEST  # hooki odpięte
+
+
+class TestReplayDriver:
+
+    def test_elements_and_click(self, archive_dir):
+        archive = PageArchive(archive_dir, 'record')
+        archive.record_page('https://x/h2h/ogolem/', '<a class="tab" href="/h2h/u-siebie/">Dom</a>')
+        archive.close()
+
+        driver = ReplayDriver(PageArchive(archive_dir, 'replay'))
+        driver.get('https://x/h2h/ogolem/')
+        link, = driver.find_elements(By.CSS_SELECTOR, 'a.tab')
+        assert link.text == 'Dom' and link.get_attribute('class') == 'tab'
+        assert driver.find_elements(By.XPATH, '//a') == []
+        with pytest.raises(NoSuchElementException):
+            driver.find_element(By.CSS_SELECTOR, 'div.missing')
+        link.click()
+        assert driver.current_url == 'https://x/h2h/u-siebie/'
+        assert 'Dom' in driver.page_source  # treść nadal spod URL z get()
+
+    def test_start_driver_without_chrome(self, archive_dir):
+        PageArchive(archive_dir, 'record').close()
+        enable_archive(archive_dir, 'replay')
+        assert isinstance(ls.start_driver(headless=True), ReplayDriver)
+
+
+class LiveDriver(ReplayDriver):
+    """Udaje Chrome na stronie z debug_html (do nagrania)."""
+
+    def __init__(self, html):
+        super().__init__(PageArchive())
+        self._fixture = html
+
+    @property
+    def page_source(self):
+        self._html = self._fixture
+        return self._fixture
+
+    def _current_soup(self):
+        self._html = self._fixture
+        return super()._current_soup()
+
+
+class TestProcessMatchReplay:
+
+    def test_identical_results_offline(self, archive_dir, monkeypatch):
+        monkeypatch.setattr(ls, 'fetch_odds_from_livesport',
+                            lambda driver, url, sport='football': {'odds_found': False})
+        with open(QUALIFYING, encoding='utf-8') as f:
+            html = f.read()
+
+        archive = PageArchive(archive_dir, 'record')
+        recorded = ls.process_match(MATCH_URL, archive.wrap_driver(LiveDriver(html)), sport='volleyball')
+        archive.close()
+        assert archive.stats['recorded'] >= 1
+
+        replay = PageArchive(archive_dir, 'replay')
+        replayed = ls.process_match(MATCH_URL, ReplayDriver(replay), sport='volleyball')
+        recorded.pop('_timings', None)
+        replayed.pop('_timings', None)
+        assert replayed == recorded and replayed['qualifies']
+        assert replay.stats['misses'] == 0
@@ -0,0 +1,166 @@
+"""
+Tests for resource_blocking (CDP resource blocking profiles).
+
+Covers:
+  - Profile resolution (argument > env > 'off') and URL patterns per profile
+  - Per-sport allowlists removing groups from the blocked set
+  - Chrome options: prefs merged with existing ones, performance log enabled
+  - apply_blocking_profile(): CDP calls, no-op for the same key, re-apply on sport change
+  - BlockingStats / collect_blocking_stats(): counts and estimated savings
+"""
+
+import sys
+import os
+import json
+import pytest
+from selenium.webdriver.chrome.options import Options
+
+# Ensure project root is on path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import resource_blocking as rb
+
+
+class FakeDriver:
+    """Records CDP commands and serves a canned performance log."""
+
+    def __init__(self, log_entries=None, timing=None, cdp_error=False):
+        self.cdp = []
+        self.log_entries = log_entries or []
+        self.timing = timing
+        self.cdp_error = cdp_error
+
+    def execute_cdp_cmd(self, cmd, params):
+        if self.cdp_error:
+            raise RuntimeError("CDP not supported")
+        self.cdp.append((cmd, params))
+        return {}
+
+    def get_log(self, log_type):
+        assert log_type == 'performance'
+        entries, self.log_entries = self.log_entries, []
+        return entries
+
+    def execute_script(self, script, *args):
+        return self.timing
+
+
+def _entry(method, **params):
+    return {'message': json.dumps({'message': {'method': method, 'params': params}})}
+
+
+class TestProfiles:
+
+    def test_profile_resolution(self, monkeypatch):
+        monkeypatch.delenv(rb.BLOCK_PROFILE_ENV, raising=False)
+        assert rb.get_block_profile() == 'off'
+        monkeypatch.setenv(rb.BLOCK_PROFILE_ENV, 'light')
+        assert rb.get_block_profile() == 'light'
+        assert rb.get_block_profile('aggressive') == 'aggressive'
+        assert rb.get_block_profile('bogus') == 'off'
+
+    def test_patterns_per_profile(self):
+        assert rb.blocked_url_patterns('off') == []
+        light = rb.blocked_url_patterns('light')
+        aggressive = rb.blocked_url_patterns('aggressive')
+        assert '*doubleclick.net*' in light
+        assert '*.png' not in light
+        assert '*.png' in aggressive and '*.woff2' in aggressive
+        assert set(light) < set(aggressive)
+
+    def test_sport_allowlist(self, monkeypatch):
+        monkeypatch.setitem(rb.SPORT_ALLOWLISTS, 'tennis', ['images'])
+        assert 'images' not in rb.blocked_groups('aggressive', 'tennis')
+        assert 'images' in rb.blocked_groups('aggressive', 'football')
+
+
+class TestChromeOptions:
+
+    def test_prefs_merged_and_performance_log(self):
+        opts = Options()
+        opts.add_experimental_option('prefs', {'profile.default_content_setting_values.notifications': 2})
+        rb.configure_chrome_options(opts, 'light')
+        prefs = opts.experimental_options['prefs']
+        assert prefs['profile.default_content_setting_values.notifications'] == 2
+        assert prefs['profile.managed_default_content_settings.plugins'] == 2
+        assert opts.to_capabilities()['goog:loggingPrefs'] == {'performance': 'ALL'}
+
+    def test_off_leaves_options_untouched(self):
+        opts = Options()
+        rb.configure_chrome_options(opts, 'off')
+        assert 'prefs' not in opts.experimental_options
+        assert 'goog:loggingPrefs' not in opts.to_capabilities()
+
+
+class TestApply:
+
+    def test_cdp_commands(self):
+        d = FakeDriver()
+        assert rb.apply_blocking_profile(d, 'light', 'football') is True
+        assert [c for c, _ in d.cdp] == ['Network.enable', 'Network.setBlockedURLs']
+        assert d.cdp[1][1]['urls'] == rb.blocked_url_patterns('light', 'football')
+
+    def test_same_key_is_noop_sport_change_reapplies(self):
+        d = FakeDriver()
+        rb.apply_blocking_profile(d, 'aggressive', 'football')
+        rb.apply_blocking_profile(d, 'aggressive', 'football')
+        assert len(d.cdp) == 2
+        rb.apply_blocking_profile(d, 'aggressive', 'tennis')
+        assert len(d.cdp) == 4
+
+    def test_off_and_cdp_errors(self):
+        d = FakeDriver()
+        assert rb.apply_blocking_profile(d, 'off', 'football') is False
+        assert d.cdp == []
+        assert rb.apply_blocking_profile(FakeDriver(cdp_error=True), 'light') is False
+
+
+class TestStats:
+
+    def _log(self):
+        return [
+            _entry('Network.requestWillBeSent', requestId='1', type='Document'),
+            _entry('Network.loadingFinished', requestId='1', encodedDataLength=100_000),
+            _entry('Network.requestWillBeSent', requestId='2', type='Image'),
+            _entry('Network.loadingFinished', requestId='2', encodedDataLength=10_000),
+            _entry('Network.requestWillBeSent', requestId='3', type='Image'),
+            _entry('Network.loadingFailed', requestId='3', type='Image',
+                   errorText='net::ERR_BLOCKED_BY_CLIENT', blockedReason='inspector'),
+            _entry('Network.requestWillBeSent', requestId='4', type='Font'),
+            _entry('Network.loadingFailed', requestId='4', errorText='net::ERR_BLOCKED_BY_CLIENT'),
+            _entry('Network.requestWillBeSent', requestId='5', type='XHR'),
+            _entry('Network.loadingFailed', requestId='5', errorText='net::ERR_ABORTED'),
+            _entry('Page.loadEventFired'),
+            {'message': 'not json'},
+        ]
+
+    def test_collect_counts_blocked_by_type(self):
+        stats = rb.BlockingStats()
+        d = FakeDriver(self._log(), timing=[1000, 2000])
+        d._blocking_key = ('aggressive', 'football')
+        rb.collect_blocking_stats(d, stats)
+
+        assert stats.requests == 5
+        assert stats.blocked_by_type == {'Image': 1, 'Font': 1}
+        assert stats.transferred_bytes == 110_000
+        assert stats.pages == 1
+
+    def test_estimates(self):
+        stats = rb.BlockingStats()
+        d = FakeDriver(self._log(), timing=[1000, 2000])
+        d._blocking_key = ('aggressive', 'football')
+        rb.collect_blocking_stats(d, stats)
+
+        # Image: średnia z runu (10 kB), Font: typowy rozmiar
+        expected = 10_000 + rb.TYPICAL_RESOURCE_BYTES['Font']
+        assert stats.estimated_saved_bytes() == expected
+        # 110 kB w 1 s -> przepustowość 110 kB/s
+        assert stats.estimated_saved_seconds() == pytest.approx(expected / 110_000)
+        report = stats.format_report()
+        assert '2/5' in report and 'Font:1' in report and 'Image:1' in report
+
+    def test_collect_without_blocking_is_noop(self):
+        stats = rb.BlockingStats()
+        rb.collect_blocking_stats(FakeDriver(self._log()), stats)
+        assert stats.requests == 0
+        assert 'brak danych' in stats.format_report()
@@ -0,0 +1,134 @@
+"""
+Tests for run_journal (append-only JSONL run journal).
+
+Covers:
+  - append() / completed_urls() and journal_path_for()
+  - Latest record per URL wins, row order = first appearance
+  - Truncated last line (crash mid-write) is skipped
+  - write_csv(): header = union of keys, same cells as the old pandas export
+  - write_json() with a predicate, concurrent appends from worker threads
+  - fresh=True starts a new run, fresh=False keeps entries for --resume
+"""
+
+import sys
+import os
+import csv
+import json
+import threading
+
+import pandas as pd
+
+# Ensure project root is on path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from run_journal import RunJournal, journal_path_for
+import livesport_h2h_scraper as ls
+import scrape_and_notify as sn
+
+
+def _rows():
+    return [
+        {'match_url': 'u1', 'home_team': 'A', 'qualifies': True, 'win_rate': 0.8,
+         'h2h_last5': [{'home': 'A', 'score': '2-1'}], 'home_odds': 1.5},
+        {'match_url': 'u2', 'home_team': 'B', 'qualifies': False, 'win_rate': 0.2,
+         'h2h_last5': [], 'home_odds': None, 'home_form': ['W', 'L']},
+        {'match_url': 'u3', 'home_team': 'C', 'qualifies': False, 'h2h_last5': [], 'extra': 'x'},
+    ]
+
+
+def _journal(tmp_path, rows=None):
+    journal = RunJournal(str(tmp_path / 'run.journal.jsonl'))
+    for row in rows if rows is not None else _rows():
+        journal.append(row['match_url'], row)
+    return journal
+
+
+class TestJournal:
+
+    def test_path_for_output(self):
+        assert journal_path_for(os.path.join('outputs', 'x_EMAIL.csv')) == os.path.join('outputs', 'x_EMAIL.journal.jsonl')
+
+    def test_append_and_completed(self, tmp_path):
+        journal = _journal(tmp_path)
+        assert journal.completed_urls() == {'u1', 'u2', 'u3'}
+        with open(journal.path, encoding='utf-8') as f:
+            lines = [json.loads(line) for line in f]
+        assert [e['url'] for e in lines] == ['u1', 'u2', 'u3']
+        assert lines[0]['status'] == 'done' and lines[0]['record']['home_team'] == 'A'
+
+    def test_latest_record_wins_in_first_order(self, tmp_path):
+        journal = _journal(tmp_path)
+        enriched = dict(_rows()[0], forebet_prediction='1')
+        journal.append('u1', enriched, status='enriched')
+
+        entries = list(journal.iter_entries())
+        assert [e['url'] for e in entries] == ['u1', 'u2', 'u3']
+        assert entries[0]['status'] == 'enriched'
+        assert entries[0]['record']['forebet_prediction'] == '1'
+        assert [r['home_team'] for r in journal.iter_records(lambda r: r['qualifies'])] == ['A']
+
+    def test_truncated_line_skipped(self, tmp_path):
+        journal = _journal(tmp_path)
+        with open(journal.path, 'a', encoding='utf-8') as f:
+            f.write('{"url": "u4", "status": "do')
+        assert journal.completed_urls() == {'u1', 'u2', 'u3'}
+        assert len(journal.load_records()) == 3
+
+    def test_fresh_and_resume(self, tmp_path):
+        _journal(tmp_path)
+        path = str(tmp_path / 'run.journal.jsonl')
+        assert RunJournal(path).completed_urls() == {'u1', 'u2', 'u3'}
+        assert RunJournal(path, fresh=True).completed_urls() == set()
+
+    def test_concurrent_appends(self, tmp_path):
+        journal = RunJournal(str(tmp_path / 'run.journal.jsonl'))
+
+        def worker(n):
+            for i in range(50):
+                journal.append(f'w{n}-{i}', {'match_url': f'w{n}-{i}', 'n': i})
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(journal.completed_urls()) == 200
+
+
+class TestOutputs:
+
+    def test_csv_matches_pandas_export(self, tmp_path):
+        journal = _journal(tmp_path)
+        outfn = str(tmp_path / 'out.csv')
+        assert journal.write_csv(outfn, transform=ls._journal_csv_row) == 3
+
+        df = pd.DataFrame(_rows())
+        df['h2h_last5'] = df['h2h_last5'].apply(lambda x: str(x) if x else '')
+        expected_fn = str(tmp_path / 'expected.csv')
+        df.to_csv(expected_fn, index=False, encoding='utf-8-sig')
+
+        written = pd.read_csv(outfn, encoding='utf-8-sig', keep_default_na=False)
+        expected = pd.read_csv(expected_fn, encoding='utf-8-sig', keep_default_na=False)
+        assert list(written.columns) == list(expected.columns)
+        assert written.astype(str).values.tolist() == expected.astype(str).values.tolist()
+
+    def test_csv_odds_cleaning(self, tmp_path):
+        rows = _rows()
+        rows[1]['home_odds'] = float('nan')
+        rows[2]['home_odds'] = 'nan'
+        journal = _journal(tmp_path, rows)
+        outfn = str(tmp_path / 'out.csv')
+        journal.write_csv(outfn, transform=sn.clean_journal_row_for_csv)
+        with open(outfn, encoding='utf-8-sig', newline='') as f:
+            odds = [r['home_odds'] for r in csv.DictReader(f)]
+        assert odds == ['1.5', '', '']
+
+    def test_json_predictions(self, tmp_path):
+        journal = _journal(tmp_path)
+        outfn = str(tmp_path / 'pred.json')
+        assert journal.write_json(outfn, predicate=lambda r: r.get('qualifies')) == 1
+        with open(outfn, encoding='utf-8') as f:
+            assert json.load(f) == [_rows()[0]]
+        assert journal.write_json(outfn, predicate=lambda r: False) == 0
+        with open(outfn, encoding='utf-8') as f:
+            assert json.load(f) == []
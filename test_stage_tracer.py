@@ -0,0 +1,131 @@
+"""
+Tests for stage_tracer (per-stage JSONL spans + percentile report).
+
+Covers:
+  - span() / record(): JSONL entries with match id, sport, outcome, duration
+  - Exceptions recorded as outcome 'error' and re-raised
+  - Disabled tracer (default, no --trace) writes nothing
+  - Nearest-rank p50/p95/p99 summary and report
+  - Per-thread match context
+  - process_match() over the HTTP path emitting navigate/parse/extract/form/match spans
+"""
+
+import sys
+import os
+import json
+import threading
+
+import pytest
+
+# Ensure project root is on path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import stage_tracer
+from stage_tracer import StageTracer, enable_tracing, percentile, trace_path_for
+import livesport_h2h_scraper as ls
+from livesport_http import LivesportHttpClient
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+QUALIFYING = os.path.join(ROOT, 'debug_html', 'h2h_page_1763382582.html')
+MATCH_URL = ('https://www.livesport.com/pl/mecz/siatkowka/cuprum-stilon-gorzow-K4CJzoda/'
+             'slepsk-malow-suwalki-2kggPBWE/?mid=AByAQtGc')
+
+
+def _read_jsonl(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+@pytest.fixture
+def tracer(tmp_path):
+    t = enable_tracing(str(tmp_path / 'run.trace.jsonl'))
+    yield t
+    t.close()
+    stage_tracer.TRACER = StageTracer(enabled=False)
+
+
+class TestSpans:
+
+    def test_span_entry(self, tracer):
+        tracer.set_match(MATCH_URL, 'volleyball')
+        with tracer.span('navigate', via='http') as span:
+            span['outcome'] = 'fallback'
+        entry, = _read_jsonl(tracer.path)
+        assert entry['stage'] == 'navigate' and entry['via'] == 'http'
+        assert entry['match_id'] == 'AByAQtGc' and entry['sport'] == 'volleyball'
+        assert entry['outcome'] == 'fallback' and entry['duration_ms'] >= 0
+
+    def test_error_outcome(self, tracer):
+        with pytest.raises(ValueError):
+            with tracer.span('parse'):
+                raise ValueError('bad html')
+        entry, = _read_jsonl(tracer.path)
+        assert entry['outcome'] == 'error' and entry['error'] == 'ValueError'
+
+    def test_disabled_is_noop(self, tmp_path):
+        t = StageTracer(str(tmp_path / 'x.jsonl'), enabled=False)
+        with t.span('navigate') as span:
+            span['outcome'] = 'miss'
+        t.record('odds', 1.0)
+        assert t.summary() == {}
+        assert not os.path.exists(tmp_path / 'x.jsonl')
+
+    def test_thread_local_match(self, tracer):
+        def worker(mid):
+            tracer.set_match(f'https://x/?mid={mid}', 'football')
+            tracer.record('match', 0.1)
+
+        threads = [threading.Thread(target=worker, args=(f'M{i}',)) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert sorted(e['match_id'] for e in _read_jsonl(tracer.path)) == ['M0', 'M1', 'M2', 'M3']
+
+    def test_path_for_output(self):
+        assert trace_path_for(os.path.join('outputs', 'x.csv')) == os.path.join('outputs', 'x.trace.jsonl')
+
+
+class TestSummary:
+
+    def test_percentiles(self):
+        values = [float(v) for v in range(1, 101)]
+        assert percentile(values, 50) == 50.0
+        assert percentile(values, 95) == 95.0
+        assert percentile(values, 99) == 99.0
+        assert percentile([3.0], 99) == 3.0
+
+    def test_report_order_and_outcomes(self):
+        t = StageTracer()
+        for v in (1.0, 2.0, 3.0):
+            t.record('odds', v, outcome='ok')
+        t.record('odds', 10.0, outcome='miss')
+        t.record('navigate', 0.5)
+        summary = t.summary()
+        assert list(summary) == ['navigate', 'odds']
+        assert summary['odds']['p50'] == 2.0 and summary['odds']['p99'] == 10.0
+        assert summary['odds']['outcomes'] == {'ok': 3, 'miss': 1}
+        assert 'miss:1' in t.format_report()
+
+
+class TestProcessMatchSpans:
+
+    def test_http_path(self, tracer, monkeypatch):
+        monkeypatch.setattr(ls, 'fetch_odds_from_livesport',
+                            lambda driver, url, sport='football': {'odds_found': False})
+        with open(QUALIFYING, encoding='utf-8') as f:
+            html = f.read()
+
+        class Session:
+            def get(self, url, headers=None, timeout=None):
+                return type('R', (), {'text': html, 'status_code': 200})()
+
+        client = LivesportHttpClient(session_factory=Session)
+        info = ls.process_match(MATCH_URL, driver=None, sport='volleyball', http_client=client)
+        assert info['qualifies']
+
+        stages = [e['stage'] for e in _read_jsonl(tracer.path)]
+        for stage in ('navigate', 'parse', 'extract', 'form', 'odds', 'match'):
+            assert stage in stages, stage
+        assert stages[-1] == 'match'
+        assert tracer.summary()['odds']['outcomes'] == {'miss': 1}
@@ -0,0 +1,154 @@
+"""
+Tests for the persistent tennis player cache (disk_cache.PlayerCache + tennis helpers).
+
+Covers:
+  - PlayerCache: URL and data entries across instances, separate TTLs, hit/miss report
+  - Name normalisation for URL keys; profile URLs kept case-sensitive
+  - find_player_url_from_search / extract_player_detailed_form /
+    extract_surface_statistics: second run served from disk without navigation
+  - Concurrent writers from several threads
+"""
+
+import sys
+import os
+import threading
+import time
+
+import pytest
+
+# Ensure project root is on path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import tennis_scraper_v3_helpers as helpers
+from disk_cache import PlayerCache, player_key
+
+PLAYER_URL = 'https://www.livesport.com/pl/gracz/swiatek-iga/jGHFoXjb/'
+
+SEARCH_HTML = '<html><body><a href="/pl/gracz/swiatek-iga/jGHFoXjb/">Iga Świątek</a></body></html>'
+RESULTS_HTML = """
+<html><body>
+  <div class="match win"><span class="date">01.10.25</span><a class="participant">Coco Gauff (3)</a>
+    <span class="score">6-4 6-3</span><span class="surface">twarda</span></div>
+  <div class="match loss"><span class="date">28.09.25</span><a class="participant">Aryna Sabalenka (1)</a>
+    <span class="score">4-6 6-7</span><span class="surface">twarda</span></div>
+</body></html>
+"""
+STATS_HTML = '<html><body><div class="surface-stats">Ziemia 45 - 15</div></body></html>'
+
+
+class CountingDriver:
+    """Driver z HTML per rodzaj strony; liczy nawigacje."""
+
+    def __init__(self):
+        self.visited = []
+        self.current = None
+
+    def get(self, url):
+        self.visited.append(url)
+        self.current = url
+
+    @property
+    def page_source(self):
+        if '/szukaj/' in self.current:
+            return SEARCH_HTML
+        if self.current.endswith('/wyniki/'):
+            return RESULTS_HTML
+        if self.current.endswith('/statystyki/'):
+            return STATS_HTML
+        return '<html></html>'
+
+
+@pytest.fixture
+def cache_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(helpers.time, 'sleep', lambda s: None)
+    path = str(tmp_path / 'cache.sqlite')
+    helpers.set_player_cache(PlayerCache(path))
+    yield path
+    helpers.set_player_cache(None)
+
+
+class TestPlayerCache:
+
+    def test_roundtrip_and_keys(self, tmp_path):
+        path = str(tmp_path / 'c.sqlite')
+        cache = PlayerCache(path)
+        cache.set_url('Iga  Świątek', PLAYER_URL)
+        cache.set_data(PLAYER_URL, 'form', [{'result': 'W'}])
+        cache.set_data('Iga Świątek', 'ranking', 2)
+        cache.set_data(PLAYER_URL, 'surface', {})   # puste dane nie są zapisywane
+
+        again = PlayerCache(path)
+        assert again.get_url('iga świątek') == PLAYER_URL
+        assert again.get_data(PLAYER_URL, 'form') == [{'result': 'W'}]
+        assert again.get_data(PLAYER_URL.lower(), 'form') is None
+        assert again.get_data('IGA ŚWIĄTEK', 'ranking') == 2
+        assert again.get_data(PLAYER_URL, 'surface') is None
+        assert player_key(' Iga   Świątek ') == 'iga świątek'
+
+    def test_separate_ttls(self, tmp_path):
+        cache = PlayerCache(str(tmp_path / 'c.sqlite'), url_ttl_days=90, data_ttl_hours=1)
+        cache.set_url('Iga Świątek', PLAYER_URL)
+        cache.set_data(PLAYER_URL, 'form', ['W'])
+        two_hours_ago = time.time() - 7200
+        for store in (cache.urls, cache.data):
+            with store._lock:
+                store._conn.execute('UPDATE cache SET updated_at = ?', (two_hours_ago,))
+                store._conn.commit()
+        assert cache.get_url('Iga Świątek') == PLAYER_URL
+        assert cache.get_data(PLAYER_URL, 'form') is None
+
+    def test_report(self, tmp_path):
+        cache = PlayerCache(str(tmp_path / 'c.sqlite'))
+        assert 'brak zapytań' in cache.format_report()
+        cache.set_url('A', 'https://x/a/')
+        cache.get_url('A')
+        cache.get_url('B')
+        cache.get_data('https://x/a/', 'form')
+        assert cache.stats['url'] == {'hits': 1, 'misses': 1}
+        assert 'url 1/2' in cache.format_report() and 'form 0/1' in cache.format_report()
+
+    def test_concurrent_writers(self, tmp_path):
+        cache = PlayerCache(str(tmp_path / 'c.sqlite'))
+
+        def worker(i):
+            for j in range(20):
+                cache.set_data(f'https://x/{i}/{j}/', 'ranking', j + 1)
+                cache.get_data(f'https://x/{i}/{j}/', 'ranking')
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(cache.data) == 80
+        assert cache.stats['ranking'] == {'hits': 80, 'misses': 0}
+
+
+class TestHelpersUseCache:
+
+    def test_second_run_skips_navigation(self, cache_path):
+        driver = CountingDriver()
+        form = helpers.extract_player_detailed_form(driver, 'Iga Świątek')
+        surface = helpers.extract_surface_statistics(driver, PLAYER_URL)
+        assert [m['result'] for m in form] == ['W', 'L']
+        assert surface['clay']['wins'] == 45 and surface['clay']['total'] == 60
+        assert len(driver.visited) == 3  # szukaj + wyniki + statystyki
+
+        # Nowy proces: pamięć pusta, dane z dysku
+        helpers.set_player_cache(PlayerCache(cache_path))
+        second = CountingDriver()
+        assert helpers.extract_player_detailed_form(second, 'Iga Świątek') == form
+        assert helpers.extract_surface_statistics(second, PLAYER_URL) == surface
+        assert second.visited == []
+        assert helpers.get_player_cache().stats['url']['hits'] == 1
+
+    def test_failed_scrape_not_cached(self, cache_path):
+        class EmptyDriver(CountingDriver):
+            @property
+            def page_source(self):
+                return '<html></html>'
+
+        driver = EmptyDriver()
+        assert helpers.find_player_url_from_search(driver, 'Nobody') is None
+        assert helpers.find_player_url_from_search(driver, 'Nobody') is None
+        assert len(driver.visited) == 2
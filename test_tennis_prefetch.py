@@ -0,0 +1,175 @@
+"""
+Tests for the day-level tennis player prefetch (tennis_prefetch).
+
+Covers:
+  - Player profile URLs derived from tennis match URLs (A = home, B = away)
+  - Distinct players across the day's card; names from listing stubs, doubles skipped
+  - TennisPrefetcher: each player fetched once, bounded drivers, cached players
+    without a driver, failed fetches counted
+  - Ranking parsed from the player results page header and cached with the form
+  - apply_player_records(): fills only missing ranking / form, surface stats for both
+"""
+
+import sys
+import os
+import threading
+
+import pytest
+
+# Ensure project root is on path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import tennis_prefetch as tp
+import tennis_scraper_v3_helpers as helpers
+from disk_cache import PlayerCache
+from tennis_prefetch import TennisPrefetcher, apply_player_records, collect_day_players, player_refs_from_url
+
+BASE = 'https://www.livesport.com/pl/mecz/tenis/'
+SWIATEK = 'https://www.livesport.com/pl/gracz/swiatek-iga/jGHFoXjb/'
+GAUFF = 'https://www.livesport.com/pl/gracz/gauff-coco/AbCd1234/'
+SABALENKA = 'https://www.livesport.com/pl/gracz/sabalenka-aryna/ZzYy9876/'
+
+MATCH_1 = f'{BASE}swiatek-iga-jGHFoXjb/gauff-coco-AbCd1234/?mid=T1'
+MATCH_2 = f'{BASE}sabalenka-aryna-ZzYy9876/swiatek-iga-jGHFoXjb/?mid=T2'
+FOOTBALL = 'https://www.livesport.com/pl/mecz/pilka-nozna/a-AAAAAAAA/b-BBBBBBBB/?mid=F1'
+
+
+def _record(url, ranking=None, form=(), surface=None):
+    return {'name': url, 'url': url, 'form': list(form), 'ranking': ranking, 'surface_stats': surface or {}}
+
+
+class TestPlayers:
+
+    def test_refs_from_url(self):
+        assert player_refs_from_url(MATCH_1) == [(SWIATEK, 'Swiatek Iga'), (GAUFF, 'Gauff Coco')]
+        assert player_refs_from_url('https://www.livesport.com/en/match/tennis/a-name-AbCd1234/b-name-ZzYy9876/') == [
+            ('https://www.livesport.com/en/player/a-name/AbCd1234/', 'A Name'),
+            ('https://www.livesport.com/en/player/b-name/ZzYy9876/', 'B Name')]
+        assert player_refs_from_url(FOOTBALL) == []
+        assert player_refs_from_url(f'{BASE}?mid=X') == []
+
+    def test_distinct_players_of_the_day(self):
+        stubs = {MATCH_1: {'home_team': 'Świątek I.', 'away_team': 'Gauff C.'}}
+        players = collect_day_players([MATCH_1, MATCH_2, FOOTBALL], stubs)
+        assert players == {SWIATEK: 'Świątek I.', GAUFF: 'Gauff C.', SABALENKA: 'Sabalenka Aryna'}
+
+    def test_doubles_skipped(self):
+        stubs = {MATCH_1: {'home_team': 'Swiatek I. / Linette M.', 'away_team': 'Gauff C. / Pegula J.'}}
+        assert collect_day_players([MATCH_1], stubs) == {}
+
+
+class StartedDrivers:
+    """driver_factory liczący starty przeglądarek."""
+
+    def __init__(self):
+        self.started = 0
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        with self.lock:
+            self.started += 1
+        return type('Driver', (), {'current_url': 'about:blank', 'quit': lambda self: None})()
+
+
+@pytest.fixture
+def player_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(helpers.time, 'sleep', lambda s: None)
+    helpers.set_player_cache(PlayerCache(str(tmp_path / 'cache.sqlite')))
+    yield
+    helpers.set_player_cache(None)
+
+
+class TestPrefetcher:
+
+    def test_each_player_fetched_once(self, player_cache):
+        fetched = []
+        lock = threading.Lock()
+
+        def fetch(driver, profile, name):
+            with lock:
+                fetched.append(profile)
+            return _record(profile, ranking=len(profile))
+
+        drivers = StartedDrivers()
+        prefetcher = TennisPrefetcher(drivers, workers=2, fetch=fetch, delay_range=None)
+        records = prefetcher.run([MATCH_1, MATCH_2, MATCH_1, FOOTBALL])
+        assert sorted(fetched) == sorted([SWIATEK, GAUFF, SABALENKA])
+        assert set(records) == {SWIATEK, GAUFF, SABALENKA}
+        assert drivers.started == 2
+        assert prefetcher.stats['players'] == 3 and prefetcher.stats['fetched'] == 3
+        assert '3 unikalnych z 3 meczów' in prefetcher.format_report()
+
+    def test_cached_players_skip_drivers(self, player_cache):
+        for profile in (SWIATEK, GAUFF):
+            helpers.remember_player_data(profile, 'form', [{'result': 'W'}, {'result': 'L'}])
+            helpers.remember_player_data(profile, 'surface', {'clay': {'wins': 3, 'total': 4, 'win_rate': 0.75}})
+        helpers.remember_player_data(SWIATEK, 'ranking', 2)
+
+        drivers = StartedDrivers()
+        prefetcher = TennisPrefetcher(drivers, fetch=lambda *a: pytest.fail('fetch'))
+        records = prefetcher.run([MATCH_1])
+        assert drivers.started == 0 and prefetcher.stats['cached'] == 2
+        assert records[SWIATEK] == {'name': 'Swiatek Iga', 'url': SWIATEK, 'form': ['W', 'L'],
+                                    'ranking': 2, 'surface_stats': {'clay': 0.75}}
+
+    def test_failed_fetch_counted(self, player_cache):
+        def fetch(driver, profile, name):
+            if profile == GAUFF:
+                raise RuntimeError('boom')
+            return _record(profile)
+
+        prefetcher = TennisPrefetcher(StartedDrivers(), workers=1, fetch=fetch, delay_range=None)
+        records = prefetcher.run([MATCH_1])
+        assert set(records) == {SWIATEK}
+        assert prefetcher.stats['failed'] == 1
+
+
+class PlayerPagesDriver:
+    """Driver ze stronami wyników / statystyk zawodnika."""
+
+    RESULTS = ('<html><body><script>{"rank":["WTA","2","Iga"]}</script>'
+               '<div class="match win"><span class="score">6-4 6-3</span><span class="surface">ziemia</span></div>'
+               '<div class="match loss"><span class="score">4-6 6-7</span><span class="surface">ziemia</span></div>'
+               '</body></html>')
+
+    def __init__(self):
+        self.visited = []
+
+    def get(self, url):
+        self.visited.append(url)
+
+    @property
+    def page_source(self):
+        return self.RESULTS if self.visited[-1].endswith('/wyniki/') else '<html></html>'
+
+
+class TestFetchPlayerRecord:
+
+    def test_record_from_player_pages(self, player_cache):
+        driver = PlayerPagesDriver()
+        record = tp.fetch_player_record(driver, SWIATEK, 'Świątek I.')
+        assert record['form'] == ['W', 'L'] and record['ranking'] == 2
+        assert record['surface_stats'] == {'clay': 0.5}   # fallback z formy
+        assert driver.visited == [SWIATEK + 'wyniki/', SWIATEK + 'statystyki/']
+        assert tp.cached_player_record(SWIATEK, 'Świątek I.') == record
+
+
+class TestApplyRecords:
+
+    def test_fills_missing_only(self):
+        players = {
+            SWIATEK: _record(SWIATEK, ranking=2, form='WWL', surface={'clay': 0.8}),
+            GAUFF: _record(GAUFF, ranking=3, form='LLW', surface={'clay': 0.6, 'hard': 0.7}),
+        }
+        out = {'ranking_a': 1, 'ranking_b': None, 'form_a': [], 'form_b': ['W', 'W', 'W']}
+        assert apply_player_records(out, MATCH_1, players) is out
+        assert out['ranking_a'] == 1 and out['ranking_b'] == 3
+        assert out['form_a'] == ['W', 'W', 'L'] and out['form_b'] == ['W', 'W', 'W']
+        assert out['surface_stats_a'] == {'clay': 0.8} and out['surface_stats_b']['hard'] == 0.7
+
+    def test_missing_player_or_records(self):
+        out = {'ranking_a': None, 'form_a': []}
+        apply_player_records(out, MATCH_1, {SWIATEK: _record(SWIATEK, ranking=2, surface={'clay': 0.8})})
+        assert out['ranking_a'] == 2 and 'surface_stats_a' not in out
+        assert apply_player_records({}, MATCH_1, None) == {}
+        assert apply_player_records({}, FOOTBALL, {SWIATEK: _record(SWIATEK)}) == {}
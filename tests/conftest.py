@@ -28,6 +28,10 @@ def app():
     import auth_middleware
     importlib.reload(auth_middleware)
 
+    # Fresh shared transport without the on-disk HTTP response cache
+    import http_transport
+    http_transport.set_transport(http_transport.HttpTransport())
+
     import api_server as _mod
     importlib.reload(_mod)
 